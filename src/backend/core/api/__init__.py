@@ -1,11 +1,22 @@
 """Meet core API endpoints"""
 
+import functools
+import hashlib
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 
 from rest_framework import exceptions as drf_exceptions
+from rest_framework import status as drf_status
 from rest_framework import views as drf_views
-from rest_framework.decorators import api_view
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
 
@@ -31,15 +42,17 @@ def exception_handler(exc, context):
     return drf_views.exception_handler(exc, context)
 
 
-# pylint: disable=unused-argument
-@api_view(["GET"])
-def get_frontend_configuration(request):
-    """Returns the frontend configuration dict as configured in settings."""
+@functools.lru_cache(maxsize=1)
+def _get_frontend_configuration():
+    """Build the frontend configuration from settings, with its ETag.
+
+    Computed once per process, as settings do not change while it runs.
+    """
     frontend_configuration = {
         "LANGUAGE_CODE": settings.LANGUAGE_CODE,
         "recording": {
             "is_enabled": settings.RECORDING_ENABLE,
-            "available_modes": settings.RECORDING_WORKER_CLASSES.keys(),
+            "available_modes": list(settings.RECORDING_WORKER_CLASSES.keys()),
             "expiration_days": settings.RECORDING_EXPIRATION_DAYS,
             "max_duration": settings.RECORDING_MAX_DURATION,
         },
@@ -59,4 +72,36 @@ def get_frontend_configuration(request):
         },
     }
     frontend_configuration.update(settings.FRONTEND_CONFIGURATION)
-    return Response(frontend_configuration)
+
+    content = JSONRenderer().render(frontend_configuration)
+    etag = f'"{hashlib.sha256(content).hexdigest()}"'
+    return frontend_configuration, etag
+
+
+# pylint: disable=unused-argument
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([])
+def get_frontend_configuration(request):
+    """Returns the frontend configuration dict as configured in settings.
+
+    The configuration is public: requests are not authenticated, so that their
+    session is never loaded. Clients revalidate it with its ETag, and get a 304
+    response as long as it did not change.
+    """
+    frontend_configuration, etag = _get_frontend_configuration()
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and (
+        if_none_match.strip() == "*"
+        or etag in [tag.removeprefix("W/") for tag in parse_etags(if_none_match)]
+    ):
+        response = Response(status=drf_status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(frontend_configuration)
+
+    response["ETag"] = etag
+    patch_cache_control(
+        response, public=True, max_age=settings.FRONTEND_CONFIGURATION_MAX_AGE
+    )
+    return response
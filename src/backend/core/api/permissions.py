@@ -78,7 +78,10 @@ class ResourceAccessPermission(IsAuthenticated):
         if request.method == "DELETE" and obj.role == RoleChoices.OWNER:
             return obj.user == user
 
-        return obj.resource.is_administrator_or_owner(user)
+        role = obj.get_resource_role(user)
+        return RoleChoices.check_administrator_role(
+            role
+        ) or RoleChoices.check_owner_role(role)
 
 
 class HasAbilityPermission(IsAuthenticated):
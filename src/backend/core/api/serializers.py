@@ -41,7 +41,9 @@ class ResourceAccessSerializerMixin:
             self.instance
             and (
                 data.get("role") == models.RoleChoices.OWNER
-                and not self.instance.resource.is_owner(user)
+                and not models.RoleChoices.check_owner_role(
+                    self.instance.get_resource_role(user)
+                )
                 or self.instance.role == models.RoleChoices.OWNER
                 and self.instance.user != user
             )
@@ -233,6 +235,37 @@ class ParticipantEntrySerializer(BaseValidationOnlySerializer):
     allow_entry = serializers.BooleanField(required=True)
 
 
+class BulkParticipantEntrySerializer(BaseValidationOnlySerializer):
+    """Validate entry decision data for several participants."""
+
+    participant_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+        max_length=1000,
+    )
+    all_waiting = serializers.BooleanField(required=False, default=False)
+    allow_entry = serializers.BooleanField(required=True)
+
+    def validate(self, attrs):
+        """Ensure participants are targeted either by ids or all at once."""
+        if bool(attrs.get("participant_ids")) == attrs["all_waiting"]:
+            raise serializers.ValidationError(
+                "Provide either participant_ids or all_waiting."
+            )
+        return attrs
+
+
+class WaitingParticipantsQuerySerializer(BaseValidationOnlySerializer):
+    """Validate waiting participants list query parameters."""
+
+    since = serializers.IntegerField(
+        required=False,
+        min_value=0,
+        help_text="Only list changes since this version of the lobby",
+    )
+
+
 class CreationCallbackSerializer(BaseValidationOnlySerializer):
     """Validate room creation callback data."""
 
@@ -309,3 +342,27 @@ class UpdateParticipantSerializer(BaseParticipantsManagementSerializer):
                 ) from e
 
         return attrs
+
+
+class BulkMuteParticipantsSerializer(BaseValidationOnlySerializer):
+    """Validate muting data for several tracks."""
+
+    tracks = serializers.ListField(
+        child=MuteParticipantSerializer(), allow_empty=False, max_length=1000
+    )
+
+
+class BulkUpdateParticipantsSerializer(BaseValidationOnlySerializer):
+    """Validate update data for several participants."""
+
+    participants = serializers.ListField(
+        child=UpdateParticipantSerializer(), allow_empty=False, max_length=1000
+    )
+
+
+class BulkRemoveParticipantsSerializer(BaseValidationOnlySerializer):
+    """Validate removal data for several participants."""
+
+    participant_identities = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=1000
+    )
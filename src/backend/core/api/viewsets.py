@@ -1,16 +1,21 @@
 """API endpoints"""
 
+# pylint: disable=too-many-lines
+
+import base64
 import uuid
+from datetime import datetime
 from logging import getLogger
 from urllib.parse import urlparse
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import FieldError
-from django.db.models import Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils.text import slugify
 
+from kombu.exceptions import OperationalError
 from rest_framework import decorators, mixins, pagination, throttling, viewsets
 from rest_framework import (
     exceptions as drf_exceptions,
@@ -21,8 +26,10 @@ from rest_framework import (
 from rest_framework import (
     status as drf_status,
 )
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
-from core import enums, models, utils
+from core import enums, models, tasks, utils
 from core.recording.enums import FileExtension
 from core.recording.event.authentication import StorageEventAuthentication
 from core.recording.event.exceptions import (
@@ -139,7 +146,160 @@ class SerializerPerActionMixin:
         return self.serializer_classes.get(self.action, self.default_serializer_class)
 
 
-class Pagination(pagination.PageNumberPagination):
+class KeysetPagination(pagination.BasePagination):
+    """Paginate querysets on (created_at, id), newest first, through an opaque cursor.
+
+    Each page is filtered on the position of the last row of the previous one
+    instead of skipping rows with an offset, so that deep pages are served from
+    the (created_at, id) indexes as cheaply as the first one. No count is run:
+    responses only link to the next page, if any.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.request = None
+        self.page_size = None
+        self.next_position = None
+
+    def get_page_size(self, request):
+        """Return the page size requested by the client, bounded by max_page_size."""
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+
+        if page_size <= 0:
+            return api_settings.PAGE_SIZE
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        """Return the (created_at, id) position encoded in the cursor, if any."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            created_at, pk = (
+                base64.urlsafe_b64decode(encoded.encode("ascii"))
+                .decode("ascii")
+                .split("|")
+            )
+            return datetime.fromisoformat(created_at), uuid.UUID(pk)
+        except (TypeError, ValueError, UnicodeError) as e:
+            raise drf_exceptions.NotFound(self.invalid_cursor_message) from e
+
+    @staticmethod
+    def encode_cursor(position):
+        """Encode a (created_at, id) position as an opaque cursor."""
+        created_at, pk = position
+        return base64.urlsafe_b64encode(
+            f"{created_at.isoformat()}|{pk!s}".encode("ascii")
+        ).decode("ascii")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return the page of rows following the position of the cursor."""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            created_at, pk = position
+            # The range condition on created_at alone lets the index bound the scan
+            queryset = queryset.filter(created_at__lte=created_at).exclude(
+                created_at=created_at, pk__gte=pk
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        page = results[: self.page_size]
+
+        self.next_position = (
+            (page[-1].created_at, page[-1].pk)
+            if len(results) > self.page_size
+            else None
+        )
+        return page
+
+    def get_next_link(self):
+        """Return the link to the next page, or None on the last one."""
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position),
+        )
+
+    def get_paginated_response(self, data):
+        """Return a page of results along with the link to the next one."""
+        return drf_response.Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        """Describe paginated responses for the OpenAPI schema."""
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class KeysetOptInMixin:
+    """Let clients opt into keyset pagination by passing a cursor.
+
+    An empty cursor requests the first page. Without cursor, the page number
+    pagination this mixin is combined with is used, counting results as before.
+    """
+
+    keyset_pagination_class = KeysetPagination
+    keyset_pagination = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate with a cursor when the client passed one, by page number otherwise."""
+        cursor_query_param = self.keyset_pagination_class.cursor_query_param
+        if cursor_query_param not in request.query_params:
+            self.keyset_pagination = None
+            return super().paginate_queryset(queryset, request, view=view)
+
+        self.keyset_pagination = self.keyset_pagination_class()
+        return self.keyset_pagination.paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        """Return the response of the pagination that was used."""
+        if self.keyset_pagination is not None:
+            return self.keyset_pagination.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        """Document the cursor parameter along with page number ones."""
+        return [
+            *super().get_schema_operation_parameters(view),
+            {
+                "name": self.keyset_pagination_class.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Opt into cursor pagination, without count. "
+                    "Pass an empty value for the first page."
+                ),
+                "schema": {"type": "string"},
+            },
+        ]
+
+
+class DefaultPagination(KeysetOptInMixin, pagination.PageNumberPagination):
+    """Page number pagination of DRF settings, opting into keyset pagination on demand."""
+
+
+class Pagination(KeysetOptInMixin, pagination.PageNumberPagination):
     """Default pagination.
 
     DRF's PageNumberPagination does *not* apply ordering by itself. If a view
@@ -225,7 +385,7 @@ class CreationCallbackAnonRateThrottle(throttling.AnonRateThrottle):
     scope = "creation_callback"
 
 
-class RoomViewSet(
+class RoomViewSet(  # pylint: disable=too-many-public-methods
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.UpdateModelMixin,
@@ -235,9 +395,16 @@ class RoomViewSet(
     API endpoints to access and perform actions on rooms.
     """
 
+    pagination_class = DefaultPagination
     permission_classes = [permissions.RoomPermissions]
     queryset = models.Room.objects.all()
     serializer_class = serializers.RoomSerializer
+    # Actions on the join path, resolving rooms through the cache of their essentials
+    cached_room_actions = ["retrieve", "request_entry"]
+
+    def get_queryset(self):
+        """Load the roles of the user on rooms, read by permissions and serializers."""
+        return super().get_queryset().annotate_user_roles(self.request.user)
 
     def get_object(self):
         """Allow getting a room by its slug."""
@@ -246,8 +413,18 @@ class RoomViewSet(
             filter_kwargs = {"pk": self.kwargs["pk"]}
         except ValueError:
             filter_kwargs = {"slug": slugify(self.kwargs["pk"])}
-        queryset = self.filter_queryset(self.get_queryset())
-        obj = get_object_or_404(queryset, **filter_kwargs)
+
+        if self.action in self.cached_room_actions:
+            try:
+                obj = models.Room.objects.get_cached(
+                    **filter_kwargs, user=self.request.user
+                )
+            except models.Room.DoesNotExist as e:
+                raise Http404("No room matches the given query.") from e
+        else:
+            queryset = self.filter_queryset(self.get_queryset())
+            obj = get_object_or_404(queryset, **filter_kwargs)
+
         # May raise a permission denied
         self.check_object_permissions(self.request, obj)
         return obj
@@ -284,9 +461,7 @@ class RoomViewSet(
         user = self.request.user
 
         if user.is_authenticated:
-            queryset = (
-                self.filter_queryset(self.get_queryset()).filter(users=user).distinct()
-            )
+            queryset = self.filter_queryset(self.get_queryset()).filter_user(user)
         else:
             queryset = self.get_queryset().none()
 
@@ -310,6 +485,35 @@ class RoomViewSet(
         if callback_id := self.request.data.get("callback_id"):
             RoomCreation().persist_callback_state(callback_id, room)
 
+    @staticmethod
+    def _enqueue_recording_task(task, recording, action):
+        """Hand starting or stopping a recording over to a celery worker.
+
+        The request does not wait for LiveKit: clients follow the recording through
+        the room's metadata, or by polling its status on the recordings endpoint.
+        """
+        room = recording.room
+        try:
+            task.delay(recording_id=str(recording.id))
+        except OperationalError:
+            logger.exception("Failed to enqueue recording %s", recording.id)
+            if action == "start":
+                recording.status = models.RecordingStatusChoices.FAILED_TO_START
+                recording.save()
+            return drf_response.Response(
+                {"error": f"Recording failed to {action} for room {room.slug}"},
+                status=drf_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        return drf_response.Response(
+            {
+                "message": f"Recording {action} requested for room {room.slug}",
+                "id": str(recording.id),
+                "status": recording.status,
+            },
+            status=drf_status.HTTP_202_ACCEPTED,
+        )
+
     @decorators.action(
         detail=True,
         methods=["post"],
@@ -342,17 +546,33 @@ class RoomViewSet(
             user=self.request.user, role=models.RoleChoices.OWNER, recording=recording
         )
 
+        if settings.RECORDING_ASYNC_ENABLE:
+            return self._enqueue_recording_task(
+                tasks.start_recording, recording, "start"
+            )
+
         worker_service = get_worker_service(mode=recording.mode)
         worker_manager = WorkerServiceMediator(worker_service=worker_service)
 
         try:
-            worker_manager.start(recording)
+            started = worker_manager.start(recording)
         except RecordingStartError:
             return drf_response.Response(
                 {"error": f"Recording failed to start for room {room.slug}"},
                 status=drf_status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        # Egress capacity is saturated, the recording starts once a slot is freed
+        if not started:
+            return drf_response.Response(
+                {
+                    "message": f"Recording queued for room {room.slug}",
+                    "id": str(recording.id),
+                    "status": recording.status,
+                },
+                status=drf_status.HTTP_202_ACCEPTED,
+            )
+
         return drf_response.Response(
             {"message": f"Recording successfully started for room {room.slug}"},
             status=drf_status.HTTP_201_CREATED,
@@ -368,19 +588,26 @@ class RoomViewSet(
     )
     @FeatureFlag.require("recording")
     def stop_room_recording(self, request, pk=None):  # pylint: disable=unused-argument
-        """Stop room recording."""
+        """Stop room recording, or cancel it if it is still queued."""
 
         room = self.get_object()
 
         try:
             recording = models.Recording.objects.get(
-                room=room, status=models.RecordingStatusChoices.ACTIVE
+                room=room,
+                status__in=[
+                    models.RecordingStatusChoices.ACTIVE,
+                    models.RecordingStatusChoices.INITIATED,
+                ],
             )
         except models.Recording.DoesNotExist as e:
             raise drf_exceptions.NotFound(
                 "No active recording found for this room."
             ) from e
 
+        if settings.RECORDING_ASYNC_ENABLE:
+            return self._enqueue_recording_task(tasks.stop_recording, recording, "stop")
+
         worker_service = get_worker_service(mode=recording.mode)
         worker_manager = WorkerServiceMediator(worker_service=worker_service)
 
@@ -460,6 +687,54 @@ class RoomViewSet(
                 status=drf_status.HTTP_404_NOT_FOUND,
             )
 
+    @decorators.action(
+        detail=True,
+        methods=["post"],
+        url_path="enter-bulk",
+        permission_classes=[
+            permissions.HasPrivilegesOnRoom,
+        ],
+    )
+    def allow_participants_to_enter(self, request, pk=None):  # pylint: disable=unused-argument
+        """Accept or deny the entry requests of several participants at once.
+
+        Targets either the given participants, or all waiting participants. Returns
+        the resulting status of each targeted participant.
+        """
+
+        serializer = serializers.BulkParticipantEntrySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        room = self.get_object()
+
+        if room.is_public:
+            return drf_response.Response(
+                {"message": "Room has no lobby system."},
+                status=drf_status.HTTP_404_NOT_FOUND,
+            )
+
+        participant_ids = serializer.validated_data.get("participant_ids")
+
+        results = LobbyService().handle_participants_entry(
+            room_id=room.id,
+            allow_entry=serializer.validated_data["allow_entry"],
+            participant_ids=[str(participant_id) for participant_id in participant_ids]
+            if participant_ids
+            else None,
+        )
+
+        return drf_response.Response(
+            {
+                "participants": [
+                    {
+                        "id": participant_id,
+                        "status": status.value if status else "not_found",
+                    }
+                    for participant_id, status in results.items()
+                ]
+            }
+        )
+
     @decorators.action(
         detail=True,
         methods=["GET"],
@@ -469,16 +744,57 @@ class RoomViewSet(
         ],
     )
     def list_waiting_participants(self, request, pk=None):  # pylint: disable=unused-argument
-        """List waiting participants."""
+        """List waiting participants.
+
+        The lobby version is returned as ETag. Pass it back with `since` to only get
+        the participants who joined and the ids of those who left since then, or as
+        If-None-Match to get the whole list only if it changed. Either way, a 304 is
+        returned if nothing changed. With `since`, the whole list is returned flagged
+        with `reset` when the changes since then are no longer known.
+        """
         room = self.get_object()
 
         if room.is_public:
             return drf_response.Response({"participants": []})
 
+        serializer = serializers.WaitingParticipantsQuerySerializer(
+            data=request.query_params
+        )
+        serializer.is_valid(raise_exception=True)
+
+        since = serializer.validated_data.get("since")
+        full = since is None
+        if full:
+            since = self._parse_lobby_etag(request.headers.get("If-None-Match"))
+
         lobby_service = LobbyService()
 
-        participants = lobby_service.list_waiting_participants(room.id)
-        return drf_response.Response({"participants": participants})
+        changes = lobby_service.list_waiting_participants_changes(
+            room.id, since=since, full=full
+        )
+
+        if changes is None:
+            response = drf_response.Response(status=drf_status.HTTP_304_NOT_MODIFIED)
+            response["ETag"] = f'"{since}"'
+            return response
+
+        version = changes.pop("version")
+        if full:
+            changes.pop("reset")
+        else:
+            changes["version"] = version
+
+        response = drf_response.Response(changes)
+        response["ETag"] = f'"{version}"'
+        return response
+
+    @staticmethod
+    def _parse_lobby_etag(if_none_match):
+        """Extract the lobby version from an If-None-Match header, if any."""
+        if not if_none_match:
+            return None
+        etag = if_none_match.split(",")[0].strip().removeprefix("W/").strip('"')
+        return int(etag) if etag.isdigit() else None
 
     @decorators.action(
         detail=False,
@@ -716,6 +1032,115 @@ class RoomViewSet(
             {"status": "success"}, status=drf_status.HTTP_200_OK
         )
 
+    @decorators.action(
+        detail=True,
+        methods=["post"],
+        url_path="mute-participants",
+        url_name="mute-participants",
+        permission_classes=[permissions.HasPrivilegesOnRoom],
+    )
+    def mute_participants(self, request, pk=None):  # pylint: disable=unused-argument
+        """Mute several tracks at once, returning the outcome of each track."""
+        room = self.get_object()
+
+        serializer = serializers.BulkMuteParticipantsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        tracks = [
+            {
+                "identity": str(track["participant_identity"]),
+                "track_sid": track["track_sid"],
+            }
+            for track in serializer.validated_data["tracks"]
+        ]
+        results = ParticipantsManagement().mute_many(
+            room_name=str(room.pk), tracks=tracks
+        )
+
+        return drf_response.Response(
+            {
+                "participants": [
+                    {
+                        "participant_identity": track["identity"],
+                        "track_sid": track["track_sid"],
+                        "status": status,
+                    }
+                    for track, status in zip(tracks, results, strict=True)
+                ]
+            },
+            status=drf_status.HTTP_200_OK,
+        )
+
+    @decorators.action(
+        detail=True,
+        methods=["post"],
+        url_path="update-participants",
+        url_name="update-participants",
+        permission_classes=[permissions.HasPrivilegesOnRoom],
+    )
+    def update_participants(self, request, pk=None):  # pylint: disable=unused-argument
+        """Update several participants at once, returning the outcome of each."""
+        room = self.get_object()
+
+        serializer = serializers.BulkUpdateParticipantsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        updates = [
+            {
+                "identity": str(participant["participant_identity"]),
+                "metadata": participant.get("metadata"),
+                "attributes": participant.get("attributes"),
+                "permission": participant.get("permission"),
+                "name": participant.get("name"),
+            }
+            for participant in serializer.validated_data["participants"]
+        ]
+        results = ParticipantsManagement().update_many(
+            room_name=str(room.pk), updates=updates
+        )
+
+        return drf_response.Response(
+            {
+                "participants": [
+                    {"participant_identity": update["identity"], "status": status}
+                    for update, status in zip(updates, results, strict=True)
+                ]
+            },
+            status=drf_status.HTTP_200_OK,
+        )
+
+    @decorators.action(
+        detail=True,
+        methods=["post"],
+        url_path="remove-participants",
+        url_name="remove-participants",
+        permission_classes=[permissions.HasPrivilegesOnRoom],
+    )
+    def remove_participants(self, request, pk=None):  # pylint: disable=unused-argument
+        """Remove several participants from the room, returning the outcome of each."""
+        room = self.get_object()
+
+        serializer = serializers.BulkRemoveParticipantsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        identities = [
+            str(identity)
+            for identity in serializer.validated_data["participant_identities"]
+        ]
+        results = ParticipantsManagement().remove_many(
+            room_name=str(room.pk), identities=identities
+        )
+
+        return drf_response.Response(
+            {
+                "participants": [
+                    {"participant_identity": identity, "status": status}
+                    for identity, status in zip(identities, results, strict=True)
+                ]
+            },
+            status=drf_status.HTTP_200_OK,
+        )
+
 
 class ResourceAccessViewSet(
     mixins.CreateModelMixin,
@@ -729,6 +1154,7 @@ class ResourceAccessViewSet(
     API endpoints to access and perform actions on resource accesses.
     """
 
+    pagination_class = DefaultPagination
     permission_classes = [permissions.ResourceAccessPermission]
     queryset = models.ResourceAccess.objects.all()
     serializer_class = serializers.ResourceAccessSerializer
@@ -736,19 +1162,12 @@ class ResourceAccessViewSet(
     def get_queryset(self):
         """Return the queryset according to the action."""
 
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().annotate_user_roles(self.request.user)
 
         # Restrict access to resources the user either has explicit
         # permissions for or administrative privileges over.
         if self.action == "list":
-            user = self.request.user
-            queryset = queryset.filter(
-                Q(resource__accesses__user=user),
-                resource__accesses__role__in=[
-                    models.RoleChoices.ADMIN,
-                    models.RoleChoices.OWNER,
-                ],
-            ).distinct()
+            queryset = queryset.filter_administrated_by(self.request.user)
 
         return queryset
 
@@ -769,12 +1188,14 @@ class RecordingViewSet(
     serializer_class = serializers.RecordingSerializer
 
     def get_queryset(self):
-        """Restrict recordings to the user's ones."""
+        """Restrict recordings to the user's ones, loading their room and roles."""
         user = self.request.user
         return (
             super()
             .get_queryset()
-            .filter(Q(accesses__user=user) | Q(accesses__team__in=user.get_teams()))
+            .filter_user(user)
+            .select_related("room")
+            .annotate_user_roles(user)
         )
 
     @decorators.action(
@@ -867,6 +1288,16 @@ class RecordingViewSet(
             logger.debug("Failed to extract parameters from subrequest URL: %s", exc)
             raise drf_exceptions.PermissionDenied() from exc
 
+    @staticmethod
+    def _auth_get_decision_cache_key(user, key):
+        """Generate cache key for the decision to let a user access a file."""
+        return f"{settings.RECORDING_MEDIA_AUTH_KEY_PREFIX}_{user.pk!s}_{key:s}"
+
+    @staticmethod
+    def _auth_get_headers_cache_key(key):
+        """Generate cache key for the authorization headers signed for a file."""
+        return f"{settings.RECORDING_MEDIA_AUTH_KEY_PREFIX}_headers_{key:s}"
+
     @decorators.action(detail=False, methods=["get"], url_path="media-auth")
     def media_auth(self, request, *args, **kwargs):
         """
@@ -891,6 +1322,18 @@ class RecordingViewSet(
         if extension not in [item.value for item in FileExtension]:
             raise drf_exceptions.ValidationError({"detail": "Unsupported extension."})
 
+        # Players make many range requests: once authorized, a user is served
+        # from the cache, with headers signed for the file by a previous request.
+        key = f"{settings.RECORDING_OUTPUT_FOLDER}/{recording_id}.{extension}"
+        decision_cache_key = self._auth_get_decision_cache_key(user, key)
+        headers_cache_key = self._auth_get_headers_cache_key(key)
+
+        cached = cache.get_many([decision_cache_key, headers_cache_key])
+        if decision_cache_key in cached and headers_cache_key in cached:
+            return drf_response.Response(
+                "authorized", headers=cached[headers_cache_key], status=200
+            )
+
         try:
             recording = models.Recording.objects.get(id=recording_id)
         except models.Recording.DoesNotExist as e:
@@ -909,6 +1352,20 @@ class RecordingViewSet(
             logger.debug("Recording '%s' has not been saved", recording)
             raise drf_exceptions.PermissionDenied()
 
-        request = utils.generate_s3_authorization_headers(recording.key)
+        headers = cached.get(headers_cache_key)
+        if headers is None:
+            headers = utils.generate_s3_authorization_headers(recording.key)
+            cache.set(
+                headers_cache_key,
+                headers,
+                timeout=settings.RECORDING_MEDIA_AUTH_HEADERS_CACHE_TIMEOUT,
+            )
+
+        # Revoked accesses are thus denied after this timeout at most
+        cache.set(
+            decision_cache_key,
+            True,
+            timeout=settings.RECORDING_MEDIA_AUTH_CACHE_TIMEOUT,
+        )
 
-        return drf_response.Response("authorized", headers=request.headers, status=200)
+        return drf_response.Response("authorized", headers=headers, status=200)
@@ -22,6 +22,7 @@ from rest_framework import (
 )
 
 from core import api, models
+from core.api.viewsets import DefaultPagination
 
 from . import authentication, permissions, serializers
 
@@ -181,6 +182,7 @@ class RoomViewSet(
         authentication.ApplicationJWTAuthentication,
         ResourceServerAuthentication,
     ]
+    pagination_class = DefaultPagination
     permission_classes = [
         api.permissions.IsAuthenticated & permissions.HasRequiredRoomScope
     ]
@@ -193,9 +195,7 @@ class RoomViewSet(
         user = self.request.user
 
         if user.is_authenticated:
-            queryset = (
-                self.filter_queryset(self.get_queryset()).filter(users=user).distinct()
-            )
+            queryset = self.filter_queryset(self.get_queryset()).filter_user(user)
         else:
             queryset = self.get_queryset().none()
 
@@ -0,0 +1,167 @@
+"""
+Process-wide pool of connections to the LiveKit API.
+"""
+
+import asyncio
+import atexit
+import functools
+import os
+import threading
+import time
+from collections import Counter
+from logging import getLogger
+from typing import Dict, Optional
+
+from django.conf import settings
+
+import aiohttp
+
+logger = getLogger(__name__)
+
+
+class LiveKitPool:
+    """Keep connections to LiveKit alive, on a persistent background event loop.
+
+    LiveKit API calls are coroutines. Running each of them in a short-lived event
+    loop, like async_to_sync does, forces a new HTTP session, and thus a new TCP
+    and TLS handshake, for every call. Instead, calls are run in an event loop
+    living in a background thread, sharing a single keep-alive HTTP session.
+
+    The loop's thread does not survive a fork, so the pool is reset in child
+    processes, e.g. gunicorn or celery workers, which open their own connections.
+    Each process logs how often its connections are reused, every
+    LIVEKIT_CLIENT_STATS_LOG_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._stats = Counter()
+        self._stats_logged_at = time.monotonic()
+
+    def reset(self):
+        """Forget the loop and session without closing them, e.g. after a fork."""
+        self._lock = threading.Lock()
+        self._loop = None
+        self._session = None
+        self._stats = Counter()
+        self._stats_logged_at = time.monotonic()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the pool's event loop, starting it if needed."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="livekit-pool", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        """Count requests and connections made through the pool's session."""
+
+        async def on_request_start(*_):
+            self._stats["requests"] += 1
+
+        async def on_connection_create_end(*_):
+            self._stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(*_):
+            self._stats["connections_reused"] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Return the pool's HTTP session, to be used from the pool's event loop."""
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=settings.LIVEKIT_VERIFY_SSL,
+                limit=settings.LIVEKIT_CLIENT_POOL_SIZE,
+                keepalive_timeout=settings.LIVEKIT_CLIENT_KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=settings.LIVEKIT_CLIENT_TIMEOUT),
+                trace_configs=[self._create_trace_config()],
+            )
+        return self._session
+
+    def run(self, coroutine):
+        """Run a coroutine in the pool's event loop, and wait for its result."""
+
+        loop = self._get_loop()
+
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is loop:
+            coroutine.close()
+            raise RuntimeError("Cannot wait for the LiveKit pool from its own loop.")
+
+        try:
+            return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+        finally:
+            self._log_stats_periodically()
+
+    def _log_stats_periodically(self):
+        """Log the pool's counters if they were not logged for long enough."""
+
+        interval = settings.LIVEKIT_CLIENT_STATS_LOG_INTERVAL
+        now = time.monotonic()
+        if not interval or now - self._stats_logged_at < interval:
+            return
+
+        self._stats_logged_at = now
+        logger.info("LiveKit pool stats of process %s: %s", os.getpid(), self.stats())
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters about requests made, and connections created or reused."""
+        return {
+            "requests": self._stats["requests"],
+            "connections_created": self._stats["connections_created"],
+            "connections_reused": self._stats["connections_reused"],
+        }
+
+    def close(self):
+        """Close the pool's session, and stop its event loop."""
+
+        with self._lock:
+            loop, session = self._loop, self._session
+            self._loop, self._session = None, None
+
+        if loop is None:
+            return
+
+        if session is not None:
+            asyncio.run_coroutine_threadsafe(session.close(), loop).result()
+
+        logger.info("LiveKit pool closed: %s", self.stats())
+        loop.call_soon_threadsafe(loop.stop)
+
+
+livekit_pool = LiveKitPool()
+
+os.register_at_fork(after_in_child=livekit_pool.reset)
+atexit.register(livekit_pool.close)
+
+
+def run_in_livekit_loop(func):
+    """Make an async function synchronous, running it in the LiveKit pool's loop.
+
+    Drop-in replacement for async_to_sync, for code calling the LiveKit API.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return livekit_pool.run(func(*args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,73 @@
+"""benchmark_s3_signing management command"""
+
+import time
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from botocore.auth import S3SigV4Auth
+from botocore.awsrequest import AWSRequest
+
+from core.s3_signer import S3Signer
+
+
+def sign_with_botocore(key):
+    """Sign a GET request on an object the generic way, through botocore."""
+    url = default_storage.unsigned_connection.meta.client.generate_presigned_url(
+        "get_object",
+        ExpiresIn=0,
+        Params={"Bucket": default_storage.bucket_name, "Key": key},
+    )
+    request = AWSRequest(method="get", url=url)
+
+    s3_client = default_storage.connection.meta.client
+    # pylint: disable=protected-access
+    credentials = s3_client._request_signer._credentials  # noqa: SLF001
+    auth = S3SigV4Auth(
+        credentials.get_frozen_credentials(), "s3", s3_client.meta.region_name
+    )
+    auth.add_auth(request)
+    return dict(request.headers)
+
+
+class Command(BaseCommand):
+    """Measure the throughput of signing recording media access headers.
+
+    Compares the generic botocore path, which presigns an url and runs the SigV4
+    machinery for each key, with the dedicated S3 signer. Nothing is sent to the
+    object storage.
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        """Add argument to choose the number of signatures."""
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=10000,
+            help="Number of keys signed by each method",
+        )
+
+    def _measure(self, sign, iterations):
+        """Return the number of signatures per second of a signing function."""
+        start = time.perf_counter()
+        for i in range(iterations):
+            sign(f"recordings/{i:d}.mp4")
+        return iterations / (time.perf_counter() - start)
+
+    def handle(self, *args, **options):
+        """Handling of the management command."""
+        iterations = options["iterations"]
+        signer = S3Signer()
+
+        # Warm up clients and caches, so they don't weigh on the measures
+        sign_with_botocore("recordings/warmup.mp4")
+        signer.sign("recordings/warmup.mp4")
+
+        before = self._measure(sign_with_botocore, iterations)
+        after = self._measure(signer.sign, iterations)
+
+        self.stdout.write(f"botocore: {before:,.0f} signatures/s")
+        self.stdout.write(f"S3 signer: {after:,.0f} signatures/s")
+        self.stdout.write(f"Speedup: {after / before:.1f}x")
@@ -0,0 +1,42 @@
+"""reconcile_telephony_dispatch_rules management command"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.telephony import TelephonyException, TelephonyService
+
+
+class Command(BaseCommand):
+    """Make SIP dispatch rules match the rooms running in LiveKit.
+
+    Deletes the rules leaked by lost or failed 'room_finished' webhooks, and
+    creates the rules missing for running rooms.
+    """
+
+    help = __doc__
+
+    def handle(self, *args, **options):
+        """Handling of the management command."""
+        if not settings.ROOM_TELEPHONY_ENABLED:
+            raise CommandError("Telephony is not enabled.")
+
+        try:
+            report = TelephonyService().reconcile_dispatch_rules()
+        except TelephonyException as e:
+            raise CommandError(str(e)) from e
+
+        self.stdout.write(
+            f"Found {report.rules} dispatch rules and "
+            f"{report.running_rooms} running rooms"
+        )
+        self.stdout.write(
+            f"Deleted {report.deleted} rules, created {report.created} rules, "
+            f"{report.failed} failed"
+        )
+        self.stdout.write(
+            "Timings (ms): "
+            + ", ".join(
+                f"{step} {duration * 1000:.2f}"
+                for step, duration in report.timings.items()
+            )
+        )
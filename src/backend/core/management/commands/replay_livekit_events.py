@@ -0,0 +1,22 @@
+"""replay_livekit_events management command"""
+
+from django.core.management.base import BaseCommand
+
+from core.services.livekit_events import LiveKitEventsService
+
+
+class Command(BaseCommand):
+    """Process again the LiveKit webhook events that failed to process.
+
+    Failed events, e.g. a 'room_finished' event failing while the database was
+    unavailable, are dead-lettered rather than lost. They are replayed oldest
+    first, and dead-lettered again if they fail again.
+    """
+
+    help = __doc__
+
+    def handle(self, *args, **options):
+        """Handling of the management command."""
+        replayed, failed = LiveKitEventsService().replay_dead_letters()
+
+        self.stdout.write(f"Replayed {replayed} events, {failed} failed again")
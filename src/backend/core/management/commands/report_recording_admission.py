@@ -0,0 +1,36 @@
+"""report_recording_admission management command"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.recording.worker.admission import EgressAdmission
+
+
+class Command(BaseCommand):
+    """Report the egress occupancy, queue depth and wait times of recordings.
+
+    Helps sizing RECORDING_EGRESS_CAPACITY and the LiveKit egress deployment,
+    when recordings start waiting for a free egress.
+    """
+
+    help = __doc__
+
+    def handle(self, *args, **options):
+        """Handling of the management command."""
+        admission = EgressAdmission()
+
+        if not settings.RECORDING_EGRESS_CAPACITY:
+            self.stdout.write("Egress capacity is not limited.")
+            return
+
+        for mode in settings.RECORDING_EGRESS_CAPACITY:
+            stats = admission.get_stats(mode)
+            self.stdout.write(
+                f"{mode}: {stats['active']} active out of {stats['capacity']}, "
+                f"{stats['queued']} queued (oldest waiting {stats['oldest_wait']:.0f}s)"
+            )
+            self.stdout.write(
+                f"{mode}: {stats['admitted']} admitted, waiting "
+                f"{stats['average_wait']:.1f}s on average, "
+                f"{stats['max_wait']:.0f}s at most"
+            )
@@ -0,0 +1,45 @@
+"""report_telephony_pin_occupancy management command"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.models import Room
+
+
+class Command(BaseCommand):
+    """Report how crowded the space of telephony PIN codes is.
+
+    Helps deciding when to raise ROOM_TELEPHONY_PIN_LENGTH, before room creation
+    starts failing to find a free PIN code.
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        """Add argument to report on another PIN code length."""
+        parser.add_argument(
+            "--length",
+            type=int,
+            default=None,
+            help="Length of PIN codes, defaults to ROOM_TELEPHONY_PIN_LENGTH",
+        )
+
+    def handle(self, *args, **options):
+        """Handling of the management command."""
+        length = options["length"] or settings.ROOM_TELEPHONY_PIN_LENGTH
+        report = Room.get_pin_code_occupancy(length)
+
+        # A PIN code is missed when all candidates of all attempts are taken
+        nb_candidates = (
+            settings.ROOM_TELEPHONY_PIN_BATCH_SIZE
+            * settings.ROOM_TELEPHONY_PIN_MAX_RETRIES
+        )
+        failure_rate = report["occupancy"] ** nb_candidates
+
+        self.stdout.write(
+            f"PIN codes of length {length}: {report['used']} used out of "
+            f"{report['capacity']} ({report['occupancy']:.4%})"
+        )
+        self.stdout.write(
+            f"Probability for a room to get no PIN code: {failure_rate:.4%}"
+        )
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.11 on 2026-10-17 15:27
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently, not to lock large recording tables
+    atomic = False
+
+    dependencies = [
+        ("core", "0016_recording_options"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="recording",
+            index=models.Index(fields=["worker_id"], name="recording_worker_id_idx"),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=(
+                        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "
+                        '"unique_initiated_or_active_recording_per_worker" '
+                        'ON "meet_recording" ("worker_id") '
+                        "WHERE \"status\" IN ('active', 'initiated')"
+                    ),
+                    reverse_sql=(
+                        "DROP INDEX CONCURRENTLY IF EXISTS "
+                        '"unique_initiated_or_active_recording_per_worker"'
+                    ),
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name="recording",
+                    constraint=models.UniqueConstraint(
+                        condition=models.Q(("status__in", ["active", "initiated"])),
+                        fields=("worker_id",),
+                        name="unique_initiated_or_active_recording_per_worker",
+                    ),
+                ),
+            ],
+        ),
+    ]
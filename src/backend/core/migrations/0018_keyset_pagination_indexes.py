@@ -0,0 +1,34 @@
+# Generated by Django 5.2.11 on 2026-10-17 16:30
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently, not to lock large tables
+    atomic = False
+
+    dependencies = [
+        ("core", "0017_recording_worker_id_lookup"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="resource",
+            index=models.Index(
+                fields=["created_at", "id"], name="resource_created_at_id_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="resourceaccess",
+            index=models.Index(
+                fields=["created_at", "id"], name="access_created_at_id_idx"
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="recording",
+            index=models.Index(
+                fields=["created_at", "id"], name="recording_created_at_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-17 16:50
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently, not to lock large tables
+    atomic = False
+
+    dependencies = [
+        ("core", "0018_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="resourceaccess",
+            index=models.Index(
+                fields=["user", "resource", "role"],
+                name="access_user_resource_role_idx",
+            ),
+        ),
+    ]
@@ -2,8 +2,11 @@
 Declare and configure the models for the Meet core application
 """
 
+# pylint: disable=too-many-lines
+
 import secrets
 import uuid
+from collections import Counter
 from datetime import datetime, timedelta
 from logging import getLogger
 from typing import List, Optional
@@ -11,10 +14,15 @@ from typing import List, Optional
 from django.conf import settings
 from django.contrib.auth import models as auth_models
 from django.contrib.auth.base_user import AbstractBaseUser
+from django.contrib.postgres.expressions import ArraySubquery
 from django.contrib.postgres.fields import ArrayField
 from django.core import mail, validators
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied, ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Length
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.text import capfirst, slugify
 from django.utils.translation import gettext_lazy as _
@@ -45,6 +53,14 @@ class RoleChoices(models.TextChoices):
         """Check if a role is owner."""
         return role == cls.OWNER
 
+    @classmethod
+    def get_highest_role(cls, roles):
+        """Return the highest of the given roles, or None."""
+        for role in (cls.OWNER, cls.ADMIN, cls.MEMBER):
+            if role in roles:
+                return role
+        return None
+
 
 class RecordingStatusChoices(models.TextChoices):
     """Enumeration of possible states for a recording operation."""
@@ -240,7 +256,7 @@ def get_resource_roles(resource: models.Model, user: User) -> List[str]:
     if not user.is_authenticated:
         return []
 
-    # Use pre-annotated roles if available from viewset optimization
+    # Use roles annotated by the queryset, see annotate_user_roles
     if hasattr(resource, "user_roles"):
         return resource.user_roles or []
 
@@ -254,6 +270,39 @@ def get_resource_roles(resource: models.Model, user: User) -> List[str]:
         return []
 
 
+class ResourceQuerySet(models.QuerySet):
+    """Queryset of resources, knowing how to load the roles of a user on them."""
+
+    def filter_user(self, user):
+        """Filter resources a user has a direct access to.
+
+        Memberships are checked with an EXISTS subquery instead of a join, so that
+        resources are listed once without a DISTINCT over their rows.
+        """
+        return self.filter(
+            models.Exists(
+                ResourceAccess.objects.filter(resource=models.OuterRef("pk"), user=user)
+            )
+        )
+
+    def annotate_user_roles(self, user):
+        """Annotate resources with the roles of a user, in the same query.
+
+        The roles are read by get_role, and thus by all access rights methods,
+        instead of querying accesses again. They are only valid for this user.
+        """
+        if not user or not user.is_authenticated:
+            return self
+
+        return self.annotate(
+            user_roles=ArraySubquery(
+                ResourceAccess.objects.filter(
+                    resource=models.OuterRef("pk"), user=user
+                ).values("role")
+            )
+        )
+
+
 class Resource(BaseModel):
     """Model to define access control"""
 
@@ -264,10 +313,18 @@ class Resource(BaseModel):
         related_name="resources",
     )
 
+    objects = ResourceQuerySet.as_manager()
+
     class Meta:
         db_table = "meet_resource"
         verbose_name = _("Resource")
         verbose_name_plural = _("Resources")
+        indexes = [
+            # Keyset pagination of rooms, see KeysetPagination
+            models.Index(
+                fields=["created_at", "id"], name="resource_created_at_id_idx"
+            ),
+        ]
 
     def __str__(self):
         try:
@@ -282,15 +339,11 @@ class Resource(BaseModel):
         if not user or not user.is_authenticated:
             return None
 
-        role = None
-        for access in self.accesses.filter(user=user):
-            if access.role == RoleChoices.OWNER:
-                return RoleChoices.OWNER
-            if access.role == RoleChoices.ADMIN:
-                role = RoleChoices.ADMIN
-            if access.role == RoleChoices.MEMBER and role != RoleChoices.ADMIN:
-                role = RoleChoices.MEMBER
-        return role
+        roles = getattr(self, "user_roles", None)
+        if roles is None:
+            roles = self.accesses.filter(user=user).values_list("role", flat=True)
+
+        return RoleChoices.get_highest_role(list(roles))
 
     def is_administrator_or_owner(self, user):
         """
@@ -305,6 +358,52 @@ class Resource(BaseModel):
         return RoleChoices.check_owner_role(self.get_role(user))
 
 
+class ResourceAccessQuerySet(models.QuerySet):
+    """Queryset of resource accesses."""
+
+    def update(self, **kwargs):
+        """Update accesses in bulk, and invalidate the cached roles of their users.
+
+        Bulk updates bypass save, accesses are thus listed before being updated.
+        """
+        resources_users = list(self.values_list("resource_id", "user_id"))
+        rows = super().update(**kwargs)
+        Room.objects.invalidate_roles_cache(*resources_users)
+        return rows
+
+    def filter_administrated_by(self, user):
+        """Filter accesses to the resources a user is administrator or owner of.
+
+        Checked with an EXISTS subquery instead of a join, not to duplicate accesses.
+        """
+        return self.filter(
+            models.Exists(
+                ResourceAccess.objects.filter(
+                    resource=models.OuterRef("resource"),
+                    user=user,
+                    role__in=[RoleChoices.ADMIN, RoleChoices.OWNER],
+                )
+            )
+        )
+
+    def annotate_user_roles(self, user):
+        """Annotate accesses with the roles of a user on their resource.
+
+        The roles are read by get_resource_role instead of querying the resource
+        and its accesses again. They are only valid for this user.
+        """
+        if not user or not user.is_authenticated:
+            return self
+
+        return self.annotate(
+            resource_user_roles=ArraySubquery(
+                ResourceAccess.objects.filter(
+                    resource=models.OuterRef("resource"), user=user
+                ).values("role")
+            )
+        )
+
+
 class ResourceAccess(BaseModel):
     """Link table between resources and users"""
 
@@ -318,6 +417,8 @@ class ResourceAccess(BaseModel):
         max_length=20, choices=RoleChoices.choices, default=RoleChoices.MEMBER
     )
 
+    objects = ResourceAccessQuerySet.as_manager()
+
     class Meta:
         db_table = "meet_resource_access"
         ordering = ("-created_at",)
@@ -332,6 +433,15 @@ class ResourceAccess(BaseModel):
                 ),
             ),
         ]
+        indexes = [
+            # Keyset pagination of accesses, see KeysetPagination
+            models.Index(fields=["created_at", "id"], name="access_created_at_id_idx"),
+            # Covers membership and role checks on resources, see filter_user
+            models.Index(
+                fields=["user", "resource", "role"],
+                name="access_user_resource_role_idx",
+            ),
+        ]
 
     def __str__(self):
         role = capfirst(self.get_role_display())
@@ -364,6 +474,167 @@ class ResourceAccess(BaseModel):
             raise PermissionDenied("A resource should keep at least one owner.")
         return super().delete(*args, **kwargs)
 
+    def get_resource_role(self, user):
+        """Determine the role of a given user in the resource of this access."""
+        roles = getattr(self, "resource_user_roles", None)
+        if roles is None or not user or not user.is_authenticated:
+            return self.resource.get_role(user)
+        return RoleChoices.get_highest_role(roles)
+
+
+class RoomQuerySet(ResourceQuerySet):
+    """Queryset of rooms, forgetting the cached essentials of the rooms it updates."""
+
+    def update(self, **kwargs):
+        """Update rooms in bulk, and invalidate their cached essentials.
+
+        Bulk updates bypass save, rooms are thus listed before being updated.
+        """
+        rooms_ids = list(self.values_list("pk", flat=True))
+        rows = super().update(**kwargs)
+        self.model.objects.invalidate_cache(*rooms_ids)
+        return rows
+
+
+class RoomManager(models.Manager.from_queryset(RoomQuerySet)):
+    """Manager for rooms, resolving them through a cache of their essentials.
+
+    Joining a room only needs a few of its fields, which rarely change. They are
+    cached under the room's id, and its slug points to that id, so that invalidating
+    the id alone is enough when a room is updated, renamed or deleted.
+
+    The roles of users on rooms are cached as well, under the room's id and the
+    user's, so that permissions and serializers don't query accesses either.
+
+    Rooms are invalidated when saved, updated through a queryset, or deleted in any
+    way, and roles when accesses are. Changes bypassing the ORM, such as bulk_update
+    or raw SQL, are only seen once the cache expires, after ROOM_CACHE_TIMEOUT.
+    """
+
+    CACHED_FIELDS = ["id", "name", "slug", "access_level", "configuration", "pin_code"]
+
+    _stats = Counter()
+
+    @staticmethod
+    def _get_cache_key(room_id) -> str:
+        """Generate cache key for the essentials of a room."""
+        return f"{settings.ROOM_CACHE_KEY_PREFIX}_{room_id!s}"
+
+    @staticmethod
+    def _get_slug_cache_key(slug: str) -> str:
+        """Generate cache key for the id of the room having a slug."""
+        return f"{settings.ROOM_CACHE_KEY_PREFIX}_slug_{slug}"
+
+    @staticmethod
+    def _get_roles_cache_key(room_id, user_id) -> str:
+        """Generate cache key for the roles of a user on a room."""
+        return f"{settings.ROOM_CACHE_KEY_PREFIX}_roles_{room_id!s}_{user_id!s}"
+
+    def _from_cached(self, data: dict):
+        """Build a room from its cached essentials, other fields being deferred."""
+        data = {**data, "resource_id": data["id"]}
+        field_names = [
+            field.attname
+            for field in self.model._meta.concrete_fields  # noqa: SLF001  # pylint: disable=protected-access
+            if field.attname in data
+        ]
+        return self.model.from_db(
+            self.db, field_names, [data[name] for name in field_names]
+        )
+
+    def get_cached(self, *, pk=None, slug=None, user=None):
+        """Return a room by id or slug, read through the cache of its essentials.
+
+        The room is meant for reading: its other fields are deferred. The roles of
+        the given user on it are loaded through the cache too, and read by get_role,
+        like the ones annotated by annotate_user_roles.
+
+        Raises:
+            Room.DoesNotExist: If no room has this id or slug.
+        """
+
+        room = self._get_cached_room(pk=pk, slug=slug)
+
+        if user is not None and user.is_authenticated:
+            room.user_roles = self._get_cached_roles(room.pk, user)
+
+        return room
+
+    def _get_cached_room(self, *, pk=None, slug=None):
+        """Return a room by id or slug, built from its cached essentials."""
+
+        if slug is not None:
+            pk = cache.get(self._get_slug_cache_key(slug))
+
+        data = cache.get(self._get_cache_key(pk)) if pk is not None else None
+
+        # A renamed room leaves a stale slug behind, pointing to its id
+        if data is not None and (slug is None or data["slug"] == slug):
+            self._stats["hits"] += 1
+            return self._from_cached(data)
+
+        self._stats["misses"] += 1
+
+        lookup = {"slug": slug} if slug is not None else {"pk": pk}
+        data = self.filter(**lookup).values(*self.CACHED_FIELDS).get()
+
+        cache.set_many(
+            {
+                self._get_cache_key(data["id"]): data,
+                self._get_slug_cache_key(data["slug"]): data["id"],
+            },
+            timeout=settings.ROOM_CACHE_TIMEOUT,
+        )
+        return self._from_cached(data)
+
+    def _get_cached_roles(self, room_id, user):
+        """Return the roles of a user on a room, read through the cache."""
+
+        cache_key = self._get_roles_cache_key(room_id, user.pk)
+        roles = cache.get(cache_key)
+
+        if roles is None:
+            roles = list(
+                ResourceAccess.objects.filter(
+                    resource_id=room_id, user=user
+                ).values_list("role", flat=True)
+            )
+            cache.set(cache_key, roles, timeout=settings.ROOM_CACHE_TIMEOUT)
+
+        return roles
+
+    def invalidate_cache(self, *rooms_ids):
+        """Forget the cached essentials of rooms, now and once committed.
+
+        Invalidating again on commit prevents a concurrent request from caching
+        values read before the transaction changing them was committed.
+        """
+        if not rooms_ids:
+            return
+
+        cache_keys = [self._get_cache_key(room_id) for room_id in rooms_ids]
+        cache.delete_many(cache_keys)
+        transaction.on_commit(lambda: cache.delete_many(cache_keys), using=self.db)
+
+    def invalidate_roles_cache(self, *rooms_users_ids):
+        """Forget the cached roles of users on rooms, given as (room, user) ids.
+
+        Like for rooms, roles are invalidated again once the transaction commits.
+        """
+        if not rooms_users_ids:
+            return
+
+        cache_keys = [
+            self._get_roles_cache_key(room_id, user_id)
+            for room_id, user_id in rooms_users_ids
+        ]
+        cache.delete_many(cache_keys)
+        transaction.on_commit(lambda: cache.delete_many(cache_keys), using=self.db)
+
+    def cache_stats(self):
+        """Return counters about rooms found in the cache or not, in this process."""
+        return {"hits": self._stats["hits"], "misses": self._stats["misses"]}
+
 
 class Room(Resource):
     """Model for one room"""
@@ -396,6 +667,8 @@ class Room(Resource):
         help_text=_("Unique n-digit code that identifies this room in telephony mode."),
     )
 
+    objects = RoomManager()
+
     class Meta:
         db_table = "meet_room"
         ordering = ("name",)
@@ -406,12 +679,13 @@ class Room(Resource):
         return capfirst(self.name)
 
     def save(self, *args, **kwargs):
-        """Generate a unique n-digit pin code for new rooms."""
+        """Generate a unique n-digit pin code for new rooms, and invalidate the cache."""
         if settings.ROOM_TELEPHONY_ENABLED and not self.pk and not self.pin_code:
             self.pin_code = self.generate_unique_pin_code(
                 length=settings.ROOM_TELEPHONY_PIN_LENGTH
             )
         super().save(*args, **kwargs)
+        Room.objects.invalidate_cache(self.pk)
 
     def clean_fields(self, exclude=None):
         """
@@ -437,7 +711,11 @@ class Room(Resource):
 
     @staticmethod
     def generate_unique_pin_code(length):
-        """Generate a unique n-digit PIN code"""
+        """Generate a unique n-digit PIN code
+
+        Candidates are drawn in batches, each batch being checked in a single query,
+        so that a crowded PIN space costs few queries before giving up.
+        """
 
         if length < 4:
             raise ValueError(
@@ -447,9 +725,20 @@ class Room(Resource):
         max_value = 10**length
 
         for _attempt in range(settings.ROOM_TELEPHONY_PIN_MAX_RETRIES):
-            pin_code = str(secrets.randbelow(max_value)).zfill(length)
-            if not Room.objects.filter(pin_code=pin_code).exists():
-                return pin_code
+            candidates = list(
+                dict.fromkeys(
+                    str(secrets.randbelow(max_value)).zfill(length)
+                    for _ in range(settings.ROOM_TELEPHONY_PIN_BATCH_SIZE)
+                )
+            )
+            taken = set(
+                Room.objects.filter(pin_code__in=candidates).values_list(
+                    "pin_code", flat=True
+                )
+            )
+            for pin_code in candidates:
+                if pin_code not in taken:
+                    return pin_code
 
         # Log a warning as a temporary measure until backend observability is implemented.
         logger.warning(
@@ -460,6 +749,41 @@ class Room(Resource):
 
         return None
 
+    @staticmethod
+    def get_pin_code_occupancy(length):
+        """Return how crowded the space of n-digit PIN codes is.
+
+        The occupancy is the probability for a random candidate to be taken. Once
+        it gets high, PIN codes should be made longer.
+        """
+
+        used = (
+            Room.objects.filter(pin_code__isnull=False)
+            .annotate(pin_code_length=Length("pin_code"))
+            .filter(pin_code_length=length)
+            .count()
+        )
+        capacity = 10**length
+
+        return {
+            "length": length,
+            "used": used,
+            "capacity": capacity,
+            "occupancy": used / capacity,
+        }
+
+
+@receiver(post_delete, sender=Room)
+def _invalidate_deleted_room_cache(sender, instance, **kwargs):
+    """Forget the cached essentials of a room, however it was deleted."""
+    Room.objects.invalidate_cache(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=ResourceAccess)
+def _invalidate_access_roles_cache(sender, instance, **kwargs):
+    """Forget the cached roles of a user on a room, when their access changes."""
+    Room.objects.invalidate_roles_cache((instance.resource_id, instance.user_id))
+
 
 class BaseAccessManager(models.Manager):
     """Base manager for handling resource access control."""
@@ -530,6 +854,76 @@ class BaseAccess(BaseModel):
         }
 
 
+class RecordingQuerySet(models.QuerySet):
+    """Queryset of recordings, knowing how to load the roles of a user on them."""
+
+    def filter_user(self, user):
+        """Filter recordings a user has access to, directly or through a team."""
+        return self.filter(
+            models.Exists(
+                RecordingAccess.objects.filter_user(user).filter(
+                    recording=models.OuterRef("pk")
+                )
+            )
+        )
+
+    def annotate_user_roles(self, user):
+        """Annotate recordings with the roles of a user, including team-based roles.
+
+        The roles are read by get_resource_roles, and thus by get_abilities,
+        instead of querying accesses again. They are only valid for this user.
+        """
+        if not user or not user.is_authenticated:
+            return self
+
+        return self.annotate(
+            user_roles=ArraySubquery(
+                RecordingAccess.objects.filter_user(user)
+                .filter(recording=models.OuterRef("pk"))
+                .values("role")
+                .distinct()
+            )
+        )
+
+
+class RecordingManager(models.Manager.from_queryset(RecordingQuerySet)):
+    """Manager for recordings, looking them up by worker ID through a cache."""
+
+    @staticmethod
+    def _get_worker_cache_key(worker_id: str) -> str:
+        """Generate cache key for the recording of a worker."""
+        return f"{settings.RECORDING_WORKER_KEY_PREFIX}_{worker_id}"
+
+    def cache_worker_id(self, recording):
+        """Remember which recording a worker is recording."""
+        cache.set(
+            self._get_worker_cache_key(recording.worker_id),
+            recording.pk,
+            timeout=settings.RECORDING_WORKER_CACHE_TIMEOUT,
+        )
+
+    def get_by_worker_id(self, worker_id: str):
+        """Return the recording of a worker, finding it by primary key when cached.
+
+        Raises:
+            Recording.DoesNotExist: If no recording has this worker ID.
+        """
+
+        queryset = self.select_related("room")
+
+        recording_id = cache.get(self._get_worker_cache_key(worker_id))
+        if recording_id is not None:
+            try:
+                return queryset.get(pk=recording_id, worker_id=worker_id)
+            except self.model.DoesNotExist:
+                # The recording was deleted, or its worker ID changed
+                pass
+
+        recording = queryset.get(worker_id=worker_id)
+        self.cache_worker_id(recording)
+        return recording
+
+
 class Recording(BaseModel):
     """Model for recordings that take place in a room.
 
@@ -584,6 +978,8 @@ class Recording(BaseModel):
         help_text=_("Recording options"),
     )
 
+    objects = RecordingManager()
+
     class Meta:
         db_table = "meet_recording"
         ordering = ("-created_at",)
@@ -599,7 +995,25 @@ class Recording(BaseModel):
                     ]
                 ),
                 name="unique_initiated_or_active_recording_per_room",
-            )
+            ),
+            models.UniqueConstraint(
+                fields=["worker_id"],
+                condition=models.Q(
+                    status__in=[
+                        RecordingStatusChoices.ACTIVE,
+                        RecordingStatusChoices.INITIATED,
+                    ]
+                ),
+                name="unique_initiated_or_active_recording_per_worker",
+            ),
+        ]
+        indexes = [
+            # Webhooks look recordings up by worker ID, whatever their status
+            models.Index(fields=["worker_id"], name="recording_worker_id_idx"),
+            # Keyset pagination of recordings, see KeysetPagination
+            models.Index(
+                fields=["created_at", "id"], name="recording_created_at_id_idx"
+            ),
         ]
 
     def __str__(self):
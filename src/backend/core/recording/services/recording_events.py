@@ -7,6 +7,7 @@ from logging import getLogger
 from livekit import api
 
 from core import models, utils
+from core.services.room_metadata import RoomMetadataService
 
 logger = getLogger(__name__)
 
@@ -33,7 +34,7 @@ class RecordingEventsService:
         recording_status = status_mapping.get(egress_status)
         if recording_status:
             try:
-                utils.update_room_metadata(
+                RoomMetadataService().update(
                     room_name, {"recording_status": recording_status}
                 )
             except utils.MetadataUpdateException as e:
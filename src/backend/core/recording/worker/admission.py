@@ -0,0 +1,176 @@
+"""Admission control of recordings, against the egress capacity of each mode."""
+
+import time
+from logging import getLogger
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from kombu.exceptions import OperationalError
+
+from core import utils
+from core.models import Recording
+
+logger = getLogger(__name__)
+
+
+# Release a recording's slot and queue a recording, then grant free slots to
+# queued recordings, oldest first. Slots not released before their timeout are
+# considered leaked, e.g. by a lost webhook, and are reclaimed.
+# Returns whether the queued recording holds a slot, followed by the other
+# recordings granted a slot, which the caller must start.
+# KEYS: active slots, queue, statistics.
+# ARGV: recording to queue or "", recording to release or "", capacity,
+#       current time in milliseconds, slot timeout in milliseconds.
+ADMISSION_SCRIPT = """
+local now = tonumber(ARGV[4])
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now)
+if ARGV[2] ~= "" then
+    redis.call("ZREM", KEYS[1], ARGV[2])
+    redis.call("ZREM", KEYS[2], ARGV[2])
+end
+if ARGV[1] ~= "" and not redis.call("ZSCORE", KEYS[1], ARGV[1]) then
+    redis.call("ZADD", KEYS[2], "NX", now, ARGV[1])
+end
+local granted = {}
+while redis.call("ZCARD", KEYS[1]) < tonumber(ARGV[3]) do
+    local head = redis.call("ZPOPMIN", KEYS[2])
+    if #head == 0 then
+        break
+    end
+    redis.call("ZADD", KEYS[1], now + tonumber(ARGV[5]), head[1])
+    local wait = now - tonumber(head[2])
+    redis.call("HINCRBY", KEYS[3], "admitted", 1)
+    redis.call("HINCRBY", KEYS[3], "wait_total", wait)
+    if wait > tonumber(redis.call("HGET", KEYS[3], "wait_max") or 0) then
+        redis.call("HSET", KEYS[3], "wait_max", wait)
+    end
+    if head[1] ~= ARGV[1] then
+        table.insert(granted, head[1])
+    end
+end
+local admitted = 0
+if ARGV[1] ~= "" and redis.call("ZSCORE", KEYS[1], ARGV[1]) then
+    admitted = 1
+end
+table.insert(granted, 1, admitted)
+return granted
+"""
+
+
+class EgressAdmission:
+    """Limit the number of egress running at once for each recording mode.
+
+    When all slots of a mode are taken, recordings are queued instead of failing
+    to start, and started in order as egress_ended webhooks release slots. Slots
+    and queues live in Redis, shared by all API and celery processes.
+
+    Modes missing from RECORDING_EGRESS_CAPACITY are not limited.
+    """
+
+    @staticmethod
+    def _get_key(name: str, mode: str) -> str:
+        """Generate the raw Redis key of a mode's admission state."""
+        return cache.make_key(
+            f"{settings.RECORDING_ADMISSION_KEY_PREFIX}_{name}_{mode}"
+        )
+
+    @staticmethod
+    def get_capacity(mode: str):
+        """Return the number of egress allowed at once for a mode, if limited."""
+        return settings.RECORDING_EGRESS_CAPACITY.get(mode)
+
+    def _run(self, mode: str, queue_id: str = "", release_id: str = "") -> bool:
+        """Run the admission script, and start the recordings it granted a slot."""
+
+        admitted, *granted = utils.run_redis_script(
+            ADMISSION_SCRIPT,
+            keys=[
+                self._get_key("active", mode),
+                self._get_key("queue", mode),
+                self._get_key("stats", mode),
+            ],
+            args=[
+                queue_id,
+                release_id,
+                self.get_capacity(mode),
+                int(time.time() * 1000),
+                settings.RECORDING_ADMISSION_SLOT_TIMEOUT * 1000,
+            ],
+        )
+
+        for recording_id in granted:
+            self._start(recording_id.decode("utf-8"))
+
+        return bool(admitted)
+
+    @staticmethod
+    def _start(recording_id: str):
+        """Hand a recording granted a slot over to a celery worker."""
+
+        # Resolved lazily, as the task itself starts recordings through admission
+        task = import_string("core.tasks.start_recording")
+        try:
+            task.delay(recording_id=recording_id)
+        except OperationalError:
+            logger.exception(
+                "Failed to schedule start of recording %s, starting it now",
+                recording_id,
+            )
+            task(recording_id=recording_id)
+
+    def admit(self, recording: Recording) -> bool:
+        """Take a slot for a recording, or queue it if its mode is saturated.
+
+        Returns whether the recording can start now. Queued recordings are
+        started by a celery task once a slot is granted to them.
+        """
+
+        if self.get_capacity(recording.mode) is None:
+            return True
+
+        return self._run(recording.mode, queue_id=str(recording.id))
+
+    def release(self, recording: Recording):
+        """Release a recording's slot, or drop it from the queue.
+
+        Freed slots are granted to the oldest queued recordings. Releasing twice,
+        e.g. on duplicated webhooks, is harmless.
+        """
+
+        if self.get_capacity(recording.mode) is None:
+            return
+
+        self._run(recording.mode, release_id=str(recording.id))
+
+    def get_stats(self, mode: str) -> Dict[str, float]:
+        """Return the occupancy, queue depth and wait times of a mode.
+
+        Wait times are in seconds. Recordings admitted right away count as
+        having waited 0 seconds.
+        """
+
+        client = cache.client.get_client(write=False)
+        now = int(time.time() * 1000)
+
+        pipeline = client.pipeline(transaction=False)
+        pipeline.zcount(self._get_key("active", mode), now, "+inf")
+        pipeline.zcard(self._get_key("queue", mode))
+        pipeline.zrange(self._get_key("queue", mode), 0, 0, withscores=True)
+        pipeline.hgetall(self._get_key("stats", mode))
+        active, queued, oldest, stats = pipeline.execute()
+
+        admitted = int(stats.get(b"admitted", 0))
+        wait_total = int(stats.get(b"wait_total", 0))
+
+        return {
+            "capacity": self.get_capacity(mode),
+            "active": active,
+            "queued": queued,
+            "oldest_wait": (now - oldest[0][1]) / 1000 if oldest else 0,
+            "admitted": admitted,
+            "average_wait": wait_total / admitted / 1000 if admitted else 0,
+            "max_wait": int(stats.get(b"wait_max", 0)) / 1000,
+        }
@@ -2,9 +2,13 @@
 
 import logging
 
+from django.utils import timezone
+
 from core import utils
 from core.models import Recording, RecordingStatusChoices
+from core.services.room_metadata import RoomMetadataService
 
+from .admission import EgressAdmission
 from .exceptions import (
     RecordingStartError,
     RecordingStopError,
@@ -25,19 +29,56 @@ class WorkerServiceMediator:
     Implements Mediator pattern.
     """
 
-    def __init__(self, worker_service: WorkerService):
+    def __init__(
+        self, worker_service: WorkerService, admission: EgressAdmission = None
+    ):
         """Initialize the WorkerServiceMediator with the provided worker service."""
 
         self._worker_service = worker_service
+        self._admission = admission or EgressAdmission()
+
+    @staticmethod
+    def _notify_starting(room_name: str, recording: Recording):
+        """Let the room's participants know a recording is starting."""
+
+        mode = recording.options.get("original_mode", None) or recording.mode
+
+        try:
+            RoomMetadataService().update(
+                room_name, {"recording_mode": mode, "recording_status": "starting"}
+            )
+        except utils.MetadataUpdateException as e:
+            logger.exception("Failed to update room's metadata: %s", e)
+
+    @staticmethod
+    def _update_if_initiated(recording: Recording, **fields) -> bool:
+        """Update a recording only if it is still INITIATED in the database.
+
+        Guards the transitions out of INITIATED against a concurrent start or
+        cancellation of the same recording. Returns whether it was updated.
+        """
 
-    def start(self, recording: Recording):
+        updated = Recording.objects.filter(
+            pk=recording.pk, status=RecordingStatusChoices.INITIATED
+        ).update(updated_at=timezone.now(), **fields)
+
+        if updated:
+            for name, value in fields.items():
+                setattr(recording, name, value)
+        return bool(updated)
+
+    def start(self, recording: Recording) -> bool:
         """Start the recording process using the worker service.
 
         If the operation is successful, the recording's status will
         transition from INITIATED to ACTIVE, else to FAILED_TO_START to keep track of errors.
+        When the egress capacity of its mode is saturated, the recording stays
+        INITIATED in a queue, and is started again once a slot is freed.
 
         Args:
             recording (Recording): The recording instance to start.
+        Returns:
+            bool: Whether the recording started, or was queued.
         Raises:
             RecordingStartError: If there is an error starting the recording.
         """
@@ -47,6 +88,16 @@ class WorkerServiceMediator:
             raise RecordingStartError()
 
         room_name = str(recording.room.id)
+
+        if not self._admission.admit(recording):
+            logger.info(
+                "Egress capacity saturated, recording %s queued for room %s",
+                recording.id,
+                recording.room,
+            )
+            self._notify_starting(room_name, recording)
+            return False
+
         try:
             worker_id = self._worker_service.start(room_name, recording.id)
         except (WorkerRequestError, WorkerConnectionError, WorkerResponseError) as e:
@@ -54,33 +105,81 @@ class WorkerServiceMediator:
                 "Failed to start recording for room %s: %s", recording.room.slug, e
             )
             recording.status = RecordingStatusChoices.FAILED_TO_START
-            raise RecordingStartError() from e
-        else:
-            recording.worker_id = worker_id
-            recording.status = RecordingStatusChoices.ACTIVE
-        finally:
             recording.save()
+            self._admission.release(recording)
+            raise RecordingStartError() from e
 
-        mode = recording.options.get("original_mode", None) or recording.mode
+        if not self._update_if_initiated(
+            recording, worker_id=worker_id, status=RecordingStatusChoices.ACTIVE
+        ):
+            self._stop_cancelled_worker(recording, worker_id)
+            raise RecordingStartError()
 
-        try:
-            utils.update_room_metadata(
-                room_name, {"recording_mode": mode, "recording_status": "starting"}
-            )
-        except utils.MetadataUpdateException as e:
-            logger.exception("Failed to update room's metadata: %s", e)
+        # Webhooks about the worker then find its recording without a lookup
+        Recording.objects.cache_worker_id(recording)
+
+        self._notify_starting(room_name, recording)
 
         logger.info(
             "Worker started for room %s (worker ID: %s)",
             recording.room,
             recording.worker_id,
         )
+        return True
+
+    def _stop_cancelled_worker(self, recording: Recording, worker_id: str):
+        """Stop the worker started for a recording cancelled in the meantime."""
+
+        logger.warning(
+            "Recording %s was cancelled while starting, stopping worker %s",
+            recording.id,
+            worker_id,
+        )
+
+        # Its egress_ended webhook then finds the recording, and releases its slot
+        Recording.objects.filter(pk=recording.pk).update(worker_id=worker_id)
+
+        try:
+            self._worker_service.stop(worker_id=worker_id)
+        except (WorkerConnectionError, WorkerResponseError):
+            logger.exception(
+                "Failed to stop worker %s of cancelled recording %s",
+                worker_id,
+                recording.id,
+            )
+
+    def _cancel(self, recording: Recording):
+        """Cancel a recording not started yet, e.g. queued for an egress slot.
+
+        The recording transitions from INITIATED to ABORTED, and leaves the
+        admission queue, or frees the slot just granted to it.
+        """
+
+        if not self._update_if_initiated(
+            recording, status=RecordingStatusChoices.ABORTED
+        ):
+            logger.error(
+                "Cannot cancel recording %s, it already started.", recording.id
+            )
+            raise RecordingStopError()
+
+        self._admission.release(recording)
+
+        try:
+            RoomMetadataService().update(
+                str(recording.room.id), {}, ["recording_mode", "recording_status"]
+            )
+        except utils.MetadataUpdateException as e:
+            logger.exception("Failed to update room's metadata: %s", e)
+
+        logger.info("Recording cancelled for room %s", recording.room)
 
     def stop(self, recording: Recording):
         """Stop the recording process using the worker service.
 
         If the operation is successful, the recording's status will transition
         from ACTIVE to STOPPED, else to FAILED_TO_STOP to keep track of errors.
+        A recording not started yet, still INITIATED, is cancelled instead.
 
         Args:
             recording (Recording): The recording instance to stop.
@@ -88,6 +187,10 @@ class WorkerServiceMediator:
             RecordingStopError: If there is an error stopping the recording.
         """
 
+        if recording.status == RecordingStatusChoices.INITIATED:
+            self._cancel(recording)
+            return
+
         if recording.status != RecordingStatusChoices.ACTIVE:
             logger.error("Cannot stop recording in %s status.", recording.status)
             raise RecordingStopError()
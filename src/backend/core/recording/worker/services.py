@@ -2,10 +2,10 @@
 
 # pylint: disable=no-member
 
-from asgiref.sync import async_to_sync
 from livekit import api as livekit_api
 
 from ... import utils
+from ...livekit_pool import run_in_livekit_loop
 from ..enums import FileExtension
 from .exceptions import WorkerConnectionError, WorkerResponseError
 from .factories import WorkerServiceConfig
@@ -24,7 +24,7 @@ class BaseEgressService:
         """
         return f"{self._config.output_folder}/{filename}.{extension}"
 
-    @async_to_sync
+    @run_in_livekit_loop
     async def _handle_request(self, request, method_name: str):
         """Handle making a request to the LiveKit API and returns the response."""
 
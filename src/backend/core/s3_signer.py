@@ -0,0 +1,169 @@
+"""
+Process-wide signer of S3 object requests.
+"""
+
+import hashlib
+import hmac
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from django.core.files.storage import default_storage
+
+ALGORITHM = "AWS4-HMAC-SHA256"
+EMPTY_SHA256_HASH = hashlib.sha256(b"").hexdigest()
+SERVICE_NAME = "s3"
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%SZ"
+
+# Stands for the key of an object in the url template, it must not be quoted
+KEY_PLACEHOLDER = "__s3_signer_key__"
+
+
+def _hmac_sha256(key: bytes, message: str) -> bytes:
+    """Return the HMAC-SHA256 digest of a message."""
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+class S3Signer:
+    """Sign GET requests on objects of the default storage with AWS SigV4.
+
+    Produces the same headers as botocore's S3SigV4Auth, without its generic
+    machinery: the url of objects is derived from a template computed once, the
+    canonical request of a key is built directly, and the signing key derived from
+    the secret key, which only changes once a day, is computed once per day.
+
+    Credentials are read from the storage's client on each call, so they are
+    refreshed by botocore when they rotate, and the signing key follows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoint: Optional[Tuple[str, str, str]] = None
+        self._signing_key: Optional[Tuple[Tuple[str, str, str, str], bytes]] = None
+
+    def reset(self):
+        """Forget the url template and signing key, e.g. when settings change."""
+        with self._lock:
+            self._endpoint = None
+            self._signing_key = None
+
+    def _get_endpoint(self) -> Tuple[str, str, str]:
+        """Return the path template, host and canonical query string of objects."""
+        with self._lock:
+            if self._endpoint is None:
+                # Let botocore resolve the endpoint and addressing style once
+                client = default_storage.unsigned_connection.meta.client
+                url = client.generate_presigned_url(
+                    "get_object",
+                    ExpiresIn=0,
+                    Params={
+                        "Bucket": default_storage.bucket_name,
+                        "Key": KEY_PLACEHOLDER,
+                    },
+                )
+                self._endpoint = (
+                    urlsplit(url).path,
+                    self._get_host(url),
+                    self._get_canonical_query_string(url),
+                )
+            return self._endpoint
+
+    @staticmethod
+    def _get_host(url: str) -> str:
+        """Return the host header of an url, without its port if it is the default."""
+        parts = urlsplit(url)
+        host = parts.hostname
+        if ":" in host:
+            host = f"[{host}]"
+        if parts.port is not None and parts.port != {"http": 80, "https": 443}.get(
+            parts.scheme
+        ):
+            host = f"{host}:{parts.port}"
+        return host
+
+    @staticmethod
+    def _get_canonical_query_string(url: str) -> str:
+        """Return the query string of an url, sorted as SigV4 expects."""
+        query = urlsplit(url).query
+        if not query:
+            return ""
+        pairs = sorted(pair.partition("=")[::2] for pair in query.split("&"))
+        return "&".join(f"{key}={value}" for key, value in pairs)
+
+    def _get_signing_key(self, secret_key: str, date: str, region: str) -> bytes:
+        """Return the signing key for a day, computing it only when it changes."""
+        cache_key = (secret_key, date, region, SERVICE_NAME)
+        cached = self._signing_key
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+
+        signing_key = _hmac_sha256(f"AWS4{secret_key}".encode("utf-8"), date)
+        for message in (region, SERVICE_NAME, "aws4_request"):
+            signing_key = _hmac_sha256(signing_key, message)
+
+        self._signing_key = (cache_key, signing_key)
+        return signing_key
+
+    def sign(self, key: str, now: Optional[datetime] = None) -> Dict[str, str]:
+        """Return the headers authorizing a GET request on an object."""
+        path_template, host, canonical_query_string = self._get_endpoint()
+
+        s3_client = default_storage.connection.meta.client
+        # pylint: disable=protected-access
+        credentials = s3_client._request_signer._credentials  # noqa: SLF001
+        frozen_credentials = credentials.get_frozen_credentials()
+        region = s3_client.meta.region_name
+
+        now = now or datetime.now(timezone.utc)
+        timestamp = now.strftime(TIMESTAMP_FORMAT)
+        date = timestamp[:8]
+
+        headers = {
+            "host": host,
+            "x-amz-content-sha256": EMPTY_SHA256_HASH,
+            "x-amz-date": timestamp,
+        }
+        if frozen_credentials.token:
+            headers["x-amz-security-token"] = frozen_credentials.token
+        signed_headers = ";".join(headers)
+
+        canonical_request = "\n".join(
+            [
+                "GET",
+                path_template.replace(KEY_PLACEHOLDER, quote(key, safe="/~")),
+                canonical_query_string,
+                "".join(f"{name}:{value}\n" for name, value in headers.items()),
+                signed_headers,
+                EMPTY_SHA256_HASH,
+            ]
+        )
+        scope = f"{date}/{region}/{SERVICE_NAME}/aws4_request"
+        string_to_sign = "\n".join(
+            [
+                ALGORITHM,
+                timestamp,
+                scope,
+                hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+            ]
+        )
+        signature = hmac.new(
+            self._get_signing_key(frozen_credentials.secret_key, date, region),
+            string_to_sign.encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+
+        authorization_headers = {
+            "X-Amz-Date": timestamp,
+            "X-Amz-Content-SHA256": EMPTY_SHA256_HASH,
+            "Authorization": (
+                f"{ALGORITHM} Credential={frozen_credentials.access_key}/{scope}, "
+                f"SignedHeaders={signed_headers}, Signature={signature}"
+            ),
+        }
+        if frozen_credentials.token:
+            authorization_headers["X-Amz-Security-Token"] = frozen_credentials.token
+        return authorization_headers
+
+
+s3_signer = S3Signer()
@@ -2,27 +2,88 @@
 
 # pylint: disable=no-member
 
+import functools
+import hashlib
 import re
+import threading
 import uuid
 from enum import Enum
 from logging import getLogger
+from typing import List, Optional, Tuple
 
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 
+from kombu.exceptions import OperationalError
 from livekit import api
 
-from core import models, utils
+from core import models, tasks, utils
 from core.recording.services.recording_events import (
     RecordingEventsError,
     RecordingEventsService,
 )
+from core.recording.worker.admission import EgressAdmission
 
 from .lobby import LobbyService
+from .room_metadata import RoomMetadataService
 from .telephony import TelephonyException, TelephonyService
 
 logger = getLogger(__name__)
 
 
+# Record an event unless it was already received, and queue it after the room's
+# other events. Returns 0 for duplicates, 1 if the caller took the room's drain
+# lock and must process the queue, 2 if another process is processing it.
+# KEYS: event marker, room queue, drain lock, rooms with queued events.
+# ARGV: event timeout, event, lock token, lock timeout in milliseconds, room name.
+ENQUEUE_SCRIPT = """
+if not redis.call("SET", KEYS[1], 1, "NX", "EX", ARGV[1]) then
+    return 0
+end
+redis.call("RPUSH", KEYS[2], ARGV[2])
+redis.call("EXPIRE", KEYS[2], ARGV[1])
+redis.call("SADD", KEYS[4], ARGV[5])
+redis.call("EXPIRE", KEYS[4], ARGV[1])
+if redis.call("SET", KEYS[3], ARGV[3], "NX", "PX", ARGV[4]) then
+    return 1
+end
+return 2
+"""
+
+# Pop the room's next event, releasing the drain lock if there is none left. The
+# lock is taken again if it expired in between, so that queued events are not left
+# behind. Returns false if the queue is empty, or if another process took the lock.
+# KEYS: room queue, drain lock, rooms with queued events.
+# ARGV: lock token, lock timeout in milliseconds, room name.
+POP_SCRIPT = """
+local owner = redis.call("GET", KEYS[2])
+if owner ~= ARGV[1] then
+    if owner or not redis.call("SET", KEYS[2], ARGV[1], "NX", "PX", ARGV[2]) then
+        return false
+    end
+end
+local event = redis.call("LPOP", KEYS[1])
+if event then
+    redis.call("PEXPIRE", KEYS[2], ARGV[2])
+else
+    redis.call("DEL", KEYS[2])
+    redis.call("SREM", KEYS[3], ARGV[3])
+end
+return event
+"""
+
+# Extend the room's drain lock, if still held with the given token.
+# KEYS: drain lock.
+# ARGV: lock token, lock timeout in milliseconds.
+RENEW_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
 class LiveKitWebhookError(Exception):
     """Base exception for LiveKit webhook processing errors."""
 
@@ -78,34 +139,111 @@ class LiveKitWebhookEventType(Enum):
     INGRESS_ENDED = "ingress_ended"
 
 
+@functools.lru_cache
+def _get_webhook_receiver(api_key: str, api_secret: str) -> api.WebhookReceiver:
+    """Return a webhook receiver verifying tokens signed with the given keys."""
+    return api.WebhookReceiver(api.TokenVerifier(api_key, api_secret))
+
+
+@functools.lru_cache
+def _compile_filter_regex(pattern: Optional[str]) -> Optional[re.Pattern]:
+    """Compile the regex filtering webhook events by room name, if any."""
+    if not pattern:
+        return None
+    try:
+        return re.compile(pattern)
+    except re.error:
+        logger.exception(
+            "Invalid LIVEKIT_WEBHOOK_EVENTS_FILTER_REGEX. Webhook filtering disabled."
+        )
+        return None
+
+
 class LiveKitEventsService:
-    """Service for processing and handling LiveKit webhook events and notifications."""
+    """Service for processing and handling LiveKit webhook events and notifications.
+
+    Webhooks are verified and acknowledged right away, while events are processed
+    by a background worker. LiveKit retries webhooks it considers slow or failed,
+    so events are deduplicated by id. Each room's events are queued in Redis and
+    processed in order, by a single worker at a time.
+    """
 
     def __init__(self):
         """Initialize with required services."""
 
-        token_verifier = api.TokenVerifier(
+        self.webhook_receiver = _get_webhook_receiver(
             settings.LIVEKIT_CONFIGURATION["api_key"],
             settings.LIVEKIT_CONFIGURATION["api_secret"],
         )
-        self.webhook_receiver = api.WebhookReceiver(token_verifier)
-        self.lobby_service = LobbyService()
-        self.telephony_service = TelephonyService()
-        self.recording_events = RecordingEventsService()
+        self._filter_regex = _compile_filter_regex(
+            settings.LIVEKIT_WEBHOOK_EVENTS_FILTER_REGEX
+        )
 
-        self._filter_regex = None
-        if settings.LIVEKIT_WEBHOOK_EVENTS_FILTER_REGEX:
-            try:
-                self._filter_regex = re.compile(
-                    settings.LIVEKIT_WEBHOOK_EVENTS_FILTER_REGEX
-                )
-            except re.error:
-                logger.exception(
-                    "Invalid LIVEKIT_WEBHOOK_EVENTS_FILTER_REGEX. Webhook filtering disabled."
-                )
+    # Services are only needed to process events, not to receive them
+    @functools.cached_property
+    def lobby_service(self):
+        """Return the lobby service."""
+        return LobbyService()
+
+    @functools.cached_property
+    def room_metadata_service(self):
+        """Return the room metadata service."""
+        return RoomMetadataService()
+
+    @functools.cached_property
+    def telephony_service(self):
+        """Return the telephony service."""
+        return TelephonyService()
+
+    @functools.cached_property
+    def recording_events(self):
+        """Return the recording events service."""
+        return RecordingEventsService()
+
+    @functools.cached_property
+    def egress_admission(self):
+        """Return the egress admission control."""
+        return EgressAdmission()
+
+    @staticmethod
+    def _get_event_key(event_id: str) -> str:
+        """Generate the raw Redis key marking an event as received."""
+        return cache.make_key(f"{settings.LIVEKIT_WEBHOOK_KEY_PREFIX}_event_{event_id}")
+
+    @staticmethod
+    def _get_queue_key(room_name: str) -> str:
+        """Generate the raw Redis key of the room's queued events."""
+        return cache.make_key(
+            f"{settings.LIVEKIT_WEBHOOK_KEY_PREFIX}_queue_{room_name}"
+        )
+
+    @staticmethod
+    def _get_lock_key(room_name: str) -> str:
+        """Generate the raw Redis key of the room's drain lock."""
+        return cache.make_key(f"{settings.LIVEKIT_WEBHOOK_KEY_PREFIX}_lock_{room_name}")
+
+    @staticmethod
+    def _get_rooms_key() -> str:
+        """Generate the raw Redis key of the rooms having queued events."""
+        return cache.make_key(f"{settings.LIVEKIT_WEBHOOK_KEY_PREFIX}_rooms")
+
+    @staticmethod
+    def _get_dead_letter_key() -> str:
+        """Generate the raw Redis key of the events that failed to process."""
+        return cache.make_key(f"{settings.LIVEKIT_WEBHOOK_KEY_PREFIX}_dead_letter")
+
+    @staticmethod
+    def _run_script(script: str, keys: List[str], args: List):
+        """Run a Lua script against the Redis server backing the default cache."""
+        return utils.run_redis_script(script, keys=keys, args=args)
+
+    def _get_handler(self, webhook_type: LiveKitWebhookEventType):
+        """Return the handler of an event type, if any."""
+        handler = getattr(self, f"_handle_{webhook_type.value}", None)
+        return handler if callable(handler) else None
 
     def receive(self, request):
-        """Process webhook and route to appropriate handler."""
+        """Verify a webhook, and queue its event for processing."""
 
         auth_token = request.headers.get("Authorization")
         if not auth_token:
@@ -131,21 +269,206 @@ class LiveKitEventsService:
                 f"Unknown webhook type: {data.event}"
             ) from e
 
-        handler_name = f"_handle_{webhook_type.value}"
-        handler = getattr(self, handler_name, None)
+        if self._get_handler(webhook_type) is None:
+            return
+
+        self._enqueue(room_name, data)
+
+    def _enqueue(self, room_name: str, data: api.WebhookEvent):
+        """Queue an event after the room's other events, unless already received.
+
+        The process queuing an event while nobody processes the room's events
+        schedules a worker to process them.
+        """
+
+        event = data.SerializeToString()
+        event_id = data.id or hashlib.sha256(event).hexdigest()
+        token = uuid.uuid4().hex
+
+        result = self._run_script(
+            ENQUEUE_SCRIPT,
+            keys=[
+                self._get_event_key(event_id),
+                self._get_queue_key(room_name),
+                self._get_lock_key(room_name),
+                self._get_rooms_key(),
+            ],
+            args=[
+                settings.LIVEKIT_WEBHOOK_DEDUPLICATION_TIMEOUT,
+                event,
+                token,
+                settings.LIVEKIT_WEBHOOK_LOCK_TIMEOUT * 1000,
+                room_name,
+            ],
+        )
 
-        if not handler or not callable(handler):
+        if result == 0:
+            logger.info("Ignoring duplicate webhook event %s", event_id)
             return
 
-        # pylint: disable=not-callable
-        handler(data)
+        if result != 1:
+            # Another process is processing the room's events, including this one
+            return
+
+        self._schedule_processing(room_name, token)
+
+    def _schedule_processing(self, room_name: str, token: str):
+        """Schedule a worker to process the room's events, with the given lock."""
+        try:
+            tasks.process_livekit_events.delay(room_name=room_name, token=token)
+        except OperationalError:
+            logger.exception(
+                "Failed to schedule processing of webhook events, processing them now"
+            )
+            self.process_events(room_name, token)
+
+    def sweep_queues(self) -> int:
+        """Schedule processing of the rooms whose queued events nobody processes.
+
+        Events are left behind when the worker processing them died, or when its
+        task was lost. Returns the number of rooms scheduled.
+        """
+
+        client = cache.client.get_client(write=True)
+        lock_timeout = settings.LIVEKIT_WEBHOOK_LOCK_TIMEOUT * 1000
+
+        swept = 0
+        for member in client.sscan_iter(self._get_rooms_key()):
+            room_name = member.decode("utf-8")
+            token = uuid.uuid4().hex
+            if not client.set(
+                self._get_lock_key(room_name), token, nx=True, px=lock_timeout
+            ):
+                # Being processed already
+                continue
+            logger.warning(
+                "Sweeping webhook events left queued for room '%s'", room_name
+            )
+            self._schedule_processing(room_name, token)
+            swept += 1
+
+        return swept
+
+    def process_events(self, room_name: str, token: str):
+        """Process the room's queued events in order, while holding its drain lock.
+
+        The lock is renewed in the background while events are processed, so that
+        slow handlers don't let another worker process the room's next events.
+        Events failing to process are logged and dead-lettered: LiveKit already
+        got its response, and they must not hold back the room's next events.
+        """
+
+        lock_timeout = settings.LIVEKIT_WEBHOOK_LOCK_TIMEOUT * 1000
+        stopped = threading.Event()
+        renewer = threading.Thread(
+            target=self._renew_lock,
+            args=(room_name, token, stopped),
+            name=f"livekit-events-{room_name}",
+            daemon=True,
+        )
+        renewer.start()
+
+        try:
+            while (
+                event := self._run_script(
+                    POP_SCRIPT,
+                    keys=[
+                        self._get_queue_key(room_name),
+                        self._get_lock_key(room_name),
+                        self._get_rooms_key(),
+                    ],
+                    args=[token, lock_timeout, room_name],
+                )
+            ) is not None:
+                self._process_event(event)
+        finally:
+            stopped.set()
+            renewer.join()
+
+    def _renew_lock(self, room_name: str, token: str, stopped: threading.Event):
+        """Renew the room's drain lock every third of its timeout, until stopped."""
+
+        lock_timeout = settings.LIVEKIT_WEBHOOK_LOCK_TIMEOUT * 1000
+
+        while not stopped.wait(lock_timeout / 3000):
+            try:
+                self._run_script(
+                    RENEW_SCRIPT,
+                    keys=[self._get_lock_key(room_name)],
+                    args=[token, lock_timeout],
+                )
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception(
+                    "Failed to renew the webhook events lock of room '%s'", room_name
+                )
+
+    def _process_event(self, event: bytes) -> bool:
+        """Handle a serialized event, dead-lettering it if it fails.
+
+        Returns whether the event was processed.
+        """
+
+        data = api.WebhookEvent.FromString(event)
+        try:
+            self.handle(data)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception(
+                "Failed to process webhook event %s for room '%s'",
+                data.id,
+                data.room.name or data.egress_info.room_name,
+            )
+            self._dead_letter(event)
+            return False
+        return True
+
+    def _dead_letter(self, event: bytes):
+        """Keep an event that failed to process, to be replayed later on.
+
+        Only the last LIVEKIT_WEBHOOK_DEAD_LETTER_MAX_LENGTH events are kept.
+        """
+        dead_letter_key = self._get_dead_letter_key()
+        client = cache.client.get_client(write=True)
+        pipeline = client.pipeline()
+        pipeline.lpush(dead_letter_key, event)
+        pipeline.ltrim(
+            dead_letter_key, 0, settings.LIVEKIT_WEBHOOK_DEAD_LETTER_MAX_LENGTH - 1
+        )
+        pipeline.execute()
+
+    def replay_dead_letters(self) -> Tuple[int, int]:
+        """Process again the events that failed to process, oldest first.
+
+        Events failing again are dead-lettered again. Returns the number of events
+        replayed, and the number of them that failed again.
+        """
+
+        client = cache.client.get_client(write=True)
+        dead_letter_key = self._get_dead_letter_key()
+
+        replayed, failed = 0, 0
+        for _ in range(client.llen(dead_letter_key)):
+            event = client.rpop(dead_letter_key)
+            if event is None:
+                break
+            replayed += 1
+            if not self._process_event(event):
+                failed += 1
+
+        return replayed, failed
+
+    def handle(self, data: api.WebhookEvent):
+        """Route an event to its handler."""
+
+        handler = self._get_handler(LiveKitWebhookEventType(data.event))
+        if handler is not None:
+            handler(data)
 
     def _handle_egress_updated(self, data):
         """Handle 'egress_updated' event."""
 
         egress_id = data.egress_info.egress_id
         try:
-            recording = models.Recording.objects.get(worker_id=egress_id)
+            recording = models.Recording.objects.get_by_worker_id(egress_id)
         except models.Recording.DoesNotExist as err:
             raise ActionFailedError(
                 f"Recording with worker ID {egress_id} does not exist"
@@ -158,17 +481,20 @@ class LiveKitEventsService:
         """Handle 'egress_ended' event."""
 
         try:
-            recording = models.Recording.objects.get(
-                worker_id=data.egress_info.egress_id
+            recording = models.Recording.objects.get_by_worker_id(
+                data.egress_info.egress_id
             )
         except models.Recording.DoesNotExist as err:
             raise ActionFailedError(
                 f"Recording with worker ID {data.egress_info.egress_id} does not exist"
             ) from err
 
+        # The egress slot goes to the next queued recording, if any
+        self.egress_admission.release(recording)
+
         try:
             room_name = str(recording.room.id)
-            utils.update_room_metadata(
+            self.room_metadata_service.update(
                 room_name, {}, ["recording_mode", "recording_status"]
             )
         except utils.MetadataUpdateException as e:
@@ -198,7 +524,7 @@ class LiveKitEventsService:
             raise ActionFailedError("Failed to process room started event") from e
 
         try:
-            room = models.Room.objects.get(id=room_id)
+            room = models.Room.objects.get_cached(pk=room_id)
         except models.Room.DoesNotExist as err:
             raise ActionFailedError(f"Room with ID {room_id} does not exist") from err
 
@@ -230,6 +556,25 @@ class LiveKitEventsService:
                     f"Failed to delete telephony dispatch rule for room {room_id}"
                 ) from e
 
+        # Recordings still queued for an egress slot would start in an empty room
+        queued_recordings = list(
+            models.Recording.objects.filter(
+                room_id=room_id, status=models.RecordingStatusChoices.INITIATED
+            )
+        )
+        if queued_recordings:
+            models.Recording.objects.filter(
+                pk__in=[recording.pk for recording in queued_recordings],
+                status=models.RecordingStatusChoices.INITIATED,
+            ).update(
+                status=models.RecordingStatusChoices.ABORTED, updated_at=timezone.now()
+            )
+            for recording in queued_recordings:
+                self.egress_admission.release(recording)
+
+        # Metadata of the next room with this name starts from scratch
+        self.room_metadata_service.clear(str(room_id))
+
         try:
             self.lobby_service.clear_room_cache(room_id)
         except Exception as e:
@@ -1,6 +1,7 @@
 """Lobby Service"""
 
 import logging
+import time
 import uuid
 from dataclasses import dataclass
 from enum import Enum
@@ -10,11 +11,163 @@ from uuid import UUID
 from django.conf import settings
 from django.core.cache import cache
 
-from core import models, utils
+from kombu.exceptions import OperationalError
+from redis.exceptions import ResponseError
+
+from core import models, tasks, utils
 
 logger = logging.getLogger(__name__)
 
 
+# Lobby transitions are implemented as Lua scripts, so that each of them is atomic
+# and costs a single round-trip to Redis. Participants are stored as Redis hashes.
+LUA_HELPERS = """
+local statuses = {unknown = true, waiting = true, accepted = true, denied = true}
+
+-- Load a participant's fields, as nil if missing, or false if corrupted. Corrupted
+-- participants are deleted.
+local function load_participant(key)
+    local key_type = redis.call("TYPE", key)["ok"]
+    if key_type == "none" then
+        return nil
+    end
+    if key_type == "hash" then
+        local fields = redis.call("HMGET", key, "status", "username", "id", "color")
+        if fields[1] and fields[2] and fields[3] and fields[4] and statuses[fields[1]] then
+            return fields
+        end
+    end
+    redis.call("DEL", key)
+    return false
+end
+
+-- Bump the room's lobby version and record it as the last change of each given
+-- participant. Versions start from the current timestamp in milliseconds, so they
+-- keep increasing even if the keys expire in between. Only the changes of the
+-- last `retention` versions are kept.
+local function record_changes(
+    version_key, changes_key, ttl, timestamp, retention, participant_ids
+)
+    if redis.call("EXISTS", version_key) == 0 then
+        redis.call("SET", version_key, timestamp)
+    end
+    local version = redis.call("INCR", version_key)
+    for _, participant_id in ipairs(participant_ids) do
+        redis.call("ZADD", changes_key, version, participant_id)
+    end
+    redis.call("ZREMRANGEBYSCORE", changes_key, "-inf", version - tonumber(retention))
+    redis.call("EXPIRE", version_key, ttl)
+    redis.call("EXPIRE", changes_key, ttl)
+    return version
+end
+"""
+
+# Add a participant to the lobby if missing, and refresh it if waiting.
+# KEYS: participant, index, version, changes.
+# ARGV: participant id, username, color, waiting timeout, expiry timestamp,
+#       lobby timeout, timestamp in milliseconds, "1" to add a missing participant,
+#       changes retention.
+ENTER_SCRIPT = (
+    LUA_HELPERS
+    + """
+local participant = load_participant(KEYS[1])
+local created = 0
+if not participant then
+    if ARGV[8] ~= "1" then
+        return false
+    end
+    participant = {"waiting", ARGV[2], ARGV[1], ARGV[3]}
+    redis.call(
+        "HSET", KEYS[1], "status", participant[1], "username", participant[2],
+        "id", participant[3], "color", participant[4]
+    )
+    created = 1
+end
+if participant[1] == "waiting" then
+    redis.call("EXPIRE", KEYS[1], ARGV[4])
+    redis.call("ZADD", KEYS[2], ARGV[5], ARGV[1])
+    redis.call("EXPIRE", KEYS[2], ARGV[6])
+end
+if created == 1 then
+    record_changes(KEYS[3], KEYS[4], ARGV[6], ARGV[7], ARGV[9], {ARGV[1]})
+end
+return {created, participant[1], participant[2], participant[3], participant[4]}
+"""
+)
+
+# Set the status of participants. Returns the outcome for each participant: its new
+# status, or one of "not_found", "corrupted" or "skipped".
+# KEYS: index, version, changes, then the key of each participant.
+# ARGV: status, timeout, expiry timestamp, lobby timeout, timestamp in milliseconds,
+#       "1" to skip participants not waiting, changes retention, participant ids...
+DECIDE_SCRIPT = (
+    LUA_HELPERS
+    + """
+local results, changed = {}, {}
+for i = 8, #ARGV do
+    local participant_id = ARGV[i]
+    local participant_key = KEYS[i - 4]
+    local participant = load_participant(participant_key)
+    if participant == nil then
+        results[#results + 1] = "not_found"
+    elseif participant == false then
+        redis.call("ZREM", KEYS[1], participant_id)
+        changed[#changed + 1] = participant_id
+        results[#results + 1] = "corrupted"
+    elseif ARGV[6] == "1" and participant[1] ~= "waiting" then
+        results[#results + 1] = "skipped"
+    else
+        redis.call("HSET", participant_key, "status", ARGV[1])
+        redis.call("EXPIRE", participant_key, ARGV[2])
+        redis.call("ZADD", KEYS[1], ARGV[3], participant_id)
+        changed[#changed + 1] = participant_id
+        results[#results + 1] = ARGV[1]
+    end
+end
+if #changed > 0 then
+    redis.call("EXPIRE", KEYS[1], ARGV[4])
+    record_changes(KEYS[2], KEYS[3], ARGV[4], ARGV[5], ARGV[7], changed)
+end
+return results
+"""
+)
+
+# Remove participants from the lobby.
+# KEYS: index, version, changes, then participant keys.
+# ARGV: lobby timeout, timestamp in milliseconds, changes retention,
+#       participant ids...
+REMOVE_SCRIPT = (
+    LUA_HELPERS
+    + """
+local participant_ids = {}
+for i = 4, #ARGV do
+    participant_ids[#participant_ids + 1] = ARGV[i]
+    redis.call("DEL", KEYS[i])
+    redis.call("ZREM", KEYS[1], ARGV[i])
+end
+if #participant_ids > 0 then
+    record_changes(KEYS[2], KEYS[3], ARGV[1], ARGV[2], ARGV[3], participant_ids)
+end
+"""
+)
+
+# Remove expired participants from the room's index, and list the remaining ones.
+# KEYS: index, version, changes.
+# ARGV: current timestamp, lobby timeout, timestamp in milliseconds,
+#       changes retention.
+PRUNE_SCRIPT = (
+    LUA_HELPERS
+    + """
+local expired = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1])
+if #expired > 0 then
+    redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", ARGV[1])
+    record_changes(KEYS[2], KEYS[3], ARGV[2], ARGV[3], ARGV[4], expired)
+end
+return redis.call("ZRANGE", KEYS[1], 0, -1)
+"""
+)
+
+
 class LobbyParticipantStatus(Enum):
     """Possible states of a participant in the lobby system.
     Values are lowercase strings for consistent serialization and API responses.
@@ -79,6 +232,9 @@ class LobbyService:
 
     Handles participant entry requests, status management, and notifications
     using cache for state management and LiveKit for real-time updates.
+
+    Participants are stored as Redis hashes, and changed with Lua scripts so that
+    each transition is atomic and costs a single round-trip.
     """
 
     @staticmethod
@@ -86,6 +242,124 @@ class LobbyService:
         """Generate cache key for participant(s) data."""
         return f"{settings.LOBBY_KEY_PREFIX}_{room_id!s}_{participant_id}"
 
+    def _get_participant_key(self, room_id: UUID, participant_id: str) -> str:
+        """Generate the raw Redis key of participant data."""
+        return cache.make_key(self._get_cache_key(room_id, participant_id))
+
+    @staticmethod
+    def _get_index_key(room_id: UUID) -> str:
+        """Generate cache key for the room's lobby index.
+
+        The index is a Redis sorted set holding the room's participant ids, scored
+        by their expiry timestamp. It lets us list or clear a room's lobby without
+        scanning the whole keyspace. Its name does not share the participants' key
+        pattern on purpose.
+        """
+        return cache.make_key(f"{settings.LOBBY_KEY_PREFIX}_index_{room_id!s}")
+
+    @staticmethod
+    def _get_version_key(room_id: UUID) -> str:
+        """Generate cache key for the room's lobby version.
+
+        The version increases on every change to the room's lobby. Changes are also
+        published on a channel with the same name.
+        """
+        return cache.make_key(f"{settings.LOBBY_KEY_PREFIX}_version_{room_id!s}")
+
+    @staticmethod
+    def _get_changes_key(room_id: UUID) -> str:
+        """Generate cache key for the room's lobby changes.
+
+        The changes are a Redis sorted set holding the room's participant ids,
+        scored by the version of their last change. Changes older than
+        LOBBY_CHANGES_RETENTION versions are trimmed whenever a change is recorded.
+        """
+        return cache.make_key(f"{settings.LOBBY_KEY_PREFIX}_changes_{room_id!s}")
+
+    @staticmethod
+    def _get_notification_key(room_id: UUID) -> str:
+        """Generate cache key held while a lobby notification is scheduled."""
+        return f"{settings.LOBBY_KEY_PREFIX}_notification_{room_id!s}"
+
+    @staticmethod
+    def _get_redis_client():
+        """Return the raw Redis client backing the default cache."""
+        return cache.client.get_client(write=True)
+
+    @staticmethod
+    def _get_lobby_timeout() -> int:
+        """Return the longest time a participant can stay in a lobby."""
+        return max(
+            settings.LOBBY_WAITING_TIMEOUT,
+            settings.LOBBY_DENIED_TIMEOUT,
+            settings.LOBBY_ACCEPTED_TIMEOUT,
+        )
+
+    @staticmethod
+    def _decode(values) -> List[str]:
+        """Decode values returned by the raw Redis client."""
+        return [
+            value.decode("utf-8") if isinstance(value, bytes) else value
+            for value in values
+        ]
+
+    @classmethod
+    def _decode_hash(cls, data: dict) -> dict:
+        """Decode a hash returned by the raw Redis client."""
+        return dict(
+            zip(cls._decode(data.keys()), cls._decode(data.values()), strict=True)
+        )
+
+    def _run_script(self, script: str, keys: List[str], args: List):
+        """Run a Lua script against the Redis server backing the default cache."""
+        return utils.run_redis_script(
+            script, keys=keys, args=args, client=self._get_redis_client()
+        )
+
+    def _remove_participants(self, room_id: UUID, *participant_ids: str):
+        """Remove participants from the room's lobby, including its index."""
+        if participant_ids:
+            self._run_script(
+                REMOVE_SCRIPT,
+                keys=[
+                    self._get_index_key(room_id),
+                    self._get_version_key(room_id),
+                    self._get_changes_key(room_id),
+                    *[
+                        self._get_participant_key(room_id, participant_id)
+                        for participant_id in participant_ids
+                    ],
+                ],
+                args=[
+                    self._get_lobby_timeout(),
+                    int(time.time() * 1000),
+                    settings.LOBBY_CHANGES_RETENTION,
+                    *participant_ids,
+                ],
+            )
+
+    def _get_indexed_participant_ids(self, room_id: UUID) -> List[str]:
+        """List ids of the room's non-expired participants, pruning expired ones."""
+        participant_ids = self._run_script(
+            PRUNE_SCRIPT,
+            keys=[
+                self._get_index_key(room_id),
+                self._get_version_key(room_id),
+                self._get_changes_key(room_id),
+            ],
+            args=[
+                time.time(),
+                self._get_lobby_timeout(),
+                int(time.time() * 1000),
+                settings.LOBBY_CHANGES_RETENTION,
+            ],
+        )
+        return self._decode(participant_ids)
+
+    def get_version(self, room_id: UUID) -> int:
+        """Return the room's current lobby version, 0 if nothing changed lately."""
+        return int(self._get_redis_client().get(self._get_version_key(room_id)) or 0)
+
     @staticmethod
     def _get_or_create_participant_id(request) -> str:
         """Extract unique participant identifier from the request."""
@@ -141,11 +415,10 @@ class LobbyService:
         """
 
         participant_id = self._get_or_create_participant_id(request)
-        participant = self.get_participant(room.id, participant_id)
-
         room_id = str(room.id)
 
         if self.can_bypass_lobby(room=room, user=request.user):
+            participant = self.get_participant(room.id, participant_id)
             if participant is None:
                 participant = LobbyParticipant(
                     status=LobbyParticipantStatus.ACCEPTED,
@@ -169,13 +442,10 @@ class LobbyService:
 
         livekit_config = None
 
-        if participant is None:
-            participant = self.enter(room.id, participant_id, username)
-
-        elif participant.status == LobbyParticipantStatus.WAITING:
-            self.refresh_waiting_status(room.id, participant_id)
+        # Adds the participant if unknown, or refreshes it if waiting
+        participant = self.enter(room.id, participant_id, username)
 
-        elif participant.status == LobbyParticipantStatus.ACCEPTED:
+        if participant.status == LobbyParticipantStatus.ACCEPTED:
             # wrongly named, contains access token to join a room
             livekit_config = utils.generate_livekit_config(
                 room_id=room_id,
@@ -189,6 +459,49 @@ class LobbyService:
 
         return participant, livekit_config
 
+    def _enter(
+        self, room_id: UUID, participant_id: str, username: str, create: bool
+    ) -> Tuple[Optional[LobbyParticipant], bool]:
+        """Add a participant to the lobby if missing and refresh it if waiting.
+
+        Returns the participant, or None if missing and not created, and whether it
+        was created.
+        """
+        result = self._run_script(
+            ENTER_SCRIPT,
+            keys=[
+                self._get_participant_key(room_id, participant_id),
+                self._get_index_key(room_id),
+                self._get_version_key(room_id),
+                self._get_changes_key(room_id),
+            ],
+            args=[
+                participant_id,
+                username,
+                utils.generate_color(participant_id) if create else "",
+                settings.LOBBY_WAITING_TIMEOUT,
+                time.time() + settings.LOBBY_WAITING_TIMEOUT,
+                self._get_lobby_timeout(),
+                int(time.time() * 1000),
+                "1" if create else "0",
+                settings.LOBBY_CHANGES_RETENTION,
+            ],
+        )
+
+        if not result:
+            return None, False
+
+        created, status, username, participant_id, color = result
+        return (
+            LobbyParticipant(
+                status=LobbyParticipantStatus(self._decode([status])[0]),
+                username=self._decode([username])[0],
+                id=self._decode([participant_id])[0],
+                color=self._decode([color])[0],
+            ),
+            bool(created),
+        )
+
     def refresh_waiting_status(self, room_id: UUID, participant_id: str):
         """Refresh timeout for waiting participant.
 
@@ -196,93 +509,191 @@ class LobbyService:
         in the lobby queue. Automatic removal if the participant is not
         actively checking their status.
         """
-        cache.touch(
-            self._get_cache_key(room_id, participant_id), settings.LOBBY_WAITING_TIMEOUT
-        )
+        self._enter(room_id, participant_id, username="", create=False)
 
     def enter(
         self, room_id: UUID, participant_id: str, username: str
     ) -> LobbyParticipant:
         """Add participant to waiting lobby.
 
-        Create a new participant entry in waiting status and notify room
-        participants of the new entry request.
+        Create a new participant entry in waiting status and schedule a
+        notification of the new entry request to room participants. Participants
+        already in the lobby are returned as is, with their waiting timeout
+        refreshed if they are still waiting.
         """
 
-        color = utils.generate_color(participant_id)
-
-        participant = LobbyParticipant(
-            status=LobbyParticipantStatus.WAITING,
-            username=username,
-            id=participant_id,
-            color=color,
+        participant, created = self._enter(
+            room_id, participant_id, username, create=True
         )
 
+        if created:
+            self._schedule_notification(room_id)
+
+        return participant
+
+    def _schedule_notification(self, room_id: UUID):
+        """Notify room participants that the lobby changed, off the request path.
+
+        Notifications are sent by a background worker, and coalesced: at most one
+        is sent per room every LOBBY_NOTIFICATION_WINDOW seconds, whatever the
+        number of participants entering the lobby in between.
+        """
+
+        notification_key = self._get_notification_key(room_id)
+        window = settings.LOBBY_NOTIFICATION_WINDOW
+
+        # The key is released when sending. Its timeout only guards against lost
+        # tasks, which would otherwise block the room's notifications forever.
+        if not cache.add(notification_key, True, timeout=window + 60):
+            # A pending notification already covers this change
+            return
+
         try:
-            utils.notify_participants(
-                room_name=str(room_id),
-                notification_data={
-                    "type": settings.LOBBY_NOTIFICATION_TYPE,
+            tasks.notify_room_participants.apply_async(
+                kwargs={
+                    "room_name": str(room_id),
+                    "notification_data": {
+                        "type": settings.LOBBY_NOTIFICATION_TYPE,
+                    },
+                    "coalescing_key": notification_key,
                 },
+                countdown=window,
             )
-        except utils.NotificationError:
-            # If room not created yet, there is no participants to notify
-            logger.exception("Failed to notify room participants")
-
-        cache_key = self._get_cache_key(room_id, participant_id)
-        cache.set(
-            cache_key,
-            participant.to_dict(),
-            timeout=settings.LOBBY_WAITING_TIMEOUT,
-        )
-
-        return participant
+        except OperationalError:
+            logger.exception("Failed to schedule lobby notification")
+            cache.delete(notification_key)
 
     def _get_participant(
         self, room_id: UUID, participant_id: str
     ) -> Optional[LobbyParticipant]:
         """Check participant's current status in the lobby."""
 
-        cache_key = self._get_cache_key(room_id, participant_id)
-        data = cache.get(cache_key)
+        try:
+            data = self._get_redis_client().hgetall(
+                self._get_participant_key(room_id, participant_id)
+            )
+        except ResponseError:
+            # Not stored as a hash, it can't be parsed
+            data = {b"status": b"corrupted"}
 
         if not data:
             return None
 
         try:
-            return LobbyParticipant.from_dict(data)
+            return LobbyParticipant.from_dict(self._decode_hash(data))
         except LobbyParticipantParsingError:
-            logger.error("Corrupted participant data found and removed: %s", cache_key)
-            cache.delete(cache_key)
+            logger.error(
+                "Corrupted participant data found and removed: %s", participant_id
+            )
+            self._remove_participants(room_id, participant_id)
             return None
 
     def get_participant(self, room_id: UUID, participant_id: str):
         """Remove a participant entry from the lobby cache for the given room."""
         return self._get_participant(room_id, participant_id)
 
-    def list_waiting_participants(self, room_id: UUID) -> List[dict]:
-        """List all waiting participants for a room."""
+    def _get_waiting_participants(
+        self, room_id: UUID, participant_ids: List[str]
+    ) -> Tuple[List[dict], List[str]]:
+        """Fetch the given participants, keeping only those still waiting.
 
-        pattern = self._get_cache_key(room_id, "*")
-        keys = cache.keys(pattern)
+        Returns the waiting participants, and the ids of participants missing from
+        the cache. Corrupted entries are reported missing.
+        """
 
-        if not keys:
-            return []
+        if not participant_ids:
+            return [], []
 
-        data = cache.get_many(keys)
+        pipeline = self._get_redis_client().pipeline(transaction=False)
+        for participant_id in participant_ids:
+            pipeline.hgetall(self._get_participant_key(room_id, participant_id))
+        data = pipeline.execute(raise_on_error=False)
 
         waiting_participants = []
-        for cache_key, raw_participant in data.items():
+        missing = []
+        for participant_id, raw_participant in zip(participant_ids, data, strict=True):
+            if not raw_participant or isinstance(raw_participant, Exception):
+                missing.append(participant_id)
+                continue
             try:
-                participant = LobbyParticipant.from_dict(raw_participant)
+                participant = LobbyParticipant.from_dict(
+                    self._decode_hash(raw_participant)
+                )
             except LobbyParticipantParsingError:
-                cache.delete(cache_key)
+                missing.append(participant_id)
                 continue
             if participant.status == LobbyParticipantStatus.WAITING:
                 waiting_participants.append(participant.to_dict())
 
+        return waiting_participants, missing
+
+    def list_waiting_participants(self, room_id: UUID) -> List[dict]:
+        """List all waiting participants for a room."""
+
+        participant_ids = self._get_indexed_participant_ids(room_id)
+        waiting_participants, missing = self._get_waiting_participants(
+            room_id, participant_ids
+        )
+
+        # Entries evicted, corrupted or deleted behind the index's back
+        self._remove_participants(room_id, *missing)
+
         return waiting_participants
 
+    def list_waiting_participants_changes(
+        self,
+        room_id: UUID,
+        since: Optional[int] = None,
+        full: bool = False,
+    ) -> Optional[dict]:
+        """List changes to a room's waiting participants since a given version.
+
+        Returns None if nothing changed since that version. Otherwise, returns the
+        current version with the participants who joined the lobby and the ids of
+        those who left it since that version. The whole list of waiting participants
+        is returned instead, flagged with `reset`, if requested with `full`, or if
+        the changes since that version are unknown (e.g. the lobby expired or they
+        were trimmed).
+        """
+
+        # Expired participants are recorded as changes when pruned
+        self._get_indexed_participant_ids(room_id)
+        version = self.get_version(room_id)
+
+        if since == version:
+            return None
+
+        if (
+            full
+            or since is None
+            or since > version
+            or since < version - settings.LOBBY_CHANGES_RETENTION
+        ):
+            return {
+                "version": version,
+                "reset": True,
+                "participants": self.list_waiting_participants(room_id),
+            }
+
+        changed_ids = self._decode(
+            self._get_redis_client().zrangebyscore(
+                self._get_changes_key(room_id), f"({since}", "+inf"
+            )
+        )
+        participants, _ = self._get_waiting_participants(room_id, changed_ids)
+        waiting_ids = {participant["id"] for participant in participants}
+
+        return {
+            "version": version,
+            "reset": False,
+            "participants": participants,
+            "left": [
+                participant_id
+                for participant_id in changed_ids
+                if participant_id not in waiting_ids
+            ],
+        }
+
     def handle_participant_entry(
         self,
         room_id: UUID,
@@ -308,6 +719,101 @@ class LobbyService:
 
         self._update_participant_status(room_id, participant_id, **decision)
 
+    def handle_participants_entry(
+        self,
+        room_id: UUID,
+        allow_entry: bool,
+        participant_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Optional[LobbyParticipantStatus]]:
+        """Handle a decision on the entry of several participants at once.
+
+        Targets the given participants, or all waiting participants if none are
+        given. All participants are updated at once, atomically.
+
+        Returns the new status of each targeted participant, or None for the ones
+        not found in the lobby.
+        """
+
+        if allow_entry:
+            status, timeout = (
+                LobbyParticipantStatus.ACCEPTED,
+                settings.LOBBY_ACCEPTED_TIMEOUT,
+            )
+        else:
+            status, timeout = (
+                LobbyParticipantStatus.DENIED,
+                settings.LOBBY_DENIED_TIMEOUT,
+            )
+
+        only_waiting = participant_ids is None
+        if only_waiting:
+            participant_ids = self._get_indexed_participant_ids(room_id)
+
+        outcomes = self._update_participants_status(
+            room_id,
+            list(dict.fromkeys(participant_ids)),
+            status=status,
+            timeout=timeout,
+            only_waiting=only_waiting,
+        )
+
+        return {
+            participant_id: status if outcome == status.value else None
+            for participant_id, outcome in outcomes.items()
+            if outcome != "skipped"
+        }
+
+    def _update_participants_status(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        room_id: UUID,
+        participant_ids: List[str],
+        status: LobbyParticipantStatus,
+        timeout: int,
+        only_waiting: bool = False,
+    ) -> Dict[str, str]:
+        """Update participants status with appropriate timeout, atomically.
+
+        Returns the outcome for each participant: its new status, or one of
+        "not_found", "corrupted" or "skipped" (when not waiting, if only_waiting).
+        """
+
+        if not participant_ids:
+            return {}
+
+        keys = [
+            self._get_index_key(room_id),
+            self._get_version_key(room_id),
+            self._get_changes_key(room_id),
+        ]
+        for participant_id in participant_ids:
+            keys.append(self._get_participant_key(room_id, participant_id))
+
+        outcomes = self._run_script(
+            DECIDE_SCRIPT,
+            keys=keys,
+            args=[
+                status.value,
+                timeout,
+                time.time() + timeout,
+                self._get_lobby_timeout(),
+                int(time.time() * 1000),
+                "1" if only_waiting else "0",
+                settings.LOBBY_CHANGES_RETENTION,
+                *participant_ids,
+            ],
+        )
+
+        if corrupted := [
+            participant_id
+            for participant_id, outcome in zip(
+                participant_ids, self._decode(outcomes), strict=True
+            )
+            if outcome == "corrupted"
+        ]:
+            logger.error("Corrupted participant data found and removed: %s", corrupted)
+
+        return dict(zip(participant_ids, self._decode(outcomes), strict=True))
+
     def _update_participant_status(
         self,
         room_id: UUID,
@@ -317,38 +823,31 @@ class LobbyService:
     ) -> None:
         """Update participant status with appropriate timeout."""
 
-        cache_key = self._get_cache_key(room_id, participant_id)
+        outcome = self._update_participants_status(
+            room_id, [participant_id], status=status, timeout=timeout
+        )[participant_id]
 
-        data = cache.get(cache_key)
-        if not data:
+        if outcome == "not_found":
             logger.error("Participant %s not found", participant_id)
             raise LobbyParticipantNotFound("Participant not found")
 
-        try:
-            participant = LobbyParticipant.from_dict(data)
-        except LobbyParticipantParsingError:
-            logger.exception(
-                "Removed corrupted data for participant %s:", participant_id
-            )
-            cache.delete(cache_key)
-            raise
-
-        participant.status = status
-        cache.set(cache_key, participant.to_dict(), timeout=timeout)
+        if outcome == "corrupted":
+            raise LobbyParticipantParsingError("Invalid participant data")
 
     def clear_room_cache(self, room_id: UUID) -> None:
         """Clear all participant entries from the cache for a specific room."""
 
-        pattern = self._get_cache_key(room_id, "*")
-        keys = cache.keys(pattern)
-
-        if not keys:
-            return
-
-        cache.delete_many(keys)
+        participant_ids = self._get_indexed_participant_ids(room_id)
+        self._remove_participants(room_id, *participant_ids)
+        self._get_redis_client().delete(self._get_index_key(room_id))
 
     def clear_participant_cache(self, room_id: UUID, participant_id: str) -> None:
         """Clear a given participant entry from the cache for a specific room."""
+        self._remove_participants(room_id, participant_id)
 
-        cache_key = self._get_cache_key(room_id, participant_id)
-        cache.delete(cache_key)
+    def clear_participants_cache(
+        self, room_id: UUID, participant_ids: List[str]
+    ) -> None:
+        """Clear several participant entries from the cache for a specific room."""
+        if participant_ids:
+            self._remove_participants(room_id, *participant_ids)
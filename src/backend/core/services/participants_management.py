@@ -3,12 +3,14 @@
 # pylint: disable=too-many-arguments,no-name-in-module,too-many-positional-arguments
 # ruff: noqa:PLR0913
 
+import asyncio
 import json
 import uuid
 from logging import getLogger
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+from django.conf import settings
 
-from asgiref.sync import async_to_sync
 from livekit.api import (
     MuteRoomTrackRequest,
     RoomParticipantIdentity,
@@ -17,6 +19,7 @@ from livekit.api import (
 )
 
 from core import utils
+from core.livekit_pool import run_in_livekit_loop
 
 from .lobby import LobbyService
 
@@ -38,68 +41,172 @@ class ParticipantsManagementException(Exception):
 class ParticipantsManagement:
     """Service for managing participants."""
 
-    @async_to_sync
+    @staticmethod
+    def _get_status_code(error: TwirpError) -> int:
+        """Translate a LiveKit error into an HTTP-ish status code."""
+        return 404 if getattr(error, "status", None) == 404 else 500
+
+    @staticmethod
+    async def _mute(lkapi, room_name: str, identity: str, track_sid: str):
+        """Mute a participant's track, with the given client."""
+        await lkapi.room.mute_published_track(
+            MuteRoomTrackRequest(
+                room=room_name,
+                identity=identity,
+                track_sid=track_sid,
+                muted=True,
+            )
+        )
+
+    @staticmethod
+    async def _remove(lkapi, room_name: str, identity: str):
+        """Remove a participant from a room, with the given client."""
+        await lkapi.room.remove_participant(
+            RoomParticipantIdentity(room=room_name, identity=identity)
+        )
+
+    @staticmethod
+    async def _update(
+        lkapi,
+        room_name: str,
+        identity: str,
+        metadata: Optional[Dict] = None,
+        attributes: Optional[Dict] = None,
+        permission: Optional[Dict] = None,
+        name: Optional[str] = None,
+    ):
+        """Update a participant's properties, with the given client."""
+        await lkapi.room.update_participant(
+            UpdateParticipantRequest(
+                room=room_name,
+                identity=identity,
+                metadata=json.dumps(metadata),
+                permission=permission,
+                attributes=attributes,
+                name=name,
+            )
+        )
+
+    @staticmethod
+    def _clear_lobby_cache(room_name: str, identities: List[str]):
+        """Best-effort lobby cache cleanup of removed participants.
+
+        Do not fail removal if room_name isn't a UUID.
+        """
+        try:
+            room_id = uuid.UUID(room_name)
+        except (ValueError, TypeError) as exc:
+            logger.warning(
+                "participants_management.remove: room_name '%s' is not a UUID; "
+                "skipping lobby cache clear",
+                room_name,
+                exc_info=exc,
+            )
+            return
+
+        LobbyService().clear_participants_cache(
+            room_id=room_id, participant_ids=identities
+        )
+
+    async def _run_many(self, operation, room_name: str, targets: List[Dict]):
+        """Run an operation on several participants concurrently, with one client.
+
+        At most PARTICIPANTS_MANAGEMENT_MAX_CONCURRENCY requests are in flight at
+        once. Returns the outcome for each target, in order: "success", or
+        "not_found" or "error" when LiveKit fails.
+        """
+
+        lkapi = utils.create_livekit_client()
+        semaphore = asyncio.Semaphore(settings.PARTICIPANTS_MANAGEMENT_MAX_CONCURRENCY)
+
+        async def run(target):
+            async with semaphore:
+                try:
+                    await operation(lkapi, room_name, **target)
+                except TwirpError as e:
+                    if self._get_status_code(e) == 404:
+                        return "not_found"
+                    logger.error(
+                        "Failed to manage participant %s in room %s: %s",
+                        target["identity"],
+                        room_name,
+                        e,
+                    )
+                    return "error"
+                return "success"
+
+        try:
+            return await asyncio.gather(*[run(target) for target in targets])
+        finally:
+            await lkapi.aclose()
+
+    @run_in_livekit_loop
     async def mute(self, room_name: str, identity: str, track_sid: str):
         """Mute a specific audio or video track for a participant in a room."""
         lkapi = utils.create_livekit_client()
 
         try:
-            await lkapi.room.mute_published_track(
-                MuteRoomTrackRequest(
-                    room=room_name,
-                    identity=identity,
-                    track_sid=track_sid,
-                    muted=True,
-                )
-            )
+            await self._mute(lkapi, room_name, identity, track_sid)
 
         except TwirpError as e:
-            status_code = 404 if getattr(e, "status", None) == 404 else 500
             raise ParticipantsManagementException(
-                "Could not mute participant", status_code=status_code
+                "Could not mute participant", status_code=self._get_status_code(e)
             ) from e
 
         finally:
             await lkapi.aclose()
 
-    @async_to_sync
-    async def remove(self, room_name: str, identity: str):
-        """Remove a participant from a room and clear their lobby cache.
+    @run_in_livekit_loop
+    async def mute_many(self, room_name: str, tracks: List[Dict]) -> List[str]:
+        """Mute several tracks, given as dicts of identity and track_sid, at once.
 
-        LiveKit returns a TwirpError with status 404 when the participant/room
-        is not found. We propagate this as a ParticipantsManagementException
-        with status_code=404 so the API can return HTTP 404 instead of 500.
+        Returns the outcome of each track, in order.
         """
-        # Best-effort lobby cache cleanup (do not fail removal if room_name isn't a UUID)
-        try:
-            LobbyService().clear_participant_cache(
-                room_id=uuid.UUID(room_name), participant_id=identity
-            )
-        except (ValueError, TypeError) as exc:
-            logger.warning(
-                "participants_management.remove: room_name '%s' is not a UUID; "
-                "skipping lobby cache clear",
-                room_name,
-                exc_info=exc,
-            )
+        return await self._run_many(self._mute, room_name, tracks)
 
+    @run_in_livekit_loop
+    async def _remove_one(self, room_name: str, identity: str):
+        """Remove a participant from a room through LiveKit."""
         lkapi = utils.create_livekit_client()
 
         try:
-            await lkapi.room.remove_participant(
-                RoomParticipantIdentity(room=room_name, identity=identity)
-            )
+            await self._remove(lkapi, room_name, identity)
 
         except TwirpError as e:
-            status_code = 404 if getattr(e, "status", None) == 404 else 500
             raise ParticipantsManagementException(
-                "Could not remove participant", status_code=status_code
+                "Could not remove participant", status_code=self._get_status_code(e)
             ) from e
 
         finally:
             await lkapi.aclose()
 
-    @async_to_sync
+    @run_in_livekit_loop
+    async def _remove_several(self, room_name: str, identities: List[str]):
+        """Remove several participants from a room through LiveKit."""
+        return await self._run_many(
+            self._remove, room_name, [{"identity": identity} for identity in identities]
+        )
+
+    def remove(self, room_name: str, identity: str):
+        """Remove a participant from a room and clear their lobby cache.
+
+        LiveKit returns a TwirpError with status 404 when the participant/room
+        is not found. We propagate this as a ParticipantsManagementException
+        with status_code=404 so the API can return HTTP 404 instead of 500.
+        """
+        # Blocking cache calls are kept out of the shared LiveKit event loop
+        self._clear_lobby_cache(room_name, [identity])
+        self._remove_one(room_name, identity)
+
+    def remove_many(self, room_name: str, identities: List[str]) -> List[str]:
+        """Remove several participants from a room and clear their lobby cache.
+
+        Returns the outcome of each participant, in order.
+        """
+        self._clear_lobby_cache(room_name, identities)
+        return self._remove_several(room_name, identities)
+
+    @run_in_livekit_loop
     async def update(
         self,
         room_name: str,
@@ -113,22 +220,29 @@ class ParticipantsManagement:
         lkapi = utils.create_livekit_client()
 
         try:
-            await lkapi.room.update_participant(
-                UpdateParticipantRequest(
-                    room=room_name,
-                    identity=identity,
-                    metadata=json.dumps(metadata),
-                    permission=permission,
-                    attributes=attributes,
-                    name=name,
-                )
+            await self._update(
+                lkapi,
+                room_name,
+                identity,
+                metadata=metadata,
+                attributes=attributes,
+                permission=permission,
+                name=name,
             )
 
         except TwirpError as e:
-            status_code = 404 if getattr(e, "status", None) == 404 else 500
             raise ParticipantsManagementException(
-                "Could not update participant", status_code=status_code
+                "Could not update participant", status_code=self._get_status_code(e)
             ) from e
 
         finally:
             await lkapi.aclose()
+
+    @run_in_livekit_loop
+    async def update_many(self, room_name: str, updates: List[Dict]) -> List[str]:
+        """Update several participants at once.
+
+        Updates are dicts of identity, and any of metadata, attributes, permission
+        or name. Returns the outcome of each update, in order.
+        """
+        return await self._run_many(self._update, room_name, updates)
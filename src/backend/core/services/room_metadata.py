@@ -0,0 +1,287 @@
+"""Service for updating the metadata of LiveKit rooms."""
+
+import json
+import uuid
+from logging import getLogger
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from kombu.exceptions import OperationalError
+
+from core import utils
+
+logger = getLogger(__name__)
+
+
+# Merge changes into the room's pending changes, and try to take the flush lock.
+# KEYS: pending changes, flush lock.
+# ARGV: lock token, lock timeout in milliseconds, pending changes timeout,
+#       then changed keys and their encoded values.
+ENQUEUE_SCRIPT = """
+redis.call("HSET", KEYS[1], unpack(ARGV, 4))
+redis.call("EXPIRE", KEYS[1], ARGV[3])
+if redis.call("SET", KEYS[2], ARGV[1], "NX", "PX", ARGV[2]) then
+    return 1
+end
+return 0
+"""
+
+# Take all pending changes, releasing the flush lock if there are none.
+# Returns false if the lock was lost.
+# KEYS: pending changes, flush lock.
+# ARGV: lock token, lock timeout in milliseconds.
+DRAIN_SCRIPT = """
+if redis.call("GET", KEYS[2]) ~= ARGV[1] then
+    return false
+end
+local changes = redis.call("HGETALL", KEYS[1])
+if #changes == 0 then
+    redis.call("DEL", KEYS[2])
+else
+    redis.call("DEL", KEYS[1])
+    redis.call("PEXPIRE", KEYS[2], ARGV[2])
+end
+return changes
+"""
+
+# Put back changes that failed to be written, unless newer changes replaced them,
+# then release the flush lock, if still owned.
+# KEYS: pending changes, flush lock.
+# ARGV: lock token, pending changes timeout, then changed keys and their encoded
+#       values.
+RESTORE_SCRIPT = """
+for i = 3, #ARGV, 2 do
+    redis.call("HSETNX", KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call("EXPIRE", KEYS[1], ARGV[2])
+if redis.call("GET", KEYS[2]) == ARGV[1] then
+    redis.call("DEL", KEYS[2])
+end
+"""
+
+
+class RoomMetadataService:
+    """Update the metadata of LiveKit rooms, coalescing concurrent updates.
+
+    Updates are merged into the room's pending changes. The first process to
+    update a room takes its flush lock, and writes pending changes until there is
+    none left, while other processes return right away. A burst of updates thus
+    results in a few writes, none of them losing another's changes.
+
+    Changes that failed to be written are kept pending. They are written by the
+    next update, or by flushes retried in a celery worker, as the processes that
+    only enqueued them did not wait for the write.
+
+    The last written metadata is cached, so that LiveKit is only read once per
+    room rather than before each write.
+    """
+
+    @staticmethod
+    def _get_cache_key(room_name: str) -> str:
+        """Generate cache key for the room's last written metadata."""
+        return f"{settings.ROOM_METADATA_KEY_PREFIX}_{room_name}"
+
+    @staticmethod
+    def _get_pending_key(room_name: str) -> str:
+        """Generate the raw Redis key of the room's pending changes."""
+        return cache.make_key(
+            f"{settings.ROOM_METADATA_KEY_PREFIX}_pending_{room_name}"
+        )
+
+    @staticmethod
+    def _get_lock_key(room_name: str) -> str:
+        """Generate the raw Redis key of the room's flush lock."""
+        return cache.make_key(f"{settings.ROOM_METADATA_KEY_PREFIX}_lock_{room_name}")
+
+    @staticmethod
+    def _run_script(script: str, keys: List[str], args: List):
+        """Run a Lua script against the Redis server backing the default cache."""
+        return utils.run_redis_script(script, keys=keys, args=args)
+
+    @staticmethod
+    def _get_lock_timeout() -> int:
+        """Return the flush lock timeout in milliseconds.
+
+        The lock is renewed before each write and must outlast it, i.e. reading
+        then writing the metadata, each taking up to LIVEKIT_CLIENT_TIMEOUT.
+        """
+        return (
+            max(
+                settings.ROOM_METADATA_LOCK_TIMEOUT,
+                2 * settings.LIVEKIT_CLIENT_TIMEOUT + 1,
+            )
+            * 1000
+        )
+
+    def update(
+        self, room_name: str, metadata: dict, remove_keys: Optional[List[str]] = None
+    ) -> None:
+        """Merge new values into the room's metadata, and remove the given keys.
+
+        The update is written by the process currently flushing the room's
+        changes, which may be another one.
+
+        Raises:
+            MetadataUpdateException: If writing the metadata to LiveKit fails. The
+                changes are kept pending, and a flush is scheduled to retry them.
+        """
+
+        # Values are wrapped in a list, so that removals can be told apart
+        encoded_changes = {key: json.dumps([]) for key in remove_keys or []}
+        encoded_changes.update(
+            {key: json.dumps([value]) for key, value in metadata.items()}
+        )
+
+        if not encoded_changes:
+            return
+
+        token = uuid.uuid4().hex
+        lock_timeout = self._get_lock_timeout()
+
+        is_flushing = self._run_script(
+            ENQUEUE_SCRIPT,
+            keys=[self._get_pending_key(room_name), self._get_lock_key(room_name)],
+            args=[
+                token,
+                lock_timeout,
+                settings.ROOM_METADATA_CACHE_TIMEOUT,
+                *[item for change in encoded_changes.items() for item in change],
+            ],
+        )
+
+        if not is_flushing:
+            # Another process is flushing, it will write this update
+            return
+
+        try:
+            self._flush(room_name, token, lock_timeout)
+        except Exception:
+            self.schedule_flush(room_name)
+            raise
+
+    def flush(self, room_name: str) -> None:
+        """Write the room's pending changes, unless another process is writing them.
+
+        Raises:
+            MetadataUpdateException: If writing the metadata to LiveKit fails.
+        """
+
+        token = uuid.uuid4().hex
+        lock_timeout = self._get_lock_timeout()
+
+        is_flushing = cache.client.get_client(write=True).set(
+            self._get_lock_key(room_name), token, nx=True, px=lock_timeout
+        )
+
+        if is_flushing:
+            self._flush(room_name, token, lock_timeout)
+
+    def _flush(self, room_name: str, token: str, lock_timeout: int) -> None:
+        """Write pending changes until there is none left, holding the flush lock.
+
+        On any error, the changes not written are put back and the lock released.
+        """
+
+        changes, flushed = {}, False
+        try:
+            while changes := self._drain(room_name, token, lock_timeout):
+                self._write(room_name, changes)
+            flushed = True
+        except Exception:
+            # Don't build on metadata that may be outdated
+            self.clear(room_name)
+            raise
+        finally:
+            if not flushed:
+                self._restore(room_name, token, changes)
+
+    def _restore(self, room_name: str, token: str, changes: Dict) -> None:
+        """Put back changes that failed to be written, and release the flush lock."""
+
+        self._run_script(
+            RESTORE_SCRIPT,
+            keys=[self._get_pending_key(room_name), self._get_lock_key(room_name)],
+            args=[
+                token,
+                settings.ROOM_METADATA_CACHE_TIMEOUT,
+                *[
+                    item
+                    for key, value in changes.items()
+                    for item in (key, json.dumps(value))
+                ],
+            ],
+        )
+
+    @staticmethod
+    def schedule_flush(room_name: str, attempt: int = 1) -> None:
+        """Retry writing the room's pending changes later, in a celery worker.
+
+        Each attempt waits twice as long as the previous one, starting from
+        ROOM_METADATA_RETRY_DELAY seconds.
+        """
+
+        # Resolved lazily, as the task itself flushes through this service
+        task = import_string("core.tasks.flush_room_metadata")
+        try:
+            task.apply_async(
+                kwargs={"room_name": room_name, "attempt": attempt},
+                countdown=settings.ROOM_METADATA_RETRY_DELAY * 2 ** (attempt - 1),
+            )
+        except OperationalError:
+            logger.exception(
+                "Failed to schedule a retry of the metadata changes of room %s",
+                room_name,
+            )
+
+    def _drain(self, room_name: str, token: str, lock_timeout: int) -> Dict:
+        """Take the room's pending changes, decoded."""
+
+        changes = self._run_script(
+            DRAIN_SCRIPT,
+            keys=[self._get_pending_key(room_name), self._get_lock_key(room_name)],
+            args=[token, lock_timeout],
+        )
+
+        if changes is None:
+            logger.warning("Lost the metadata flush lock of room %s", room_name)
+            return {}
+
+        return {
+            key.decode("utf-8"): json.loads(value)
+            for key, value in zip(changes[::2], changes[1::2], strict=True)
+        }
+
+    def _write(self, room_name: str, changes: Dict) -> None:
+        """Apply changes to the room's metadata, and write it to LiveKit."""
+
+        cache_key = self._get_cache_key(room_name)
+        state = cache.get(cache_key)
+
+        if state is None:
+            metadata = utils.get_room_metadata(room_name)
+            if metadata is None:
+                # The room is not running, there is no metadata to update
+                return
+            state = {"metadata": metadata}
+
+        metadata = dict(state["metadata"])
+        for key, value in changes.items():
+            if value:
+                metadata[key] = value[0]
+            else:
+                metadata.pop(key, None)
+
+        utils.set_room_metadata(room_name, metadata)
+
+        cache.set(
+            cache_key,
+            {"metadata": metadata},
+            timeout=settings.ROOM_METADATA_CACHE_TIMEOUT,
+        )
+
+    def clear(self, room_name: str) -> None:
+        """Forget the room's cached metadata, e.g. when the room is finished."""
+        cache.delete(self._get_cache_key(room_name))
@@ -4,10 +4,10 @@ from logging import getLogger
 
 from django.conf import settings
 
-from asgiref.sync import async_to_sync
 from livekit.protocol.agent_dispatch import CreateAgentDispatchRequest
 
 from core import utils
+from core.livekit_pool import run_in_livekit_loop
 
 logger = getLogger(__name__)
 
@@ -19,7 +19,7 @@ class SubtitleException(Exception):
 class SubtitleService:
     """Service for managing subtitle agents in LiveKit rooms."""
 
-    @async_to_sync
+    @run_in_livekit_loop
     async def start_subtitle(self, room):
         """Start subtitle agent for the specified room."""
 
@@ -40,7 +40,7 @@ class SubtitleService:
         finally:
             await lkapi.aclose()
 
-    @async_to_sync
+    @run_in_livekit_loop
     async def stop_subtitle(self, room) -> None:
         """Stop subtitle agent for the specified room."""
 
@@ -1,9 +1,17 @@
 """Telephony service for managing SIP dispatch rules for room access."""
 
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
 from logging import getLogger
+from typing import Dict, List, Optional
 
-from asgiref.sync import async_to_sync
-from livekit.api import TwirpError
+from django.conf import settings
+from django.core.cache import cache
+
+from livekit.api import ListRoomsRequest, TwirpError  # pylint: disable=E0611
 from livekit.protocol.sip import (
     CreateSIPDispatchRuleRequest,
     DeleteSIPDispatchRuleRequest,
@@ -12,7 +20,8 @@ from livekit.protocol.sip import (
     SIPDispatchRuleDirect,
 )
 
-from core import utils
+from core import models, utils
+from core.livekit_pool import run_in_livekit_loop
 
 logger = getLogger(__name__)
 
@@ -21,6 +30,18 @@ class TelephonyException(Exception):
     """Exception raised when telephony operations fail."""
 
 
+@dataclass
+class DispatchRulesReconciliation:
+    """Outcome of reconciling SIP dispatch rules with the rooms running in LiveKit."""
+
+    rules: int = 0
+    running_rooms: int = 0
+    deleted: int = 0
+    created: int = 0
+    failed: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
 class TelephonyService:
     """Service for managing participant access through the telephony system (SIP)."""
 
@@ -28,28 +49,71 @@ class TelephonyService:
         """Generate the rule name for a room based on its ID."""
         return f"SIP_{str(room_id)}"
 
-    @async_to_sync
-    async def create_dispatch_rule(self, room):
-        """Create a SIP inbound dispatch rule for direct room routing.
+    @staticmethod
+    def _get_rules_key(room_id):
+        """Generate the raw Redis key of the set of dispatch rule IDs of a room."""
+        return cache.make_key(
+            f"{settings.TELEPHONY_DISPATCH_RULE_KEY_PREFIX}_rules_{room_id!s}"
+        )
 
-        Configures telephony to route incoming SIP calls directly to the specified room
-        using the room's ID and PIN code for authentication.
+    @staticmethod
+    def _get_redis_client():
+        """Return the raw Redis client backing the default cache."""
+        return cache.client.get_client(write=True)
+
+    def _record_dispatch_rule_id(self, room_id, rule_id):
+        """Record the ID of a dispatch rule created for a room.
+
+        IDs are added to a Redis set, atomically, so that rules created at once
+        for a room, e.g. by its webhook events and a reconciliation, are all
+        recorded.
         """
+        rules_key = self._get_rules_key(room_id)
+        pipeline = self._get_redis_client().pipeline()
+        pipeline.sadd(rules_key, rule_id)
+        pipeline.expire(rules_key, settings.TELEPHONY_DISPATCH_RULE_CACHE_TIMEOUT)
+        pipeline.execute()
+
+    def _get_recorded_rules_ids(self, room_id) -> Optional[List[str]]:
+        """Return the IDs of the dispatch rules recorded for a room, if any."""
+        rules_ids = self._get_redis_client().smembers(self._get_rules_key(room_id))
+        if not rules_ids:
+            return None
+        return sorted(rule_id.decode("utf-8") for rule_id in rules_ids)
+
+    def _parse_rule_name(self, rule_name):
+        """Return the ID of the room a rule was named after, if any."""
+        prefix, _, room_id = rule_name.partition("_")
+        if prefix != "SIP":
+            return None
+        try:
+            return uuid.UUID(room_id)
+        except ValueError:
+            return None
+
+    def _build_create_request(self, room_id, pin_code):
+        """Build the request creating a dispatch rule routing calls to a room."""
 
         direct_rule = SIPDispatchRule(
             dispatch_rule_direct=SIPDispatchRuleDirect(
-                room_name=str(room.pk), pin=str(room.pin_code)
+                room_name=str(room_id), pin=str(pin_code)
             )
         )
 
-        request = CreateSIPDispatchRuleRequest(
-            rule=direct_rule, name=self._rule_name(room.pk)
+        return CreateSIPDispatchRuleRequest(
+            rule=direct_rule, name=self._rule_name(room_id)
         )
 
+    @run_in_livekit_loop
+    async def _create_dispatch_rule(self, room) -> str:
+        """Create a SIP inbound dispatch rule for a room, and return its ID."""
+
+        request = self._build_create_request(room.pk, room.pin_code)
+
         lkapi = utils.create_livekit_client()
 
         try:
-            await lkapi.sip.create_sip_dispatch_rule(create=request)
+            rule = await lkapi.sip.create_sip_dispatch_rule(create=request)
         except TwirpError as e:
             logger.exception(
                 "Unexpected error creating dispatch rule for room %s", room.id
@@ -59,6 +123,19 @@ class TelephonyService:
         finally:
             await lkapi.aclose()
 
+        return rule.sip_dispatch_rule_id
+
+    def create_dispatch_rule(self, room):
+        """Create a SIP inbound dispatch rule for direct room routing.
+
+        Configures telephony to route incoming SIP calls directly to the specified room
+        using the room's ID and PIN code for authentication.
+        """
+
+        rule_id = self._create_dispatch_rule(room)
+        # Blocking cache calls are kept out of the shared LiveKit event loop
+        self._record_dispatch_rule_id(room.pk, rule_id)
+
     async def _list_dispatch_rules_ids(self, room_id):
         """List SIP dispatch rule IDs for a specific room.
 
@@ -94,11 +171,17 @@ class TelephonyService:
             if existing_rule.name == rule_name
         ]
 
-    @async_to_sync
-    async def delete_dispatch_rule(self, room_id):
-        """Delete all SIP inbound dispatch rules associated with a specific room."""
+    @run_in_livekit_loop
+    async def _delete_dispatch_rules(self, room_id, rules_ids: Optional[List[str]]):
+        """Delete the given SIP dispatch rules of a room, or all its rules if unknown.
 
-        rules_ids = await self._list_dispatch_rules_ids(room_id)
+        Returns whether any rule was deleted.
+        """
+
+        is_recorded = rules_ids is not None
+
+        if not is_recorded:
+            rules_ids = await self._list_dispatch_rules_ids(room_id)
 
         if not rules_ids:
             logger.info("No dispatch rules found for room %s", room_id)
@@ -110,9 +193,16 @@ class TelephonyService:
         lkapi = utils.create_livekit_client()
         try:
             for rule_id in rules_ids:
-                await lkapi.sip.delete_sip_dispatch_rule(
-                    delete=DeleteSIPDispatchRuleRequest(sip_dispatch_rule_id=rule_id)
-                )
+                try:
+                    await lkapi.sip.delete_sip_dispatch_rule(
+                        delete=DeleteSIPDispatchRuleRequest(
+                            sip_dispatch_rule_id=rule_id
+                        )
+                    )
+                except TwirpError as e:
+                    # A recorded rule may already have been deleted in LiveKit
+                    if not is_recorded or e.status != 404:
+                        raise
 
             return True
 
@@ -122,3 +212,233 @@ class TelephonyService:
 
         finally:
             await lkapi.aclose()
+
+    def delete_dispatch_rule(self, room_id):
+        """Delete all SIP inbound dispatch rules associated with a specific room.
+
+        Rules are deleted by their IDs, recorded when they were created. Listing all
+        the rules to find the room's ones is only a fallback, for rules created
+        before IDs were recorded or whose record expired.
+        """
+
+        # Blocking cache calls are kept out of the shared LiveKit event loop
+        deleted = self._delete_dispatch_rules(
+            room_id, self._get_recorded_rules_ids(room_id)
+        )
+
+        if deleted:
+            self._get_redis_client().delete(self._get_rules_key(room_id))
+        return deleted
+
+    @run_in_livekit_loop
+    async def _list_dispatch_rules_and_rooms(self):
+        """List all SIP dispatch rules, then all the rooms running in LiveKit.
+
+        Rules are listed first, so that a rule created for a room started in
+        between is not listed without its room, and taken for an orphan. Such a
+        room is listed without its rule though, rooms missing a rule are thus
+        checked again before creating one.
+        """
+
+        lkapi = utils.create_livekit_client()
+
+        try:
+            rules = await lkapi.sip.list_sip_dispatch_rule(
+                list=ListSIPDispatchRuleRequest()
+            )
+            rooms = await lkapi.room.list_rooms(ListRoomsRequest())
+        except TwirpError as e:
+            logger.exception("Failed to list dispatch rules and running rooms")
+            raise TelephonyException("Could not list dispatch rules") from e
+        finally:
+            await lkapi.aclose()
+
+        return list(rules.items), [room.name for room in rooms.rooms]
+
+    @run_in_livekit_loop
+    async def _filter_rooms_without_rule(self, rooms_to_create):
+        """Drop the rooms which got a dispatch rule since rules were listed.
+
+        Rules are listed again right before creating the missing ones, so that the
+        rule created by the webhook of a room started meanwhile is not duplicated.
+        """
+
+        if not rooms_to_create:
+            return []
+
+        lkapi = utils.create_livekit_client()
+
+        try:
+            rules = await lkapi.sip.list_sip_dispatch_rule(
+                list=ListSIPDispatchRuleRequest()
+            )
+        except TwirpError as e:
+            logger.exception("Failed to list dispatch rules")
+            raise TelephonyException("Could not list dispatch rules") from e
+        finally:
+            await lkapi.aclose()
+
+        rules_names = {rule.name for rule in rules.items}
+
+        return [
+            (room_id, pin_code)
+            for room_id, pin_code in rooms_to_create
+            if self._rule_name(room_id) not in rules_names
+        ]
+
+    @run_in_livekit_loop
+    async def _apply_reconciliation(self, rules_ids_to_delete, rooms_to_create):
+        """Delete and create dispatch rules concurrently, sharing a single client.
+
+        Returns the IDs of the deleted rules, and the IDs of the rules created by
+        room ID. Failures are logged and left out, to be retried on the next run.
+        """
+
+        lkapi = utils.create_livekit_client()
+        semaphore = asyncio.Semaphore(settings.TELEPHONY_RECONCILIATION_MAX_CONCURRENCY)
+
+        async def delete(rule_id):
+            async with semaphore:
+                try:
+                    await lkapi.sip.delete_sip_dispatch_rule(
+                        delete=DeleteSIPDispatchRuleRequest(
+                            sip_dispatch_rule_id=rule_id
+                        )
+                    )
+                except TwirpError as e:
+                    if e.status == 404:
+                        return rule_id
+                    logger.exception("Failed to delete dispatch rule %s", rule_id)
+                    return None
+                return rule_id
+
+        async def create(room_id, pin_code):
+            async with semaphore:
+                try:
+                    rule = await lkapi.sip.create_sip_dispatch_rule(
+                        create=self._build_create_request(room_id, pin_code)
+                    )
+                except TwirpError:
+                    logger.exception(
+                        "Failed to create dispatch rule for room %s", room_id
+                    )
+                    return room_id, None
+                return room_id, rule.sip_dispatch_rule_id
+
+        try:
+            deleted, created = await asyncio.gather(
+                asyncio.gather(*(delete(rule_id) for rule_id in rules_ids_to_delete)),
+                asyncio.gather(
+                    *(create(room_id, pin) for room_id, pin in rooms_to_create)
+                ),
+            )
+        finally:
+            await lkapi.aclose()
+
+        return (
+            [rule_id for rule_id in deleted if rule_id is not None],
+            {room_id: rule_id for room_id, rule_id in created if rule_id is not None},
+        )
+
+    def reconcile_dispatch_rules(self) -> DispatchRulesReconciliation:
+        """Make dispatch rules match the rooms running in LiveKit.
+
+        Rules leak when a 'room_finished' webhook is lost or fails, and each of them
+        slows down listing rules. All rules and running rooms are listed once, and
+        compared to the rooms having a PIN code in a single query. Rules of rooms not
+        running anymore, and duplicated rules, are deleted. Running rooms still
+        missing their rule once rules are listed again get one. Rules not named
+        after a room are left untouched.
+        """
+
+        report = DispatchRulesReconciliation()
+
+        start = time.perf_counter()
+        rules, running_rooms_names = self._list_dispatch_rules_and_rooms()
+        report.timings["list"] = time.perf_counter() - start
+        report.rules = len(rules)
+        report.running_rooms = len(running_rooms_names)
+
+        rules_ids_by_room: Dict[uuid.UUID, List[str]] = defaultdict(list)
+        for rule in rules:
+            room_id = self._parse_rule_name(rule.name)
+            if room_id is not None:
+                rules_ids_by_room[room_id].append(rule.sip_dispatch_rule_id)
+
+        running_rooms_ids = []
+        for room_name in running_rooms_names:
+            try:
+                running_rooms_ids.append(uuid.UUID(room_name))
+            except ValueError:
+                continue
+
+        start = time.perf_counter()
+        pin_codes = dict(
+            models.Room.objects.filter(
+                pk__in=running_rooms_ids, pin_code__isnull=False
+            ).values_list("pk", "pin_code")
+        )
+        report.timings["query"] = time.perf_counter() - start
+
+        rules_ids_to_delete = []
+        for room_id, rules_ids in rules_ids_by_room.items():
+            # Keep a single rule for rooms still running
+            rules_ids_to_delete.extend(
+                rules_ids[1:] if room_id in pin_codes else rules_ids
+            )
+        rooms_to_create = [
+            (room_id, pin_code)
+            for room_id, pin_code in pin_codes.items()
+            if room_id not in rules_ids_by_room
+        ]
+
+        start = time.perf_counter()
+        rooms_to_create = self._filter_rooms_without_rule(rooms_to_create)
+        deleted, created = self._apply_reconciliation(
+            rules_ids_to_delete, rooms_to_create
+        )
+        report.timings["apply"] = time.perf_counter() - start
+        report.deleted = len(deleted)
+        report.created = len(created)
+        report.failed = (
+            len(rules_ids_to_delete)
+            + len(rooms_to_create)
+            - len(deleted)
+            - len(created)
+        )
+
+        # Recorded IDs must include the rules left, to be deleted by ID later on.
+        # They are merged with the IDs recorded meanwhile by webhooks, not replaced.
+        deleted_ids = set(deleted)
+        pipeline = self._get_redis_client().pipeline()
+        for room_id, rules_ids in rules_ids_by_room.items():
+            rules_key = self._get_rules_key(room_id)
+            removed_ids = [rule_id for rule_id in rules_ids if rule_id in deleted_ids]
+            if removed_ids:
+                pipeline.srem(rules_key, *removed_ids)
+            if room_id in pin_codes:
+                # The first rule of a running room is always kept
+                pipeline.sadd(
+                    rules_key,
+                    *(rule_id for rule_id in rules_ids if rule_id not in deleted_ids),
+                )
+                pipeline.expire(
+                    rules_key, settings.TELEPHONY_DISPATCH_RULE_CACHE_TIMEOUT
+                )
+        for room_id, rule_id in created.items():
+            rules_key = self._get_rules_key(room_id)
+            pipeline.sadd(rules_key, rule_id)
+            pipeline.expire(rules_key, settings.TELEPHONY_DISPATCH_RULE_CACHE_TIMEOUT)
+        pipeline.execute()
+
+        logger.info(
+            "Reconciled %d dispatch rules with %d running rooms: "
+            "%d deleted, %d created, %d failed",
+            report.rules,
+            report.running_rooms,
+            report.deleted,
+            report.created,
+            report.failed,
+        )
+
+        return report
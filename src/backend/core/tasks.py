@@ -0,0 +1,124 @@
+"""Meet core tasks"""
+
+from logging import getLogger
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from core import models, utils
+from core.recording.worker.exceptions import RecordingStartError, RecordingStopError
+from core.recording.worker.factories import get_worker_service
+from core.recording.worker.mediator import WorkerServiceMediator
+from core.services.room_metadata import RoomMetadataService
+from core.services.telephony import TelephonyService
+
+from meet.celery_app import app
+
+logger = getLogger(__name__)
+
+
+@app.task
+def notify_room_participants(
+    room_name: str, notification_data: dict, coalescing_key: Optional[str] = None
+):
+    """Send notification data to all participants in a LiveKit room.
+
+    When notifications are coalesced, the coalescing key is released before
+    sending, so that changes happening while sending get notified again.
+    """
+
+    if coalescing_key is not None:
+        cache.delete(coalescing_key)
+
+    try:
+        utils.notify_participants(
+            room_name=room_name, notification_data=notification_data
+        )
+    except utils.NotificationError:
+        # If room not created yet, there is no participants to notify
+        logger.exception("Failed to notify room participants")
+
+
+@app.task
+def flush_room_metadata(room_name: str, attempt: int = 1):
+    """Write the metadata changes of a room left pending by a failed write.
+
+    Failed writes are retried up to ROOM_METADATA_RETRY_ATTEMPTS times. Changes
+    still pending after that are written along with the room's next update.
+    """
+
+    try:
+        RoomMetadataService().flush(room_name)
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("Failed to write the pending metadata of room %s", room_name)
+        if attempt < settings.ROOM_METADATA_RETRY_ATTEMPTS:
+            RoomMetadataService.schedule_flush(room_name, attempt=attempt + 1)
+
+
+@app.task
+def process_livekit_events(room_name: str, token: str):
+    """Process the LiveKit webhook events queued for a room, in order."""
+
+    # Resolved lazily, as the service itself schedules this task
+    service_class = import_string("core.services.livekit_events.LiveKitEventsService")
+    service_class().process_events(room_name, token)
+
+
+@app.task
+def sweep_livekit_events():
+    """Schedule processing of the LiveKit webhook events left queued."""
+
+    service_class = import_string("core.services.livekit_events.LiveKitEventsService")
+    service_class().sweep_queues()
+
+
+@app.task
+def reconcile_telephony_dispatch_rules():
+    """Delete leaked SIP dispatch rules, and create the missing ones."""
+
+    if not settings.ROOM_TELEPHONY_ENABLED:
+        return
+
+    TelephonyService().reconcile_dispatch_rules()
+
+
+@app.task
+def start_recording(recording_id: str):
+    """Start a recording initiated through the API, out of the request cycle.
+
+    Failures are tracked on the recording's status, which clients poll.
+    """
+
+    try:
+        recording = models.Recording.objects.select_related("room").get(pk=recording_id)
+    except models.Recording.DoesNotExist:
+        logger.error("Recording %s to start does not exist", recording_id)
+        return
+
+    worker_service = get_worker_service(mode=recording.mode)
+    try:
+        WorkerServiceMediator(worker_service=worker_service).start(recording)
+    except RecordingStartError:
+        logger.error("Recording %s failed to start", recording_id)
+
+
+@app.task
+def stop_recording(recording_id: str):
+    """Stop a recording through the API, out of the request cycle.
+
+    Failures are tracked on the recording's status, which clients poll.
+    """
+
+    try:
+        recording = models.Recording.objects.select_related("room").get(pk=recording_id)
+    except models.Recording.DoesNotExist:
+        logger.error("Recording %s to stop does not exist", recording_id)
+        return
+
+    worker_service = get_worker_service(mode=recording.mode)
+    try:
+        WorkerServiceMediator(worker_service=worker_service).stop(recording)
+    except RecordingStopError:
+        logger.error("Recording %s failed to stop", recording_id)
@@ -2,13 +2,38 @@
 
 from unittest import mock
 
+from django.urls import get_resolver
+
 import pytest
 
+from core.api import _get_frontend_configuration
+from core.s3_signer import s3_signer
+
 USER = "user"
 TEAM = "team"
 VIA = [USER, TEAM]
 
 
+@pytest.fixture(autouse=True, scope="session")
+def load_urls():
+    """Load views before any test freezes time.
+
+    Throttles capture the clock when their module is imported, so importing them
+    while time is frozen would break throttling for all next tests.
+    """
+    get_resolver().url_patterns  # noqa: B018 # pylint: disable=expression-not-assigned
+
+
+@pytest.fixture(autouse=True)
+def clear_process_caches():
+    """Forget what is computed once per process from settings, which tests change."""
+    _get_frontend_configuration.cache_clear()
+    s3_signer.reset()
+    yield
+    _get_frontend_configuration.cache_clear()
+    s3_signer.reset()
+
+
 @pytest.fixture
 def mock_user_get_teams():
     """Mock for the "get_teams" method on the User model."""
@@ -92,7 +92,7 @@ def test_api_recordings_delete_active(role):
     "role",
     ["owner", "administrator"],
 )
-def test_api_recordings_delete_final(role):
+def test_api_recordings_delete_final(role, django_assert_num_queries):
     """
     Authenticated users should not be allowed to delete an active recording
     from which they are an admin or owner.
@@ -106,9 +106,10 @@ def test_api_recordings_delete_final(role):
     client = APIClient()
     client.force_login(user)
 
-    response = client.delete(
-        f"/api/v1.0/recordings/{access.recording.id}/",
-    )
+    with django_assert_num_queries(4):
+        response = client.delete(
+            f"/api/v1.0/recordings/{access.recording.id}/",
+        )
 
     assert response.status_code == 204
     assert Recording.objects.count() == 0
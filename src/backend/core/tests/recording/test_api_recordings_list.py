@@ -9,7 +9,7 @@ import pytest
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.test import APIClient
 
-from core import factories
+from core import factories, models
 
 pytestmark = pytest.mark.django_db
 
@@ -171,6 +171,51 @@ def test_api_recordings_list_pagination(_mock_page_size):
     assert recording_ids == []
 
 
+def test_api_recordings_list_pagination_cursor(django_assert_num_queries):
+    """
+    Passing a cursor should paginate recordings on their creation date and id,
+    without counting them.
+    """
+    user = factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    recordings = factories.RecordingFactory.create_batch(3, users=[user])
+    # Recordings created at the same time are ordered by id
+    models.Recording.objects.filter(id=recordings[0].id).update(
+        created_at=recordings[1].created_at
+    )
+    recordings = models.Recording.objects.order_by("-created_at", "-id")
+    expected_ids = [str(recording.id) for recording in recordings]
+
+    with django_assert_num_queries(2):
+        response = client.get("/api/v1.0/recordings/?cursor=&page_size=2")
+
+    assert response.status_code == 200
+    content = response.json()
+    assert "count" not in content
+    assert [item["id"] for item in content["results"]] == expected_ids[:2]
+
+    response = client.get(content["next"])
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["next"] is None
+    assert [item["id"] for item in content["results"]] == expected_ids[2:]
+
+
+def test_api_recordings_list_pagination_cursor_invalid():
+    """An invalid cursor should return a 404."""
+    user = factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.get("/api/v1.0/recordings/?cursor=invalid")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
 def test_api_recordings_list_authenticated_distinct():
     """A recording for a room with several related users should only be listed once."""
     user = factories.UserFactory()
@@ -188,6 +233,42 @@ def test_api_recordings_list_authenticated_distinct():
     assert content["results"][0]["id"] == str(recording.id)
 
 
+def test_api_recordings_list_authenticated_direct_and_team(mock_user_get_teams):
+    """A recording shared with a user both directly and via a team is listed once."""
+    user = factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    mock_user_get_teams.return_value = ["team1", "team2"]
+
+    recording = factories.RecordingFactory()
+    factories.UserRecordingAccessFactory(recording=recording, user=user)
+    factories.TeamRecordingAccessFactory(recording=recording, team="team1")
+    factories.TeamRecordingAccessFactory(recording=recording, team="team2")
+
+    response = client.get("/api/v1.0/recordings/")
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 1
+    assert [result["id"] for result in content["results"]] == [str(recording.id)]
+
+
+def test_api_recordings_list_num_queries(django_assert_num_queries):
+    """Listing recordings should not query their room or accesses one by one."""
+    user = factories.UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    factories.RecordingFactory.create_batch(5, users=[user])
+
+    with django_assert_num_queries(3):
+        response = client.get("/api/v1.0/recordings/")
+
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 5
+
+
 def test_api_recordings_list_ordering_default():
     """Recordings should be ordered by descending "updated_at" by default"""
     user = factories.UserFactory()
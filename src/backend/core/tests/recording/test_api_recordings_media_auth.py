@@ -3,10 +3,12 @@ Test media-auth authorization API endpoint in docs core app.
 """
 
 from io import BytesIO
+from unittest import mock
 from urllib.parse import urlparse
 from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.storage import default_storage
 from django.utils import timezone
 
@@ -14,7 +16,8 @@ import pytest
 import requests
 from rest_framework.test import APIClient
 
-from core import models
+from core import models, utils
+from core.api.viewsets import RecordingViewSet
 from core.factories import RecordingFactory, UserFactory, UserRecordingAccessFactory
 
 pytestmark = pytest.mark.django_db
@@ -282,3 +285,81 @@ def test_api_recordings_media_auth_success_administrator(mode):
         timeout=1,
     )
     assert response.content.decode("utf-8") == "my prose"
+
+
+@mock.patch.object(
+    utils,
+    "generate_s3_authorization_headers",
+    wraps=utils.generate_s3_authorization_headers,
+)
+def test_api_recordings_media_auth_cached(
+    mock_generate_headers, django_assert_num_queries
+):
+    """
+    Repeated requests for a file should be authorized from the cache, and all
+    users share the headers signed for a file.
+    """
+    user = UserFactory()
+    other_user = UserFactory()
+    recording = RecordingFactory(status=models.RecordingStatusChoices.SAVED)
+    UserRecordingAccessFactory(user=user, recording=recording, role="owner")
+    UserRecordingAccessFactory(user=other_user, recording=recording, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+    original_url = f"http://localhost/media/{recording.key:s}"
+
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 200
+    authorization = response["Authorization"]
+
+    # Only the user is loaded, by authentication
+    with django_assert_num_queries(1):
+        response = client.get(
+            "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+        )
+    assert response.status_code == 200
+    assert response["Authorization"] == authorization
+
+    client.force_login(other_user)
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 200
+    assert response["Authorization"] == authorization
+
+    mock_generate_headers.assert_called_once_with(recording.key)
+
+
+def test_api_recordings_media_auth_cached_revoked():
+    """A revoked access should be denied once its cached decision expired."""
+    user = UserFactory()
+    recording = RecordingFactory(status=models.RecordingStatusChoices.SAVED)
+    access = UserRecordingAccessFactory(user=user, recording=recording, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+    original_url = f"http://localhost/media/{recording.key:s}"
+
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 200
+
+    access.delete()
+
+    # The decision is still cached
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 200
+
+    # Simulate the expiration of the cached decision
+    cache.delete(RecordingViewSet._auth_get_decision_cache_key(user, recording.key))
+
+    response = client.get(
+        "/api/v1.0/recordings/media-auth/", HTTP_X_ORIGINAL_URL=original_url
+    )
+    assert response.status_code == 403
@@ -101,7 +101,7 @@ def test_api_recording_retrieve_administrators(settings):
     }
 
 
-def test_api_recording_retrieve_owners(settings):
+def test_api_recording_retrieve_owners(settings, django_assert_num_queries):
     """A user who is an owner of a recording should be able to retrieve it."""
     settings.RECORDING_EXPIRATION_DAYS = None
     user = UserFactory()
@@ -112,7 +112,8 @@ def test_api_recording_retrieve_owners(settings):
     client = APIClient()
     client.force_login(user)
 
-    response = client.get(f"/api/v1.0/recordings/{recording.id!s}/")
+    with django_assert_num_queries(2):
+        response = client.get(f"/api/v1.0/recordings/{recording.id!s}/")
 
     assert response.status_code == 200
     content = response.json()
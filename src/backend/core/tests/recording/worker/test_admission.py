@@ -0,0 +1,115 @@
+"""Test EgressAdmission class."""
+
+# pylint: disable=redefined-outer-name,unused-argument
+
+import uuid
+from unittest import mock
+
+import pytest
+from freezegun import freeze_time
+
+from core.factories import RecordingFactory
+from core.recording.worker.admission import EgressAdmission
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def admission(settings):
+    """Admission limited to 2 screen recordings at once, with isolated keys."""
+    settings.RECORDING_EGRESS_CAPACITY = {"screen_recording": 2}
+    settings.RECORDING_ADMISSION_KEY_PREFIX = f"admission-{uuid.uuid4()}"
+    settings.RECORDING_ADMISSION_SLOT_TIMEOUT = 3600
+    return EgressAdmission()
+
+
+@pytest.fixture
+def mock_start_task():
+    """Mock the task starting recordings granted a slot."""
+    with mock.patch("core.tasks.start_recording.delay") as mock_delay:
+        yield mock_delay
+
+
+def test_admission_unlimited_mode(admission, mock_start_task):
+    """Modes without a configured capacity should always be admitted."""
+    recordings = RecordingFactory.create_batch(5, mode="transcript")
+
+    assert all(admission.admit(recording) for recording in recordings)
+    admission.release(recordings[0])
+
+    mock_start_task.assert_not_called()
+
+
+def test_admission_queue_when_saturated(admission, mock_start_task):
+    """Recordings beyond the capacity should be queued, then started in order."""
+    recordings = RecordingFactory.create_batch(4, mode="screen_recording")
+
+    with freeze_time("2025-01-01 12:00:00") as frozen_time:
+        assert [admission.admit(recording) for recording in recordings] == [
+            True,
+            True,
+            False,
+            False,
+        ]
+        # Admitting a queued recording again keeps its place
+        assert admission.admit(recordings[2]) is False
+
+        stats = admission.get_stats("screen_recording")
+        assert stats["active"] == 2
+        assert stats["queued"] == 2
+
+        frozen_time.move_to("2025-01-01 12:00:30")
+        admission.release(recordings[0])
+
+        mock_start_task.assert_called_once_with(recording_id=str(recordings[2].id))
+        mock_start_task.reset_mock()
+
+        # The task starting the recording is admitted on its slot
+        assert admission.admit(recordings[2]) is True
+        mock_start_task.assert_not_called()
+
+        # Duplicated webhooks do not free more slots
+        admission.release(recordings[0])
+        mock_start_task.assert_not_called()
+
+        frozen_time.move_to("2025-01-01 12:01:00")
+        admission.release(recordings[1])
+
+        mock_start_task.assert_called_once_with(recording_id=str(recordings[3].id))
+        assert admission.get_stats("screen_recording") == {
+            "capacity": 2,
+            "active": 2,
+            "queued": 0,
+            "oldest_wait": 0,
+            "admitted": 4,
+            "average_wait": 22.5,
+            "max_wait": 60,
+        }
+
+
+def test_admission_release_queued(admission, mock_start_task):
+    """Releasing a queued recording should drop it from the queue."""
+    recordings = RecordingFactory.create_batch(3, mode="screen_recording")
+    for recording in recordings:
+        admission.admit(recording)
+
+    admission.release(recordings[2])
+    admission.release(recordings[0])
+
+    mock_start_task.assert_not_called()
+    assert admission.get_stats("screen_recording")["queued"] == 0
+
+
+def test_admission_leaked_slots(admission, mock_start_task):
+    """Slots not released before their timeout should be reclaimed."""
+    recordings = RecordingFactory.create_batch(3, mode="screen_recording")
+
+    with freeze_time("2025-01-01 12:00:00"):
+        for recording in recordings:
+            admission.admit(recording)
+
+    with freeze_time("2025-01-01 13:00:01"):
+        assert admission.get_stats("screen_recording")["active"] == 0
+        assert admission.admit(recordings[2]) is True
+
+    mock_start_task.assert_not_called()
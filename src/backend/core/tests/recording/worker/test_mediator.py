@@ -2,13 +2,15 @@
 
 # pylint: disable=redefined-outer-name,unused-argument
 
+import uuid
 from unittest import mock
 from unittest.mock import Mock
 
 import pytest
 
 from core.factories import RecordingFactory
-from core.models import RecordingStatusChoices
+from core.models import Recording, RecordingStatusChoices
+from core.recording.worker.admission import EgressAdmission
 from core.recording.worker.exceptions import (
     RecordingStartError,
     RecordingStopError,
@@ -34,7 +36,7 @@ def mediator(mock_worker_service):
     return WorkerServiceMediator(mock_worker_service)
 
 
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_start_recording_success(
     mock_update_room_metadata, mediator, mock_worker_service
 ):
@@ -66,10 +68,94 @@ def test_start_recording_success(
     )
 
 
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
+def test_start_recording_caches_worker_id(
+    mock_update_room_metadata, mediator, mock_worker_service, django_assert_num_queries
+):
+    """Test webhooks about a started worker find its recording by primary key."""
+    worker_id = f"EG_{uuid.uuid4().hex}"
+    mock_worker_service.start.return_value = worker_id
+    recording = RecordingFactory(status=RecordingStatusChoices.INITIATED)
+
+    mediator.start(recording)
+
+    with django_assert_num_queries(1) as context:
+        assert Recording.objects.get_by_worker_id(worker_id) == recording
+
+    assert '"meet_recording"."id" =' in context.captured_queries[0]["sql"]
+
+
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
+def test_mediator_start_recording_queued(
+    mock_update_room_metadata, mock_worker_service
+):
+    """Test a recording is queued when the egress capacity is saturated."""
+    mock_admission = Mock(spec=EgressAdmission)
+    mock_admission.admit.return_value = False
+    mediator = WorkerServiceMediator(mock_worker_service, admission=mock_admission)
+    recording = RecordingFactory(status=RecordingStatusChoices.INITIATED)
+
+    assert mediator.start(recording) is False
+
+    mock_admission.admit.assert_called_once_with(recording)
+    mock_worker_service.start.assert_not_called()
+
+    recording.refresh_from_db()
+    assert recording.status == RecordingStatusChoices.INITIATED
+    mock_update_room_metadata.assert_called_once_with(
+        str(recording.room.id),
+        {"recording_mode": recording.mode, "recording_status": "starting"},
+    )
+
+
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
+def test_mediator_start_recording_error_releases_slot(
+    mock_update_room_metadata, mock_worker_service
+):
+    """Test the egress slot of a recording failing to start is released."""
+    mock_admission = Mock(spec=EgressAdmission)
+    mock_admission.admit.return_value = True
+    mediator = WorkerServiceMediator(mock_worker_service, admission=mock_admission)
+    mock_worker_service.start.side_effect = WorkerConnectionError("Test error")
+    recording = RecordingFactory(status=RecordingStatusChoices.INITIATED)
+
+    with pytest.raises(RecordingStartError):
+        mediator.start(recording)
+
+    mock_admission.release.assert_called_once_with(recording)
+
+
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
+def test_mediator_start_recording_cancelled_while_starting(
+    mock_update_room_metadata, mock_worker_service
+):
+    """Test the worker of a recording cancelled while it was starting is stopped."""
+    mediator = WorkerServiceMediator(
+        mock_worker_service, admission=Mock(spec=EgressAdmission)
+    )
+    recording = RecordingFactory(status=RecordingStatusChoices.INITIATED)
+
+    def start(room_name, recording_id):
+        Recording.objects.filter(pk=recording_id).update(
+            status=RecordingStatusChoices.ABORTED
+        )
+        return "worker-1"
+
+    mock_worker_service.start.side_effect = start
+
+    with pytest.raises(RecordingStartError):
+        mediator.start(recording)
+
+    mock_worker_service.stop.assert_called_once_with(worker_id="worker-1")
+    recording.refresh_from_db()
+    assert recording.status == RecordingStatusChoices.ABORTED
+    assert recording.worker_id == "worker-1"
+
+
 @pytest.mark.parametrize(
     "error_class", [WorkerRequestError, WorkerConnectionError, WorkerResponseError]
 )
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_mediator_start_recording_worker_errors(
     mock_update_room_metadata, mediator, mock_worker_service, error_class
 ):
@@ -103,7 +189,7 @@ def test_mediator_start_recording_worker_errors(
         RecordingStatusChoices.ABORTED,
     ],
 )
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_mediator_start_recording_from_forbidden_status(
     mock_update_room_metadata, mediator, mock_worker_service, status
 ):
@@ -157,6 +243,41 @@ def test_mediator_stop_recording_aborted(mediator, mock_worker_service):
     assert mock_recording.status == RecordingStatusChoices.ABORTED
 
 
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
+def test_mediator_stop_recording_queued(mock_update_room_metadata, mock_worker_service):
+    """Test a recording queued for an egress slot is cancelled."""
+    mock_admission = Mock(spec=EgressAdmission)
+    mediator = WorkerServiceMediator(mock_worker_service, admission=mock_admission)
+    recording = RecordingFactory(status=RecordingStatusChoices.INITIATED)
+
+    mediator.stop(recording)
+
+    mock_worker_service.stop.assert_not_called()
+    mock_admission.release.assert_called_once_with(recording)
+    mock_update_room_metadata.assert_called_once_with(
+        str(recording.room.id), {}, ["recording_mode", "recording_status"]
+    )
+    recording.refresh_from_db()
+    assert recording.status == RecordingStatusChoices.ABORTED
+
+
+def test_mediator_stop_recording_queued_already_started(mock_worker_service):
+    """Test a queued recording which started meanwhile is not cancelled."""
+    mock_admission = Mock(spec=EgressAdmission)
+    mediator = WorkerServiceMediator(mock_worker_service, admission=mock_admission)
+    recording = RecordingFactory(status=RecordingStatusChoices.INITIATED)
+    Recording.objects.filter(pk=recording.pk).update(
+        status=RecordingStatusChoices.ACTIVE
+    )
+
+    with pytest.raises(RecordingStopError):
+        mediator.stop(recording)
+
+    mock_admission.release.assert_not_called()
+    recording.refresh_from_db()
+    assert recording.status == RecordingStatusChoices.ACTIVE
+
+
 @pytest.mark.parametrize("error_class", [WorkerConnectionError, WorkerResponseError])
 def test_mediator_stop_recording_worker_errors(
     mediator, mock_worker_service, error_class
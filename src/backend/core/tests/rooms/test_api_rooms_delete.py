@@ -83,7 +83,7 @@ def test_api_rooms_delete_administrators():
     assert Room.objects.count() == 1
 
 
-def test_api_rooms_delete_owners():
+def test_api_rooms_delete_owners(django_assert_num_queries):
     """
     Authenticated users should be able to delete a room for which they are directly
     owner.
@@ -94,9 +94,10 @@ def test_api_rooms_delete_owners():
     client = APIClient()
     client.force_login(user)
 
-    response = client.delete(
-        f"/api/v1.0/rooms/{room.id}/",
-    )
+    with django_assert_num_queries(6):
+        response = client.delete(
+            f"/api/v1.0/rooms/{room.id}/",
+        )
 
     assert response.status_code == 204
     assert Room.objects.exists() is False
@@ -62,6 +62,28 @@ def test_api_rooms_list_authenticated():
     assert expected_ids == results_id
 
 
+def test_api_rooms_list_num_queries(django_assert_num_queries):
+    """
+    Roles of the user on listed rooms should be loaded along with the rooms,
+    instead of being queried for each room.
+    """
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    for role in ["member", "administrator", "owner"]:
+        RoomFactory(users=[(user, role)])
+
+    # Accesses are only listed for the rooms administrated by the user
+    with django_assert_num_queries(5):
+        response = client.get("/api/v1.0/rooms/")
+
+    assert response.status_code == 200
+    assert sorted(
+        result["is_administrable"] for result in response.json()["results"]
+    ) == [False, True, True]
+
+
 @mock.patch.object(PageNumberPagination, "get_page_size", return_value=2)
 def test_api_rooms_list_pagination(_mock_page_size):
     """Pagination should work as expected."""
@@ -103,6 +125,31 @@ def test_api_rooms_list_pagination(_mock_page_size):
     assert room_ids == []
 
 
+def test_api_rooms_list_pagination_cursor():
+    """Passing a cursor should paginate rooms on their creation date, without count."""
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    rooms = RoomFactory.create_batch(3, users=[user])
+    expected_ids = [str(room.id) for room in reversed(rooms)]
+
+    response = client.get("/api/v1.0/rooms/?cursor=&page_size=2")
+
+    assert response.status_code == 200
+    content = response.json()
+    assert "count" not in content
+    assert content["next"].startswith("http://testserver/api/v1.0/rooms/?cursor=")
+    assert [item["id"] for item in content["results"]] == expected_ids[:2]
+
+    response = client.get(content["next"])
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["next"] is None
+    assert [item["id"] for item in content["results"]] == expected_ids[2:]
+
+
 def test_api_rooms_list_authenticated_distinct():
     """A public room with several related users should only be listed once."""
     user = UserFactory()
@@ -3,6 +3,7 @@ Test rooms API endpoints in the Meet core app: lobby functionality.
 """
 
 # pylint: disable=W0621,W0613,W0212
+import time
 import uuid
 from unittest import mock
 
@@ -21,6 +22,19 @@ from ...services.lobby import (
 pytestmark = pytest.mark.django_db
 
 
+def _add_to_lobby(room, participant, timeout=60):
+    """Store a participant in the room's lobby."""
+    lobby_service = LobbyService()
+    participant_key = lobby_service._get_participant_key(room.id, participant["id"])
+    client = lobby_service._get_redis_client()
+    client.hset(participant_key, mapping=participant)
+    client.expire(participant_key, timeout)
+    client.zadd(
+        lobby_service._get_index_key(room.id),
+        {participant["id"]: time.time() + timeout},
+    )
+
+
 # Tests for request_entry endpoint
 
 
@@ -67,8 +81,8 @@ def test_request_entry_anonymous(settings):
     assert len(lobby_keys) == 1
 
     # Verify participant data was correctly stored in cache
-    participant_data = cache.get(f"mocked-cache-prefix_{room.id!s}_{participant_id}")
-    assert participant_data.get("username") == "test_user"
+    participant = LobbyService().get_participant(room.id, participant_id)
+    assert participant.username == "test_user"
 
 
 def test_request_entry_authenticated_user(settings):
@@ -116,8 +130,8 @@ def test_request_entry_authenticated_user(settings):
     assert len(lobby_keys) == 1
 
     # Verify participant data was correctly stored in cache
-    participant_data = cache.get(f"mocked-cache-prefix_{room.id!s}_{participant_id}")
-    assert participant_data.get("username") == "test_user"
+    participant = LobbyService().get_participant(room.id, participant_id)
+    assert participant.username == "test_user"
 
 
 def test_request_entry_with_existing_participants(settings):
@@ -131,8 +145,8 @@ def test_request_entry_with_existing_participants(settings):
     settings.LOBBY_KEY_PREFIX = "mocked-cache-prefix"
 
     # Add two participants already waiting in the lobby
-    cache.set(
-        f"mocked-cache-prefix_{room.id}_2f7f162f-e7d1-421b-90e7-02bfbfbf8def",
+    _add_to_lobby(
+        room,
         {
             "id": "2f7f162f-e7d1-421b-90e7-02bfbfbf8def",
             "username": "user1",
@@ -140,8 +154,8 @@ def test_request_entry_with_existing_participants(settings):
             "color": "#123456",
         },
     )
-    cache.set(
-        f"mocked-cache-prefix_{room.id}_f4ca3ab8a6c04ad88097b8da33f60f10",
+    _add_to_lobby(
+        room,
         {
             "id": "f4ca3ab8a6c04ad88097b8da33f60f10",
             "username": "user2",
@@ -188,8 +202,8 @@ def test_request_entry_with_existing_participants(settings):
     assert len(lobby_keys) == 3
 
     # Verify the new participant data was correctly stored in cache
-    participant_data = cache.get(f"mocked-cache-prefix_{room.id!s}_{participant_id}")
-    assert participant_data.get("username") == "test_user"
+    participant = LobbyService().get_participant(room.id, participant_id)
+    assert participant.username == "test_user"
 
 
 def test_request_entry_public_room(settings):
@@ -301,8 +315,8 @@ def test_request_entry_waiting_participant_public_room(settings):
     settings.LOBBY_KEY_PREFIX = "mocked-cache-prefix"
 
     # Add a waiting participant to the room's lobby cache
-    cache.set(
-        f"mocked-cache-prefix_{room.id}_2f7f162f-e7d1-421b-90e7-02bfbfbf8def",
+    _add_to_lobby(
+        room,
         {
             "id": "2f7f162f-e7d1-421b-90e7-02bfbfbf8def",
             "username": "user1",
@@ -436,8 +450,8 @@ def test_allow_participant_to_enter_success(settings, allow_entry, updated_statu
 
     settings.LOBBY_KEY_PREFIX = "mocked-cache-prefix"
 
-    cache.set(
-        f"mocked-cache-prefix_{room.id!s}_2f7f162f-e7d1-421b-90e7-02bfbfbf8def",
+    _add_to_lobby(
+        room,
         {
             "id": "2f7f162f-e7d1-421b-90e7-02bfbfbf8def",
             "status": "waiting",
@@ -457,10 +471,10 @@ def test_allow_participant_to_enter_success(settings, allow_entry, updated_statu
     assert response.status_code == 200
     assert response.json() == {"message": "Participant was updated."}
 
-    participant_data = cache.get(
-        f"mocked-cache-prefix_{room.id!s}_2f7f162f-e7d1-421b-90e7-02bfbfbf8def"
+    participant = LobbyService().get_participant(
+        room.id, "2f7f162f-e7d1-421b-90e7-02bfbfbf8def"
     )
-    assert participant_data.get("status") == updated_status
+    assert participant.status.value == updated_status
 
 
 def test_allow_participant_to_enter_participant_not_found(settings):
@@ -475,10 +489,10 @@ def test_allow_participant_to_enter_participant_not_found(settings):
 
     settings.LOBBY_KEY_PREFIX = "mocked-cache-prefix"
 
-    participant_data = cache.get(
-        f"mocked-cache-prefix_{room.id!s}_2f7f162f-e7d1-421b-90e7-02bfbfbf8def"
+    participant = LobbyService().get_participant(
+        room.id, "2f7f162f-e7d1-421b-90e7-02bfbfbf8def"
     )
-    assert participant_data is None
+    assert participant is None
 
     response = client.post(
         f"/api/v1.0/rooms/{room.id}/enter/",
@@ -507,6 +521,151 @@ def test_allow_participant_to_enter_invalid_data():
     assert response.status_code == 400
 
 
+# Tests for allow_participants_to_enter endpoint
+
+
+def _enter_lobby_as_admin(room):
+    """Return a client logged in as the room owner, with a participant waiting."""
+    user = UserFactory()
+    room.accesses.create(user=user, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+
+    with mock.patch.object(utils, "notify_participants", return_value=None):
+        participant = LobbyService().enter(
+            room.id, "2f7f162f-e7d1-421b-90e7-02bfbfbf8def", "user1"
+        )
+
+    return client, participant
+
+
+def test_allow_participants_to_enter_anonymous():
+    """Anonymous users should not be allowed to decide on participants' entry."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client = APIClient()
+
+    response = client.post(
+        f"/api/v1.0/rooms/{room.id}/enter-bulk/",
+        {"all_waiting": True, "allow_entry": True},
+        format="json",
+    )
+
+    assert response.status_code == 401
+
+
+def test_allow_participants_to_enter_non_owner():
+    """Non-privileged users should not be allowed to decide on participants' entry."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client = APIClient()
+    client.force_login(UserFactory())
+
+    response = client.post(
+        f"/api/v1.0/rooms/{room.id}/enter-bulk/",
+        {"all_waiting": True, "allow_entry": True},
+        format="json",
+    )
+
+    assert response.status_code == 403
+
+
+def test_allow_participants_to_enter_public_room():
+    """Should return 404 for public rooms that don't use the lobby system."""
+    room = RoomFactory(access_level=RoomAccessLevel.PUBLIC)
+    user = UserFactory()
+    room.accesses.create(user=user, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        f"/api/v1.0/rooms/{room.id}/enter-bulk/",
+        {"all_waiting": True, "allow_entry": True},
+        format="json",
+    )
+
+    assert response.status_code == 404
+    assert response.json() == {"message": "Room has no lobby system."}
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"allow_entry": True},
+        {"all_waiting": False, "allow_entry": True},
+        {"participant_ids": [], "allow_entry": True},
+        {"participant_ids": ["invalid"], "allow_entry": True},
+        {
+            "participant_ids": ["2f7f162f-e7d1-421b-90e7-02bfbfbf8def"],
+            "all_waiting": True,
+            "allow_entry": True,
+        },
+        {"all_waiting": True},
+    ],
+)
+def test_allow_participants_to_enter_invalid_data(payload):
+    """Should return 400 unless participants are targeted either by ids or all."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    user = UserFactory()
+    room.accesses.create(user=user, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        f"/api/v1.0/rooms/{room.id}/enter-bulk/", payload, format="json"
+    )
+
+    assert response.status_code == 400
+
+
+def test_allow_participants_to_enter_by_ids():
+    """Should decide on the given participants, reporting unknown ones."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client, participant = _enter_lobby_as_admin(room)
+
+    response = client.post(
+        f"/api/v1.0/rooms/{room.id}/enter-bulk/",
+        {
+            "participant_ids": [
+                "2f7f162f-e7d1-421b-90e7-02bfbfbf8def",
+                "f4ca3ab8-a6c0-4ad8-8097-b8da33f60f10",
+            ],
+            "allow_entry": False,
+        },
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "participants": [
+            {"id": "2f7f162f-e7d1-421b-90e7-02bfbfbf8def", "status": "denied"},
+            {"id": "f4ca3ab8-a6c0-4ad8-8097-b8da33f60f10", "status": "not_found"},
+        ]
+    }
+    assert (
+        LobbyService().get_participant(room.id, participant.id).status.value == "denied"
+    )
+
+
+def test_allow_participants_to_enter_all_waiting():
+    """Should admit all waiting participants at once."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client, participant = _enter_lobby_as_admin(room)
+
+    response = client.post(
+        f"/api/v1.0/rooms/{room.id}/enter-bulk/",
+        {"all_waiting": True, "allow_entry": True},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "participants": [{"id": participant.id, "status": "accepted"}]
+    }
+    assert not LobbyService().list_waiting_participants(room.id)
+
+
 # Tests for list_waiting_participants endpoint
 
 
@@ -571,24 +730,21 @@ def test_list_waiting_participants_success(settings):
     settings.LOBBY_KEY_PREFIX = "mocked-cache-prefix"
 
     # Add participants in the lobby
-    cache.set(
-        f"mocked-cache-prefix_{room.id}_2f7f162f-e7d1-421b-90e7-02bfbfbf8def",
+    for participant in [
         {
             "id": "2f7f162f-e7d1-421b-90e7-02bfbfbf8def",
             "username": "user1",
             "status": "waiting",
             "color": "#123456",
         },
-    )
-    cache.set(
-        f"mocked-cache-prefix_{room.id}_f4ca3ab8a6c04ad88097b8da33f60f10",
         {
             "id": "f4ca3ab8a6c04ad88097b8da33f60f10",
             "username": "user2",
             "status": "waiting",
             "color": "#654321",
         },
-    )
+    ]:
+        _add_to_lobby(room, participant)
 
     response = client.get(f"/api/v1.0/rooms/{room.id}/waiting-participants/")
 
@@ -631,3 +787,128 @@ def test_list_waiting_participants_empty(settings):
 
     assert response.status_code == 200
     assert response.json() == {"participants": []}
+
+
+def test_list_waiting_participants_etag():
+    """Should return the lobby version as ETag."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client, participant = _enter_lobby_as_admin(room)
+
+    response = client.get(f"/api/v1.0/rooms/{room.id}/waiting-participants/")
+
+    assert response.status_code == 200
+    assert response["ETag"] == f'"{LobbyService().get_version(room.id)}"'
+    assert response.json() == {"participants": [participant.to_dict()]}
+
+
+def test_list_waiting_participants_if_none_match_unchanged():
+    """Should return 304 when the lobby did not change since the given ETag."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client, _ = _enter_lobby_as_admin(room)
+    etag = f'"{LobbyService().get_version(room.id)}"'
+
+    response = client.get(
+        f"/api/v1.0/rooms/{room.id}/waiting-participants/",
+        HTTP_IF_NONE_MATCH=etag,
+    )
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+
+def test_list_waiting_participants_if_none_match_changed():
+    """Should return the whole list when the lobby changed since the given ETag."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client, participant = _enter_lobby_as_admin(room)
+    etag = f'"{LobbyService().get_version(room.id)}"'
+
+    with mock.patch.object(utils, "notify_participants", return_value=None):
+        other_participant = LobbyService().enter(room.id, "participant-2", "user2")
+
+    response = client.get(
+        f"/api/v1.0/rooms/{room.id}/waiting-participants/",
+        HTTP_IF_NONE_MATCH=f"W/{etag}",
+    )
+
+    assert response.status_code == 200
+    assert response["ETag"] == f'"{LobbyService().get_version(room.id)}"'
+    participants = response.json()["participants"]
+    assert sorted(participants, key=lambda p: p["id"]) == [
+        participant.to_dict(),
+        other_participant.to_dict(),
+    ]
+
+
+def test_list_waiting_participants_since_unchanged():
+    """Should return 304 when the lobby did not change since the given version."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client, _ = _enter_lobby_as_admin(room)
+    version = LobbyService().get_version(room.id)
+
+    response = client.get(
+        f"/api/v1.0/rooms/{room.id}/waiting-participants/?since={version}"
+    )
+
+    assert response.status_code == 304
+
+
+def test_list_waiting_participants_since_changed():
+    """Should only return participants who joined or left since the given version."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client, participant = _enter_lobby_as_admin(room)
+    version = LobbyService().get_version(room.id)
+
+    with mock.patch.object(utils, "notify_participants", return_value=None):
+        other_participant = LobbyService().enter(room.id, "participant-2", "user2")
+    LobbyService().handle_participant_entry(room.id, participant.id, allow_entry=True)
+
+    response = client.get(
+        f"/api/v1.0/rooms/{room.id}/waiting-participants/?since={version}"
+    )
+
+    assert response.status_code == 200
+    new_version = LobbyService().get_version(room.id)
+    assert response["ETag"] == f'"{new_version}"'
+    assert response.json() == {
+        "reset": False,
+        "participants": [other_participant.to_dict()],
+        "left": ["2f7f162f-e7d1-421b-90e7-02bfbfbf8def"],
+        "version": new_version,
+    }
+
+
+def test_list_waiting_participants_since_trimmed(settings):
+    """Should return the whole list flagged as reset when changes were trimmed."""
+    settings.LOBBY_CHANGES_RETENTION = 1
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client, participant = _enter_lobby_as_admin(room)
+    version = LobbyService().get_version(room.id)
+
+    with mock.patch.object(utils, "notify_participants", return_value=None):
+        other_participant = LobbyService().enter(room.id, "participant-2", "user2")
+        LobbyService().enter(room.id, "participant-3", "user3")
+    LobbyService().clear_participant_cache(room.id, "participant-3")
+
+    response = client.get(
+        f"/api/v1.0/rooms/{room.id}/waiting-participants/?since={version}"
+    )
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["reset"] is True
+    assert content["version"] == LobbyService().get_version(room.id)
+    assert sorted(content["participants"], key=lambda p: p["id"]) == [
+        participant.to_dict(),
+        other_participant.to_dict(),
+    ]
+
+
+@pytest.mark.parametrize("query", ["since=-1", "since=abc"])
+def test_list_waiting_participants_invalid_query(query):
+    """Should return 400 for invalid query parameters."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    client, _ = _enter_lobby_as_admin(room)
+
+    response = client.get(f"/api/v1.0/rooms/{room.id}/waiting-participants/?{query}")
+
+    assert response.status_code == 400
@@ -4,6 +4,7 @@ Test rooms API endpoints in the Meet core app: participants management.
 
 # pylint: disable=redefined-outer-name,unused-argument,protected-access
 
+import asyncio
 from unittest import mock
 from uuid import uuid4
 
@@ -297,6 +298,37 @@ def test_remove_participant_success_lobby_cache(mock_livekit_client):
     assert all(p.get("participant_identity") != participant_identity for p in waiting)
 
 
+def test_remove_participant_clears_lobby_cache_outside_event_loop(
+    mock_livekit_client,
+):
+    """The lobby cache should not be cleared from the shared LiveKit event loop."""
+    client = APIClient()
+    room = RoomFactory()
+    user = UserFactory()
+    UserResourceAccessFactory(resource=room, user=user, role="owner")
+    client.force_authenticate(user=user)
+
+    def clear_participants_cache(**kwargs):
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+
+    payload = {"participant_identity": str(uuid4())}
+
+    with mock.patch.object(
+        LobbyService, "clear_participants_cache", side_effect=clear_participants_cache
+    ) as mock_clear_cache:
+        response = client.post(
+            reverse("rooms-remove-participant", kwargs={"pk": room.id}),
+            payload,
+            format="json",
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    mock_clear_cache.assert_called_once_with(
+        room_id=room.id, participant_ids=[payload["participant_identity"]]
+    )
+
+
 def test_remove_participant_success(mock_livekit_client):
     """Test successful participant removal."""
     client = APIClient()
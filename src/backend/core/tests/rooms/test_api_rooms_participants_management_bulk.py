@@ -0,0 +1,334 @@
+"""
+Test rooms API endpoints in the Meet core app: bulk participants management.
+"""
+
+# pylint: disable=redefined-outer-name,unused-argument,protected-access
+
+import asyncio
+import json
+from unittest import mock
+from uuid import uuid4
+
+from django.urls import reverse
+
+import pytest
+from livekit.api import TwirpError
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.factories import RoomFactory, UserFactory, UserResourceAccessFactory
+from core.services.lobby import LobbyService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def mock_create_livekit_client():
+    """Mock creating LiveKit API clients."""
+    with mock.patch("core.utils.create_livekit_client") as mock_create:
+        mock_create.return_value = mock.AsyncMock()
+        yield mock_create
+
+
+@pytest.fixture
+def mock_livekit_client(mock_create_livekit_client):
+    """Mock LiveKit API client."""
+    return mock_create_livekit_client.return_value
+
+
+@pytest.fixture
+def room():
+    """Return a room."""
+    return RoomFactory()
+
+
+@pytest.fixture
+def client(room):
+    """Return an API client authenticated as the room's owner."""
+    client = APIClient()
+    user = UserFactory()
+    UserResourceAccessFactory(resource=room, user=user, role="owner")
+    client.force_authenticate(user=user)
+    return client
+
+
+def test_mute_participants_success(
+    client, room, mock_create_livekit_client, mock_livekit_client
+):
+    """Test muting several tracks uses a single LiveKit client."""
+    identities = [str(uuid4()), str(uuid4())]
+    payload = {
+        "tracks": [
+            {"participant_identity": identities[0], "track_sid": "track-1"},
+            {"participant_identity": identities[1], "track_sid": "track-2"},
+        ]
+    }
+
+    url = reverse("rooms-mute-participants", kwargs={"pk": room.id})
+    response = client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "participants": [
+            {
+                "participant_identity": identities[0],
+                "track_sid": "track-1",
+                "status": "success",
+            },
+            {
+                "participant_identity": identities[1],
+                "track_sid": "track-2",
+                "status": "success",
+            },
+        ]
+    }
+
+    mock_create_livekit_client.assert_called_once()
+    assert mock_livekit_client.room.mute_published_track.call_count == 2
+    muted = mock_livekit_client.room.mute_published_track.call_args_list
+    assert [call.args[0].track_sid for call in muted] == ["track-1", "track-2"]
+    assert all(call.args[0].room == str(room.id) for call in muted)
+    mock_livekit_client.aclose.assert_called_once()
+
+
+def test_mute_participants_per_identity_outcomes(client, room, mock_livekit_client):
+    """Test failures of LiveKit are reported per track, without failing others."""
+    identities = [str(uuid4()), str(uuid4()), str(uuid4())]
+
+    async def mute_published_track(request):
+        if request.identity == identities[1]:
+            raise TwirpError(msg="Not found", code=404, status=404)
+        if request.identity == identities[2]:
+            raise TwirpError(msg="Internal server error", code=500, status=500)
+
+    mock_livekit_client.room.mute_published_track.side_effect = mute_published_track
+
+    payload = {
+        "tracks": [
+            {"participant_identity": identity, "track_sid": "track"}
+            for identity in identities
+        ]
+    }
+
+    url = reverse("rooms-mute-participants", kwargs={"pk": room.id})
+    response = client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [
+        participant["status"] for participant in response.json()["participants"]
+    ] == ["success", "not_found", "error"]
+    mock_livekit_client.aclose.assert_called_once()
+
+
+def test_mute_participants_bounded_concurrency(
+    client, room, settings, mock_livekit_client
+):
+    """Test LiveKit requests are made concurrently, up to the configured limit."""
+    settings.PARTICIPANTS_MANAGEMENT_MAX_CONCURRENCY = 3
+    in_flight = []
+    max_in_flight = 0
+
+    async def mute_published_track(request):
+        nonlocal max_in_flight
+        in_flight.append(request.identity)
+        max_in_flight = max(max_in_flight, len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(request.identity)
+
+    mock_livekit_client.room.mute_published_track.side_effect = mute_published_track
+
+    payload = {
+        "tracks": [
+            {"participant_identity": str(uuid4()), "track_sid": "track"}
+            for _ in range(10)
+        ]
+    }
+
+    url = reverse("rooms-mute-participants", kwargs={"pk": room.id})
+    response = client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert max_in_flight == 3
+    assert mock_livekit_client.room.mute_published_track.call_count == 10
+
+
+def test_mute_participants_forbidden_without_access(room, mock_livekit_client):
+    """Test bulk muting returns 403 when user lacks room privileges."""
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+
+    payload = {"tracks": [{"participant_identity": str(uuid4()), "track_sid": "t"}]}
+
+    url = reverse("rooms-mute-participants", kwargs={"pk": room.id})
+    response = client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    mock_livekit_client.room.mute_published_track.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {},
+        {"tracks": []},
+        {"tracks": [{"participant_identity": "invalid-uuid", "track_sid": "t"}]},
+        {"tracks": [{"participant_identity": str(uuid4())}]},
+    ],
+)
+def test_mute_participants_invalid_payload(client, room, payload, mock_livekit_client):
+    """Test bulk muting rejects invalid payloads without calling LiveKit."""
+    url = reverse("rooms-mute-participants", kwargs={"pk": room.id})
+    response = client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    mock_livekit_client.room.mute_published_track.assert_not_called()
+
+
+def test_mute_participants_too_many(client, room, mock_livekit_client):
+    """Test bulk muting is limited to 1000 tracks."""
+    payload = {
+        "tracks": [
+            {"participant_identity": str(uuid4()), "track_sid": "track"}
+            for _ in range(1001)
+        ]
+    }
+
+    url = reverse("rooms-mute-participants", kwargs={"pk": room.id})
+    response = client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    mock_livekit_client.room.mute_published_track.assert_not_called()
+
+
+def test_update_participants_success(
+    client, room, mock_create_livekit_client, mock_livekit_client
+):
+    """Test updating several participants uses a single LiveKit client."""
+    identities = [str(uuid4()), str(uuid4())]
+
+    async def update_participant(request):
+        if request.identity == identities[1]:
+            raise TwirpError(msg="Not found", code=404, status=404)
+
+    mock_livekit_client.room.update_participant.side_effect = update_participant
+
+    payload = {
+        "participants": [
+            {
+                "participant_identity": identities[0],
+                "metadata": {"role": "speaker"},
+                "permission": {"can_publish": False},
+            },
+            {"participant_identity": identities[1], "name": "John"},
+        ]
+    }
+
+    url = reverse("rooms-update-participants", kwargs={"pk": room.id})
+    response = client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "participants": [
+            {"participant_identity": identities[0], "status": "success"},
+            {"participant_identity": identities[1], "status": "not_found"},
+        ]
+    }
+
+    mock_create_livekit_client.assert_called_once()
+    first, second = [
+        call.args[0]
+        for call in mock_livekit_client.room.update_participant.call_args_list
+    ]
+    assert first.identity == identities[0]
+    assert json.loads(first.metadata) == {"role": "speaker"}
+    assert first.permission.can_publish is False
+    assert second.identity == identities[1]
+    assert second.name == "John"
+    mock_livekit_client.aclose.assert_called_once()
+
+
+def test_update_participants_invalid_payload(client, room, mock_livekit_client):
+    """Test bulk updates are validated like single updates."""
+    payload = {
+        "participants": [
+            {"participant_identity": str(uuid4()), "name": "John"},
+            {"participant_identity": str(uuid4())},
+        ]
+    }
+
+    url = reverse("rooms-update-participants", kwargs={"pk": room.id})
+    response = client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    mock_livekit_client.room.update_participant.assert_not_called()
+
+
+def test_update_participants_forbidden_without_access(room, mock_livekit_client):
+    """Test bulk updates return 403 when user lacks room privileges."""
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+
+    payload = {"participants": [{"participant_identity": str(uuid4()), "name": "J"}]}
+
+    url = reverse("rooms-update-participants", kwargs={"pk": room.id})
+    response = client.post(url, payload, format="json")
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    mock_livekit_client.room.update_participant.assert_not_called()
+
+
+@mock.patch.object(LobbyService, "clear_participants_cache")
+def test_remove_participants_success(
+    mock_clear_cache, client, room, mock_create_livekit_client, mock_livekit_client
+):
+    """Test removing several participants clears their lobby cache at once."""
+    identities = [str(uuid4()), str(uuid4())]
+
+    async def remove_participant(request):
+        if request.identity == identities[0]:
+            raise TwirpError(msg="Internal server error", code=500, status=500)
+
+    mock_livekit_client.room.remove_participant.side_effect = remove_participant
+
+    url = reverse("rooms-remove-participants", kwargs={"pk": room.id})
+    response = client.post(url, {"participant_identities": identities}, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "participants": [
+            {"participant_identity": identities[0], "status": "error"},
+            {"participant_identity": identities[1], "status": "success"},
+        ]
+    }
+
+    mock_clear_cache.assert_called_once_with(
+        room_id=room.id, participant_ids=identities
+    )
+    mock_create_livekit_client.assert_called_once()
+    assert mock_livekit_client.room.remove_participant.call_count == 2
+    mock_livekit_client.aclose.assert_called_once()
+
+
+def test_remove_participants_invalid_payload(client, room, mock_livekit_client):
+    """Test bulk removal rejects invalid identities."""
+    url = reverse("rooms-remove-participants", kwargs={"pk": room.id})
+    response = client.post(
+        url, {"participant_identities": ["invalid-uuid"]}, format="json"
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    mock_livekit_client.room.remove_participant.assert_not_called()
+
+
+def test_remove_participants_forbidden_without_access(room, mock_livekit_client):
+    """Test bulk removal returns 403 when user lacks room privileges."""
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+
+    url = reverse("rooms-remove-participants", kwargs={"pk": room.id})
+    response = client.post(
+        url, {"participant_identities": [str(uuid4())]}, format="json"
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    mock_livekit_client.room.remove_participant.assert_not_called()
@@ -36,6 +36,38 @@ def test_api_rooms_retrieve_anonymous_private_pk():
     }
 
 
+def test_api_rooms_retrieve_anonymous_cached(django_assert_num_queries):
+    """Once cached, a room should be retrieved by anonymous users without queries."""
+    room = RoomFactory(access_level=RoomAccessLevel.PUBLIC)
+    client = APIClient()
+
+    response = client.get(f"/api/v1.0/rooms/{room.slug:s}/")
+    assert response.status_code == 200
+
+    for lookup in [room.slug, str(room.id)]:
+        with django_assert_num_queries(0):
+            cached_response = client.get(f"/api/v1.0/rooms/{lookup:s}/")
+
+        assert cached_response.status_code == 200
+        assert cached_response.json() == response.json()
+
+
+def test_api_rooms_retrieve_after_access_level_update():
+    """Changing the access level of a room should be seen by the next retrieval."""
+    room = RoomFactory(access_level=RoomAccessLevel.PUBLIC)
+    client = APIClient()
+
+    response = client.get(f"/api/v1.0/rooms/{room.id!s}/")
+    assert "livekit" in response.json()
+
+    room.access_level = RoomAccessLevel.RESTRICTED
+    room.save()
+
+    response = client.get(f"/api/v1.0/rooms/{room.id!s}/")
+    assert response.json()["access_level"] == "restricted"
+    assert "livekit" not in response.json()
+
+
 def test_api_rooms_retrieve_anonymous_trusted_pk():
     """
     Anonymous users should be allowed to retrieve a room that has a trusted access_level,
@@ -371,6 +403,7 @@ def test_api_rooms_retrieve_members(mock_token, django_assert_num_queries, setti
     client = APIClient()
     client.force_login(user)
 
+    # The room is not cached yet
     with django_assert_num_queries(3):
         response = client.get(
             f"/api/v1.0/rooms/{room.id!s}/",
@@ -407,6 +440,38 @@ def test_api_rooms_retrieve_members(mock_token, django_assert_num_queries, setti
     )
 
 
+@mock.patch("core.utils.generate_token", return_value="foo")
+@override_settings(
+    LIVEKIT_CONFIGURATION={
+        "api_key": "key",
+        "api_secret": "secret",
+        "url": "test_url_value",
+    }
+)
+def test_api_rooms_retrieve_members_cached(mock_token, django_assert_num_queries):
+    """
+    Once cached, a room should be retrieved by its members along with their roles,
+    only querying the logged-in user.
+    """
+    user = UserFactory()
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    UserResourceAccessFactory(resource=room, user=user, role="member")
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.get(f"/api/v1.0/rooms/{room.id!s}/")
+    assert response.status_code == 200
+    assert "livekit" in response.json()
+
+    for lookup in [room.slug, str(room.id)]:
+        with django_assert_num_queries(1):
+            cached_response = client.get(f"/api/v1.0/rooms/{lookup:s}/")
+
+        assert cached_response.status_code == 200
+        assert cached_response.json() == response.json()
+
+
 @mock.patch("core.utils.generate_token", return_value="foo")
 @override_settings(
     LIVEKIT_CONFIGURATION={
@@ -435,6 +500,7 @@ def test_api_rooms_retrieve_administrators(
     client = APIClient()
     client.force_login(user)
 
+    # The room is not cached yet
     with django_assert_num_queries(4):
         response = client.get(
             f"/api/v1.0/rooms/{room.id!s}/",
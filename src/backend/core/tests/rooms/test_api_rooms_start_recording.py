@@ -7,6 +7,7 @@ Test rooms API endpoints in the Meet core app: start recording.
 from unittest import mock
 
 import pytest
+from kombu.exceptions import OperationalError
 from rest_framework.test import APIClient
 
 from ...factories import RoomFactory, UserFactory
@@ -199,3 +200,94 @@ def test_start_recording_success(
     access = recording.accesses.first()
     assert access.user == user
     assert access.role == "owner"
+
+
+def test_start_recording_queued(
+    mock_worker_service_factory, mock_worker_manager, settings
+):
+    """A recording queued for an egress slot should be accepted, not created."""
+    settings.RECORDING_ENABLE = True
+
+    room = RoomFactory()
+    user = UserFactory()
+    room.accesses.create(user=user, role="owner")
+
+    mock_worker_manager.start.return_value = False
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        f"/api/v1.0/rooms/{room.id}/start-recording/",
+        {"mode": "screen_recording"},
+    )
+
+    recording = Recording.objects.get()
+    assert response.status_code == 202
+    assert response.json() == {
+        "message": f"Recording queued for room {room.slug}",
+        "id": str(recording.id),
+        "status": "initiated",
+    }
+    mock_worker_manager.start.assert_called_once_with(recording)
+
+
+@mock.patch("core.api.viewsets.tasks.start_recording.delay")
+def test_start_recording_async(
+    mock_delay, mock_worker_service_factory, mock_worker_manager, settings
+):
+    """In async mode, the recording should be started by a task, answering 202."""
+    settings.RECORDING_ENABLE = True
+    settings.RECORDING_ASYNC_ENABLE = True
+
+    room = RoomFactory()
+    user = UserFactory()
+    room.accesses.create(user=user, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        f"/api/v1.0/rooms/{room.id}/start-recording/",
+        {"mode": "screen_recording"},
+    )
+
+    recording = Recording.objects.get()
+    assert response.status_code == 202
+    assert response.json() == {
+        "message": f"Recording start requested for room {room.slug}",
+        "id": str(recording.id),
+        "status": "initiated",
+    }
+    assert recording.status == "initiated"
+    assert recording.accesses.get().user == user
+
+    mock_delay.assert_called_once_with(recording_id=str(recording.id))
+    mock_worker_service_factory.assert_not_called()
+    mock_worker_manager.start.assert_not_called()
+
+
+@mock.patch("core.api.viewsets.tasks.start_recording.delay")
+def test_start_recording_async_enqueue_error(mock_delay, settings):
+    """A recording that could not be handed over to a worker failed to start."""
+    settings.RECORDING_ENABLE = True
+    settings.RECORDING_ASYNC_ENABLE = True
+    mock_delay.side_effect = OperationalError("Broker unavailable")
+
+    room = RoomFactory()
+    user = UserFactory()
+    room.accesses.create(user=user, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(
+        f"/api/v1.0/rooms/{room.id}/start-recording/",
+        {"mode": "screen_recording"},
+    )
+
+    assert response.status_code == 500
+    assert response.json() == {
+        "error": f"Recording failed to start for room {room.slug}"
+    }
+    assert Recording.objects.get().status == "failed_to_start"
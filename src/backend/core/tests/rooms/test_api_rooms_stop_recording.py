@@ -181,3 +181,62 @@ def test_stop_recording_success(
 
     # Verify the recording still exists
     assert Recording.objects.count() == 1
+
+
+def test_stop_recording_queued(
+    mock_worker_service_factory, mock_worker_manager, settings
+):
+    """A recording still queued for an egress slot should be cancelled."""
+
+    settings.RECORDING_ENABLE = True
+
+    room = RoomFactory()
+    user = UserFactory()
+    recording = RecordingFactory(
+        room=room,
+        status=RecordingStatusChoices.INITIATED,
+        mode="screen_recording",
+    )
+    room.accesses.create(user=user, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(f"/api/v1.0/rooms/{room.id}/stop-recording/")
+
+    assert response.status_code == 200
+    mock_worker_manager.stop.assert_called_once_with(recording)
+
+
+@mock.patch("core.api.viewsets.tasks.stop_recording.delay")
+def test_stop_recording_async(
+    mock_delay, mock_worker_service_factory, mock_worker_manager, settings
+):
+    """In async mode, the recording should be stopped by a task, answering 202."""
+    settings.RECORDING_ENABLE = True
+    settings.RECORDING_ASYNC_ENABLE = True
+
+    room = RoomFactory()
+    user = UserFactory()
+    recording = RecordingFactory(
+        room=room,
+        status=RecordingStatusChoices.ACTIVE,
+        mode="screen_recording",
+    )
+    room.accesses.create(user=user, role="owner")
+
+    client = APIClient()
+    client.force_login(user)
+
+    response = client.post(f"/api/v1.0/rooms/{room.id}/stop-recording/")
+
+    assert response.status_code == 202
+    assert response.json() == {
+        "message": f"Recording stop requested for room {room.slug}",
+        "id": str(recording.id),
+        "status": "active",
+    }
+
+    mock_delay.assert_called_once_with(recording_id=str(recording.id))
+    mock_worker_service_factory.assert_not_called()
+    mock_worker_manager.stop.assert_not_called()
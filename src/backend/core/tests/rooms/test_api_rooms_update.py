@@ -77,7 +77,7 @@ def test_api_rooms_update_members():
     assert room.configuration == {}
 
 
-def test_api_rooms_update_administrators():
+def test_api_rooms_update_administrators(django_assert_num_queries):
     """Administrators or owners of a room should be allowed to update it."""
     user = UserFactory()
     room = RoomFactory(
@@ -87,16 +87,17 @@ def test_api_rooms_update_administrators():
     client = APIClient()
     client.force_login(user)
 
-    response = client.put(
-        f"/api/v1.0/rooms/{room.id!s}/",
-        {
-            "name": "New name",
-            "slug": "should-be-ignored",
-            "access_level": RoomAccessLevel.PUBLIC,
-            "configuration": {"the_key": "the_value"},
-        },
-        format="json",
-    )
+    with django_assert_num_queries(7):
+        response = client.put(
+            f"/api/v1.0/rooms/{room.id!s}/",
+            {
+                "name": "New name",
+                "slug": "should-be-ignored",
+                "access_level": RoomAccessLevel.PUBLIC,
+                "configuration": {"the_key": "the_value"},
+            },
+            format="json",
+        )
     assert response.status_code == 200
     room.refresh_from_db()
     assert room.name == "New name"
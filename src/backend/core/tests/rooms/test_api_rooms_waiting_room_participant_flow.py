@@ -24,6 +24,7 @@ from rest_framework.test import APIClient
 
 from ...factories import RoomFactory, UserFactory
 from ...models import RoomAccessLevel
+from ...services.lobby import LobbyService
 
 pytestmark = pytest.mark.django_db
 
@@ -123,8 +124,8 @@ def test_waiting_room_enabled_restricted_room_places_participant_in_waiting_room
 
     # Ensure participant state is persisted in cache.
     participant_id = response.cookies[lobby_test_settings.LOBBY_COOKIE_NAME].value
-    cache_key = f"{lobby_test_settings.LOBBY_KEY_PREFIX}_{room.id}_{participant_id}"
-    assert cache.get(cache_key)["status"] == "waiting"
+    participant = LobbyService().get_participant(room.id, participant_id)
+    assert participant.status.value == "waiting"
 
 
 def test_end_to_end_participant_waits_then_moderator_admits_then_participant_joins(
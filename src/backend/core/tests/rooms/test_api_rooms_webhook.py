@@ -6,12 +6,13 @@ Test LiveKit webhook endpoint on the rooms API.
 import base64
 import hashlib
 import json
+import uuid
 from unittest import mock
 
 import pytest
 from livekit import api
 
-from ...services.livekit_events import ActionFailedError, LiveKitEventsService
+from ...services.livekit_events import LiveKitEventsService
 
 
 @pytest.fixture
@@ -21,7 +22,7 @@ def webhook_event_data():
         "event": "room_finished",
         "room": {
             "sid": "RM_hycBMAjmt6Ub",
-            "name": "00000000-0000-0000-0000-000000000000",
+            "name": str(uuid.uuid4()),
             "emptyTimeout": 300,
             "creationTime": "1692627281",
             "turnPassword": "fake-turn-password",
@@ -31,7 +32,7 @@ def webhook_event_data():
                 {"mime": "video/VP8"},
             ],
         },
-        "id": "EV_eugWmGhovZmm",
+        "id": f"EV_{uuid.uuid4().hex}",
         "createdAt": "1692985556",
     }
 
@@ -163,12 +164,37 @@ def test_unhandled_event_type(client, mock_livekit_config):
     assert response.json() == {"status": "success"}
 
 
-def test_action_error(client, mock_livekit_config):
-    """Should raise exceptions when errors occur during LiveKit webhook processing."""
+@mock.patch.object(LiveKitEventsService, "_handle_room_finished")
+def test_duplicate_event(
+    mock_handler,
+    client,
+    serialized_event_data,
+    auth_token,
+    mock_livekit_config,
+):
+    """Should acknowledge events retried by LiveKit, processing them only once."""
+    for _ in range(2):
+        response = client.post(
+            "/api/v1.0/rooms/webhooks-livekit/",
+            data=serialized_event_data,
+            content_type="application/json",
+            HTTP_AUTHORIZATION=auth_token,
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "success"}
+
+    mock_handler.assert_called_once()
+
+
+@mock.patch("core.services.livekit_events.logger")
+def test_action_error(mock_logger, client, mock_livekit_config):
+    """Should acknowledge events failing to process, and log errors."""
     event_data = json.dumps(
         {
             "event": "room_finished",
             "room": {"sid": "RM_hycBMAjmt6Ub", "name": "invalid-uuid"},
+            "id": f"EV_{uuid.uuid4().hex}",
         }
     )
     hash64 = base64.b64encode(hashlib.sha256(event_data.encode()).digest()).decode()
@@ -178,13 +204,12 @@ def test_action_error(client, mock_livekit_config):
     token.claims.sha256 = hash64
     auth_token = token.to_jwt()
 
-    with pytest.raises(
-        ActionFailedError,
-        match="Failed to process room finished event",
-    ):
-        client.post(
-            "/api/v1.0/rooms/webhooks-livekit/",
-            data=event_data,
-            content_type="application/json",
-            HTTP_AUTHORIZATION=auth_token,
-        )
+    response = client.post(
+        "/api/v1.0/rooms/webhooks-livekit/",
+        data=event_data,
+        content_type="application/json",
+        HTTP_AUTHORIZATION=auth_token,
+    )
+
+    assert response.status_code == 200
+    mock_logger.exception.assert_called_once()
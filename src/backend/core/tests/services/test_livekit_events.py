@@ -1,7 +1,7 @@
 """
 Test LiveKitEvents service.
 """
-# pylint: disable=W0621,W0613, W0212, E0611
+# pylint: disable=W0621,W0613, W0212, E0611, E1101
 
 import uuid
 from unittest import mock
@@ -17,9 +17,11 @@ from core.services.livekit_events import (
     InvalidPayloadError,
     LiveKitEventsService,
     UnsupportedEventTypeError,
+    _get_webhook_receiver,
     api,
 )
 from core.services.lobby import LobbyService
+from core.services.room_metadata import RoomMetadataService
 from core.services.telephony import TelephonyException, TelephonyService
 from core.utils import MetadataUpdateException, NotificationError
 
@@ -52,12 +54,17 @@ def test_initialization(
 
     api_key = mock_livekit_config["api_key"]
     api_secret = mock_livekit_config["api_secret"]
+    _get_webhook_receiver.cache_clear()
 
     service = LiveKitEventsService()
+    LiveKitEventsService()
 
     mock_token_verifier.assert_called_once_with(api_key, api_secret)
     mock_webhook_receiver.assert_called_once_with(mock_token_verifier.return_value)
+    assert service.webhook_receiver is mock_webhook_receiver.return_value
+    _get_webhook_receiver.cache_clear()
     assert isinstance(service.lobby_service, LobbyService)
+    assert isinstance(service.room_metadata_service, RoomMetadataService)
     assert isinstance(service.telephony_service, TelephonyService)
     assert isinstance(service.recording_events, RecordingEventsService)
 
@@ -70,7 +77,7 @@ def test_initialization(
     ),
 )
 @mock.patch("core.utils.notify_participants")
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_handle_egress_ended_success(
     mock_update_room_metadata, mock_notify, mode, notification_type, service
 ):
@@ -94,6 +101,23 @@ def test_handle_egress_ended_success(
     assert recording.status == "stopped"
 
 
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
+@mock.patch("core.recording.worker.admission.EgressAdmission.release")
+def test_handle_egress_ended_releases_slot(
+    mock_release, mock_update_room_metadata, service
+):
+    """Should release the egress slot of the recording to queued recordings."""
+
+    recording = RecordingFactory(worker_id="worker-1", status="stopped")
+    mock_data = mock.MagicMock()
+    mock_data.egress_info.egress_id = recording.worker_id
+    mock_data.egress_info.status = EgressStatus.EGRESS_COMPLETE
+
+    service._handle_egress_ended(mock_data)
+
+    mock_release.assert_called_once_with(recording)
+
+
 @pytest.mark.parametrize(
     ("egress_status", "status"),
     (
@@ -102,7 +126,7 @@ def test_handle_egress_ended_success(
         (EgressStatus.EGRESS_ABORTED, "aborted"),
     ),
 )
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_handle_egress_updated_success(
     mock_update_room_metadata, egress_status, status, service
 ):
@@ -127,7 +151,7 @@ def test_handle_egress_updated_success(
         EgressStatus.EGRESS_LIMIT_REACHED,
     ),
 )
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_handle_egress_updated_non_handled(
     mock_update_room_metadata, egress_status, service
 ):
@@ -151,7 +175,7 @@ def test_handle_egress_updated_non_handled(
     ),
 )
 @mock.patch("core.utils.notify_participants")
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_handle_egress_ended_metadata_update_fails(
     mock_update_room_metadata, mock_notify, mode, notification_type, service
 ):
@@ -174,7 +198,7 @@ def test_handle_egress_ended_metadata_update_fails(
 
 
 @mock.patch("core.utils.notify_participants")
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_handle_egress_ended_notification_fails(
     mock_update_room_metadata, mock_notify, service
 ):
@@ -202,7 +226,7 @@ def test_handle_egress_ended_notification_fails(
 
 
 @mock.patch("core.utils.notify_participants")
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_handle_egress_ended_recording_not_found(
     mock_update_room_metadata, mock_notify, service
 ):
@@ -226,7 +250,7 @@ def test_handle_egress_ended_recording_not_found(
 
 
 @mock.patch("core.utils.notify_participants")
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_handle_egress_ended_recording_not_active(
     mock_update_room_metadata, mock_notify, service
 ):
@@ -249,7 +273,7 @@ def test_handle_egress_ended_recording_not_active(
 
 
 @mock.patch("core.utils.notify_participants")
-@mock.patch("core.utils.update_room_metadata")
+@mock.patch("core.services.room_metadata.RoomMetadataService.update")
 def test_handle_egress_ended_recording_not_limit_reached(
     mock_update_room_metadata, mock_notify, service
 ):
@@ -303,6 +327,43 @@ def test_handle_room_finished_skips_telephony_when_disabled(
     mock_clear_cache.assert_called_once_with(mock_room_name)
 
 
+@mock.patch.object(LobbyService, "clear_room_cache")
+@mock.patch.object(RoomMetadataService, "clear")
+def test_handle_room_finished_clears_room_metadata(
+    mock_clear_metadata, mock_clear_cache, service, settings
+):
+    """Should forget the room's cached metadata when room finishes."""
+    settings.ROOM_TELEPHONY_ENABLED = False
+    mock_room_name = uuid.uuid4()
+    mock_data = mock.MagicMock()
+    mock_data.room.name = str(mock_room_name)
+
+    service._handle_room_finished(mock_data)
+
+    mock_clear_metadata.assert_called_once_with(str(mock_room_name))
+
+
+@mock.patch.object(LobbyService, "clear_room_cache")
+@mock.patch("core.recording.worker.admission.EgressAdmission.release")
+def test_handle_room_finished_aborts_queued_recordings(
+    mock_release, mock_clear_cache, service, settings
+):
+    """Should abort the room's recordings still queued for an egress slot."""
+    settings.ROOM_TELEPHONY_ENABLED = False
+    queued_recording = RecordingFactory(status="initiated")
+    other_recording = RecordingFactory(status="initiated")
+    mock_data = mock.MagicMock()
+    mock_data.room.name = str(queued_recording.room.id)
+
+    service._handle_room_finished(mock_data)
+
+    mock_release.assert_called_once_with(queued_recording)
+    queued_recording.refresh_from_db()
+    assert queued_recording.status == "aborted"
+    other_recording.refresh_from_db()
+    assert other_recording.status == "initiated"
+
+
 @mock.patch.object(
     LobbyService, "clear_room_cache", side_effect=Exception("Test error")
 )
@@ -465,10 +526,11 @@ def test_receive_no_filter_processes_all_events(
     mock_request.headers = {"Authorization": "test_token"}
     mock_request.body = b"{}"
 
-    mock_data = mock.MagicMock()
-    mock_data.room.name = "!JIfCxVLcKKkWrmVBOb:your-domain.com"
-    mock_data.event = "room_started"
-    mock_receive.return_value = mock_data
+    mock_receive.return_value = api.WebhookEvent(
+        id=f"EV_{uuid.uuid4().hex}",
+        event="room_started",
+        room=api.Room(name=f"!{uuid.uuid4().hex}:your-domain.com"),
+    )
 
     service = LiveKitEventsService()
     service.receive(mock_request)
@@ -488,10 +550,11 @@ def test_receive_invalid_filter_regex_processes_all_events(
     mock_request.headers = {"Authorization": "test_token"}
     mock_request.body = b"{}"
 
-    mock_data = mock.MagicMock()
-    mock_data.room.name = "!JIfCxVLcKKkWrmVBOb:your-domain.com"
-    mock_data.event = "room_started"
-    mock_receive.return_value = mock_data
+    mock_receive.return_value = api.WebhookEvent(
+        id=f"EV_{uuid.uuid4().hex}",
+        event="room_started",
+        room=api.Room(name=f"!{uuid.uuid4().hex}:your-domain.com"),
+    )
 
     service = LiveKitEventsService()
     service.receive(mock_request)
@@ -513,10 +576,11 @@ def test_receive_filter_drops_non_matching_events(
     mock_request.headers = {"Authorization": "test_token"}
     mock_request.body = b"{}"
 
-    mock_data = mock.MagicMock()
-    mock_data.room.name = "!JIfCxVLcKKkWrmVBOb:your-domain.com"
-    mock_data.event = "room_started"
-    mock_receive.return_value = mock_data
+    mock_receive.return_value = api.WebhookEvent(
+        id=f"EV_{uuid.uuid4().hex}",
+        event="room_started",
+        room=api.Room(name=f"!{uuid.uuid4().hex}:your-domain.com"),
+    )
 
     service = LiveKitEventsService()
     service.receive(mock_request)
@@ -538,10 +602,11 @@ def test_receive_filter_processes_matching_events(
     mock_request.headers = {"Authorization": "test_token"}
     mock_request.body = b"{}"
 
-    mock_data = mock.MagicMock()
-    mock_data.room.name = str(uuid.uuid4())
-    mock_data.event = "room_started"
-    mock_receive.return_value = mock_data
+    mock_receive.return_value = api.WebhookEvent(
+        id=f"EV_{uuid.uuid4().hex}",
+        event="room_started",
+        room=api.Room(name=str(uuid.uuid4())),
+    )
 
     service = LiveKitEventsService()
     service.receive(mock_request)
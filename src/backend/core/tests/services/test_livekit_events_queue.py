@@ -0,0 +1,292 @@
+"""
+Test LiveKitEvents service: deduplication and ordering of webhook events.
+"""
+
+# pylint: disable=W0621,W0613,W0212,E0611,E1101
+
+import uuid
+from unittest import mock
+
+from django.core.cache import cache
+
+import pytest
+from kombu.exceptions import OperationalError
+
+from core.services.livekit_events import LiveKitEventsService, api
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def service(settings):
+    """Initialize LiveKitEventsService."""
+    settings.LIVEKIT_CONFIGURATION = {
+        "api_key": "test_api_key",
+        "api_secret": "test_api_secret",
+        "url": "https://test-livekit.example.com/",
+    }
+    return LiveKitEventsService()
+
+
+@pytest.fixture
+def room_name():
+    """Return the name of a room, not shared with other tests."""
+    return str(uuid.uuid4())
+
+
+@pytest.fixture
+def mock_handlers():
+    """Mock handlers of room events, recording the order of handled events."""
+    handled = []
+    with (
+        mock.patch.object(
+            LiveKitEventsService,
+            "_handle_room_started",
+            autospec=True,
+            side_effect=lambda _, data: handled.append(data.id),
+        ),
+        mock.patch.object(
+            LiveKitEventsService,
+            "_handle_room_finished",
+            autospec=True,
+            side_effect=lambda _, data: handled.append(data.id),
+        ),
+    ):
+        yield handled
+
+
+def _receive(service, data):
+    """Receive a webhook carrying the given event."""
+    request = mock.MagicMock()
+    request.headers = {"Authorization": "test_token"}
+    request.body = b"{}"
+    with mock.patch.object(service.webhook_receiver, "receive", return_value=data):
+        service.receive(request)
+
+
+def _event(room_name, event="room_started", event_id=None):
+    """Build a webhook event for a room."""
+    return api.WebhookEvent(
+        id=event_id or f"EV_{uuid.uuid4().hex}",
+        event=event,
+        room=api.Room(name=room_name),
+    )
+
+
+def test_receive_processes_event(service, room_name, mock_handlers):
+    """Received events are processed by the worker, releasing the room's lock."""
+    data = _event(room_name)
+
+    _receive(service, data)
+
+    assert mock_handlers == [data.id]
+    redis_client = cache.client.get_client(write=True)
+    assert not redis_client.exists(service._get_lock_key(room_name))
+    assert not redis_client.exists(service._get_queue_key(room_name))
+
+
+def test_receive_deduplicates_events(service, room_name, mock_handlers):
+    """Events retried by LiveKit are only processed once."""
+    data = _event(room_name)
+
+    _receive(service, data)
+    _receive(service, data)
+    _receive(LiveKitEventsService(), data)
+
+    assert mock_handlers == [data.id]
+
+
+def test_receive_deduplicates_events_without_id(service, room_name, mock_handlers):
+    """Events without id are deduplicated by content."""
+    data = _event(room_name)
+    data.id = ""
+
+    _receive(service, data)
+    _receive(service, data)
+
+    assert mock_handlers == [""]
+
+
+@mock.patch("core.tasks.process_livekit_events.delay")
+def test_receive_acknowledges_without_processing(
+    mock_delay, service, room_name, mock_handlers
+):
+    """Events are queued and handed over to a worker, not processed inline."""
+    data = _event(room_name)
+
+    _receive(service, data)
+
+    assert not mock_handlers
+    mock_delay.assert_called_once_with(room_name=room_name, token=mock.ANY)
+
+
+@mock.patch("core.tasks.process_livekit_events.delay")
+def test_receive_keeps_room_order(mock_delay, service, room_name, mock_handlers):
+    """A room's events are processed in order, by the worker holding its lock."""
+    events = [
+        _event(room_name),
+        _event(room_name, "room_finished"),
+        _event(room_name),
+    ]
+
+    for data in events:
+        _receive(service, data)
+
+    # Only the first event schedules a worker, which processes all of them
+    mock_delay.assert_called_once()
+    service.process_events(room_name, mock_delay.call_args.kwargs["token"])
+
+    assert mock_handlers == [data.id for data in events]
+
+
+@mock.patch("core.tasks.process_livekit_events.delay")
+def test_process_events_lost_lock(mock_delay, service, room_name, mock_handlers):
+    """Workers stop processing a room's events once they lost its lock."""
+    _receive(service, _event(room_name))
+
+    service.process_events(room_name, "other-token")
+
+    assert not mock_handlers
+
+
+@mock.patch("core.tasks.process_livekit_events.delay")
+def test_process_events_expired_lock(mock_delay, service, room_name, mock_handlers):
+    """Workers take a room's lock again once it expired, not to orphan events."""
+    data = _event(room_name)
+    _receive(service, data)
+    cache.client.get_client(write=True).delete(service._get_lock_key(room_name))
+
+    service.process_events(room_name, "other-token")
+
+    assert mock_handlers == [data.id]
+    assert not cache.client.get_client(write=True).exists(
+        service._get_lock_key(room_name)
+    )
+
+
+def test_process_events_skips_failing_events(service, room_name, mock_handlers):
+    """Events failing to process are dead-lettered, and don't block the next ones."""
+    first, second = _event(room_name), _event(room_name)
+
+    with (
+        mock.patch("core.tasks.process_livekit_events.delay") as mock_delay,
+        mock.patch.object(
+            LiveKitEventsService,
+            "_handle_room_started",
+            side_effect=[ValueError("Boom"), None],
+        ) as mock_handler,
+        mock.patch("core.services.livekit_events.logger") as mock_logger,
+    ):
+        _receive(service, first)
+        _receive(service, second)
+        service.process_events(room_name, mock_delay.call_args.kwargs["token"])
+
+    assert [call.args[0].id for call in mock_handler.call_args_list] == [
+        first.id,
+        second.id,
+    ]
+    mock_logger.exception.assert_called_once_with(
+        "Failed to process webhook event %s for room '%s'", first.id, room_name
+    )
+    assert cache.client.get_client(write=True).lrange(
+        service._get_dead_letter_key(), 0, -1
+    ) == [first.SerializeToString()]
+
+
+@mock.patch(
+    "core.tasks.process_livekit_events.delay",
+    side_effect=OperationalError("Broker unavailable"),
+)
+def test_receive_broker_unavailable(mock_delay, service, room_name, mock_handlers):
+    """Events are processed inline when no worker can be scheduled."""
+    data = _event(room_name)
+
+    _receive(service, data)
+
+    assert mock_handlers == [data.id]
+
+
+def test_receive_skips_events_without_handler(service, room_name):
+    """Events nobody handles are not queued."""
+    with mock.patch.object(service, "_run_script") as mock_run_script:
+        _receive(service, _event(room_name, "participant_joined"))
+
+    mock_run_script.assert_not_called()
+
+
+@mock.patch("core.tasks.process_livekit_events.delay")
+def test_process_events_forgets_drained_rooms(
+    mock_delay, service, room_name, mock_handlers
+):
+    """Rooms are no longer swept once their queue is drained."""
+    _receive(service, _event(room_name))
+    redis_client = cache.client.get_client(write=True)
+    assert redis_client.sismember(service._get_rooms_key(), room_name)
+
+    service.process_events(room_name, mock_delay.call_args.kwargs["token"])
+
+    assert not redis_client.sismember(service._get_rooms_key(), room_name)
+
+
+def test_renew_lock(service, room_name, settings):
+    """The drain lock is extended while held, until the renewal is stopped."""
+    settings.LIVEKIT_WEBHOOK_LOCK_TIMEOUT = 60
+    redis_client = cache.client.get_client(write=True)
+    lock_key = service._get_lock_key(room_name)
+    redis_client.set(lock_key, "token", px=1000)
+    stopped = mock.Mock()
+    stopped.wait.side_effect = [False, True]
+
+    service._renew_lock(room_name, "token", stopped)
+
+    stopped.wait.assert_called_with(20)
+    assert redis_client.pttl(lock_key) > 1000
+
+
+def test_renew_lock_lost(service, room_name):
+    """The drain lock is left alone once another worker holds it."""
+    redis_client = cache.client.get_client(write=True)
+    lock_key = service._get_lock_key(room_name)
+    redis_client.set(lock_key, "other-token", px=1000)
+    stopped = mock.Mock()
+    stopped.wait.side_effect = [False, True]
+
+    service._renew_lock(room_name, "token", stopped)
+
+    assert redis_client.pttl(lock_key) <= 1000
+
+
+@mock.patch("core.tasks.process_livekit_events.delay")
+def test_sweep_queues(mock_delay, service, room_name, mock_handlers):
+    """Events left queued by a lost worker are scheduled again."""
+    data = _event(room_name)
+    _receive(service, data)
+    # The worker scheduled died, and its lock expired
+    cache.client.get_client(write=True).delete(service._get_lock_key(room_name))
+    mock_delay.reset_mock()
+
+    assert service.sweep_queues() >= 1
+
+    mock_delay.assert_any_call(room_name=room_name, token=mock.ANY)
+    token = next(
+        call.kwargs["token"]
+        for call in mock_delay.call_args_list
+        if call.kwargs["room_name"] == room_name
+    )
+    service.process_events(room_name, token)
+    assert mock_handlers == [data.id]
+
+
+@mock.patch("core.tasks.process_livekit_events.delay")
+def test_sweep_queues_skips_processed_rooms(
+    mock_delay, service, room_name, mock_handlers
+):
+    """Rooms whose events are being processed are not scheduled again."""
+    _receive(service, _event(room_name))
+    mock_delay.reset_mock()
+
+    service.sweep_queues()
+
+    assert room_name not in [
+        call.kwargs["room_name"] for call in mock_delay.call_args_list
+    ]
@@ -3,8 +3,8 @@ Test lobby service.
 """
 
 # pylint: disable=W0621,W0613, W0212, R0913
-# ruff: noqa: PLR0913
 
+import time
 import uuid
 from unittest import mock
 
@@ -23,7 +23,6 @@ from core.services.lobby import (
     LobbyParticipantStatus,
     LobbyService,
 )
-from core.utils import NotificationError
 
 pytestmark = pytest.mark.django_db
 
@@ -338,34 +337,43 @@ def test_request_entry_new_participant(
     assert participant == participant_data
     assert livekit_config is None
     mock_enter.assert_called_once_with(room.id, participant_id, username)
-    lobby_service._get_participant.assert_called_once_with(room.id, participant_id)
+    lobby_service._get_participant.assert_not_called()
 
 
-@mock.patch("core.services.lobby.LobbyService.refresh_waiting_status")
+@mock.patch("core.services.lobby.LobbyService._schedule_notification")
 def test_request_entry_waiting_participant(
-    mock_refresh, lobby_service, participant_id, username
+    mock_schedule, lobby_service, participant_id, username
 ):
     """Test requesting entry for a waiting participant."""
     request = mock.Mock()
     request.COOKIES = {settings.LOBBY_COOKIE_NAME: participant_id}
 
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-
-    mocked_participant = LobbyParticipant(
-        status=LobbyParticipantStatus.WAITING,
-        username=username,
-        id=participant_id,
-        color="#123456",
+    _add_to_lobby(
+        lobby_service,
+        room.id,
+        {
+            "status": "waiting",
+            "username": username,
+            "id": participant_id,
+            "color": "#123456",
+        },
+        timeout=1,
     )
     lobby_service._get_or_create_participant_id = mock.Mock(return_value=participant_id)
-    lobby_service._get_participant = mock.Mock(return_value=mocked_participant)
 
     participant, livekit_config = lobby_service.request_entry(room, request, username)
 
     assert participant.status == LobbyParticipantStatus.WAITING
+    assert participant.color == "#123456"
     assert livekit_config is None
-    mock_refresh.assert_called_once_with(room.id, participant_id)
-    lobby_service._get_participant.assert_called_once_with(room.id, participant_id)
+    assert (
+        lobby_service._get_redis_client().ttl(
+            lobby_service._get_participant_key(room.id, participant_id)
+        )
+        > 1
+    )
+    mock_schedule.assert_not_called()
 
 
 @mock.patch("core.utils.generate_livekit_config")
@@ -378,15 +386,17 @@ def test_request_entry_accepted_participant(
     request.COOKIES = {settings.LOBBY_COOKIE_NAME: participant_id}
 
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-
-    mocked_participant = LobbyParticipant(
-        status=LobbyParticipantStatus.ACCEPTED,
-        username=username,
-        id=participant_id,
-        color="#123456",
+    _add_to_lobby(
+        lobby_service,
+        room.id,
+        {
+            "status": "accepted",
+            "username": username,
+            "id": participant_id,
+            "color": "#123456",
+        },
     )
     lobby_service._get_or_create_participant_id = mock.Mock(return_value=participant_id)
-    lobby_service._get_participant = mock.Mock(return_value=mocked_participant)
 
     mock_generate_config.return_value = {"token": "test-token"}
 
@@ -403,35 +413,89 @@ def test_request_entry_accepted_participant(
         is_admin_or_owner=False,
         participant_id="test-participant-id",
     )
-    lobby_service._get_participant.assert_called_once_with(room.id, participant_id)
 
 
-@mock.patch("core.services.lobby.cache")
-def test_refresh_waiting_status(mock_cache, lobby_service, participant_id):
+def test_request_entry_single_round_trip(lobby_service, participant_id, username):
+    """Entering or refreshing the lobby should take a single Redis round-trip."""
+    request = mock.Mock()
+    request.COOKIES = {settings.LOBBY_COOKIE_NAME: participant_id}
+
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    lobby_service._get_or_create_participant_id = mock.Mock(return_value=participant_id)
+
+    with (
+        mock.patch.object(
+            lobby_service, "_run_script", wraps=lobby_service._run_script
+        ) as mock_run_script,
+        mock.patch.object(lobby_service, "_schedule_notification"),
+    ):
+        lobby_service.request_entry(room, request, username)
+        lobby_service.request_entry(room, request, username)
+
+    assert mock_run_script.call_count == 2
+
+
+def test_refresh_waiting_status(lobby_service, participant_id, participant_dict):
     """Test refreshing waiting status for a participant."""
-    lobby_service._get_cache_key = mock.Mock(return_value="mocked_cache_key")
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    _add_to_lobby(lobby_service, room.id, participant_dict, timeout=1)
+
     lobby_service.refresh_waiting_status(room.id, participant_id)
-    mock_cache.touch.assert_called_once_with(
-        "mocked_cache_key", settings.LOBBY_WAITING_TIMEOUT
+
+    assert (
+        lobby_service._get_redis_client().ttl(
+            lobby_service._get_participant_key(room.id, participant_id)
+        )
+        > 1
     )
 
 
-# pylint: disable=R0917
-@mock.patch("core.services.lobby.cache")
-@mock.patch("core.utils.generate_color")
+def test_refresh_waiting_status_missing_participant(lobby_service, participant_id):
+    """Refreshing a participant missing from the lobby should not create it."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+
+    lobby_service.refresh_waiting_status(room.id, participant_id)
+
+    assert lobby_service.get_participant(room.id, participant_id) is None
+    assert lobby_service._get_indexed_participant_ids(room.id) == []
+
+
+def test_refresh_waiting_status_updates_index(
+    lobby_service, participant_id, participant_dict
+):
+    """Refreshing a waiting participant should push back its expiry in the index."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    index_key = lobby_service._get_index_key(room.id)
+    client = lobby_service._get_redis_client()
+    _add_to_lobby(lobby_service, room.id, participant_dict)
+    client.zadd(index_key, {participant_id: 1})
+
+    lobby_service.refresh_waiting_status(room.id, participant_id)
+
+    assert client.zscore(index_key, participant_id) > 1
+    assert lobby_service._get_indexed_participant_ids(room.id) == [participant_id]
+
+
 @mock.patch("core.utils.notify_participants")
+def test_enter_registers_participant_in_index(
+    mock_notify, lobby_service, participant_id, username
+):
+    """Entering the lobby should register the participant in the room's index."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+
+    lobby_service.enter(room.id, participant_id, username)
+
+    assert lobby_service._get_indexed_participant_ids(room.id) == [participant_id]
+    assert lobby_service.list_waiting_participants(room.id)[0]["id"] == participant_id
+
+
+@mock.patch("core.services.lobby.LobbyService._schedule_notification")
+@mock.patch("core.utils.generate_color")
 def test_enter_success(
-    mock_notify,
-    mock_generate_color,
-    mock_cache,
-    lobby_service,
-    participant_id,
-    username,
+    mock_generate_color, mock_schedule, lobby_service, participant_id, username
 ):
     """Test successful participant entry."""
     mock_generate_color.return_value = "#123456"
-    lobby_service._get_cache_key = mock.Mock(return_value="mocked_cache_key")
 
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
     participant = lobby_service.enter(room.id, participant_id, username)
@@ -442,122 +506,123 @@ def test_enter_success(
     assert participant.id == participant_id
     assert participant.color == "#123456"
 
-    lobby_service._get_cache_key.assert_called_once_with(room.id, participant_id)
-
-    mock_cache.set.assert_called_once_with(
-        "mocked_cache_key",
-        participant.to_dict(),
-        timeout=settings.LOBBY_WAITING_TIMEOUT,
-    )
-    mock_notify.assert_called_once_with(
-        room_name=str(room.pk), notification_data={"type": "participantWaiting"}
+    participant_key = lobby_service._get_participant_key(room.id, participant_id)
+    client = lobby_service._get_redis_client()
+    assert (
+        lobby_service._decode_hash(client.hgetall(participant_key))
+        == participant.to_dict()
     )
+    assert 0 < client.ttl(participant_key) <= settings.LOBBY_WAITING_TIMEOUT
+    mock_schedule.assert_called_once_with(room.id)
 
 
-# pylint: disable=R0917
-@mock.patch("core.services.lobby.cache")
-@mock.patch("core.utils.generate_color")
-@mock.patch("core.utils.notify_participants")
-def test_enter_with_notification_error(
-    mock_notify,
-    mock_generate_color,
-    mock_cache,
-    lobby_service,
-    participant_id,
-    username,
+@mock.patch("core.services.lobby.LobbyService._schedule_notification")
+def test_enter_existing_participant(
+    mock_schedule, lobby_service, participant_id, username
 ):
-    """Test participant entry with notification error."""
-    mock_generate_color.return_value = "#123456"
-    mock_notify.side_effect = NotificationError("Error notifying")
-    lobby_service._get_cache_key = mock.Mock(return_value="mocked_cache_key")
-
+    """Entering twice should return the existing participant and notify once."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-    participant = lobby_service.enter(room.id, participant_id, username)
 
-    mock_generate_color.assert_called_once_with(participant_id)
-    assert participant.status == LobbyParticipantStatus.WAITING
-    assert participant.username == username
+    first = lobby_service.enter(room.id, participant_id, username)
+    second = lobby_service.enter(room.id, participant_id, "other-username")
+
+    assert second == first
+    assert second.username == username
+    mock_schedule.assert_called_once_with(room.id)
 
-    lobby_service._get_cache_key.assert_called_once_with(room.id, participant_id)
 
-    mock_cache.set.assert_called_once_with(
-        "mocked_cache_key",
-        participant.to_dict(),
-        timeout=settings.LOBBY_WAITING_TIMEOUT,
+@mock.patch("core.services.lobby.LobbyService._schedule_notification")
+def test_enter_replaces_legacy_data(
+    mock_schedule, lobby_service, participant_id, username
+):
+    """Participants stored in the former pickled format should be replaced."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    cache.set(
+        lobby_service._get_cache_key(room.id, participant_id),
+        {"status": "accepted", "username": username, "id": participant_id},
     )
 
+    participant = lobby_service.enter(room.id, participant_id, username)
+
+    assert participant.status == LobbyParticipantStatus.WAITING
+    assert lobby_service.get_participant(room.id, participant_id) == participant
+    mock_schedule.assert_called_once_with(room.id)
 
-@mock.patch("core.services.lobby.cache")
-def test_get_participant_not_found(mock_cache, lobby_service, participant_id):
-    """Test getting a participant that doesn't exist."""
-    mock_cache.get.return_value = None
-    lobby_service._get_cache_key = mock.Mock(return_value="mocked_cache_key")
 
+def test_get_participant_not_found(lobby_service, participant_id):
+    """Test getting a participant that doesn't exist."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
     result = lobby_service._get_participant(room.id, participant_id)
 
     assert result is None
 
-    lobby_service._get_cache_key.assert_called_once_with(room.id, participant_id)
-    mock_cache.get.assert_called_once_with("mocked_cache_key")
 
-
-@mock.patch("core.services.lobby.cache")
-@mock.patch("core.services.lobby.LobbyParticipant.from_dict")
-def test_get_participant_parsing_error(
-    mock_from_dict, mock_cache, lobby_service, participant_id
-):
+def test_get_participant_parsing_error(lobby_service, participant_id):
     """Test handling corrupted participant data."""
-    mock_cache.get.return_value = {"some": "data"}
-    lobby_service._get_cache_key = mock.Mock(return_value="mocked_cache_key")
-    mock_from_dict.side_effect = LobbyParticipantParsingError("Invalid data")
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    _add_to_lobby(
+        lobby_service,
+        room.id,
+        {"status": "invalid", "username": "user", "id": participant_id},
+    )
 
+    result = lobby_service._get_participant(room.id, participant_id)
+
+    assert result is None
+    assert not lobby_service._get_redis_client().exists(
+        lobby_service._get_participant_key(room.id, participant_id)
+    )
+    assert lobby_service._get_indexed_participant_ids(room.id) == []
+
+
+def test_get_participant_legacy_data(lobby_service, participant_id, participant_dict):
+    """Participants stored in the former pickled format are treated as corrupted."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    cache_key = lobby_service._get_cache_key(room.id, participant_id)
+    cache.set(cache_key, participant_dict)
+
     result = lobby_service._get_participant(room.id, participant_id)
 
     assert result is None
-    lobby_service._get_cache_key.assert_called_once_with(room.id, participant_id)
-    mock_cache.delete.assert_called_once_with("mocked_cache_key")
+    assert cache.get(cache_key) is None
 
 
-@mock.patch("core.services.lobby.cache")
-def test_list_waiting_participants_empty(mock_cache, lobby_service):
-    """Test listing waiting participants when none exist."""
-    mock_cache.keys.return_value = []
+def _add_to_lobby(lobby_service, room_id, participant, timeout=10000):
+    """Store a participant in the lobby cache and register it in the room's index."""
+    participant_key = lobby_service._get_participant_key(room_id, participant["id"])
+    client = lobby_service._get_redis_client()
+    client.hset(participant_key, mapping=participant)
+    client.expire(participant_key, timeout)
+    client.zadd(
+        lobby_service._get_index_key(room_id),
+        {participant["id"]: time.time() + timeout},
+    )
 
+
+def test_list_waiting_participants_empty(lobby_service):
+    """Test listing waiting participants when none exist."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-    result = lobby_service.list_waiting_participants(room.id)
+
+    with mock.patch.object(cache, "get_many") as mock_get_many:
+        result = lobby_service.list_waiting_participants(room.id)
 
     assert result == []
-    pattern = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_*"
-    mock_cache.keys.assert_called_once_with(pattern)
-    mock_cache.get_many.assert_not_called()
+    mock_get_many.assert_not_called()
 
 
-@mock.patch("core.services.lobby.cache")
-def test_list_waiting_participants(mock_cache, lobby_service, participant_dict):
+def test_list_waiting_participants(lobby_service, participant_dict):
     """Test listing waiting participants with valid data."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-    cache_key = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_participant1"
-    mock_cache.keys.return_value = [cache_key]
-    mock_cache.get_many.return_value = {cache_key: participant_dict}
+    _add_to_lobby(lobby_service, room.id, participant_dict)
 
     result = lobby_service.list_waiting_participants(room.id)
 
-    assert len(result) == 1
-    assert result[0]["status"] == "waiting"
-    assert result[0]["username"] == "test-username"
-    pattern = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_*"
-    mock_cache.keys.assert_called_once_with(pattern)
-    mock_cache.get_many.assert_called_once_with([cache_key])
+    assert result == [participant_dict]
 
 
-@mock.patch("core.services.lobby.cache")
-def test_list_waiting_participants_multiple(mock_cache, lobby_service):
+def test_list_waiting_participants_multiple(lobby_service):
     """Test listing multiple waiting participants with valid data."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-    cache_key1 = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_participant1"
-    cache_key2 = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_participant2"
 
     participant1 = {
         "status": "waiting",
@@ -573,11 +638,8 @@ def test_list_waiting_participants_multiple(mock_cache, lobby_service):
         "color": "#654321",
     }
 
-    mock_cache.keys.return_value = [cache_key1, cache_key2]
-    mock_cache.get_many.return_value = {
-        cache_key1: participant1,
-        cache_key2: participant2,
-    }
+    _add_to_lobby(lobby_service, room.id, participant1)
+    _add_to_lobby(lobby_service, room.id, participant2)
 
     result = lobby_service.list_waiting_participants(room.id)
 
@@ -590,31 +652,99 @@ def test_list_waiting_participants_multiple(mock_cache, lobby_service):
     # Verify all participants have waiting status
     assert all(p["status"] == "waiting" for p in result)
 
-    pattern = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_*"
-    mock_cache.keys.assert_called_once_with(pattern)
-    mock_cache.get_many.assert_called_once_with([cache_key1, cache_key2])
 
+def test_list_waiting_participants_does_not_scan_keyspace(lobby_service):
+    """Listing a room's lobby should never rely on a KEYS pattern scan."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    _add_to_lobby(
+        lobby_service,
+        room.id,
+        {"status": "waiting", "username": "user1", "id": "p1", "color": "#123456"},
+    )
+
+    with mock.patch.object(cache, "keys") as mock_keys:
+        result = lobby_service.list_waiting_participants(room.id)
+
+    assert [p["id"] for p in result] == ["p1"]
+    mock_keys.assert_not_called()
 
-@mock.patch("core.services.lobby.cache")
-def test_list_waiting_participants_corrupted_data(mock_cache, lobby_service):
+
+def test_list_waiting_participants_isolated_per_room(lobby_service):
+    """Participants waiting in another room should not be listed."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    other_room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    _add_to_lobby(
+        lobby_service,
+        room.id,
+        {"status": "waiting", "username": "user1", "id": "p1", "color": "#123456"},
+    )
+    _add_to_lobby(
+        lobby_service,
+        other_room.id,
+        {"status": "waiting", "username": "user2", "id": "p2", "color": "#123456"},
+    )
+
+    result = lobby_service.list_waiting_participants(room.id)
+
+    assert [p["id"] for p in result] == ["p1"]
+
+
+def test_list_waiting_participants_prunes_expired_entries(lobby_service):
+    """Expired participants should be pruned from the room's index."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    _add_to_lobby(
+        lobby_service,
+        room.id,
+        {"status": "waiting", "username": "user1", "id": "p1", "color": "#123456"},
+    )
+    # Index entry already expired
+    lobby_service._get_redis_client().zadd(
+        lobby_service._get_index_key(room.id), {"p2": 1}
+    )
+
+    result = lobby_service.list_waiting_participants(room.id)
+
+    assert [p["id"] for p in result] == ["p1"]
+    assert lobby_service._get_indexed_participant_ids(room.id) == ["p1"]
+
+
+def test_list_waiting_participants_unindex_missing_entries(lobby_service):
+    """Index entries whose participant data is gone should be removed."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    _add_to_lobby(
+        lobby_service,
+        room.id,
+        {"status": "waiting", "username": "user1", "id": "p1", "color": "#123456"},
+    )
+    cache.delete(lobby_service._get_cache_key(room.id, "p1"))
+
+    result = lobby_service.list_waiting_participants(room.id)
+
+    assert result == []
+    assert lobby_service._get_indexed_participant_ids(room.id) == []
+
+
+def test_list_waiting_participants_corrupted_data(lobby_service):
     """Test listing waiting participants with corrupted data."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-    cache_key = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_participant1"
-    mock_cache.keys.return_value = [cache_key]
-    mock_cache.get_many.return_value = {cache_key: {"invalid": "data"}}
+    _add_to_lobby(lobby_service, room.id, {"invalid": "data", "id": "participant1"})
 
     result = lobby_service.list_waiting_participants(room.id)
 
     assert result == []
-    mock_cache.delete.assert_called_once_with(cache_key)
+    assert lobby_service.get_participant(room.id, "participant1") is None
+    assert lobby_service._get_indexed_participant_ids(room.id) == []
 
 
-@mock.patch("core.services.lobby.cache")
-def test_list_waiting_participants_partially_corrupted(mock_cache, lobby_service):
+def test_list_waiting_participants_partially_corrupted(lobby_service):
     """Test listing waiting participants with one valid and one corrupted entry."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-    cache_key1 = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_participant1"
-    cache_key2 = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_participant2"
+    cache_key1 = lobby_service._get_cache_key(room.id, "participant1")
+    # Participants stored in the former pickled format can't be read anymore
+    cache.set(cache_key1, {"invalid": "data"})
+    lobby_service._get_redis_client().zadd(
+        lobby_service._get_index_key(room.id), {"participant1": time.time() + 10000}
+    )
 
     valid_participant = {
         "status": "waiting",
@@ -622,38 +752,21 @@ def test_list_waiting_participants_partially_corrupted(mock_cache, lobby_service
         "id": "participant2",
         "color": "#654321",
     }
-
-    corrupted_participant = {"invalid": "data"}
-
-    mock_cache.keys.return_value = [cache_key1, cache_key2]
-    mock_cache.get_many.return_value = {
-        cache_key1: corrupted_participant,
-        cache_key2: valid_participant,
-    }
+    _add_to_lobby(lobby_service, room.id, valid_participant)
 
     result = lobby_service.list_waiting_participants(room.id)
 
     # Check that only the valid participant is returned
-    assert len(result) == 1
-    assert result[0]["id"] == "participant2"
-    assert result[0]["status"] == "waiting"
-    assert result[0]["username"] == "user2"
+    assert result == [valid_participant]
 
     # Verify corrupted entry was deleted
-    mock_cache.delete.assert_called_once_with(cache_key1)
-
-    # Verify both cache keys were queried
-    pattern = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_*"
-    mock_cache.keys.assert_called_once_with(pattern)
-    mock_cache.get_many.assert_called_once_with([cache_key1, cache_key2])
+    assert cache.get(cache_key1) is None
+    assert lobby_service._get_indexed_participant_ids(room.id) == ["participant2"]
 
 
-@mock.patch("core.services.lobby.cache")
-def test_list_waiting_participants_non_waiting(mock_cache, lobby_service):
+def test_list_waiting_participants_non_waiting(lobby_service):
     """Test listing only waiting participants (not accepted/denied)."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-    cache_key1 = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_participant1"
-    cache_key2 = f"{settings.LOBBY_KEY_PREFIX}_{room.id!s}_participant2"
 
     participant1 = {
         "status": "waiting",
@@ -668,11 +781,8 @@ def test_list_waiting_participants_non_waiting(mock_cache, lobby_service):
         "color": "#654321",
     }
 
-    mock_cache.keys.return_value = [cache_key1, cache_key2]
-    mock_cache.get_many.return_value = {
-        cache_key1: participant1,
-        cache_key2: participant2,
-    }
+    _add_to_lobby(lobby_service, room.id, participant1)
+    _add_to_lobby(lobby_service, room.id, participant2)
 
     result = lobby_service.list_waiting_participants(room.id)
 
@@ -709,12 +819,9 @@ def test_handle_participant_entry_deny(mock_update, lobby_service, participant_i
     )
 
 
-@mock.patch("core.services.lobby.cache")
-def test_update_participant_status_not_found(mock_cache, lobby_service, participant_id):
+def test_update_participant_status_not_found(lobby_service, participant_id):
     """Test updating status for non-existent participant."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-    mock_cache.get.return_value = None
-    lobby_service._get_cache_key = mock.Mock(return_value="mocked_cache_key")
 
     with pytest.raises(LobbyParticipantNotFound, match="Participant not found"):
         lobby_service._update_participant_status(
@@ -724,20 +831,13 @@ def test_update_participant_status_not_found(mock_cache, lobby_service, particip
             timeout=60,
         )
 
-    lobby_service._get_cache_key.assert_called_once_with(room.id, participant_id)
-    mock_cache.get.assert_called_once_with("mocked_cache_key")
+    assert lobby_service.get_participant(room.id, participant_id) is None
 
 
-@mock.patch("core.services.lobby.cache")
-@mock.patch("core.services.lobby.LobbyParticipant.from_dict")
-def test_update_participant_status_corrupted_data(
-    mock_from_dict, mock_cache, lobby_service, participant_id
-):
+def test_update_participant_status_corrupted_data(lobby_service, participant_id):
     """Test updating status with corrupted participant data."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-    mock_cache.get.return_value = {"some": "data"}
-    mock_from_dict.side_effect = LobbyParticipantParsingError("Invalid data")
-    lobby_service._get_cache_key = mock.Mock(return_value="mocked_cache_key")
+    _add_to_lobby(lobby_service, room.id, {"some": "data", "id": participant_id})
 
     with pytest.raises(LobbyParticipantParsingError):
         lobby_service._update_participant_status(
@@ -747,23 +847,18 @@ def test_update_participant_status_corrupted_data(
             timeout=60,
         )
 
-    mock_cache.delete.assert_called_once_with("mocked_cache_key")
-    lobby_service._get_cache_key.assert_called_once_with(room.id, participant_id)
+    assert not lobby_service._get_redis_client().exists(
+        lobby_service._get_participant_key(room.id, participant_id)
+    )
+    assert lobby_service._get_indexed_participant_ids(room.id) == []
 
 
-@mock.patch("core.services.lobby.cache")
-def test_update_participant_status_success(mock_cache, lobby_service, participant_id):
+def test_update_participant_status_success(
+    lobby_service, participant_id, participant_dict
+):
     """Test successful participant status update."""
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
-    participant_dict = {
-        "status": "waiting",
-        "username": "test-username",
-        "id": participant_id,
-        "color": "#123456",
-    }
-
-    mock_cache.get.return_value = participant_dict
-    lobby_service._get_cache_key = mock.Mock(return_value="mocked_cache_key")
+    _add_to_lobby(lobby_service, room.id, participant_dict)
 
     lobby_service._update_participant_status(
         room.id,
@@ -772,16 +867,31 @@ def test_update_participant_status_success(mock_cache, lobby_service, participan
         timeout=60,
     )
 
-    expected_data = {
+    participant_key = lobby_service._get_participant_key(room.id, participant_id)
+    client = lobby_service._get_redis_client()
+    assert lobby_service._decode_hash(client.hgetall(participant_key)) == {
         "status": "accepted",
         "username": "test-username",
         "id": participant_id,
         "color": "#123456",
     }
-    mock_cache.set.assert_called_once_with(
-        "mocked_cache_key", expected_data, timeout=60
+    assert 0 < client.ttl(participant_key) <= 60
+
+
+@pytest.mark.parametrize("allow_entry", [True, False])
+def test_update_participant_status_keeps_participant_indexed(
+    lobby_service, participant_id, participant_dict, allow_entry
+):
+    """Decided participants stay indexed, so they can be cleared with the room."""
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+    _add_to_lobby(lobby_service, room.id, participant_dict)
+
+    lobby_service.handle_participant_entry(
+        room.id, participant_id, allow_entry=allow_entry
     )
-    lobby_service._get_cache_key.assert_called_once_with(room.id, participant_id)
+
+    assert lobby_service._get_indexed_participant_ids(room.id) == [participant_id]
+    assert lobby_service.list_waiting_participants(room.id) == []
 
 
 def test_clear_room_cache(settings, lobby_service):
@@ -794,40 +904,53 @@ def test_clear_room_cache(settings, lobby_service):
 
     room_id = uuid.uuid4()
 
-    cache.set(
-        f"test-lobby_{room_id!s}_participant1",
-        LobbyParticipant(
-            status=LobbyParticipantStatus.WAITING,
-            username="participant1",
-            id="participant1",
-            color="#123456",
-        ),
-        timeout=settings.LOBBY_WAITING_TIMEOUT,
-    )
-    cache.set(
-        f"test-lobby_{room_id!s}_participant2",
-        LobbyParticipant(
-            status=LobbyParticipantStatus.ACCEPTED,
-            username="participant2",
-            id="participant2",
-            color="#123456",
-        ),
-        timeout=settings.LOBBY_ACCEPTED_TIMEOUT,
-    )
-    cache.set(
-        f"test-lobby_{room_id!s}_participant3",
-        LobbyParticipant(
-            status=LobbyParticipantStatus.DENIED,
-            username="participant3",
-            id="participant3",
-            color="#123456",
-        ),
-        timeout=settings.LOBBY_DENIED_TIMEOUT,
+    for index, status in enumerate(
+        [
+            LobbyParticipantStatus.WAITING,
+            LobbyParticipantStatus.ACCEPTED,
+            LobbyParticipantStatus.DENIED,
+        ],
+        start=1,
+    ):
+        _add_to_lobby(
+            lobby_service,
+            room_id,
+            LobbyParticipant(
+                status=status,
+                username=f"participant{index}",
+                id=f"participant{index}",
+                color="#123456",
+            ).to_dict(),
+        )
+
+    lobby_service.clear_room_cache(room_id)
+
+    assert cache.keys(f"test-lobby_{room_id!s}_*") == []
+    assert not lobby_service._get_redis_client().exists(
+        lobby_service._get_index_key(room_id)
     )
 
+
+def test_clear_room_cache_keeps_other_rooms(settings, lobby_service):
+    """Clearing a room's lobby should not affect other rooms."""
+
+    settings.LOBBY_KEY_PREFIX = "test-lobby"
+
+    room_id = uuid.uuid4()
+    other_room_id = uuid.uuid4()
+    participant = {
+        "status": "waiting",
+        "username": "participant1",
+        "id": "participant1",
+        "color": "#123456",
+    }
+    _add_to_lobby(lobby_service, room_id, participant)
+    _add_to_lobby(lobby_service, other_room_id, participant)
+
     lobby_service.clear_room_cache(room_id)
 
     assert cache.keys(f"test-lobby_{room_id!s}_*") == []
+    assert lobby_service.list_waiting_participants(other_room_id) == [participant]
 
 
 def test_clear_room_empty(settings, lobby_service):
@@ -846,18 +969,20 @@ def test_clear_participant_cache(lobby_service):
     room_id = uuid.uuid4()
     participant_id = "test-participant-id"
 
-    cache_key = f"{settings.LOBBY_KEY_PREFIX}_{room_id!s}_{participant_id}"
     participant_data = {
         "status": "waiting",
         "username": "test-username",
         "id": participant_id,
         "color": "#123456",
     }
-    cache.set(cache_key, participant_data, timeout=settings.LOBBY_WAITING_TIMEOUT)
-    assert cache.get(cache_key) is not None
+    _add_to_lobby(
+        lobby_service, room_id, participant_data, settings.LOBBY_WAITING_TIMEOUT
+    )
+    assert lobby_service.get_participant(room_id, participant_id) is not None
 
     lobby_service.clear_participant_cache(room_id, participant_id)
-    assert cache.get(cache_key) is None
+    assert lobby_service.get_participant(room_id, participant_id) is None
+    assert lobby_service._get_indexed_participant_ids(room_id) == []
 
 
 def test_clear_participant_cache_nonexistent(lobby_service):
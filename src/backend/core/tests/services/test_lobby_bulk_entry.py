@@ -0,0 +1,174 @@
+"""
+Test lobby service: bulk entry decisions.
+"""
+
+# pylint: disable=W0621,W0613,W0212
+
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+
+import pytest
+
+from core.factories import RoomFactory
+from core.models import RoomAccessLevel
+from core.services.lobby import LobbyParticipantStatus, LobbyService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def lobby_service():
+    """Return a LobbyService instance."""
+    return LobbyService()
+
+
+@pytest.fixture
+def room():
+    """Return a room with a lobby."""
+    return RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+
+
+@pytest.fixture(autouse=True)
+def mock_notify_participants():
+    """Do not notify LiveKit rooms when participants enter the lobby."""
+    with mock.patch("core.utils.notify_participants") as mocked:
+        yield mocked
+
+
+@pytest.mark.parametrize(
+    "allow_entry, status, timeout",
+    [
+        (True, LobbyParticipantStatus.ACCEPTED, "LOBBY_ACCEPTED_TIMEOUT"),
+        (False, LobbyParticipantStatus.DENIED, "LOBBY_DENIED_TIMEOUT"),
+    ],
+)
+def test_handle_participants_entry_by_ids(
+    lobby_service, room, allow_entry, status, timeout
+):
+    """Test deciding on the entry of several participants at once."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    lobby_service.enter(room.id, "participant-2", "user2")
+    lobby_service.enter(room.id, "participant-3", "user3")
+
+    results = lobby_service.handle_participants_entry(
+        room.id,
+        allow_entry=allow_entry,
+        participant_ids=["participant-1", "participant-2"],
+    )
+
+    assert results == {"participant-1": status, "participant-2": status}
+
+    for participant_id in ["participant-1", "participant-2"]:
+        participant = lobby_service.get_participant(room.id, participant_id)
+        assert participant.status == status
+        cache_key = lobby_service._get_cache_key(room.id, participant_id)
+        assert (
+            getattr(settings, timeout) - 5
+            < cache.ttl(cache_key)
+            <= getattr(settings, timeout)
+        )
+
+    assert [
+        participant["id"]
+        for participant in lobby_service.list_waiting_participants(room.id)
+    ] == ["participant-3"]
+
+
+def test_handle_participants_entry_all_waiting(lobby_service, room):
+    """Test admitting all waiting participants leaves decided ones untouched."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    lobby_service.enter(room.id, "participant-2", "user2")
+    lobby_service.enter(room.id, "participant-3", "user3")
+    lobby_service.handle_participant_entry(room.id, "participant-3", allow_entry=False)
+
+    results = lobby_service.handle_participants_entry(room.id, allow_entry=True)
+
+    assert results == {
+        "participant-1": LobbyParticipantStatus.ACCEPTED,
+        "participant-2": LobbyParticipantStatus.ACCEPTED,
+    }
+    assert lobby_service.list_waiting_participants(room.id) == []
+    assert (
+        lobby_service.get_participant(room.id, "participant-3").status
+        == LobbyParticipantStatus.DENIED
+    )
+
+
+def test_handle_participants_entry_empty_lobby(lobby_service, room):
+    """Test admitting all waiting participants of an empty lobby."""
+    version = lobby_service.get_version(room.id)
+
+    assert lobby_service.handle_participants_entry(room.id, allow_entry=True) == {}
+    assert lobby_service.get_version(room.id) == version
+
+
+def test_handle_participants_entry_not_found(lobby_service, room):
+    """Test participants missing from the lobby are reported as not found."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+
+    results = lobby_service.handle_participants_entry(
+        room.id,
+        allow_entry=True,
+        participant_ids=["participant-1", "unknown", "participant-1"],
+    )
+
+    assert results == {
+        "participant-1": LobbyParticipantStatus.ACCEPTED,
+        "unknown": None,
+    }
+
+
+def test_handle_participants_entry_corrupted_data(lobby_service, room):
+    """Test corrupted participants are removed and reported as not found."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    cache_key = lobby_service._get_cache_key(room.id, "participant-2")
+    # Participants stored in the former pickled format can't be read anymore
+    cache.set(cache_key, {"invalid": "data"})
+    lobby_service._get_redis_client().zadd(
+        lobby_service._get_index_key(room.id), {"participant-2": time.time() + 60}
+    )
+
+    results = lobby_service.handle_participants_entry(
+        room.id,
+        allow_entry=True,
+        participant_ids=["participant-1", "participant-2"],
+    )
+
+    assert results == {
+        "participant-1": LobbyParticipantStatus.ACCEPTED,
+        "participant-2": None,
+    }
+    assert cache.get(cache_key) is None
+    assert lobby_service._get_indexed_participant_ids(room.id) == ["participant-1"]
+
+
+def test_handle_participants_entry_single_write_round_trip(lobby_service, room):
+    """Test all updates are written in a single script call, whatever their number."""
+    participant_ids = [f"participant-{i}" for i in range(50)]
+    for participant_id in participant_ids:
+        lobby_service.enter(room.id, participant_id, "user")
+
+    with mock.patch.object(
+        lobby_service, "_run_script", wraps=lobby_service._run_script
+    ) as mocked_run_script:
+        lobby_service.handle_participants_entry(
+            room.id, allow_entry=True, participant_ids=participant_ids
+        )
+
+    mocked_run_script.assert_called_once()
+
+
+def test_handle_participants_entry_records_changes(lobby_service, room):
+    """Test decided participants are listed as left in the lobby changes."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    lobby_service.enter(room.id, "participant-2", "user2")
+    version = lobby_service.get_version(room.id)
+
+    lobby_service.handle_participants_entry(room.id, allow_entry=True)
+
+    changes = lobby_service.list_waiting_participants_changes(room.id, since=version)
+    assert changes["participants"] == []
+    assert sorted(changes["left"]) == ["participant-1", "participant-2"]
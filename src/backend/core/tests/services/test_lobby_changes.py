@@ -0,0 +1,235 @@
+"""
+Test lobby service: waiting participants changes.
+"""
+
+# pylint: disable=W0621,W0613,W0212
+
+import time
+from unittest import mock
+
+from django.core.cache import cache
+
+import pytest
+
+from core.factories import RoomFactory
+from core.models import RoomAccessLevel
+from core.services.lobby import LobbyService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def lobby_service():
+    """Return a LobbyService instance."""
+    return LobbyService()
+
+
+@pytest.fixture
+def room():
+    """Return a room with a lobby."""
+    return RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+
+
+@pytest.fixture(autouse=True)
+def mock_notify_participants():
+    """Do not notify LiveKit rooms when participants enter the lobby."""
+    with mock.patch("core.utils.notify_participants") as mocked:
+        yield mocked
+
+
+def test_get_version_unknown_room(lobby_service, room):
+    """Test the version of a lobby without any change."""
+    assert lobby_service.get_version(room.id) == 0
+
+
+def test_version_increases_on_each_change(lobby_service, room):
+    """Test entering, being decided and leaving all bump the lobby version."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    first_version = lobby_service.get_version(room.id)
+
+    lobby_service.enter(room.id, "participant-2", "user2")
+    second_version = lobby_service.get_version(room.id)
+
+    lobby_service.handle_participant_entry(room.id, "participant-1", allow_entry=True)
+    third_version = lobby_service.get_version(room.id)
+
+    lobby_service.clear_participant_cache(room.id, "participant-2")
+    fourth_version = lobby_service.get_version(room.id)
+
+    assert 0 < first_version < second_version < third_version < fourth_version
+
+
+def test_version_unchanged_on_refresh(lobby_service, room):
+    """Test refreshing a waiting participant does not bump the lobby version."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    version = lobby_service.get_version(room.id)
+
+    lobby_service.refresh_waiting_status(room.id, "participant-1")
+    lobby_service.list_waiting_participants(room.id)
+
+    assert lobby_service.get_version(room.id) == version
+
+
+def test_version_keeps_increasing_after_expiry(lobby_service, room):
+    """Test versions are not reused once the lobby keys expired."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    version = lobby_service.get_version(room.id)
+
+    lobby_service._get_redis_client().delete(
+        lobby_service._get_version_key(room.id),
+        lobby_service._get_changes_key(room.id),
+    )
+    # Lobby keys expire after hours without activity, not within a millisecond
+    time.sleep(0.01)
+    lobby_service.enter(room.id, "participant-2", "user2")
+
+    assert lobby_service.get_version(room.id) > version
+
+
+def test_list_waiting_participants_changes_full(lobby_service, room):
+    """Test listing changes without a version returns the whole list."""
+    participant = lobby_service.enter(room.id, "participant-1", "user1")
+
+    changes = lobby_service.list_waiting_participants_changes(room.id)
+
+    assert changes == {
+        "version": lobby_service.get_version(room.id),
+        "reset": True,
+        "participants": [participant.to_dict()],
+    }
+
+
+def test_list_waiting_participants_changes_unchanged(lobby_service, room):
+    """Test listing changes since the current version returns nothing."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    version = lobby_service.get_version(room.id)
+
+    assert (
+        lobby_service.list_waiting_participants_changes(room.id, since=version) is None
+    )
+    assert (
+        lobby_service.list_waiting_participants_changes(
+            room.id, since=version, full=True
+        )
+        is None
+    )
+
+
+def test_list_waiting_participants_changes_empty_lobby(lobby_service, room):
+    """Test a lobby without any change is unchanged since version 0."""
+    assert lobby_service.list_waiting_participants_changes(room.id, since=0) is None
+
+
+def test_list_waiting_participants_changes_deltas(lobby_service, room):
+    """Test listing changes only returns participants who joined or left since."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    lobby_service.enter(room.id, "participant-2", "user2")
+    version = lobby_service.get_version(room.id)
+
+    lobby_service.handle_participant_entry(room.id, "participant-1", allow_entry=False)
+    participant = lobby_service.enter(room.id, "participant-3", "user3")
+
+    changes = lobby_service.list_waiting_participants_changes(room.id, since=version)
+
+    assert changes == {
+        "version": lobby_service.get_version(room.id),
+        "reset": False,
+        "participants": [participant.to_dict()],
+        "left": ["participant-1"],
+    }
+
+
+def test_list_waiting_participants_changes_full_requested(lobby_service, room):
+    """Test listing changes can return the whole list when it changed."""
+    first = lobby_service.enter(room.id, "participant-1", "user1")
+    version = lobby_service.get_version(room.id)
+    second = lobby_service.enter(room.id, "participant-2", "user2")
+
+    changes = lobby_service.list_waiting_participants_changes(
+        room.id, since=version, full=True
+    )
+
+    assert changes["version"] == lobby_service.get_version(room.id)
+    assert changes["reset"] is True
+    assert sorted(changes["participants"], key=lambda p: p["id"]) == [
+        first.to_dict(),
+        second.to_dict(),
+    ]
+
+
+def test_list_waiting_participants_changes_unknown_version(lobby_service, room):
+    """Test listing changes since a version from the future returns the whole list."""
+    participant = lobby_service.enter(room.id, "participant-1", "user1")
+    version = lobby_service.get_version(room.id)
+
+    changes = lobby_service.list_waiting_participants_changes(
+        room.id, since=version + 1000
+    )
+
+    assert changes == {
+        "version": version,
+        "reset": True,
+        "participants": [participant.to_dict()],
+    }
+
+
+def test_list_waiting_participants_changes_trimmed(lobby_service, room, settings):
+    """Test changes older than the retention are trimmed, and reset clients."""
+    settings.LOBBY_CHANGES_RETENTION = 2
+    participants = [
+        lobby_service.enter(room.id, f"participant-{i}", f"user{i}") for i in range(4)
+    ]
+    version = lobby_service.get_version(room.id)
+
+    changes_key = lobby_service._get_changes_key(room.id)
+    assert lobby_service._decode(
+        lobby_service._get_redis_client().zrange(changes_key, 0, -1)
+    ) == ["participant-2", "participant-3"]
+
+    # Changes since the oldest retained version are still known
+    changes = lobby_service.list_waiting_participants_changes(
+        room.id, since=version - 2
+    )
+    assert changes["reset"] is False
+    assert changes["participants"] == [
+        participant.to_dict() for participant in participants[2:]
+    ]
+
+    changes = lobby_service.list_waiting_participants_changes(
+        room.id, since=version - 3
+    )
+    assert changes["reset"] is True
+    assert sorted(changes["participants"], key=lambda p: p["id"]) == [
+        participant.to_dict() for participant in participants
+    ]
+
+
+def test_list_waiting_participants_changes_expired(lobby_service, room):
+    """Test participants whose entry expired are listed as left."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    cache.delete(lobby_service._get_cache_key(room.id, "participant-1"))
+    # Expire the participant in the index as well
+    lobby_service._get_redis_client().zadd(
+        lobby_service._get_index_key(room.id), {"participant-1": 1}
+    )
+    version = lobby_service.get_version(room.id)
+
+    changes = lobby_service.list_waiting_participants_changes(room.id, since=version)
+
+    assert changes["version"] > version
+    assert changes["participants"] == []
+    assert changes["left"] == ["participant-1"]
+
+
+def test_list_waiting_participants_changes_cleared(lobby_service, room):
+    """Test clearing the lobby lists all its participants as left."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    lobby_service.enter(room.id, "participant-2", "user2")
+    version = lobby_service.get_version(room.id)
+
+    lobby_service.clear_room_cache(room.id)
+
+    changes = lobby_service.list_waiting_participants_changes(room.id, since=version)
+
+    assert changes["participants"] == []
+    assert sorted(changes["left"]) == ["participant-1", "participant-2"]
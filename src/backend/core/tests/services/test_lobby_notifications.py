@@ -0,0 +1,103 @@
+"""
+Test lobby service: coalesced notifications.
+"""
+
+# pylint: disable=W0621,W0613,W0212
+
+from unittest import mock
+
+from django.core.cache import cache
+
+import pytest
+from kombu.exceptions import OperationalError
+
+from core.factories import RoomFactory
+from core.models import RoomAccessLevel
+from core.services.lobby import LobbyService
+from core.tasks import notify_room_participants
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def lobby_service():
+    """Return a LobbyService instance."""
+    return LobbyService()
+
+
+@pytest.fixture
+def room():
+    """Return a room with a lobby."""
+    return RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+
+
+@mock.patch.object(notify_room_participants, "apply_async")
+def test_enter_schedules_notification(mock_apply_async, lobby_service, room, settings):
+    """Entering the lobby should schedule a notification instead of sending it."""
+    settings.LOBBY_NOTIFICATION_WINDOW = 2
+
+    with mock.patch("core.utils.notify_participants") as mock_notify:
+        lobby_service.enter(room.id, "participant-1", "user1")
+
+    mock_notify.assert_not_called()
+    mock_apply_async.assert_called_once_with(
+        kwargs={
+            "room_name": str(room.id),
+            "notification_data": {"type": "participantWaiting"},
+            "coalescing_key": lobby_service._get_notification_key(room.id),
+        },
+        countdown=2,
+    )
+
+
+@mock.patch.object(notify_room_participants, "apply_async")
+def test_enter_coalesces_notifications(mock_apply_async, lobby_service, room):
+    """Participants entering while a notification is pending share it."""
+    for i in range(10):
+        lobby_service.enter(room.id, f"participant-{i}", "user")
+
+    mock_apply_async.assert_called_once()
+
+
+@mock.patch.object(notify_room_participants, "apply_async")
+def test_enter_coalesces_notifications_per_room(mock_apply_async, lobby_service):
+    """Notifications are coalesced per room."""
+    rooms = RoomFactory.create_batch(3, access_level=RoomAccessLevel.RESTRICTED)
+
+    for room in rooms:
+        lobby_service.enter(room.id, "participant-1", "user1")
+        lobby_service.enter(room.id, "participant-2", "user2")
+
+    assert [
+        call.kwargs["kwargs"]["room_name"] for call in mock_apply_async.call_args_list
+    ] == [str(room.id) for room in rooms]
+
+
+@mock.patch("core.utils.notify_participants")
+def test_enter_notifies_again_once_sent(mock_notify, lobby_service, room):
+    """Once the pending notification is sent, new entries get notified again."""
+    with mock.patch.object(notify_room_participants, "apply_async") as mock_apply:
+        lobby_service.enter(room.id, "participant-1", "user1")
+        lobby_service.enter(room.id, "participant-2", "user2")
+
+    mock_apply.assert_called_once()
+    notify_room_participants(**mock_apply.call_args.kwargs["kwargs"])
+    mock_notify.assert_called_once_with(
+        room_name=str(room.id), notification_data={"type": "participantWaiting"}
+    )
+
+    with mock.patch.object(notify_room_participants, "apply_async") as mock_apply:
+        lobby_service.enter(room.id, "participant-3", "user3")
+
+    mock_apply.assert_called_once()
+
+
+@mock.patch.object(
+    notify_room_participants, "apply_async", side_effect=OperationalError("down")
+)
+def test_enter_notification_scheduling_error(mock_apply_async, lobby_service, room):
+    """Failing to schedule a notification should not fail the entry request."""
+    participant = lobby_service.enter(room.id, "participant-1", "user1")
+
+    assert lobby_service.get_participant(room.id, participant.id) is not None
+    assert cache.get(lobby_service._get_notification_key(room.id)) is None
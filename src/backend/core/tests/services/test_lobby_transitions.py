@@ -0,0 +1,126 @@
+"""
+Test lobby service: atomicity of lobby transitions.
+"""
+
+# pylint: disable=W0621,W0613,W0212
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from core import utils
+from core.factories import RoomFactory
+from core.models import RoomAccessLevel
+from core.services.lobby import ENTER_SCRIPT, LobbyParticipantStatus, LobbyService
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def lobby_service():
+    """Return a LobbyService instance."""
+    return LobbyService()
+
+
+@pytest.fixture
+def room():
+    """Return a room with a lobby."""
+    return RoomFactory(access_level=RoomAccessLevel.RESTRICTED)
+
+
+@pytest.fixture(autouse=True)
+def mock_schedule_notification():
+    """Do not notify LiveKit rooms when participants enter the lobby."""
+    with mock.patch.object(LobbyService, "_schedule_notification") as mocked:
+        yield mocked
+
+
+def test_enter_concurrently_creates_participant_once(
+    lobby_service, room, mock_schedule_notification
+):
+    """Test concurrent entries of a participant create it, and notify, only once."""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        participants = list(
+            executor.map(
+                lambda i: lobby_service.enter(room.id, "participant-1", f"user{i}"),
+                range(20),
+            )
+        )
+
+    assert len({participant.username for participant in participants}) == 1
+    assert lobby_service._get_indexed_participant_ids(room.id) == ["participant-1"]
+    mock_schedule_notification.assert_called_once_with(room.id)
+
+
+def test_handle_participants_entry_concurrent_decisions(lobby_service, room):
+    """Test concurrent decisions on the whole lobby never overlap."""
+    participant_ids = [f"participant-{i}" for i in range(20)]
+    for participant_id in participant_ids:
+        lobby_service.enter(room.id, participant_id, "user")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        allowed, denied = executor.map(
+            lambda allow_entry: lobby_service.handle_participants_entry(
+                room.id, allow_entry=allow_entry
+            ),
+            [True, False],
+        )
+
+    # Each participant is decided once, by one of the decisions
+    assert not set(allowed) & set(denied)
+    assert sorted([*allowed, *denied]) == sorted(participant_ids)
+
+    for participant_id in participant_ids:
+        participant = lobby_service.get_participant(room.id, participant_id)
+        expected_status = (
+            LobbyParticipantStatus.ACCEPTED
+            if participant_id in allowed
+            else LobbyParticipantStatus.DENIED
+        )
+        assert participant.status == expected_status
+
+
+def test_handle_participants_entry_skips_decided_participants(lobby_service, room):
+    """Test deciding on the whole lobby leaves already decided participants as is."""
+    lobby_service.enter(room.id, "participant-1", "user1")
+    lobby_service.enter(room.id, "participant-2", "user2")
+    lobby_service.handle_participant_entry(room.id, "participant-1", allow_entry=False)
+
+    results = lobby_service.handle_participants_entry(room.id, allow_entry=True)
+
+    assert results == {"participant-2": LobbyParticipantStatus.ACCEPTED}
+    assert (
+        lobby_service.get_participant(room.id, "participant-1").status
+        == LobbyParticipantStatus.DENIED
+    )
+
+
+def test_handle_participant_entry_does_not_create_participant(lobby_service, room):
+    """Test deciding on a participant that left the lobby does not bring it back."""
+    results = lobby_service.handle_participants_entry(
+        room.id, allow_entry=True, participant_ids=["participant-1"]
+    )
+
+    assert results == {"participant-1": None}
+    assert lobby_service.get_participant(room.id, "participant-1") is None
+    assert lobby_service._get_indexed_participant_ids(room.id) == []
+
+
+def test_scripts_registered_once(lobby_service, room):
+    """Test Lua scripts are registered once, then reused by every service."""
+    client = lobby_service._get_redis_client()
+
+    with (
+        mock.patch.dict(utils._redis_scripts, clear=True),
+        mock.patch.object(LobbyService, "_get_redis_client", return_value=client),
+        mock.patch.object(
+            client, "register_script", wraps=client.register_script
+        ) as mock_register_script,
+    ):
+        lobby_service.enter(room.id, "participant-1", "user1")
+        lobby_service.enter(room.id, "participant-2", "user2")
+        LobbyService().enter(room.id, "participant-3", "user3")
+
+    mock_register_script.assert_called_once_with(ENTER_SCRIPT)
+    assert lobby_service.get_participant(room.id, "participant-3") is not None
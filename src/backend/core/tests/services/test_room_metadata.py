@@ -0,0 +1,335 @@
+"""
+Test room metadata service.
+"""
+
+# pylint: disable=W0621,W0613,W0212
+
+import uuid
+from unittest import mock
+
+from django.core.cache import cache
+
+import pytest
+
+from core.services.room_metadata import RoomMetadataService
+from core.tasks import flush_room_metadata
+from core.utils import MetadataUpdateException
+
+
+@pytest.fixture
+def room_metadata_service():
+    """Return a RoomMetadataService instance."""
+    return RoomMetadataService()
+
+
+@pytest.fixture
+def room_name():
+    """Return the name of a room, cleaning its cached metadata afterwards."""
+    room_name = str(uuid.uuid4())
+    yield room_name
+    cache.delete(RoomMetadataService._get_cache_key(room_name))
+
+
+@pytest.fixture
+def mock_get_room_metadata():
+    """Mock reading room's metadata from LiveKit."""
+    with mock.patch(
+        "core.utils.get_room_metadata", return_value={"foo": "bar"}
+    ) as mocked:
+        yield mocked
+
+
+@pytest.fixture
+def mock_set_room_metadata():
+    """Mock writing room's metadata to LiveKit."""
+    with mock.patch("core.utils.set_room_metadata") as mocked:
+        yield mocked
+
+
+@pytest.fixture(autouse=True)
+def mock_schedule_flush():
+    """Mock scheduling flushes, run right away by eager celery tasks otherwise."""
+    with mock.patch.object(flush_room_metadata, "apply_async") as mocked:
+        yield mocked
+
+
+def test_update_merges_metadata(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test values are merged into the room's existing metadata."""
+    room_metadata_service.update(room_name, {"recording_status": "started"})
+
+    mock_get_room_metadata.assert_called_once_with(room_name)
+    mock_set_room_metadata.assert_called_once_with(
+        room_name, {"foo": "bar", "recording_status": "started"}
+    )
+
+
+def test_update_removes_keys(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test keys to remove are dropped from the room's metadata."""
+    room_metadata_service.update(
+        room_name, {"recording_mode": "transcript"}, ["foo", "unknown"]
+    )
+
+    mock_set_room_metadata.assert_called_once_with(
+        room_name, {"recording_mode": "transcript"}
+    )
+
+
+def test_update_reads_livekit_once(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test the last written metadata is cached between updates."""
+    room_metadata_service.update(
+        room_name, {"recording_mode": "transcript", "recording_status": "starting"}
+    )
+    room_metadata_service.update(room_name, {"recording_status": "started"})
+    room_metadata_service.update(room_name, {}, ["recording_mode", "recording_status"])
+
+    mock_get_room_metadata.assert_called_once_with(room_name)
+    assert mock_set_room_metadata.call_args_list == [
+        mock.call(
+            room_name,
+            {
+                "foo": "bar",
+                "recording_mode": "transcript",
+                "recording_status": "starting",
+            },
+        ),
+        mock.call(
+            room_name,
+            {
+                "foo": "bar",
+                "recording_mode": "transcript",
+                "recording_status": "started",
+            },
+        ),
+        mock.call(room_name, {"foo": "bar"}),
+    ]
+    assert cache.get(room_metadata_service._get_cache_key(room_name)) == {
+        "metadata": {"foo": "bar"},
+    }
+
+
+def test_update_nothing(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test empty updates are not written."""
+    room_metadata_service.update(room_name, {})
+
+    mock_get_room_metadata.assert_not_called()
+    mock_set_room_metadata.assert_not_called()
+
+
+def test_update_room_not_running(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test nothing is written, nor cached, for rooms not running in LiveKit."""
+    mock_get_room_metadata.return_value = None
+
+    room_metadata_service.update(room_name, {"recording_status": "started"})
+
+    mock_set_room_metadata.assert_not_called()
+    assert cache.get(room_metadata_service._get_cache_key(room_name)) is None
+
+
+def test_update_coalesces_concurrent_updates(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test updates made while flushing are merged, and written by the flusher."""
+
+    def concurrent_updates(*args):
+        if mock_set_room_metadata.call_count == 1:
+            # Other processes update the room while the first write is in flight
+            other_service = RoomMetadataService()
+            other_service.update(room_name, {"recording_status": "started"})
+            other_service.update(room_name, {"recording_mode": "transcript"})
+            other_service.update(room_name, {}, ["foo"])
+
+    mock_set_room_metadata.side_effect = concurrent_updates
+
+    room_metadata_service.update(room_name, {"recording_status": "starting"})
+
+    mock_get_room_metadata.assert_called_once_with(room_name)
+    assert mock_set_room_metadata.call_args_list == [
+        mock.call(room_name, {"foo": "bar", "recording_status": "starting"}),
+        mock.call(
+            room_name, {"recording_status": "started", "recording_mode": "transcript"}
+        ),
+    ]
+
+
+def test_update_error(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test failed writes forget the cached metadata and release the flush lock."""
+    room_metadata_service.update(room_name, {"recording_status": "starting"})
+    mock_set_room_metadata.side_effect = MetadataUpdateException("Error")
+
+    with pytest.raises(MetadataUpdateException):
+        room_metadata_service.update(room_name, {"recording_status": "started"})
+
+    assert cache.get(room_metadata_service._get_cache_key(room_name)) is None
+
+    mock_set_room_metadata.side_effect = None
+    room_metadata_service.update(room_name, {"recording_status": "saving"})
+
+    assert mock_get_room_metadata.call_count == 2
+    mock_set_room_metadata.assert_called_with(
+        room_name, {"foo": "bar", "recording_status": "saving"}
+    )
+
+
+def test_update_error_keeps_changes_pending(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test changes that failed to be written are written by the next update."""
+    mock_set_room_metadata.side_effect = MetadataUpdateException("Error")
+
+    with pytest.raises(MetadataUpdateException):
+        room_metadata_service.update(
+            room_name, {"recording_mode": "transcript", "recording_status": "started"}
+        )
+
+    mock_set_room_metadata.side_effect = None
+    room_metadata_service.update(room_name, {"recording_status": "saving"})
+
+    mock_set_room_metadata.assert_called_with(
+        room_name,
+        {"foo": "bar", "recording_mode": "transcript", "recording_status": "saving"},
+    )
+
+
+def test_update_error_keeps_newer_changes(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test restored changes do not override changes made during the failed write."""
+
+    def concurrent_update(*args):
+        RoomMetadataService().update(room_name, {"recording_status": "started"})
+        raise MetadataUpdateException("Error")
+
+    mock_set_room_metadata.side_effect = concurrent_update
+
+    with pytest.raises(MetadataUpdateException):
+        room_metadata_service.update(room_name, {"recording_status": "starting"})
+
+    mock_set_room_metadata.side_effect = None
+    room_metadata_service.update(room_name, {"recording_mode": "transcript"})
+
+    mock_set_room_metadata.assert_called_with(
+        room_name,
+        {"foo": "bar", "recording_status": "started", "recording_mode": "transcript"},
+    )
+
+
+def test_update_error_schedules_flush(
+    room_metadata_service,
+    room_name,
+    mock_get_room_metadata,
+    mock_set_room_metadata,
+    mock_schedule_flush,
+):
+    """Test failed writes are retried later, in a celery worker."""
+    mock_set_room_metadata.side_effect = MetadataUpdateException("Error")
+
+    with pytest.raises(MetadataUpdateException):
+        room_metadata_service.update(room_name, {"recording_status": "started"})
+
+    mock_schedule_flush.assert_called_once()
+    assert mock_schedule_flush.call_args.kwargs["kwargs"] == {
+        "room_name": room_name,
+        "attempt": 1,
+    }
+
+
+def test_update_unexpected_error_keeps_changes_pending(
+    room_metadata_service,
+    room_name,
+    mock_get_room_metadata,
+    mock_set_room_metadata,
+    mock_schedule_flush,
+):
+    """Test any error puts changes back and releases the flush lock."""
+    mock_set_room_metadata.side_effect = RuntimeError("Boom")
+
+    with pytest.raises(RuntimeError):
+        room_metadata_service.update(room_name, {"recording_status": "started"})
+
+    mock_schedule_flush.assert_called_once()
+
+    mock_set_room_metadata.side_effect = None
+    room_metadata_service.update(room_name, {"recording_mode": "transcript"})
+
+    mock_set_room_metadata.assert_called_with(
+        room_name,
+        {"foo": "bar", "recording_status": "started", "recording_mode": "transcript"},
+    )
+
+
+def test_flush_writes_pending_changes(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test flushing writes changes left pending by a failed write."""
+    mock_set_room_metadata.side_effect = MetadataUpdateException("Error")
+
+    with pytest.raises(MetadataUpdateException):
+        room_metadata_service.update(room_name, {"recording_status": "started"})
+
+    mock_set_room_metadata.side_effect = None
+    RoomMetadataService().flush(room_name)
+
+    mock_set_room_metadata.assert_called_with(
+        room_name, {"foo": "bar", "recording_status": "started"}
+    )
+    mock_set_room_metadata.reset_mock()
+
+    RoomMetadataService().flush(room_name)
+
+    mock_set_room_metadata.assert_not_called()
+
+
+def test_flush_while_flushing(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test flushing leaves pending changes to the process already flushing."""
+
+    def concurrent_flush(*args):
+        if mock_set_room_metadata.call_count == 1:
+            RoomMetadataService().update(room_name, {"recording_status": "started"})
+            RoomMetadataService().flush(room_name)
+
+    mock_set_room_metadata.side_effect = concurrent_flush
+
+    room_metadata_service.update(room_name, {"recording_status": "starting"})
+
+    assert mock_set_room_metadata.call_args_list == [
+        mock.call(room_name, {"foo": "bar", "recording_status": "starting"}),
+        mock.call(room_name, {"foo": "bar", "recording_status": "started"}),
+    ]
+
+
+def test_lock_timeout_outlasts_livekit_client(settings):
+    """Test the flush lock is held longer than reading then writing metadata."""
+    settings.LIVEKIT_CLIENT_TIMEOUT = 60
+    settings.ROOM_METADATA_LOCK_TIMEOUT = 10
+
+    assert RoomMetadataService._get_lock_timeout() == 121000
+
+    settings.ROOM_METADATA_LOCK_TIMEOUT = 300
+
+    assert RoomMetadataService._get_lock_timeout() == 300000
+
+
+def test_clear(
+    room_metadata_service, room_name, mock_get_room_metadata, mock_set_room_metadata
+):
+    """Test clearing the room's metadata reads it from LiveKit on the next update."""
+    room_metadata_service.update(room_name, {"recording_status": "starting"})
+
+    room_metadata_service.clear(room_name)
+    room_metadata_service.update(room_name, {"recording_status": "started"})
+
+    assert mock_get_room_metadata.call_count == 2
@@ -2,13 +2,17 @@
 Test telephony service.
 """
 
-# pylint: disable=W0212
+# pylint: disable=W0212,E0611
 
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import pytest
 from asgiref.sync import async_to_sync
-from livekit.api import TwirpError
+from livekit.api import ListRoomsResponse, TwirpError
+from livekit.api import Room as LiveKitRoom
 from livekit.protocol.sip import (
     CreateSIPDispatchRuleRequest,
     DeleteSIPDispatchRuleRequest,
@@ -19,7 +23,7 @@ from livekit.protocol.sip import (
 )
 
 from core.factories import RoomFactory
-from core.models import RoomAccessLevel
+from core.models import Room, RoomAccessLevel
 from core.services.telephony import TelephonyException, TelephonyService
 
 pytestmark = pytest.mark.django_db
@@ -49,7 +53,9 @@ def test_create_dispatch_rule_success(mock_client_factory):
     room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED, pin_code="1234")
 
     mock_api = create_mock_livekit_client()
-    mock_api.sip.create_sip_dispatch_rule = mock.AsyncMock()
+    mock_api.sip.create_sip_dispatch_rule = mock.AsyncMock(
+        return_value=SIPDispatchRuleInfo(sip_dispatch_rule_id="rule-1")
+    )
     mock_client_factory.return_value = mock_api
 
     telephony_service.create_dispatch_rule(room)
@@ -63,6 +69,53 @@ def test_create_dispatch_rule_success(mock_client_factory):
     assert create_request.rule.dispatch_rule_direct.pin == str(room.pin_code)
     mock_api.aclose.assert_called_once()
 
+    assert telephony_service._get_recorded_rules_ids(room.id) == ["rule-1"]
+
+
+@mock.patch("core.utils.create_livekit_client")
+def test_create_dispatch_rule_records_id_outside_event_loop(mock_client_factory):
+    """Test the rule ID is not recorded from the shared LiveKit event loop."""
+    telephony_service = TelephonyService()
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED, pin_code="1234")
+
+    mock_api = create_mock_livekit_client()
+    mock_api.sip.create_sip_dispatch_rule = mock.AsyncMock(
+        return_value=SIPDispatchRuleInfo(sip_dispatch_rule_id="rule-1")
+    )
+    mock_client_factory.return_value = mock_api
+
+    def record_dispatch_rule_id(*args):
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+
+    with mock.patch.object(
+        telephony_service,
+        "_record_dispatch_rule_id",
+        side_effect=record_dispatch_rule_id,
+    ) as mock_record:
+        telephony_service.create_dispatch_rule(room)
+
+    mock_record.assert_called_once_with(room.pk, "rule-1")
+
+
+def test_record_dispatch_rule_id_concurrently():
+    """Test IDs recorded at once for a room are all kept."""
+    telephony_service = TelephonyService()
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED, pin_code="1234")
+    rules_ids = [f"rule-{i}" for i in range(10)]
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        list(
+            executor.map(
+                lambda rule_id: telephony_service._record_dispatch_rule_id(
+                    room.id, rule_id
+                ),
+                rules_ids,
+            )
+        )
+
+    assert telephony_service._get_recorded_rules_ids(room.id) == sorted(rules_ids)
+
 
 @mock.patch("core.utils.create_livekit_client")
 def test_create_dispatch_rule_api_failure(mock_client_factory):
@@ -81,6 +134,7 @@ def test_create_dispatch_rule_api_failure(mock_client_factory):
 
     mock_api.sip.create_sip_dispatch_rule.assert_called_once()
     mock_api.aclose.assert_called_once()
+    assert telephony_service._get_recorded_rules_ids(room.id) is None
 
 
 @mock.patch("core.utils.create_livekit_client")
@@ -303,3 +357,348 @@ def test_delete_dispatch_rule_api_failure(mock_client_factory, mock_list_rules):
 
     mock_api.sip.delete_sip_dispatch_rule.assert_called_once()
     mock_api.aclose.assert_called_once()
+
+
+@mock.patch("core.services.telephony.TelephonyService._list_dispatch_rules_ids")
+@mock.patch("core.utils.create_livekit_client")
+def test_delete_dispatch_rule_recorded(mock_client_factory, mock_list_rules):
+    """Test rules recorded at creation are deleted by ID, without listing rules."""
+    telephony_service = TelephonyService()
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED, pin_code="1234")
+
+    mock_api = create_mock_livekit_client()
+    mock_api.sip.create_sip_dispatch_rule = mock.AsyncMock(
+        side_effect=[
+            SIPDispatchRuleInfo(sip_dispatch_rule_id="rule-1"),
+            SIPDispatchRuleInfo(sip_dispatch_rule_id="rule-2"),
+        ]
+    )
+    mock_api.sip.delete_sip_dispatch_rule = mock.AsyncMock()
+    mock_client_factory.return_value = mock_api
+
+    telephony_service.create_dispatch_rule(room)
+    telephony_service.create_dispatch_rule(room)
+    result = telephony_service.delete_dispatch_rule(room.id)
+
+    assert result is True
+    mock_list_rules.assert_not_called()
+    assert [
+        call_args[1]["delete"].sip_dispatch_rule_id
+        for call_args in mock_api.sip.delete_sip_dispatch_rule.call_args_list
+    ] == ["rule-1", "rule-2"]
+    assert telephony_service._get_recorded_rules_ids(room.id) is None
+
+    # Forgotten rules are looked for on the next deletion
+    mock_list_rules.return_value = []
+    assert telephony_service.delete_dispatch_rule(room.id) is False
+    mock_list_rules.assert_called_once_with(room.id)
+
+
+@mock.patch("core.services.telephony.TelephonyService._list_dispatch_rules_ids")
+@mock.patch("core.utils.create_livekit_client")
+def test_delete_dispatch_rule_recorded_already_deleted(
+    mock_client_factory, mock_list_rules
+):
+    """Test recorded rules already deleted in LiveKit are skipped."""
+    telephony_service = TelephonyService()
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED, pin_code="1234")
+    telephony_service._record_dispatch_rule_id(room.id, "rule-1")
+    telephony_service._record_dispatch_rule_id(room.id, "rule-2")
+
+    mock_api = create_mock_livekit_client()
+    mock_api.sip.delete_sip_dispatch_rule = mock.AsyncMock(
+        side_effect=[TwirpError(msg="Not found", code=404, status=404), None]
+    )
+    mock_client_factory.return_value = mock_api
+
+    result = telephony_service.delete_dispatch_rule(room.id)
+
+    assert result is True
+    mock_list_rules.assert_not_called()
+    assert mock_api.sip.delete_sip_dispatch_rule.call_count == 2
+    assert telephony_service._get_recorded_rules_ids(room.id) is None
+
+
+@mock.patch("core.services.telephony.TelephonyService._list_dispatch_rules_ids")
+@mock.patch("core.utils.create_livekit_client")
+def test_delete_dispatch_rule_recorded_failure(mock_client_factory, mock_list_rules):
+    """Test recorded rules are kept when their deletion fails."""
+    telephony_service = TelephonyService()
+    room = RoomFactory(access_level=RoomAccessLevel.RESTRICTED, pin_code="1234")
+    telephony_service._record_dispatch_rule_id(room.id, "rule-1")
+
+    mock_api = create_mock_livekit_client()
+    mock_api.sip.delete_sip_dispatch_rule = mock.AsyncMock(
+        side_effect=TwirpError(msg="Internal server error", code=500, status=500)
+    )
+    mock_client_factory.return_value = mock_api
+
+    with pytest.raises(TelephonyException, match="Could not delete dispatch rules"):
+        telephony_service.delete_dispatch_rule(room.id)
+
+    mock_list_rules.assert_not_called()
+    assert telephony_service._get_recorded_rules_ids(room.id) == ["rule-1"]
+
+
+def mock_reconciliation_client(mock_client_factory, rules, running_rooms):
+    """Mock the LiveKit client listing the given rules and running rooms."""
+    mock_api = create_mock_livekit_client()
+    mock_api.room = mock.Mock()
+    mock_api.sip.list_sip_dispatch_rule = mock.AsyncMock(
+        return_value=ListSIPDispatchRuleResponse(items=rules)
+    )
+    mock_api.room.list_rooms = mock.AsyncMock(
+        return_value=ListRoomsResponse(
+            rooms=[LiveKitRoom(name=name) for name in running_rooms]
+        )
+    )
+    mock_api.sip.delete_sip_dispatch_rule = mock.AsyncMock()
+    mock_api.sip.create_sip_dispatch_rule = mock.AsyncMock(
+        side_effect=lambda create: SIPDispatchRuleInfo(
+            sip_dispatch_rule_id=f"created-{create.name}"
+        )
+    )
+    mock_client_factory.return_value = mock_api
+    return mock_api
+
+
+@mock.patch("core.utils.create_livekit_client")
+def test_reconcile_dispatch_rules(mock_client_factory, django_assert_num_queries):
+    """Test orphan and duplicated rules are deleted, and missing rules created."""
+    telephony_service = TelephonyService()
+    running_room = RoomFactory(pin_code="1111")
+    duplicated_room = RoomFactory(pin_code="2222")
+    missing_room = RoomFactory(pin_code="3333")
+    finished_room = RoomFactory(pin_code="4444")
+    room_without_pin = RoomFactory()
+    Room.objects.filter(pk=room_without_pin.pk).update(pin_code=None)
+    unknown_room_id = "00000000-0000-0000-0000-000000000000"
+    telephony_service._record_dispatch_rule_id(finished_room.id, "rule-finished")
+
+    mock_api = mock_reconciliation_client(
+        mock_client_factory,
+        rules=[
+            SIPDispatchRuleInfo(
+                sip_dispatch_rule_id="rule-running", name=f"SIP_{running_room.id}"
+            ),
+            SIPDispatchRuleInfo(
+                sip_dispatch_rule_id="rule-duplicated-1",
+                name=f"SIP_{duplicated_room.id}",
+            ),
+            SIPDispatchRuleInfo(
+                sip_dispatch_rule_id="rule-duplicated-2",
+                name=f"SIP_{duplicated_room.id}",
+            ),
+            SIPDispatchRuleInfo(
+                sip_dispatch_rule_id="rule-finished", name=f"SIP_{finished_room.id}"
+            ),
+            SIPDispatchRuleInfo(
+                sip_dispatch_rule_id="rule-unknown", name=f"SIP_{unknown_room_id}"
+            ),
+            SIPDispatchRuleInfo(sip_dispatch_rule_id="rule-other", name="OTHER_RULE"),
+        ],
+        running_rooms=[
+            str(running_room.id),
+            str(duplicated_room.id),
+            str(missing_room.id),
+            str(room_without_pin.id),
+            "not-a-uuid",
+        ],
+    )
+
+    with django_assert_num_queries(1):
+        report = telephony_service.reconcile_dispatch_rules()
+
+    assert report.rules == 6
+    assert report.running_rooms == 5
+    assert report.deleted == 3
+    assert report.created == 1
+    assert report.failed == 0
+    assert set(report.timings) == {"list", "query", "apply"}
+
+    assert {
+        call_args[1]["delete"].sip_dispatch_rule_id
+        for call_args in mock_api.sip.delete_sip_dispatch_rule.call_args_list
+    } == {"rule-duplicated-2", "rule-finished", "rule-unknown"}
+    mock_api.sip.create_sip_dispatch_rule.assert_called_once()
+    create_request = mock_api.sip.create_sip_dispatch_rule.call_args[1]["create"]
+    assert create_request.name == f"SIP_{missing_room.id}"
+    assert create_request.rule.dispatch_rule_direct.room_name == str(missing_room.id)
+    assert create_request.rule.dispatch_rule_direct.pin == "3333"
+
+    # One client lists rules before running rooms, another one lists rules again
+    # before creating missing ones, and a last one applies changes
+    assert mock_client_factory.call_count == 3
+    assert [name for name, *_ in mock_api.mock_calls if "list" in name] == [
+        "sip.list_sip_dispatch_rule",
+        "room.list_rooms",
+        "sip.list_sip_dispatch_rule",
+    ]
+
+    # Recorded IDs match the rules left
+    assert telephony_service._get_recorded_rules_ids(finished_room.id) is None
+    assert telephony_service._get_recorded_rules_ids(duplicated_room.id) == [
+        "rule-duplicated-1"
+    ]
+    assert telephony_service._get_recorded_rules_ids(missing_room.id) == [
+        f"created-SIP_{missing_room.id}"
+    ]
+
+
+@mock.patch("core.utils.create_livekit_client")
+def test_reconcile_dispatch_rules_room_started_meanwhile(mock_client_factory):
+    """Test no rule is created for a room which got one since rules were listed."""
+    telephony_service = TelephonyService()
+    room = RoomFactory(pin_code="1111")
+
+    mock_api = mock_reconciliation_client(
+        mock_client_factory, rules=[], running_rooms=[str(room.id)]
+    )
+    mock_api.sip.list_sip_dispatch_rule.side_effect = [
+        ListSIPDispatchRuleResponse(items=[]),
+        ListSIPDispatchRuleResponse(
+            items=[
+                SIPDispatchRuleInfo(
+                    sip_dispatch_rule_id="rule-webhook", name=f"SIP_{room.id}"
+                )
+            ]
+        ),
+    ]
+
+    report = telephony_service.reconcile_dispatch_rules()
+
+    assert report.created == 0
+    assert report.failed == 0
+    mock_api.sip.create_sip_dispatch_rule.assert_not_called()
+
+
+@mock.patch("core.utils.create_livekit_client")
+def test_reconcile_dispatch_rules_merges_recorded_ids(mock_client_factory):
+    """Test IDs recorded by webhooks during a reconciliation are kept."""
+    telephony_service = TelephonyService()
+    running_room = RoomFactory(pin_code="1111")
+    finished_room = RoomFactory(pin_code="2222")
+
+    mock_api = mock_reconciliation_client(
+        mock_client_factory,
+        rules=[
+            SIPDispatchRuleInfo(
+                sip_dispatch_rule_id="rule-running", name=f"SIP_{running_room.id}"
+            ),
+            SIPDispatchRuleInfo(
+                sip_dispatch_rule_id="rule-finished", name=f"SIP_{finished_room.id}"
+            ),
+        ],
+        running_rooms=[str(running_room.id)],
+    )
+
+    async def delete_sip_dispatch_rule(delete):
+        # Webhooks record rules while the reconciliation is running
+        await asyncio.to_thread(
+            telephony_service._record_dispatch_rule_id,
+            running_room.id,
+            "rule-running-webhook",
+        )
+        await asyncio.to_thread(
+            telephony_service._record_dispatch_rule_id,
+            finished_room.id,
+            "rule-restarted",
+        )
+
+    mock_api.sip.delete_sip_dispatch_rule.side_effect = delete_sip_dispatch_rule
+
+    report = telephony_service.reconcile_dispatch_rules()
+
+    assert report.deleted == 1
+    assert telephony_service._get_recorded_rules_ids(running_room.id) == [
+        "rule-running",
+        "rule-running-webhook",
+    ]
+    assert telephony_service._get_recorded_rules_ids(finished_room.id) == [
+        "rule-restarted"
+    ]
+
+
+@mock.patch("core.utils.create_livekit_client")
+def test_reconcile_dispatch_rules_bounded_concurrency(mock_client_factory, settings):
+    """Test rules are deleted concurrently, up to the configured limit."""
+    settings.TELEPHONY_RECONCILIATION_MAX_CONCURRENCY = 3
+    in_flight = []
+    max_in_flight = 0
+
+    async def delete_sip_dispatch_rule(delete):
+        nonlocal max_in_flight
+        in_flight.append(delete.sip_dispatch_rule_id)
+        max_in_flight = max(max_in_flight, len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(delete.sip_dispatch_rule_id)
+
+    mock_api = mock_reconciliation_client(
+        mock_client_factory,
+        rules=[
+            SIPDispatchRuleInfo(
+                sip_dispatch_rule_id=f"rule-{i}", name=f"SIP_{uuid.uuid4()}"
+            )
+            for i in range(10)
+        ],
+        running_rooms=[],
+    )
+    mock_api.sip.delete_sip_dispatch_rule.side_effect = delete_sip_dispatch_rule
+
+    report = TelephonyService().reconcile_dispatch_rules()
+
+    assert report.deleted == 10
+    assert max_in_flight == 3
+
+
+@mock.patch("core.utils.create_livekit_client")
+def test_reconcile_dispatch_rules_failures(mock_client_factory):
+    """Test failures are counted, without stopping other rules from being fixed."""
+    telephony_service = TelephonyService()
+    missing_room = RoomFactory(pin_code="1111")
+
+    mock_api = mock_reconciliation_client(
+        mock_client_factory,
+        rules=[
+            SIPDispatchRuleInfo(
+                sip_dispatch_rule_id=rule_id, name=f"SIP_{uuid.uuid4()}"
+            )
+            for rule_id in ["rule-gone", "rule-failing", "rule-deleted"]
+        ],
+        running_rooms=[str(missing_room.id)],
+    )
+
+    async def delete_sip_dispatch_rule(delete):
+        if delete.sip_dispatch_rule_id == "rule-gone":
+            raise TwirpError(msg="Not found", code=404, status=404)
+        if delete.sip_dispatch_rule_id == "rule-failing":
+            raise TwirpError(msg="Internal server error", code=500, status=500)
+
+    mock_api.sip.delete_sip_dispatch_rule.side_effect = delete_sip_dispatch_rule
+    mock_api.sip.create_sip_dispatch_rule.side_effect = TwirpError(
+        msg="Internal server error", code=500, status=500
+    )
+
+    report = telephony_service.reconcile_dispatch_rules()
+
+    assert report.deleted == 2
+    assert report.created == 0
+    assert report.failed == 2
+    assert telephony_service._get_recorded_rules_ids(missing_room.id) is None
+
+
+@mock.patch("core.utils.create_livekit_client")
+def test_reconcile_dispatch_rules_list_failure(mock_client_factory):
+    """Test nothing is deleted when rules or rooms can't be listed."""
+    mock_api = mock_reconciliation_client(
+        mock_client_factory, rules=[], running_rooms=[]
+    )
+    mock_api.room.list_rooms.side_effect = TwirpError(
+        msg="Internal server error", code=500, status=500
+    )
+
+    with pytest.raises(TelephonyException, match="Could not list dispatch rules"):
+        TelephonyService().reconcile_dispatch_rules()
+
+    mock_api.sip.delete_sip_dispatch_rule.assert_not_called()
+    mock_api.aclose.assert_called_once()
@@ -0,0 +1,76 @@
+"""
+Test the frontend configuration API endpoint in the Meet core app.
+"""
+
+from unittest import mock
+
+import pytest
+from rest_framework.test import APIClient
+
+from core import factories
+from core.api import _get_frontend_configuration
+
+pytestmark = pytest.mark.django_db
+
+
+def test_api_config_anonymous(settings):
+    """The configuration should be served with a strong ETag and cache headers."""
+    settings.FRONTEND_CONFIGURATION_MAX_AGE = 30
+
+    response = APIClient().get("/api/v1.0/config/")
+
+    assert response.status_code == 200
+    assert response.json()["LANGUAGE_CODE"] == settings.LANGUAGE_CODE
+    assert response["ETag"].startswith('"')
+    assert response["Cache-Control"] == "public, max-age=30"
+
+
+def test_api_config_computed_once():
+    """The configuration should be built once, not on every request."""
+    client = APIClient()
+    client.get("/api/v1.0/config/")
+
+    with mock.patch("core.api.JSONRenderer") as mock_renderer:
+        response = client.get("/api/v1.0/config/")
+
+    assert response.status_code == 200
+    mock_renderer.assert_not_called()
+
+
+def test_api_config_not_modified(django_assert_num_queries):
+    """A known ETag should be answered with a 304, without loading the session."""
+    client = APIClient()
+    client.force_login(factories.UserFactory())
+    etag = client.get("/api/v1.0/config/")["ETag"]
+
+    with (
+        mock.patch(
+            "django.contrib.sessions.backends.cache.SessionStore.load"
+        ) as mock_load_session,
+        django_assert_num_queries(0),
+    ):
+        response = client.get(
+            "/api/v1.0/config/", HTTP_IF_NONE_MATCH=f'"other", W/{etag}'
+        )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response["ETag"] == etag
+    mock_load_session.assert_not_called()
+
+
+def test_api_config_etag_changes_with_settings(settings):
+    """Changing a setting the configuration is built from should change its ETag."""
+    client = APIClient()
+    etag = client.get("/api/v1.0/config/")["ETag"]
+
+    # Settings only change when the process restarts
+    settings.ROOM_SUBTITLE_ENABLED = not settings.ROOM_SUBTITLE_ENABLED
+    _get_frontend_configuration.cache_clear()
+
+    response = client.get("/api/v1.0/config/", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert response.json()["subtitle"]["enabled"] == settings.ROOM_SUBTITLE_ENABLED
+    assert _get_frontend_configuration()[1] == response["ETag"]
@@ -226,6 +226,35 @@ def test_api_room_user_accesses_list_pagination(_mock_page_size):
     assert access_ids == []
 
 
+def test_api_room_user_accesses_list_pagination_cursor():
+    """Passing a cursor should paginate accesses on their creation date, without count."""
+
+    user = UserFactory()
+    client = APIClient()
+    client.force_login(user)
+
+    room = RoomFactory()
+    accesses = [
+        UserResourceAccessFactory(resource=room, user=user, role="owner"),
+        *UserResourceAccessFactory.create_batch(2, resource=room),
+    ]
+    expected_ids = [str(access.id) for access in reversed(accesses)]
+
+    response = client.get("/api/v1.0/resource-accesses/?cursor=&page_size=2")
+
+    assert response.status_code == 200
+    content = response.json()
+    assert "count" not in content
+    assert [item["id"] for item in content["results"]] == expected_ids[:2]
+
+    response = client.get(content["next"])
+
+    assert response.status_code == 200
+    content = response.json()
+    assert content["next"] is None
+    assert [item["id"] for item in content["results"]] == expected_ids[2:]
+
+
 # Retrieve
 
 
@@ -868,7 +897,7 @@ def test_api_room_user_access_delete_members():
     assert ResourceAccess.objects.count() == 2
 
 
-def test_api_room_user_access_delete_administrators():
+def test_api_room_user_access_delete_administrators(django_assert_num_queries):
     """
     Users who are administrators in a room should be allowed to delete a user access
     from the room provided it is not ownership.
@@ -884,9 +913,10 @@ def test_api_room_user_access_delete_administrators():
 
     assert ResourceAccess.objects.count() == 2
     assert ResourceAccess.objects.filter(user=access.user).exists() is True
-    response = client.delete(
-        f"/api/v1.0/resource-accesses/{access.id!s}/",
-    )
+    with django_assert_num_queries(3):
+        response = client.delete(
+            f"/api/v1.0/resource-accesses/{access.id!s}/",
+        )
 
     assert response.status_code == 204
     assert ResourceAccess.objects.count() == 1
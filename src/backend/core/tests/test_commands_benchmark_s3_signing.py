@@ -0,0 +1,19 @@
+"""Test the `benchmark_s3_signing` management command"""
+
+from io import StringIO
+
+from django.core.management import call_command
+
+
+def test_commands_benchmark_s3_signing():
+    """The command should report the throughput of both signing methods."""
+    stdout = StringIO()
+
+    call_command("benchmark_s3_signing", iterations=10, stdout=stdout)
+
+    lines = stdout.getvalue().splitlines()
+    assert [line.split(":")[0] for line in lines] == [
+        "botocore",
+        "S3 signer",
+        "Speedup",
+    ]
@@ -0,0 +1,64 @@
+"""Test the `reconcile_telephony_dispatch_rules` management command"""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+import pytest
+
+from core.services.telephony import (
+    DispatchRulesReconciliation,
+    TelephonyException,
+    TelephonyService,
+)
+
+
+@mock.patch.object(TelephonyService, "reconcile_dispatch_rules")
+def test_commands_reconcile_telephony_dispatch_rules(mock_reconcile, settings):
+    """The command should report counts and timings of the reconciliation."""
+    settings.ROOM_TELEPHONY_ENABLED = True
+    mock_reconcile.return_value = DispatchRulesReconciliation(
+        rules=12,
+        running_rooms=5,
+        deleted=8,
+        created=1,
+        failed=2,
+        timings={"list": 0.1, "query": 0.002, "apply": 0.25},
+    )
+    stdout = StringIO()
+
+    call_command("reconcile_telephony_dispatch_rules", stdout=stdout)
+
+    assert stdout.getvalue().splitlines() == [
+        "Found 12 dispatch rules and 5 running rooms",
+        "Deleted 8 rules, created 1 rules, 2 failed",
+        "Timings (ms): list 100.00, query 2.00, apply 250.00",
+    ]
+
+
+@mock.patch.object(TelephonyService, "reconcile_dispatch_rules")
+def test_commands_reconcile_telephony_dispatch_rules_disabled(mock_reconcile, settings):
+    """The command should refuse to run when telephony is disabled."""
+    settings.ROOM_TELEPHONY_ENABLED = False
+
+    with pytest.raises(CommandError, match="Telephony is not enabled."):
+        call_command("reconcile_telephony_dispatch_rules")
+
+    mock_reconcile.assert_not_called()
+
+
+@mock.patch.object(
+    TelephonyService,
+    "reconcile_dispatch_rules",
+    side_effect=TelephonyException("Could not list dispatch rules"),
+)
+def test_commands_reconcile_telephony_dispatch_rules_error(mock_reconcile, settings):
+    """The command should fail when rules can't be listed."""
+    settings.ROOM_TELEPHONY_ENABLED = True
+
+    with pytest.raises(CommandError, match="Could not list dispatch rules"):
+        call_command("reconcile_telephony_dispatch_rules")
+
+    mock_reconcile.assert_called_once()
@@ -0,0 +1,61 @@
+"""Test the `replay_livekit_events` management command"""
+
+import uuid
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+
+import pytest
+
+from core.services.livekit_events import LiveKitEventsService, api
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def dead_letter_prefix(settings):
+    """Isolate dead-lettered events from other tests."""
+    settings.LIVEKIT_WEBHOOK_KEY_PREFIX = f"livekit-webhook-{uuid.uuid4()}"
+    settings.LIVEKIT_CONFIGURATION = {
+        "api_key": "test_api_key",
+        "api_secret": "test_api_secret",
+        "url": "https://test-livekit.example.com/",
+    }
+
+
+def _event(event_id):
+    """Build a serialized webhook event."""
+    return api.WebhookEvent(
+        id=event_id, event="room_finished", room=api.Room(name=str(uuid.uuid4()))
+    ).SerializeToString()
+
+
+def test_commands_replay_livekit_events():
+    """The command should replay dead-lettered events, oldest first."""
+    service = LiveKitEventsService()
+    service._dead_letter(_event("EV_1"))  # pylint: disable=protected-access
+    service._dead_letter(_event("EV_2"))  # pylint: disable=protected-access
+    stdout = StringIO()
+
+    with mock.patch.object(
+        LiveKitEventsService,
+        "_handle_room_finished",
+        side_effect=[None, ValueError("Boom")],
+    ) as mock_handler:
+        call_command("replay_livekit_events", stdout=stdout)
+
+    assert [call.args[0].id for call in mock_handler.call_args_list] == [
+        "EV_1",
+        "EV_2",
+    ]
+    assert stdout.getvalue() == "Replayed 2 events, 1 failed again\n"
+
+    # The event failing again is kept for the next replay
+    with mock.patch.object(
+        LiveKitEventsService, "_handle_room_finished"
+    ) as mock_handler:
+        call_command("replay_livekit_events", stdout=StringIO())
+
+    mock_handler.assert_called_once()
+    assert mock_handler.call_args.args[0].id == "EV_2"
@@ -0,0 +1,48 @@
+"""Test the `report_recording_admission` management command"""
+
+import uuid
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+
+import pytest
+from freezegun import freeze_time
+
+from core.factories import RecordingFactory
+from core.recording.worker.admission import EgressAdmission
+
+pytestmark = pytest.mark.django_db
+
+
+@mock.patch("core.tasks.start_recording.delay")
+def test_commands_report_recording_admission(mock_delay, settings):
+    """The command should report the admission of each limited mode."""
+    settings.RECORDING_EGRESS_CAPACITY = {"screen_recording": 1}
+    settings.RECORDING_ADMISSION_KEY_PREFIX = f"admission-{uuid.uuid4()}"
+    admission = EgressAdmission()
+    recordings = RecordingFactory.create_batch(3, mode="screen_recording")
+    stdout = StringIO()
+
+    with freeze_time("2025-01-01 12:00:00") as frozen_time:
+        for recording in recordings:
+            admission.admit(recording)
+        frozen_time.move_to("2025-01-01 12:00:40")
+        admission.release(recordings[0])
+
+        call_command("report_recording_admission", stdout=stdout)
+
+    assert stdout.getvalue().splitlines() == [
+        "screen_recording: 1 active out of 1, 1 queued (oldest waiting 40s)",
+        "screen_recording: 2 admitted, waiting 20.0s on average, 40s at most",
+    ]
+
+
+def test_commands_report_recording_admission_unlimited(settings):
+    """The command should tell when egress capacity is not limited."""
+    settings.RECORDING_EGRESS_CAPACITY = {}
+    stdout = StringIO()
+
+    call_command("report_recording_admission", stdout=stdout)
+
+    assert stdout.getvalue() == "Egress capacity is not limited.\n"
@@ -0,0 +1,47 @@
+"""Test the `report_telephony_pin_occupancy` management command"""
+
+from io import StringIO
+
+from django.core.management import call_command
+
+import pytest
+
+from core.factories import RoomFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_commands_report_telephony_pin_occupancy(settings):
+    """The command should report the occupancy of the configured PIN length."""
+    settings.ROOM_TELEPHONY_ENABLED = False
+    settings.ROOM_TELEPHONY_PIN_LENGTH = 4
+    settings.ROOM_TELEPHONY_PIN_BATCH_SIZE = 1
+    settings.ROOM_TELEPHONY_PIN_MAX_RETRIES = 2
+    for i in range(5):
+        RoomFactory(pin_code=f"{i:04d}")
+    stdout = StringIO()
+
+    call_command("report_telephony_pin_occupancy", stdout=stdout)
+
+    assert stdout.getvalue().splitlines() == [
+        "PIN codes of length 4: 5 used out of 10000 (0.0500%)",
+        "Probability for a room to get no PIN code: 0.0000%",
+    ]
+
+
+def test_commands_report_telephony_pin_occupancy_length(settings):
+    """The command should report the occupancy of another PIN length."""
+    settings.ROOM_TELEPHONY_ENABLED = False
+    settings.ROOM_TELEPHONY_PIN_LENGTH = 10
+    settings.ROOM_TELEPHONY_PIN_BATCH_SIZE = 1
+    settings.ROOM_TELEPHONY_PIN_MAX_RETRIES = 1
+    for i in range(5):
+        RoomFactory(pin_code=f"{i:04d}")
+    stdout = StringIO()
+
+    call_command("report_telephony_pin_occupancy", length=4, stdout=stdout)
+
+    assert stdout.getvalue().splitlines() == [
+        "PIN codes of length 4: 5 used out of 10000 (0.0500%)",
+        "Probability for a room to get no PIN code: 0.0500%",
+    ]
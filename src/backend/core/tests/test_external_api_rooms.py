@@ -73,6 +73,31 @@ def test_api_rooms_list_with_valid_token(settings):
     assert response.data["results"][0]["id"] == str(room.id)
 
 
+def test_api_rooms_list_pagination_cursor(settings):
+    """Passing a cursor should paginate rooms without counting them."""
+
+    settings.APPLICATION_JWT_SECRET_KEY = "devKey"
+
+    user = UserFactory()
+    rooms = RoomFactory.create_batch(3, users=[(user, RoleChoices.OWNER)])
+
+    token = generate_test_token(user, [ApplicationScope.ROOMS_LIST])
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    response = client.get("/external-api/v1.0/rooms/?cursor=&page_size=2")
+
+    assert response.status_code == 200
+    assert "count" not in response.data
+    assert len(response.data["results"]) == 2
+
+    response = client.get(response.data["next"])
+
+    assert response.status_code == 200
+    assert response.data["next"] is None
+    assert [result["id"] for result in response.data["results"]] == [str(rooms[0].id)]
+
+
 def test_api_rooms_list_with_expired_token(settings):
     """Listing rooms with expired token should return 401."""
     settings.APPLICATION_JWT_SECRET_KEY = "devKey"
@@ -0,0 +1,204 @@
+"""
+Test the LiveKit pool.
+"""
+
+# pylint: disable=W0621,W0212
+
+import asyncio
+import os
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.livekit_pool import LiveKitPool, livekit_pool, run_in_livekit_loop
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answer all requests with an empty body, keeping connections alive."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Send an empty response."""
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Do not log requests."""
+
+
+@pytest.fixture
+def pool():
+    """Return a LiveKit pool, closed after the test."""
+    pool = LiveKitPool()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def server_url():
+    """Serve HTTP requests from a local server, and return its URL."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+async def _get_running_loop():
+    return asyncio.get_running_loop()
+
+
+def test_livekit_pool_run_persistent_loop(pool):
+    """Test coroutines are all run in the same background event loop."""
+    loop = pool.run(_get_running_loop())
+
+    assert pool.run(_get_running_loop()) is loop
+    assert loop.is_running()
+
+
+def test_livekit_pool_run_exception(pool):
+    """Test exceptions raised by coroutines are propagated to the caller."""
+
+    async def fail():
+        raise ValueError("Boom")
+
+    with pytest.raises(ValueError, match="Boom"):
+        pool.run(fail())
+
+
+def test_livekit_pool_run_from_its_loop(pool):
+    """Test waiting for the pool from its own loop fails instead of deadlocking."""
+
+    async def nested():
+        return pool.run(_get_running_loop())
+
+    with pytest.raises(RuntimeError, match="Cannot wait for the LiveKit pool"):
+        pool.run(nested())
+
+
+def test_livekit_pool_reuses_connections(pool, server_url):
+    """Test connections to LiveKit are kept alive and reused between calls."""
+
+    async def request():
+        session = pool.get_session()
+        async with session.get(server_url) as response:
+            await response.read()
+        return session
+
+    sessions = [pool.run(request()) for _ in range(3)]
+
+    assert sessions[0] is sessions[1] is sessions[2]
+    assert pool.stats() == {
+        "requests": 3,
+        "connections_created": 1,
+        "connections_reused": 2,
+    }
+
+
+def test_livekit_pool_logs_stats_periodically(pool, settings, caplog):
+    """Test the pool logs its counters once the log interval has elapsed."""
+    settings.LIVEKIT_CLIENT_STATS_LOG_INTERVAL = 60
+
+    with caplog.at_level("INFO", logger="core.livekit_pool"):
+        pool.run(_get_running_loop())
+        assert not caplog.records
+
+        pool._stats_logged_at -= 60
+        pool.run(_get_running_loop())
+        pool.run(_get_running_loop())
+
+    assert [record.getMessage() for record in caplog.records] == [
+        f"LiveKit pool stats of process {os.getpid()}: "
+        "{'requests': 0, 'connections_created': 0, 'connections_reused': 0}"
+    ]
+
+
+def test_livekit_pool_stats_logs_disabled(pool, settings, caplog):
+    """Test the pool does not log its counters when the interval is 0."""
+    settings.LIVEKIT_CLIENT_STATS_LOG_INTERVAL = 0
+    pool._stats_logged_at -= 3600
+
+    with caplog.at_level("INFO", logger="core.livekit_pool"):
+        pool.run(_get_running_loop())
+
+    assert not caplog.records
+
+
+@pytest.mark.parametrize("verify_ssl", [True, False])
+def test_livekit_pool_session_ssl(pool, settings, verify_ssl):
+    """Test SSL verification of LiveKit connections follows the settings."""
+    settings.LIVEKIT_VERIFY_SSL = verify_ssl
+
+    async def get_session():
+        return pool.get_session()
+
+    session = pool.run(get_session())
+
+    assert session.connector._ssl is verify_ssl
+    assert session.connector.limit == settings.LIVEKIT_CLIENT_POOL_SIZE
+
+
+def test_livekit_pool_close(pool):
+    """Test closing the pool closes its session and stops its loop."""
+
+    async def get_session():
+        return pool.get_session()
+
+    session = pool.run(get_session())
+    loop = pool.run(_get_running_loop())
+
+    pool.close()
+
+    assert session.closed
+    for _ in range(100):
+        if not loop.is_running():
+            break
+        time.sleep(0.01)
+    assert not loop.is_running()
+    # The pool starts over when used again
+    assert pool.run(_get_running_loop()) is not loop
+
+
+def test_livekit_pool_reset(pool):
+    """Test a reset pool forgets its loop and session, and starts over."""
+    loop = pool.run(_get_running_loop())
+
+    pool.reset()
+
+    assert pool.run(_get_running_loop()) is not loop
+    assert pool.stats()["requests"] == 0
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_livekit_pool_fork():
+    """Test the module's pool keeps working in forked child processes."""
+    livekit_pool.run(_get_running_loop())
+
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        # The parent's loop thread does not exist in the child, don't hang on it
+        signal.alarm(5)
+        try:
+            livekit_pool.run(_get_running_loop())
+        except BaseException:  # noqa: BLE001 # pylint: disable=broad-exception-caught
+            os._exit(1)
+        os._exit(0)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_run_in_livekit_loop():
+    """Test decorated coroutines are run synchronously in the pool's loop."""
+
+    @run_in_livekit_loop
+    async def add(a, b):
+        await asyncio.sleep(0)
+        return a + b, threading.current_thread().name
+
+    assert add(1, 2) == (3, "livekit-pool")
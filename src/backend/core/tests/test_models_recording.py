@@ -2,6 +2,10 @@
 Unit tests for the Recording model
 """
 
+import uuid
+from unittest import mock
+
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 
 import pytest
@@ -9,6 +13,7 @@ import pytest
 from core.factories import (
     RecordingFactory,
     RoomFactory,
+    TeamRecordingAccessFactory,
     UserFactory,
     UserRecordingAccessFactory,
 )
@@ -219,6 +224,67 @@ def test_models_recording_worker_id_very_long():
         RecordingFactory(worker_id=too_long_id)
 
 
+def test_models_recording_unique_initiated_or_active_per_worker():
+    """Only one initiated or active recording should be allowed per worker."""
+    RecordingFactory(worker_id="worker-123", status=RecordingStatusChoices.ACTIVE)
+
+    with pytest.raises(ValidationError):
+        RecordingFactory(worker_id="worker-123", status=RecordingStatusChoices.ACTIVE)
+
+    RecordingFactory(worker_id="worker-123", status=RecordingStatusChoices.SAVED)
+
+
+# Test lookups by worker ID
+
+
+def test_models_recording_get_by_worker_id(django_assert_num_queries):
+    """Recordings should be found by worker ID, caching their ID."""
+    worker_id = f"EG_{uuid.uuid4().hex}"
+    recording = RecordingFactory(worker_id=worker_id)
+
+    with django_assert_num_queries(1):
+        assert Recording.objects.get_by_worker_id(worker_id) == recording
+
+    assert cache.get(f"recording_worker_{worker_id}") == recording.pk
+
+    with django_assert_num_queries(1):
+        found = Recording.objects.get_by_worker_id(worker_id)
+        # The room is fetched along with the recording
+        assert found.room == recording.room
+
+
+def test_models_recording_get_by_worker_id_cached(django_assert_num_queries):
+    """Cached recordings should be fetched by primary key."""
+    worker_id = f"EG_{uuid.uuid4().hex}"
+    recording = RecordingFactory(worker_id=worker_id)
+
+    Recording.objects.cache_worker_id(recording)
+
+    with django_assert_num_queries(1) as context:
+        assert Recording.objects.get_by_worker_id(worker_id) == recording
+
+    assert '"meet_recording"."id" =' in context.captured_queries[0]["sql"]
+
+
+def test_models_recording_get_by_worker_id_stale_cache():
+    """Stale cached recordings should be looked up again by worker ID."""
+    worker_id = f"EG_{uuid.uuid4().hex}"
+    stale_recording = RecordingFactory(worker_id=worker_id)
+    Recording.objects.cache_worker_id(stale_recording)
+    stale_recording.delete()
+
+    recording = RecordingFactory(worker_id=worker_id)
+
+    assert Recording.objects.get_by_worker_id(worker_id) == recording
+    assert cache.get(f"recording_worker_{worker_id}") == recording.pk
+
+
+def test_models_recording_get_by_worker_id_not_found():
+    """Looking up an unknown worker ID should raise DoesNotExist."""
+    with pytest.raises(Recording.DoesNotExist):
+        Recording.objects.get_by_worker_id(f"EG_{uuid.uuid4().hex}")
+
+
 # Test key property method
 
 
@@ -288,3 +354,24 @@ def test_models_recording_is_saved_false_error_states(status):
     """Test is_saved property returns False for error statuses."""
     recording = RecordingFactory(status=status)
     assert recording.is_saved is False
+
+
+def test_models_recording_get_abilities_annotated(django_assert_num_queries):
+    """Roles annotated on recordings, team-based ones included, should be read."""
+    user = UserFactory()
+    recording = RecordingFactory(status=RecordingStatusChoices.SAVED)
+    UserRecordingAccessFactory(recording=recording, user=user, role="member")
+    TeamRecordingAccessFactory(recording=recording, team="lasuite", role="owner")
+    other_recording = RecordingFactory()
+
+    with mock.patch.object(user, "get_teams", return_value=["lasuite"]):
+        with django_assert_num_queries(1):
+            recordings = {
+                recording.pk: recording
+                for recording in Recording.objects.annotate_user_roles(user)
+            }
+
+    with django_assert_num_queries(0):
+        assert sorted(recordings[recording.pk].user_roles) == ["member", "owner"]
+        assert recordings[recording.pk].get_abilities(user)["destroy"] is True
+        assert recordings[other_recording.pk].get_abilities(user)["retrieve"] is False
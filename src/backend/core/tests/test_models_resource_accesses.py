@@ -3,10 +3,12 @@ Unit tests for the ResourceAccess model with user
 """
 
 from django.core.exceptions import ValidationError
+from django.db import connection
 
 import pytest
 
-from core.factories import RoomFactory, UserResourceAccessFactory
+from core.factories import RoomFactory, UserFactory, UserResourceAccessFactory
+from core.models import ResourceAccess
 
 pytestmark = pytest.mark.django_db
 
@@ -60,3 +62,74 @@ def test_models_resource_accesses_user_unique():
     assert "Resource access with this User and Resource already exists." in str(
         excinfo.value
     )
+
+
+def test_models_resource_accesses_get_resource_role(django_assert_num_queries):
+    """The role of a user on the access' resource should be queried if not annotated."""
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "administrator")])
+    access = UserResourceAccessFactory(resource=room, role="member")
+    access = ResourceAccess.objects.get(pk=access.pk)
+
+    with django_assert_num_queries(2):
+        assert access.get_resource_role(user) == "administrator"
+
+
+def test_models_resource_accesses_get_resource_role_annotated(
+    django_assert_num_queries,
+):
+    """Roles annotated on accesses should be read instead of querying the resource."""
+    user = UserFactory()
+    room = RoomFactory(users=[(user, "owner")])
+    access = UserResourceAccessFactory(resource=room, role="member")
+    other_access = UserResourceAccessFactory(role="member")
+
+    with django_assert_num_queries(1):
+        accesses = {
+            access.pk: access
+            for access in ResourceAccess.objects.annotate_user_roles(user)
+        }
+
+    with django_assert_num_queries(0):
+        assert accesses[access.pk].get_resource_role(user) == "owner"
+        assert accesses[other_access.pk].get_resource_role(user) is None
+
+
+def test_models_resource_accesses_filter_administrated_by():
+    """Accesses should be filtered on resources the user administrates or owns."""
+    user = UserFactory()
+    administrated_accesses = []
+    for role in ["administrator", "owner"]:
+        room = RoomFactory()
+        administrated_accesses += [
+            UserResourceAccessFactory(resource=room, user=user, role=role),
+            UserResourceAccessFactory(resource=room),
+        ]
+    member_room = RoomFactory()
+    UserResourceAccessFactory(resource=member_room, user=user, role="member")
+    UserResourceAccessFactory(resource=member_room)
+
+    accesses = ResourceAccess.objects.filter_administrated_by(user)
+
+    assert sorted(access.id for access in accesses) == sorted(
+        access.id for access in administrated_accesses
+    )
+
+
+def test_models_resource_accesses_filter_administrated_by_query_plan():
+    """Roles of the user should be checked from the covering index of accesses alone."""
+    user = UserFactory()
+    UserResourceAccessFactory.create_batch(3, user=user, role="owner")
+
+    # Tables of tests are too small for the planner to prefer indexes
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+    plan = ResourceAccess.objects.filter_administrated_by(user).explain()
+
+    assert (
+        "Index Only Scan using access_user_resource_role_idx on meet_resource_access"
+        in plan
+    )
+    assert "Unique" not in plan
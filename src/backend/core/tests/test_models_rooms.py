@@ -4,17 +4,19 @@ Unit tests for the Room model
 
 # pylint: disable=W0613
 
+import re
 import secrets
 from logging import Logger
 from unittest import mock
 
 from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ValidationError
+from django.db import connection
 
 import pytest
 
-from core.factories import RoomFactory, UserFactory
-from core.models import Room, RoomAccessLevel
+from core.factories import RoomFactory, UserFactory, UserResourceAccessFactory
+from core.models import ResourceAccess, RoleChoices, Room, RoomAccessLevel
 
 pytestmark = pytest.mark.django_db
 
@@ -172,6 +174,36 @@ def test_models_rooms_access_rights_owner_direct(django_assert_num_queries):
         assert room.is_owner(user) is True
 
 
+def test_models_rooms_access_rights_annotated(django_assert_num_queries):
+    """Roles annotated on rooms should be read instead of querying accesses."""
+    user = UserFactory()
+    other_user = UserFactory()
+    owned_room = RoomFactory(users=[(user, "owner"), (other_user, "member")])
+    administrated_room = RoomFactory(users=[(user, "administrator")])
+    other_room = RoomFactory(users=[(other_user, "owner")])
+
+    with django_assert_num_queries(1):
+        rooms = {room.pk: room for room in Room.objects.annotate_user_roles(user).all()}
+
+    with django_assert_num_queries(0):
+        assert rooms[owned_room.pk].get_role(user) == "owner"
+        assert rooms[owned_room.pk].is_owner(user) is True
+        assert rooms[administrated_room.pk].get_role(user) == "administrator"
+        assert rooms[administrated_room.pk].is_administrator_or_owner(user) is True
+        assert rooms[other_room.pk].get_role(user) is None
+        assert rooms[other_room.pk].is_administrator_or_owner(user) is False
+
+
+def test_models_rooms_access_rights_annotated_anonymous():
+    """Rooms should not be annotated for anonymous users."""
+    RoomFactory()
+
+    room = Room.objects.annotate_user_roles(AnonymousUser()).get()
+
+    assert not hasattr(room, "user_roles")
+    assert room.get_role(AnonymousUser()) is None
+
+
 def test_models_rooms_is_public_property():
     """Test the is_public property returns correctly based on access_level."""
     # Test public room
@@ -302,9 +334,9 @@ def test_pin_generation_max_retries(mock_randbelow, mock_logger, settings):
 
     RoomFactory(pin_code="12345")
 
-    # Assert default max retries is low, 5
+    # Assert default max retries is low, 5 batches of 10 candidates
     room1 = RoomFactory()
-    assert mock_randbelow.call_count == 5
+    assert mock_randbelow.call_count == 50
     assert room1.pin_code is None
 
     mock_logger.assert_called_once_with(
@@ -316,7 +348,7 @@ def test_pin_generation_max_retries(mock_randbelow, mock_logger, settings):
     settings.ROOM_TELEPHONY_PIN_MAX_RETRIES = 3
 
     room2 = RoomFactory()
-    assert mock_randbelow.call_count == 3
+    assert mock_randbelow.call_count == 30
     assert room2.pin_code is None
 
     mock_logger.assert_called_once_with(
@@ -324,6 +356,60 @@ def test_pin_generation_max_retries(mock_randbelow, mock_logger, settings):
     )
 
 
+@mock.patch.object(secrets, "randbelow")
+def test_pin_generation_batch(mock_randbelow, settings, django_assert_num_queries):
+    """Pin generation should check a batch of candidates in a single query."""
+
+    settings.ROOM_TELEPHONY_ENABLED = False
+    settings.ROOM_TELEPHONY_PIN_BATCH_SIZE = 4
+
+    RoomFactory(pin_code="11111")
+    RoomFactory(pin_code="22222")
+    mock_randbelow.side_effect = [11111, 22222, 11111, 33333, 44444]
+
+    with django_assert_num_queries(1):
+        pin_code = Room.generate_unique_pin_code(length=5)
+
+    assert pin_code == "33333"
+    assert mock_randbelow.call_count == 4
+
+
+@mock.patch.object(secrets, "randbelow")
+def test_pin_generation_next_batch(mock_randbelow, settings, django_assert_num_queries):
+    """Pin generation should retry with another batch when all candidates are taken."""
+
+    settings.ROOM_TELEPHONY_ENABLED = False
+    settings.ROOM_TELEPHONY_PIN_BATCH_SIZE = 2
+
+    RoomFactory(pin_code="11111")
+    RoomFactory(pin_code="22222")
+    mock_randbelow.side_effect = [11111, 22222, 22222, 33333]
+
+    with django_assert_num_queries(2):
+        pin_code = Room.generate_unique_pin_code(length=5)
+
+    assert pin_code == "33333"
+
+
+def test_pin_code_occupancy(settings):
+    """Pin code occupancy should only count pin codes of the given length."""
+
+    settings.ROOM_TELEPHONY_ENABLED = False
+
+    RoomFactory(pin_code="1234")
+    RoomFactory(pin_code="2345")
+    RoomFactory(pin_code="12345")
+    RoomFactory()
+
+    assert Room.get_pin_code_occupancy(4) == {
+        "length": 4,
+        "used": 2,
+        "capacity": 10000,
+        "occupancy": 0.0002,
+    }
+    assert Room.get_pin_code_occupancy(6)["used"] == 0
+
+
 @mock.patch.object(secrets, "randbelow", return_value=12345)
 def test_pin_code_zero_padding(mock_randbelow, settings):
     """Pin codes should be zero-padded to meet required length."""
@@ -347,3 +433,162 @@ def test_pin_generation_upper_bound(mock_randbelow, settings):
 
     # Assert called with the right exclusive upper bound, 10^5
     mock_randbelow.assert_called_with(100000)
+
+
+def test_models_rooms_filter_user():
+    """Rooms should be filtered on direct memberships of the user, each listed once."""
+    user = UserFactory()
+    other_user = UserFactory()
+    room = RoomFactory(users=[user, other_user])
+    RoomFactory(users=[other_user])
+
+    assert list(Room.objects.filter_user(user)) == [room]
+
+
+def test_models_rooms_filter_user_query_plan():
+    """
+    Memberships should be checked from an index of accesses alone, without
+    reading their rows nor sorting rooms to remove duplicates.
+    """
+    user = UserFactory()
+    RoomFactory.create_batch(3, users=[user])
+
+    # Tables of tests are too small for the planner to prefer indexes
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_bitmapscan = off")
+
+    plan = Room.objects.filter_user(user).explain()
+
+    assert re.search(r"Index Only Scan using \w+ on meet_resource_access", plan)
+    assert "Unique" not in plan
+
+
+def test_models_rooms_get_cached():
+    """Rooms should be read from the database once, then from the cache, by id or slug."""
+    room = RoomFactory(configuration={"can_publish_sources": ["camera"]})
+    stats = Room.objects.cache_stats()
+
+    cached_room = Room.objects.get_cached(slug=room.slug)
+    assert Room.objects.get_cached(pk=room.id) == cached_room
+    assert Room.objects.get_cached(slug=room.slug) == cached_room
+
+    for field in ["id", "name", "slug", "access_level", "configuration", "pin_code"]:
+        assert getattr(cached_room, field) == getattr(room, field)
+
+    new_stats = Room.objects.cache_stats()
+    assert new_stats["misses"] == stats["misses"] + 1
+    assert new_stats["hits"] == stats["hits"] + 2
+
+
+def test_models_rooms_get_cached_does_not_exist():
+    """Looking up a room that does not exist should raise DoesNotExist."""
+    with pytest.raises(Room.DoesNotExist):
+        Room.objects.get_cached(slug="unknown")
+
+
+def test_models_rooms_get_cached_invalidated_on_save():
+    """Saving a room should invalidate its cached essentials, including its old slug."""
+    room = RoomFactory(name="old name", access_level=RoomAccessLevel.PUBLIC)
+    Room.objects.get_cached(slug="old-name")
+
+    room.name = "new name"
+    room.access_level = RoomAccessLevel.RESTRICTED
+    room.save()
+
+    cached_room = Room.objects.get_cached(pk=room.id)
+    assert cached_room.slug == "new-name"
+    assert cached_room.access_level == RoomAccessLevel.RESTRICTED
+
+    with pytest.raises(Room.DoesNotExist):
+        Room.objects.get_cached(slug="old-name")
+
+
+def test_models_rooms_get_cached_invalidated_on_delete():
+    """Deleting a room should invalidate its cached essentials."""
+    room = RoomFactory()
+    Room.objects.get_cached(slug=room.slug)
+
+    room.delete()
+
+    with pytest.raises(Room.DoesNotExist):
+        Room.objects.get_cached(slug=room.slug)
+
+
+def test_models_rooms_get_cached_invalidated_on_queryset_delete():
+    """Deleting rooms through a queryset should invalidate their cached essentials."""
+    room = RoomFactory()
+    Room.objects.get_cached(pk=room.id)
+
+    Room.objects.filter(pk=room.id).delete()
+
+    with pytest.raises(Room.DoesNotExist):
+        Room.objects.get_cached(pk=room.id)
+
+
+def test_models_rooms_get_cached_invalidated_on_queryset_update():
+    """Updating rooms through a queryset should invalidate their cached essentials."""
+    rooms = RoomFactory.create_batch(2, access_level=RoomAccessLevel.PUBLIC)
+    for room in rooms:
+        Room.objects.get_cached(pk=room.id)
+
+    assert (
+        Room.objects.filter(pk__in=[room.id for room in rooms]).update(
+            access_level=RoomAccessLevel.RESTRICTED
+        )
+        == 2
+    )
+
+    for room in rooms:
+        cached_room = Room.objects.get_cached(pk=room.id)
+        assert cached_room.access_level == RoomAccessLevel.RESTRICTED
+
+
+def test_models_rooms_get_cached_user_roles(django_assert_num_queries):
+    """The roles of a user on a cached room should be read through the cache too."""
+    user = UserFactory()
+    room = RoomFactory()
+    UserResourceAccessFactory(resource=room, user=user, role=RoleChoices.ADMIN)
+    Room.objects.get_cached(pk=room.id, user=user)
+
+    with django_assert_num_queries(0):
+        cached_room = Room.objects.get_cached(pk=room.id, user=user)
+        assert cached_room.get_role(user) == RoleChoices.ADMIN
+        assert cached_room.is_administrator_or_owner(user) is True
+
+    with django_assert_num_queries(0):
+        cached_room = Room.objects.get_cached(pk=room.id, user=AnonymousUser())
+        assert cached_room.get_role(AnonymousUser()) is None
+
+
+def test_models_rooms_get_cached_user_roles_invalidated():
+    """Changing the access of a user should invalidate their cached roles."""
+    user = UserFactory()
+    room = RoomFactory()
+    access = UserResourceAccessFactory(
+        resource=room, user=user, role=RoleChoices.MEMBER
+    )
+
+    assert Room.objects.get_cached(pk=room.id, user=user).get_role(user) == "member"
+
+    access.role = RoleChoices.ADMIN
+    access.save()
+    assert (
+        Room.objects.get_cached(pk=room.id, user=user).get_role(user)
+        == RoleChoices.ADMIN
+    )
+
+    ResourceAccess.objects.filter(pk=access.pk).update(role=RoleChoices.OWNER)
+    assert (
+        Room.objects.get_cached(pk=room.id, user=user).get_role(user)
+        == RoleChoices.OWNER
+    )
+
+    ResourceAccess.objects.filter(pk=access.pk).delete()
+    assert Room.objects.get_cached(pk=room.id, user=user).get_role(user) is None
+
+    UserResourceAccessFactory(resource=room, user=user, role=RoleChoices.MEMBER)
+    assert (
+        Room.objects.get_cached(pk=room.id, user=user).get_role(user)
+        == RoleChoices.MEMBER
+    )
@@ -0,0 +1,93 @@
+"""
+Test the S3 signer in the Meet core app.
+"""
+
+# pylint: disable=W0212
+
+from unittest import mock
+
+from django.core.files.storage import default_storage
+
+import pytest
+from botocore.credentials import ReadOnlyCredentials
+from freezegun import freeze_time
+
+from core import s3_signer as s3_signer_module
+from core.management.commands.benchmark_s3_signing import sign_with_botocore
+from core.s3_signer import S3Signer, s3_signer
+
+
+@pytest.mark.parametrize(
+    "key",
+    ["recordings/a.mp4", "recordings/with space+plus.ogg", "recordings/été~(1).mp4"],
+)
+@freeze_time("2025-01-01 12:00:00")
+def test_s3_signer_sign_matches_botocore(key):
+    """Headers should be identical to the ones signed by botocore."""
+    assert S3Signer().sign(key) == sign_with_botocore(key)
+
+
+@freeze_time("2025-01-01 12:00:00")
+def test_s3_signer_sign_session_token():
+    """Temporary credentials should sign their session token."""
+    s3_client = default_storage.connection.meta.client
+    credentials = s3_client._request_signer._credentials
+    frozen_credentials = ReadOnlyCredentials("access", "secret", "token")
+
+    with mock.patch.object(
+        credentials, "get_frozen_credentials", return_value=frozen_credentials
+    ):
+        headers = S3Signer().sign("recordings/a.mp4")
+        assert headers == sign_with_botocore("recordings/a.mp4")
+
+    assert headers["X-Amz-Security-Token"] == "token"
+    assert "x-amz-security-token, Signature=" in headers["Authorization"]
+
+
+@mock.patch.object(
+    s3_signer_module, "_hmac_sha256", wraps=s3_signer_module._hmac_sha256
+)
+def test_s3_signer_signing_key_cached_per_day(mock_hmac):
+    """The signing key should only be derived again when the day changes."""
+    signer = S3Signer()
+
+    with freeze_time("2025-01-01 00:00:01"):
+        signer.sign("recordings/a.mp4")
+    with freeze_time("2025-01-01 23:59:59"):
+        signer.sign("recordings/b.mp4")
+    assert mock_hmac.call_count == 4
+
+    with freeze_time("2025-01-02 00:00:01"):
+        headers = signer.sign("recordings/a.mp4")
+        assert headers == sign_with_botocore("recordings/a.mp4")
+    assert mock_hmac.call_count == 8
+
+
+@freeze_time("2025-01-01 12:00:00")
+def test_s3_signer_credentials_rotation():
+    """A rotated secret key should derive a new signing key right away."""
+    signer = S3Signer()
+    signer.sign("recordings/a.mp4")
+
+    s3_client = default_storage.connection.meta.client
+    credentials = s3_client._request_signer._credentials
+    frozen_credentials = ReadOnlyCredentials("access", "rotated", None)
+
+    with mock.patch.object(
+        credentials, "get_frozen_credentials", return_value=frozen_credentials
+    ):
+        headers = signer.sign("recordings/a.mp4")
+        assert headers == sign_with_botocore("recordings/a.mp4")
+
+    assert "Credential=access/20250101/" in headers["Authorization"]
+
+
+def test_s3_signer_reset():
+    """Resetting the signer should forget the url template and signing key."""
+    s3_signer.sign("recordings/a.mp4")
+    assert s3_signer._endpoint is not None
+
+    s3_signer.reset()
+
+    assert s3_signer._endpoint is None
+    assert s3_signer._signing_key is None
@@ -0,0 +1,221 @@
+"""
+Test tasks
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+
+import pytest
+
+from core.factories import RecordingFactory
+from core.models import RecordingStatusChoices
+from core.recording.worker.exceptions import (
+    RecordingStartError,
+    WorkerConnectionError,
+)
+from core.tasks import (
+    flush_room_metadata,
+    notify_room_participants,
+    process_livekit_events,
+    reconcile_telephony_dispatch_rules,
+    start_recording,
+    stop_recording,
+    sweep_livekit_events,
+)
+from core.utils import MetadataUpdateException, NotificationError
+
+
+@mock.patch("core.utils.notify_participants")
+def test_notify_room_participants(mock_notify):
+    """Test notifying room participants."""
+    notify_room_participants("room-name", {"type": "test"})
+
+    mock_notify.assert_called_once_with(
+        room_name="room-name", notification_data={"type": "test"}
+    )
+
+
+@mock.patch("core.utils.notify_participants")
+def test_notify_room_participants_releases_coalescing_key(mock_notify):
+    """Test the coalescing key is released before notifying room participants."""
+    cache.set("coalescing-key", True)
+
+    def assert_released(**kwargs):
+        assert cache.get("coalescing-key") is None
+
+    mock_notify.side_effect = assert_released
+
+    notify_room_participants(
+        "room-name", {"type": "test"}, coalescing_key="coalescing-key"
+    )
+
+    mock_notify.assert_called_once()
+
+
+@mock.patch("core.utils.notify_participants")
+def test_notify_room_participants_error(mock_notify):
+    """Test failing to notify room participants does not raise."""
+    mock_notify.side_effect = NotificationError("Error notifying")
+
+    notify_room_participants("room-name", {"type": "test"})
+
+    mock_notify.assert_called_once()
+
+
+@mock.patch("core.services.livekit_events.LiveKitEventsService.process_events")
+def test_process_livekit_events(mock_process_events, settings):
+    """Test processing the LiveKit webhook events queued for a room."""
+    settings.LIVEKIT_CONFIGURATION = {
+        "api_key": "test_api_key",
+        "api_secret": "test_api_secret",
+        "url": "https://test-livekit.example.com/",
+    }
+
+    process_livekit_events("room-name", "token")
+
+    mock_process_events.assert_called_once_with("room-name", "token")
+
+
+@mock.patch("core.services.livekit_events.LiveKitEventsService.sweep_queues")
+def test_sweep_livekit_events(mock_sweep_queues, settings):
+    """Test sweeping the LiveKit webhook events left queued."""
+    settings.LIVEKIT_CONFIGURATION = {
+        "api_key": "test_api_key",
+        "api_secret": "test_api_secret",
+        "url": "https://test-livekit.example.com/",
+    }
+
+    sweep_livekit_events()
+
+    mock_sweep_queues.assert_called_once_with()
+
+
+@mock.patch("core.services.room_metadata.RoomMetadataService.flush")
+def test_flush_room_metadata(mock_flush):
+    """Test writing the metadata changes left pending for a room."""
+    with mock.patch.object(flush_room_metadata, "apply_async") as mock_apply_async:
+        flush_room_metadata("room-name")
+
+    mock_flush.assert_called_once_with("room-name")
+    mock_apply_async.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "error", [MetadataUpdateException("Error"), ConnectionError("Error")]
+)
+@mock.patch("core.services.room_metadata.RoomMetadataService.flush")
+def test_flush_room_metadata_error(mock_flush, error, settings):
+    """Test failed writes of pending metadata are retried, backing off."""
+    settings.ROOM_METADATA_RETRY_DELAY = 10
+    settings.ROOM_METADATA_RETRY_ATTEMPTS = 3
+    mock_flush.side_effect = error
+
+    with mock.patch.object(flush_room_metadata, "apply_async") as mock_apply_async:
+        flush_room_metadata("room-name", attempt=2)
+
+    mock_apply_async.assert_called_once_with(
+        kwargs={"room_name": "room-name", "attempt": 3}, countdown=40
+    )
+
+
+@mock.patch("core.services.room_metadata.RoomMetadataService.flush")
+def test_flush_room_metadata_last_attempt(mock_flush, settings):
+    """Test failed writes of pending metadata are not retried past the last attempt."""
+    settings.ROOM_METADATA_RETRY_ATTEMPTS = 3
+    mock_flush.side_effect = MetadataUpdateException("Error")
+
+    with mock.patch.object(flush_room_metadata, "apply_async") as mock_apply_async:
+        flush_room_metadata("room-name", attempt=3)
+
+    mock_apply_async.assert_not_called()
+
+
+@mock.patch(
+    "core.services.telephony.TelephonyService.reconcile_dispatch_rules",
+)
+def test_reconcile_telephony_dispatch_rules(mock_reconcile, settings):
+    """Test dispatch rules are reconciled when telephony is enabled."""
+    settings.ROOM_TELEPHONY_ENABLED = True
+
+    reconcile_telephony_dispatch_rules()
+
+    mock_reconcile.assert_called_once_with()
+
+
+@mock.patch(
+    "core.services.telephony.TelephonyService.reconcile_dispatch_rules",
+)
+def test_reconcile_telephony_dispatch_rules_disabled(mock_reconcile, settings):
+    """Test nothing is reconciled when telephony is disabled."""
+    settings.ROOM_TELEPHONY_ENABLED = False
+
+    reconcile_telephony_dispatch_rules()
+
+    mock_reconcile.assert_not_called()
+
+
+@pytest.mark.django_db
+@mock.patch("core.tasks.WorkerServiceMediator")
+@mock.patch("core.tasks.get_worker_service")
+def test_start_recording(mock_get_worker_service, mock_mediator_class):
+    """Test starting a recording through its worker service."""
+    recording = RecordingFactory(mode="transcript")
+
+    start_recording(str(recording.id))
+
+    mock_get_worker_service.assert_called_once_with(mode="transcript")
+    mock_mediator_class.assert_called_once_with(
+        worker_service=mock_get_worker_service.return_value
+    )
+    mock_mediator_class.return_value.start.assert_called_once_with(recording)
+
+
+@pytest.mark.django_db
+@mock.patch("core.tasks.WorkerServiceMediator")
+@mock.patch("core.tasks.get_worker_service")
+def test_start_recording_error(mock_get_worker_service, mock_mediator_class):
+    """Test failing to start a recording does not raise."""
+    recording = RecordingFactory()
+    mock_mediator_class.return_value.start.side_effect = RecordingStartError()
+
+    start_recording(str(recording.id))
+
+    mock_mediator_class.return_value.start.assert_called_once_with(recording)
+
+
+@pytest.mark.django_db
+@mock.patch("core.tasks.get_worker_service")
+def test_start_recording_failed_status(mock_get_worker_service):
+    """Test a recording failing to start is marked so, for clients polling it."""
+    recording = RecordingFactory(status=RecordingStatusChoices.INITIATED)
+    mock_get_worker_service.return_value.start.side_effect = WorkerConnectionError()
+
+    start_recording(str(recording.id))
+
+    recording.refresh_from_db()
+    assert recording.status == RecordingStatusChoices.FAILED_TO_START
+
+
+@pytest.mark.django_db
+@mock.patch("core.tasks.get_worker_service")
+def test_start_recording_unknown(mock_get_worker_service):
+    """Test starting a recording that does not exist does nothing."""
+    start_recording("9f3a2ce3-1bb5-4b5c-8a52-7c1f1dcb2bd4")
+
+    mock_get_worker_service.assert_not_called()
+
+
+@pytest.mark.django_db
+@mock.patch("core.tasks.WorkerServiceMediator")
+@mock.patch("core.tasks.get_worker_service")
+def test_stop_recording(mock_get_worker_service, mock_mediator_class):
+    """Test stopping a recording through its worker service."""
+    recording = RecordingFactory(
+        mode="screen_recording", status=RecordingStatusChoices.ACTIVE
+    )
+
+    stop_recording(str(recording.id))
+
+    mock_get_worker_service.assert_called_once_with(mode="screen_recording")
+    mock_mediator_class.return_value.stop.assert_called_once_with(recording)
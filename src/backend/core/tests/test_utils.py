@@ -3,58 +3,50 @@ Test utils functions
 """
 
 import json
+import random
 from unittest import mock
+from uuid import uuid4
 
-import pytest
-from livekit.api import TwirpError
-
-from core.utils import NotificationError, create_livekit_client, notify_participants
-
-
-@mock.patch("asyncio.get_running_loop")
-@mock.patch("core.utils.LiveKitAPI")
-def test_create_livekit_client_ssl_enabled(
-    mock_livekit_api, mock_get_running_loop, settings
-):
-    """Test LiveKitAPI client creation with SSL verification enabled."""
-    mock_get_running_loop.return_value = mock.MagicMock()
-    settings.LIVEKIT_VERIFY_SSL = True
-
-    create_livekit_client()
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 
-    mock_livekit_api.assert_called_once_with(
-        **settings.LIVEKIT_CONFIGURATION, session=None
-    )
-
-
-@mock.patch("core.utils.aiohttp.ClientSession")
-@mock.patch("asyncio.get_running_loop")
+import pytest
+from livekit.api import AccessToken, TwirpError
+
+from core import utils
+from core.utils import (
+    MetadataUpdateException,
+    NotificationError,
+    create_livekit_client,
+    generate_color,
+    generate_token,
+    get_room_metadata,
+    notify_participants,
+    run_redis_script,
+    set_room_metadata,
+)
+
+
+@mock.patch("core.utils.livekit_pool.get_session")
 @mock.patch("core.utils.LiveKitAPI")
-def test_create_livekit_client_ssl_disabled(
-    mock_livekit_api, mock_get_running_loop, mock_client_session, settings
-):
-    """Test LiveKitAPI client creation with SSL verification disabled."""
-    mock_get_running_loop.return_value = mock.MagicMock()
-    mock_session_instance = mock.MagicMock()
-    mock_client_session.return_value = mock_session_instance
-    settings.LIVEKIT_VERIFY_SSL = False
+def test_create_livekit_client(mock_livekit_api, mock_get_session, settings):
+    """Test LiveKitAPI client creation, sharing the LiveKit pool's session."""
+    mock_session = mock.MagicMock()
+    mock_get_session.return_value = mock_session
 
     create_livekit_client()
 
     mock_livekit_api.assert_called_once_with(
-        **settings.LIVEKIT_CONFIGURATION, session=mock_session_instance
+        **settings.LIVEKIT_CONFIGURATION, session=mock_session
     )
 
 
-@mock.patch("asyncio.get_running_loop")
+@mock.patch("core.utils.livekit_pool.get_session")
 @mock.patch("core.utils.LiveKitAPI")
-def test_create_livekit_client_custom_configuration(
-    mock_livekit_api, mock_get_running_loop, settings
-):
+def test_create_livekit_client_custom_configuration(mock_livekit_api, mock_get_session):
     """Test LiveKitAPI client creation with custom configuration."""
-    settings.LIVEKIT_VERIFY_SSL = True
-
-    mock_get_running_loop.return_value = mock.MagicMock()
+    mock_session = mock.MagicMock()
+    mock_get_session.return_value = mock_session
     custom_configuration = {
         "api_key": "mock_key",
         "api_secret": "mock_secret",
@@ -63,7 +55,9 @@ def test_create_livekit_client_custom_configuration(
 
     create_livekit_client(custom_configuration)
 
-    mock_livekit_api.assert_called_once_with(**custom_configuration, session=None)
+    mock_livekit_api.assert_called_once_with(
+        **custom_configuration, session=mock_session
+    )
 
 
 @mock.patch("core.utils.create_livekit_client")
@@ -166,3 +160,129 @@ def test_notify_participants_success(mock_create_livekit_client):
 
     # Verify aclose was called
     mock_api_instance.aclose.assert_called_once()
+
+
+@mock.patch("core.utils.create_livekit_client")
+def test_get_room_metadata(mock_create_livekit_client):
+    """Test reading a room's metadata from LiveKit."""
+    mock_api_instance = mock.Mock()
+    mock_api_instance.room.list_rooms = mock.AsyncMock(
+        return_value=mock.Mock(rooms=[mock.Mock(metadata='{"foo": "bar"}')])
+    )
+    mock_api_instance.aclose = mock.AsyncMock()
+    mock_create_livekit_client.return_value = mock_api_instance
+
+    assert get_room_metadata("room-number-1") == {"foo": "bar"}
+
+    list_rooms_request = mock_api_instance.room.list_rooms.call_args[0][0]
+    assert list(list_rooms_request.names) == ["room-number-1"]
+    mock_api_instance.aclose.assert_called_once()
+
+
+@mock.patch("core.utils.create_livekit_client")
+def test_get_room_metadata_no_room(mock_create_livekit_client):
+    """Test reading the metadata of a room not running in LiveKit."""
+    mock_api_instance = mock.Mock()
+    mock_api_instance.room.list_rooms = mock.AsyncMock(return_value=mock.Mock(rooms=[]))
+    mock_api_instance.aclose = mock.AsyncMock()
+    mock_create_livekit_client.return_value = mock_api_instance
+
+    assert get_room_metadata("room-number-1") is None
+
+
+@mock.patch("core.utils.create_livekit_client")
+def test_set_room_metadata_error(mock_create_livekit_client):
+    """Test LiveKit errors are raised as metadata update errors."""
+    mock_api_instance = mock.Mock()
+    mock_api_instance.room.update_room_metadata = mock.AsyncMock(
+        side_effect=TwirpError(msg="Internal server error", code=500, status=500)
+    )
+    mock_api_instance.aclose = mock.AsyncMock()
+    mock_create_livekit_client.return_value = mock_api_instance
+
+    with pytest.raises(MetadataUpdateException):
+        set_room_metadata("room-number-1", {"foo": "bar"})
+
+    update_request = mock_api_instance.room.update_room_metadata.call_args[0][0]
+    assert update_request.room == "room-number-1"
+    assert json.loads(update_request.metadata) == {"foo": "bar"}
+    mock_api_instance.aclose.assert_called_once()
+
+
+def test_generate_color_consistent():
+    """Colors should only depend on the identity, leaving the global random state alone."""
+    state = random.getstate()
+
+    assert generate_color("participant-1") == "hsl(109, 50%, 30%)"
+    assert generate_color("participant-1") == "hsl(109, 50%, 30%)"
+    assert generate_color("participant-2") != "hsl(109, 50%, 30%)"
+
+    assert random.getstate() == state
+
+
+@pytest.fixture
+def livekit_settings(settings):
+    """Configure LiveKit credentials and token reuse."""
+    settings.LIVEKIT_CONFIGURATION = {
+        "api_key": "key",
+        "api_secret": "secret-of-at-least-32-characters",
+        "url": "https://livekit.test",
+    }
+    settings.LIVEKIT_TOKEN_CACHE_TIMEOUT = 3600
+    return settings
+
+
+@mock.patch("core.utils.AccessToken", wraps=AccessToken)
+def test_generate_token_reused(mock_access_token, livekit_settings):
+    """A token should be signed once, then reused for the same grants."""
+    participant_id = str(uuid4())
+    kwargs = {
+        "room": str(uuid4()),
+        "user": AnonymousUser(),
+        "username": "John",
+        "participant_id": participant_id,
+    }
+
+    token = generate_token(**kwargs)
+    assert generate_token(**kwargs) == token
+    assert mock_access_token.call_count == 1
+
+    # Any change to what the token grants signs a new one
+    assert generate_token(**kwargs, is_admin_or_owner=True) != token
+    assert generate_token(**{**kwargs, "username": "Jane"}) != token
+    assert generate_token(**kwargs, sources=["camera"]) != token
+    assert mock_access_token.call_count == 4
+
+
+@mock.patch("core.utils.AccessToken", wraps=AccessToken)
+def test_generate_token_not_reused(mock_access_token, livekit_settings):
+    """Tokens should not be reused when disabled, nor for anonymous users without id."""
+    kwargs = {"room": str(uuid4()), "user": AnonymousUser(), "username": "John"}
+
+    generate_token(**kwargs)
+    generate_token(**kwargs)
+    assert mock_access_token.call_count == 2
+
+    livekit_settings.LIVEKIT_TOKEN_CACHE_TIMEOUT = 0
+    participant_id = str(uuid4())
+    generate_token(**kwargs, participant_id=participant_id)
+    generate_token(**kwargs, participant_id=participant_id)
+    assert mock_access_token.call_count == 4
+
+
+def test_run_redis_script_registered_once():
+    """Test Lua scripts are registered once, then run by their digest."""
+    script = "return ARGV[1] + 1"
+    client = cache.client.get_client(write=True)
+
+    with (
+        mock.patch.dict(utils._redis_scripts, clear=True),
+        mock.patch.object(
+            client, "register_script", wraps=client.register_script
+        ) as mock_register_script,
+        mock.patch.object(cache.client, "get_client", return_value=client),
+    ):
+        assert run_redis_script(script, keys=[], args=[1]) == 2
+        assert run_redis_script(script, keys=[], args=[2]) == 3
+
+    mock_register_script.assert_called_once_with(script)
@@ -5,20 +5,18 @@ Utils functions used in the core app
 # pylint: disable=R0913, R0917
 # ruff: noqa:S311, PLR0913
 
+import functools
 import hashlib
 import json
 import random
 import secrets
 import string
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import uuid4
 
 from django.conf import settings
-from django.core.files.storage import default_storage
+from django.core.cache import cache
 
-import aiohttp
-import botocore
-from asgiref.sync import async_to_sync
 from livekit.api import (  # pylint: disable=E0611
     AccessToken,
     ListRoomsRequest,
@@ -28,13 +26,19 @@ from livekit.api import (  # pylint: disable=E0611
     UpdateRoomMetadataRequest,
     VideoGrants,
 )
+from redis.commands.core import Script
 
+from core.livekit_pool import livekit_pool, run_in_livekit_loop
+from core.s3_signer import s3_signer
 
+
+@functools.lru_cache(maxsize=4096)
 def generate_color(identity: str) -> str:
     """Generates a consistent HSL color based on a given identity string.
 
-    The function seeds the random generator with the identity's hash,
-    ensuring consistent color output. The HSL format allows fine-tuned control
+    The function seeds a random generator of its own with the identity's hash,
+    ensuring consistent color output without altering the global random state,
+    which threads may share. The HSL format allows fine-tuned control
     over saturation and lightness, empirically adjusted to produce visually
     appealing and distinct colors. HSL is preferred over hex to constrain the color
     range and ensure predictability.
@@ -44,14 +48,20 @@ def generate_color(identity: str) -> str:
     identity_hash = hashlib.sha1(identity.encode("utf-8"))
     # Keep only hash's last 16 bits, collisions are not a concern
     seed = int(identity_hash.hexdigest(), 16) & 0xFFFF
-    random.seed(seed)
-    hue = random.randint(0, 360)
-    saturation = random.randint(50, 75)
-    lightness = random.randint(25, 60)
+    generator = random.Random(seed)
+    hue = generator.randint(0, 360)
+    saturation = generator.randint(50, 75)
+    lightness = generator.randint(25, 60)
 
     return f"hsl({hue}, {saturation}%, {lightness}%)"
 
 
+def _get_token_cache_key(*parts) -> str:
+    """Generate cache key for a LiveKit token, from everything it is signed with."""
+    digest = hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+    return f"{settings.LIVEKIT_TOKEN_KEY_PREFIX}_{digest}"
+
+
 def generate_token(
     room: str,
     user,
@@ -63,6 +73,9 @@ def generate_token(
 ) -> str:
     """Generate a LiveKit access token for a user in a specific room.
 
+    Tokens are cached for LIVEKIT_TOKEN_CACHE_TIMEOUT seconds, so that reloading a
+    page or polling the lobby returns the same token instead of signing a new one.
+
     Args:
         room (str): The name of the room.
         user (User): The user which request the access token.
@@ -86,16 +99,6 @@ def generate_token(
     if sources is None:
         sources = settings.LIVEKIT_DEFAULT_SOURCES
 
-    video_grants = VideoGrants(
-        room=room,
-        room_join=True,
-        room_admin=is_admin_or_owner,
-        can_update_own_metadata=True,
-        can_publish=bool(sources),
-        can_publish_sources=sources,
-        can_subscribe=True,
-    )
-
     if user.is_anonymous:
         identity = participant_id or str(uuid4())
         default_username = "Anonymous"
@@ -103,9 +106,38 @@ def generate_token(
         identity = str(user.sub)
         default_username = str(user)
 
+    name = username or default_username
+
     if color is None:
         color = generate_color(identity)
 
+    # Anonymous users without participant id get a new identity, never reused
+    cache_key = None
+    if settings.LIVEKIT_TOKEN_CACHE_TIMEOUT and (
+        participant_id or not user.is_anonymous
+    ):
+        cache_key = _get_token_cache_key(
+            settings.LIVEKIT_CONFIGURATION["api_key"],
+            room,
+            identity,
+            name,
+            color,
+            list(sources),
+            is_admin_or_owner,
+        )
+        if (jwt := cache.get(cache_key)) is not None:
+            return jwt
+
+    video_grants = VideoGrants(
+        room=room,
+        room_join=True,
+        room_admin=is_admin_or_owner,
+        can_update_own_metadata=True,
+        can_publish=bool(sources),
+        can_publish_sources=sources,
+        can_subscribe=True,
+    )
+
     token = (
         AccessToken(
             api_key=settings.LIVEKIT_CONFIGURATION["api_key"],
@@ -113,13 +145,18 @@ def generate_token(
         )
         .with_grants(video_grants)
         .with_identity(identity)
-        .with_name(username or default_username)
+        .with_name(name)
         .with_attributes(
             {"color": color, "room_admin": "true" if is_admin_or_owner else "false"}
         )
     )
 
-    return token.to_jwt()
+    jwt = token.to_jwt()
+
+    if cache_key is not None:
+        cache.set(cache_key, jwt, timeout=settings.LIVEKIT_TOKEN_CACHE_TIMEOUT)
+
+    return jwt
 
 
 def generate_livekit_config(
@@ -175,47 +212,30 @@ def generate_s3_authorization_headers(key):
       with cookies)
     - access control is truly realtime
     - the object storage service does not need to be exposed on internet
-    """
-
-    url = default_storage.unsigned_connection.meta.client.generate_presigned_url(
-        "get_object",
-        ExpiresIn=0,
-        Params={"Bucket": default_storage.bucket_name, "Key": key},
-    )
-
-    request = botocore.awsrequest.AWSRequest(method="get", url=url)
 
-    s3_client = default_storage.connection.meta.client
-    # pylint: disable=protected-access
-    credentials = s3_client._request_signer._credentials  # noqa: SLF001
-    frozen_credentials = credentials.get_frozen_credentials()
-    region = s3_client.meta.region_name
-    auth = botocore.auth.S3SigV4Auth(frozen_credentials, "s3", region)
-    auth.add_auth(request)
-
-    return request
+    The signing key is cached per day by the signer, see core.s3_signer.
+    """
+    return s3_signer.sign(key)
 
 
 def create_livekit_client(custom_configuration=None):
-    """Create and return a configured LiveKit API client."""
-
-    custom_session = None
+    """Create and return a configured LiveKit API client.
 
-    if not settings.LIVEKIT_VERIFY_SSL:
-        connector = aiohttp.TCPConnector(ssl=False)
-        custom_session = aiohttp.ClientSession(connector=connector)
+    Clients share the connections kept alive by the LiveKit pool, so they must be
+    used in its event loop, see run_in_livekit_loop. Closing them is harmless.
+    """
 
     # Use default configuration if none provided
     configuration = custom_configuration or settings.LIVEKIT_CONFIGURATION
 
-    return LiveKitAPI(session=custom_session, **configuration)
+    return LiveKitAPI(session=livekit_pool.get_session(), **configuration)
 
 
 class NotificationError(Exception):
     """Notification delivery to room participants fails."""
 
 
-@async_to_sync
+@run_in_livekit_loop
 async def notify_participants(room_name: str, notification_data: dict):
     """Send notification data to all participants in a LiveKit room."""
 
@@ -249,17 +269,9 @@ class MetadataUpdateException(Exception):
     """Room's metadata update fails."""
 
 
-@async_to_sync
-async def update_room_metadata(
-    room_name: str, metadata: dict, remove_keys: Optional[list[str]] = None
-):
-    """Update LiveKit room metadata by merging new values with existing metadata.
-
-    Args:
-        room_name: Name of the room to update
-        metadata: Dictionary of metadata key-values to add/update
-        remove_keys: Optional list of keys to remove from existing metadata.
-    """
+@run_in_livekit_loop
+async def get_room_metadata(room_name: str) -> Optional[dict]:
+    """Fetch the metadata of a LiveKit room, None if the room does not exist."""
 
     lkapi = create_livekit_client()
 
@@ -269,23 +281,34 @@ async def update_room_metadata(
                 names=[room_name],
             )
         )
+    except TwirpError as e:
+        raise MetadataUpdateException(
+            f"Failed to fetch metadata for room {room_name}: {e}"
+        ) from e
+    finally:
+        await lkapi.aclose()
 
-        if not response.rooms:
-            return
+    if not response.rooms:
+        return None
+
+    room = response.rooms[0]
 
-        room = response.rooms[0]
+    return json.loads(room.metadata) if room.metadata else {}
 
-        existing_metadata = json.loads(room.metadata) if room.metadata else {}
 
-        if remove_keys:
-            for key in remove_keys:
-                existing_metadata.pop(key, None)
+@run_in_livekit_loop
+async def set_room_metadata(room_name: str, metadata: dict):
+    """Replace the metadata of a LiveKit room.
 
-        updated_metadata = {**existing_metadata, **metadata}
+    Prefer RoomMetadataService to update metadata, it merges concurrent updates.
+    """
+
+    lkapi = create_livekit_client()
 
+    try:
         await lkapi.room.update_room_metadata(
             UpdateRoomMetadataRequest(
-                room=room_name, metadata=json.dumps(updated_metadata).encode("utf-8")
+                room=room_name, metadata=json.dumps(metadata).encode("utf-8")
             )
         )
     except TwirpError as e:
@@ -344,3 +367,20 @@ def generate_room_slug():
         for size in sizes
     ]
     return "-".join(parts)
+
+
+# Lua scripts registered with the Redis client, by source
+_redis_scripts: Dict[str, Script] = {}
+
+
+def run_redis_script(script: str, keys: List[str], args: List, client=None):
+    """Run a Lua script against the Redis server backing the default cache.
+
+    Scripts are registered once per process, then run by their SHA1 digest.
+    """
+    if client is None:
+        client = cache.client.get_client(write=True)
+    registered_script = _redis_scripts.get(script)
+    if registered_script is None:
+        registered_script = _redis_scripts[script] = client.register_script(script)
+    return registered_script(keys=keys, args=args, client=client)
@@ -0,0 +1,158 @@
+# ruff: noqa: S311
+"""benchmark_livekit_webhooks management command"""
+
+import base64
+import copy
+import hashlib
+import json
+import random
+import statistics
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from livekit import api
+
+PAYLOADS_PATH = Path(__file__).resolve().parents[2] / "data" / "livekit_webhooks.json"
+WEBHOOK_URL = "/api/v1.0/rooms/webhooks-livekit/"
+
+
+def build_requests(payloads, nb_events, nb_rooms, retry_rate):
+    """Replay recorded payloads in rooms of their own, signed like LiveKit does.
+
+    Each room goes through the recorded events in order. Some events are sent
+    twice, as LiveKit does when it considers a webhook slow or failed.
+    """
+
+    rooms = [str(uuid.uuid4()) for _ in range(nb_rooms)]
+    requests = []
+    for i in range(nb_events):
+        room_name = rooms[i % nb_rooms]
+        payload = copy.deepcopy(payloads[(i // nb_rooms) % len(payloads)])
+        payload["id"] = f"EV_{uuid.uuid4().hex}"
+        if "room" in payload:
+            payload["room"]["name"] = room_name
+        if "egressInfo" in payload:
+            payload["egressInfo"]["roomName"] = room_name
+
+        body = json.dumps(payload)
+        token = api.AccessToken(
+            settings.LIVEKIT_CONFIGURATION["api_key"],
+            settings.LIVEKIT_CONFIGURATION["api_secret"],
+        )
+        token.claims.sha256 = base64.b64encode(
+            hashlib.sha256(body.encode()).digest()
+        ).decode()
+        request = (body, token.to_jwt())
+
+        requests.append(request)
+        if random.random() < retry_rate:
+            requests.append(request)
+
+    return requests
+
+
+def send_request(request):
+    """Send a webhook request, and return its status code and duration."""
+    body, auth_token = request
+    start = time.perf_counter()
+    response = Client().post(
+        WEBHOOK_URL,
+        data=body,
+        content_type="application/json",
+        HTTP_AUTHORIZATION=auth_token,
+    )
+    return response.status_code, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    """Replay a burst of recorded LiveKit webhooks against the webhook endpoint.
+
+    Measures how fast webhooks are acknowledged. Events are processed by the
+    Celery worker, unless tasks are run eagerly.
+    """
+
+    help = __doc__
+
+    def add_arguments(self, parser):
+        """Add arguments to shape the burst of webhooks."""
+        parser.add_argument(
+            "-f",
+            "--force",
+            action="store_true",
+            default=False,
+            help="Force command execution despite DEBUG is set to False",
+        )
+        parser.add_argument(
+            "--events", type=int, default=1000, help="Number of events to send"
+        )
+        parser.add_argument(
+            "--rooms", type=int, default=20, help="Number of rooms to spread events in"
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Number of webhooks sent concurrently",
+        )
+        parser.add_argument(
+            "--retry-rate",
+            type=float,
+            default=0.1,
+            help="Share of events sent twice, like LiveKit retries",
+        )
+        parser.add_argument(
+            "--payloads",
+            type=Path,
+            default=PAYLOADS_PATH,
+            help="JSON file of recorded webhook payloads to replay",
+        )
+
+    def handle(self, *args, **options):
+        """Handling of the management command."""
+        if not settings.DEBUG and not options["force"]:
+            raise CommandError(
+                (
+                    "This command is not meant to be used in production environment "
+                    "except you know what you are doing, if so use --force parameter"
+                )
+            )
+
+        if options["events"] < 2:
+            raise CommandError("At least 2 events are needed to measure latency.")
+
+        payloads = json.loads(options["payloads"].read_text())
+        requests = build_requests(
+            payloads, options["events"], options["rooms"], options["retry_rate"]
+        )
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(send_request, requests))
+        elapsed_time = time.perf_counter() - start
+
+        durations = sorted(duration * 1000 for _, duration in results)
+        percentiles = statistics.quantiles(durations, n=100, method="inclusive")
+        status_codes = Counter(status_code for status_code, _ in results)
+
+        self.stdout.write(
+            f"Sent {len(requests)} webhooks ({len(requests) - options['events']} "
+            f"retries) in {elapsed_time:g} seconds, "
+            f"{len(requests) / elapsed_time:.1f} webhooks/s"
+        )
+        self.stdout.write(
+            "Status codes: "
+            + ", ".join(
+                f"{code}: {count}" for code, count in sorted(status_codes.items())
+            )
+        )
+        self.stdout.write(
+            f"Latency (ms): p50 {percentiles[49]:.2f}, p95 {percentiles[94]:.2f}, "
+            f"p99 {percentiles[98]:.2f}, max {durations[-1]:.2f}"
+        )
@@ -0,0 +1,49 @@
+"""Test the `benchmark_livekit_webhooks` management command"""
+
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+import pytest
+
+from core.services.livekit_events import LiveKitEventsService
+
+pytestmark = pytest.mark.django_db
+
+
+@override_settings(DEBUG=True)
+@mock.patch.object(LiveKitEventsService, "handle")
+def test_commands_benchmark_livekit_webhooks(mock_handle, settings):
+    """The command should replay recorded webhooks, retries being processed once."""
+    settings.LIVEKIT_CONFIGURATION = {
+        "api_key": "test_api_key",
+        "api_secret": "test_api_secret",
+        "url": "https://test-livekit.example.com/",
+    }
+    stdout = StringIO()
+
+    call_command(
+        "benchmark_livekit_webhooks",
+        events=20,
+        rooms=2,
+        retry_rate=1,
+        concurrency=2,
+        stdout=stdout,
+    )
+
+    output = stdout.getvalue()
+    assert "Sent 40 webhooks (20 retries)" in output
+    assert "Status codes: 200: 40" in output
+    assert "Latency (ms): p50" in output
+    # Events without handler are acknowledged, but not processed
+    assert mock_handle.call_count == 10
+
+
+@override_settings(DEBUG=False)
+def test_commands_benchmark_livekit_webhooks_not_debug():
+    """The command should refuse to run when not in debug mode."""
+    with pytest.raises(CommandError, match="use --force parameter"):
+        call_command("benchmark_livekit_webhooks")
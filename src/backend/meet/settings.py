@@ -318,6 +318,10 @@ class Base(Configuration):
     }
 
     # Frontend
+    # Time in seconds browsers may use the frontend configuration before revalidating it
+    FRONTEND_CONFIGURATION_MAX_AGE = values.PositiveIntegerValue(
+        60, environ_name="FRONTEND_CONFIGURATION_MAX_AGE", environ_prefix=None
+    )
     FRONTEND_CONFIGURATION = {
         # If set, a <link> tag with this URL as href is added to the <head> of the frontend app.
         # This is useful if you want to change CSS variables to customize the look of the app.
@@ -586,10 +590,59 @@ class Base(Configuration):
     LIVEKIT_VERIFY_SSL = values.BooleanValue(
         True, environ_name="LIVEKIT_VERIFY_SSL", environ_prefix=None
     )
+    # Connections to the LiveKit API are kept alive and shared by all requests
+    LIVEKIT_CLIENT_POOL_SIZE = values.PositiveIntegerValue(
+        100, environ_name="LIVEKIT_CLIENT_POOL_SIZE", environ_prefix=None
+    )
+    LIVEKIT_CLIENT_KEEPALIVE_TIMEOUT = values.PositiveIntegerValue(
+        30, environ_name="LIVEKIT_CLIENT_KEEPALIVE_TIMEOUT", environ_prefix=None
+    )
+    LIVEKIT_CLIENT_TIMEOUT = values.PositiveIntegerValue(
+        60, environ_name="LIVEKIT_CLIENT_TIMEOUT", environ_prefix=None
+    )
+    # Each process logs its requests and reused connections, 0 disables the logs
+    LIVEKIT_CLIENT_STATS_LOG_INTERVAL = values.PositiveIntegerValue(
+        300, environ_name="LIVEKIT_CLIENT_STATS_LOG_INTERVAL", environ_prefix=None
+    )
+    # Signed tokens are reused while valid long enough, tokens being valid 6 hours
+    LIVEKIT_TOKEN_KEY_PREFIX = values.Value(
+        "livekit_token", environ_name="LIVEKIT_TOKEN_KEY_PREFIX", environ_prefix=None
+    )
+    LIVEKIT_TOKEN_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        3600, environ_name="LIVEKIT_TOKEN_CACHE_TIMEOUT", environ_prefix=None
+    )
+    # Maximum number of concurrent LiveKit requests made by bulk participant actions
+    PARTICIPANTS_MANAGEMENT_MAX_CONCURRENCY = values.PositiveIntegerValue(
+        20,
+        environ_name="PARTICIPANTS_MANAGEMENT_MAX_CONCURRENCY",
+        environ_prefix=None,
+    )
     # Regex to filter webhook events by room name. Only matching events are processed.
     LIVEKIT_WEBHOOK_EVENTS_FILTER_REGEX = values.Value(
         None, environ_name="LIVEKIT_WEBHOOK_EVENTS_FILTER_REGEX", environ_prefix=None
     )
+    # Webhook events are deduplicated by id, and processed in order for each room
+    LIVEKIT_WEBHOOK_KEY_PREFIX = values.Value(
+        "livekit_webhook",
+        environ_name="LIVEKIT_WEBHOOK_KEY_PREFIX",
+        environ_prefix=None,
+    )
+    LIVEKIT_WEBHOOK_DEDUPLICATION_TIMEOUT = values.PositiveIntegerValue(
+        3600,
+        environ_name="LIVEKIT_WEBHOOK_DEDUPLICATION_TIMEOUT",
+        environ_prefix=None,
+    )
+    LIVEKIT_WEBHOOK_LOCK_TIMEOUT = values.PositiveIntegerValue(
+        60, environ_name="LIVEKIT_WEBHOOK_LOCK_TIMEOUT", environ_prefix=None
+    )
+    # Interval in seconds between sweeps of events left queued by lost workers
+    LIVEKIT_WEBHOOK_SWEEP_INTERVAL = values.PositiveIntegerValue(
+        60, environ_name="LIVEKIT_WEBHOOK_SWEEP_INTERVAL", environ_prefix=None
+    )
+    # Events that failed to process are kept to be replayed, up to this number
+    LIVEKIT_WEBHOOK_DEAD_LETTER_MAX_LENGTH = values.PositiveIntegerValue(
+        1000, environ_name="LIVEKIT_WEBHOOK_DEAD_LETTER_MAX_LENGTH", environ_prefix=None
+    )
     RESOURCE_DEFAULT_ACCESS_LEVEL = values.Value(
         "public", environ_name="RESOURCE_DEFAULT_ACCESS_LEVEL", environ_prefix=None
     )
@@ -601,6 +654,10 @@ class Base(Configuration):
     RECORDING_ENABLE = values.BooleanValue(
         False, environ_name="RECORDING_ENABLE", environ_prefix=None
     )
+    # Start and stop recordings in a celery task, instead of the API request
+    RECORDING_ASYNC_ENABLE = values.BooleanValue(
+        False, environ_name="RECORDING_ASYNC_ENABLE", environ_prefix=None
+    )
     RECORDING_OUTPUT_FOLDER = values.Value(
         "recordings", environ_name="RECORDING_OUTPUT_FOLDER", environ_prefix=None
     )
@@ -612,6 +669,45 @@ class Base(Configuration):
         environ_name="RECORDING_WORKER_CLASSES",
         environ_prefix=None,
     )
+    # Recordings are looked up by worker ID through a cache, filled when starting
+    RECORDING_WORKER_KEY_PREFIX = values.Value(
+        "recording_worker",
+        environ_name="RECORDING_WORKER_KEY_PREFIX",
+        environ_prefix=None,
+    )
+    RECORDING_WORKER_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        86400, environ_name="RECORDING_WORKER_CACHE_TIMEOUT", environ_prefix=None
+    )
+    # Maximum number of egress running at once per recording mode, e.g.
+    # {"screen_recording": 10}. Recordings beyond are queued, modes missing are
+    # not limited.
+    RECORDING_EGRESS_CAPACITY = values.DictValue(
+        {}, environ_name="RECORDING_EGRESS_CAPACITY", environ_prefix=None
+    )
+    RECORDING_ADMISSION_KEY_PREFIX = values.Value(
+        "recording_admission",
+        environ_name="RECORDING_ADMISSION_KEY_PREFIX",
+        environ_prefix=None,
+    )
+    # Slots not released by an egress_ended webhook are reclaimed after this delay
+    RECORDING_ADMISSION_SLOT_TIMEOUT = values.PositiveIntegerValue(
+        86400, environ_name="RECORDING_ADMISSION_SLOT_TIMEOUT", environ_prefix=None
+    )
+    # Media access decisions are cached for the many range requests of a player
+    RECORDING_MEDIA_AUTH_KEY_PREFIX = values.Value(
+        "recording_media_auth",
+        environ_name="RECORDING_MEDIA_AUTH_KEY_PREFIX",
+        environ_prefix=None,
+    )
+    RECORDING_MEDIA_AUTH_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        30, environ_name="RECORDING_MEDIA_AUTH_CACHE_TIMEOUT", environ_prefix=None
+    )
+    # Must be well below the 15 minutes during which S3 accepts a signed request
+    RECORDING_MEDIA_AUTH_HEADERS_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        300,
+        environ_name="RECORDING_MEDIA_AUTH_HEADERS_CACHE_TIMEOUT",
+        environ_prefix=None,
+    )
     RECORDING_EVENT_PARSER_CLASS = values.Value(
         "core.recording.event.parsers.MinioParser",
         environ_name="RECORDING_EVENT_PARSER_CLASS",
@@ -689,6 +785,15 @@ class Base(Configuration):
         environ_name="LOBBY_ACCEPTED_TIMEOUT",
         environ_prefix=None,
     )
+    # Number of lobby versions whose changes are kept, admins further behind get
+    # the whole list of waiting participants again
+    LOBBY_CHANGES_RETENTION = values.PositiveIntegerValue(
+        1000, environ_name="LOBBY_CHANGES_RETENTION", environ_prefix=None
+    )
+    # Lobby notifications are coalesced, at most one is sent per room and window
+    LOBBY_NOTIFICATION_WINDOW = values.PositiveIntegerValue(
+        1, environ_name="LOBBY_NOTIFICATION_WINDOW", environ_prefix=None
+    )
     LOBBY_NOTIFICATION_TYPE = values.Value(
         "participantWaiting",
         environ_name="LOBBY_NOTIFICATION_TYPE",
@@ -707,6 +812,36 @@ class Base(Configuration):
         environ_prefix=None,
     )
 
+    # Room metadata, last written values are cached to merge concurrent updates
+    ROOM_METADATA_KEY_PREFIX = values.Value(
+        "room_metadata", environ_name="ROOM_METADATA_KEY_PREFIX", environ_prefix=None
+    )
+    ROOM_METADATA_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        21600,  # 6hrs
+        environ_name="ROOM_METADATA_CACHE_TIMEOUT",
+        environ_prefix=None,
+    )
+    # Must outlast reading then writing metadata, it is raised above twice
+    # LIVEKIT_CLIENT_TIMEOUT otherwise
+    ROOM_METADATA_LOCK_TIMEOUT = values.PositiveIntegerValue(
+        130, environ_name="ROOM_METADATA_LOCK_TIMEOUT", environ_prefix=None
+    )
+    # Changes that failed to be written are retried, doubling the delay each time
+    ROOM_METADATA_RETRY_DELAY = values.PositiveIntegerValue(
+        10, environ_name="ROOM_METADATA_RETRY_DELAY", environ_prefix=None
+    )
+    ROOM_METADATA_RETRY_ATTEMPTS = values.PositiveIntegerValue(
+        5, environ_name="ROOM_METADATA_RETRY_ATTEMPTS", environ_prefix=None
+    )
+
+    # Rooms essentials are cached to resolve rooms on the join path
+    ROOM_CACHE_KEY_PREFIX = values.Value(
+        "room", environ_name="ROOM_CACHE_KEY_PREFIX", environ_prefix=None
+    )
+    ROOM_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        300, environ_name="ROOM_CACHE_TIMEOUT", environ_prefix=None
+    )
+
     # SIP Telephony
     ROOM_TELEPHONY_ENABLED = values.BooleanValue(
         False,
@@ -723,6 +858,12 @@ class Base(Configuration):
         environ_name="ROOM_TELEPHONY_PIN_MAX_RETRIES",
         environ_prefix=None,
     )
+    # Number of PIN code candidates checked in a single query, on each retry
+    ROOM_TELEPHONY_PIN_BATCH_SIZE = values.PositiveIntegerValue(
+        10,
+        environ_name="ROOM_TELEPHONY_PIN_BATCH_SIZE",
+        environ_prefix=None,
+    )
     ROOM_TELEPHONY_PHONE_NUMBER = values.Value(
         None,
         environ_name="ROOM_TELEPHONY_PHONE_NUMBER",
@@ -733,6 +874,29 @@ class Base(Configuration):
         environ_name="ROOM_TELEPHONY_DEFAULT_COUNTRY",
         environ_prefix=None,
     )
+    TELEPHONY_DISPATCH_RULE_KEY_PREFIX = values.Value(
+        "telephony_dispatch_rule",
+        environ_name="TELEPHONY_DISPATCH_RULE_KEY_PREFIX",
+        environ_prefix=None,
+    )
+    # Rules outliving their recorded IDs are found by listing all rules
+    TELEPHONY_DISPATCH_RULE_CACHE_TIMEOUT = values.PositiveIntegerValue(
+        604800,  # 7 days
+        environ_name="TELEPHONY_DISPATCH_RULE_CACHE_TIMEOUT",
+        environ_prefix=None,
+    )
+    # Interval in seconds between reconciliations of dispatch rules and running rooms
+    TELEPHONY_RECONCILIATION_INTERVAL = values.PositiveIntegerValue(
+        3600,
+        environ_name="TELEPHONY_RECONCILIATION_INTERVAL",
+        environ_prefix=None,
+    )
+    # Maximum number of concurrent LiveKit requests made while reconciling rules
+    TELEPHONY_RECONCILIATION_MAX_CONCURRENCY = values.PositiveIntegerValue(
+        20,
+        environ_name="TELEPHONY_RECONCILIATION_MAX_CONCURRENCY",
+        environ_prefix=None,
+    )
 
     # Subtitles settings
     ROOM_SUBTITLE_ENABLED = values.BooleanValue(
@@ -814,6 +978,22 @@ class Base(Configuration):
         return get_release()
 
     # pylint: disable=invalid-name
+    @property
+    def CELERY_BEAT_SCHEDULE(self):
+        """Periodic tasks, run by celery beat."""
+        schedule = {
+            "sweep-livekit-events": {
+                "task": "core.tasks.sweep_livekit_events",
+                "schedule": self.LIVEKIT_WEBHOOK_SWEEP_INTERVAL,
+            },
+        }
+        if self.ROOM_TELEPHONY_ENABLED:
+            schedule["reconcile-telephony-dispatch-rules"] = {
+                "task": "core.tasks.reconcile_telephony_dispatch_rules",
+                "schedule": self.TELEPHONY_RECONCILIATION_INTERVAL,
+            }
+        return schedule
+
     @property
     def PARLER_LANGUAGES(self):
         """
@@ -15,6 +15,10 @@ export const fetchApi = async <T = Record<string, unknown>>(
       ...options?.headers,
     },
   })
+  // Not modified responses have no body, callers keep what they already have
+  if (response.status === 304) {
+    return undefined as T
+  }
   const result = await response.json()
   if (!response.ok) {
     throw new ApiError(response.status, result)
@@ -2,6 +2,7 @@ import { fetchApi } from '@/api/fetchApi'
 import { useQuery, UseQueryOptions } from '@tanstack/react-query'
 import { ApiError } from '@/api/ApiError'
 import { keys } from '@/api/queryKeys'
+import { queryClient } from '@/api/queryClient'
 
 export type WaitingParticipant = {
   id: string
@@ -12,21 +13,58 @@ export type WaitingParticipant = {
 
 export type WaitingParticipantsResponse = {
   participants: WaitingParticipant[]
+  version?: number
+}
+
+type WaitingParticipantsChanges = {
+  participants: WaitingParticipant[]
+  left?: string[]
+  reset?: boolean
+  version?: number
 }
 
 export type WaitingParticipantsParams = {
   roomId: string
+  previous?: WaitingParticipantsResponse
 }
 
+/**
+ * Only fetch the participants who joined and left since the previous list, and
+ * merge them into it. Unchanged lobbies answer with a 304 and no body.
+ */
 export const listWaitingParticipants = async ({
   roomId,
+  previous,
 }: WaitingParticipantsParams): Promise<WaitingParticipantsResponse> => {
-  return fetchApi<WaitingParticipantsResponse>(
-    `/rooms/${roomId}/waiting-participants/`,
+  const since = previous?.version ?? 0
+  const changes = await fetchApi<WaitingParticipantsChanges | undefined>(
+    `/rooms/${roomId}/waiting-participants/?since=${since}`,
     {
       method: 'GET',
     }
   )
+
+  if (!changes) {
+    return previous ?? { participants: [], version: since }
+  }
+
+  if (!previous || changes.reset !== false) {
+    return { participants: changes.participants, version: changes.version }
+  }
+
+  const changedIds = new Set([
+    ...(changes.left ?? []),
+    ...changes.participants.map((participant) => participant.id),
+  ])
+  return {
+    participants: [
+      ...previous.participants.filter(
+        (participant) => !changedIds.has(participant.id)
+      ),
+      ...changes.participants,
+    ],
+    version: changes.version,
+  }
 }
 
 export const useListWaitingParticipants = (
@@ -46,7 +84,14 @@ export const useListWaitingParticipants = (
     WaitingParticipantsResponse
   >({
     queryKey: [keys.waitingParticipants, roomId],
-    queryFn: () => listWaitingParticipants({ roomId }),
+    queryFn: () =>
+      listWaitingParticipants({
+        roomId,
+        previous: queryClient.getQueryData<WaitingParticipantsResponse>([
+          keys.waitingParticipants,
+          roomId,
+        ]),
+      }),
     ...queryOptions,
   })
 }
@@ -193,6 +193,15 @@ Requires top level scope
 {{ include "meet.fullname" . }}-celery-summarize
 {{- end }}
 
+{{/*
+Full name for the Celery Beat
+
+Requires top level scope
+*/}}
+{{- define "meet.celeryBeat.fullname" -}}
+{{ include "meet.fullname" . }}-celery-beat
+{{- end }}
+
 {{/*
 Full name for the agents
 